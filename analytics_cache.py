@@ -0,0 +1,478 @@
+import datetime
+import itertools
+import threading
+import time
+
+# NumPy só é importado na primeira carga: a interface não paga por ele se a análise em memória não for usada
+np = None
+
+# Linhas por round trip do cursor nomeado usado nas cargas
+ITERSIZE_CARGA = 20000
+
+# Tabelas carregadas: nome (em minúsculas, igual ao payload do NOTIFY) -> (consulta, colunas).
+# Tipos das colunas: 'chave' (int32), 'int' (int64, nulos como 0), 'data' (datetime64[D], nulos
+# como NaT) e 'texto' (codificado em dicionário: códigos int32 e os valores distintos, ordenados)
+TABELAS_ANALISE = {
+    # mortos_nulo: 1 onde num_mortos_atual é NULL, que o ORDER BY ... DESC de 'top-conflitos-mortos' põe primeiro
+    'conflito': ("SELECT cod_conflito, nome_conflito, num_mortos_atual, num_feridos_atual, "
+                 "num_mortos_atual IS NULL FROM Conflito",
+                 [('cod', 'chave'), ('nome', 'texto'), ('mortos', 'int'), ('feridos', 'int'), ('mortos_nulo', 'int')]),
+    'conflito_territorial': ("SELECT cod_conflito_fk FROM Conflito_Territorial", [('conflito', 'chave')]),
+    'conflito_religioso': ("SELECT cod_conflito_fk FROM Conflito_Religioso", [('conflito', 'chave')]),
+    'conflito_economico': ("SELECT cod_conflito_fk FROM Conflito_Economico", [('conflito', 'chave')]),
+    'conflito_racial': ("SELECT cod_conflito_fk FROM Conflito_Racial", [('conflito', 'chave')]),
+    'conflito_afeta_pais': ("SELECT cod_conflito_fk, cod_pais_fk FROM Conflito_Afeta_Pais",
+                            [('conflito', 'chave'), ('pais', 'chave')]),
+    'conflito_territorial_afeta_regiao': (
+        "SELECT cod_conflito_territorial_fk, id_regiao_fk FROM Conflito_Territorial_Afeta_Regiao",
+        [('conflito', 'chave'), ('regiao', 'chave')]),
+    'fornecimento_arma_grupo': (
+        """SELECT id_traficante_fk, nome_arma_fk, cod_grupo_fk, data_fornecimento, quantidade_fornecida
+           FROM Fornecimento_Arma_Grupo""",
+        [('traficante', 'chave'), ('arma', 'texto'), ('grupo', 'chave'), ('data', 'data'), ('quantidade', 'int')]),
+    'organizacao_intervem_conflito': (
+        "SELECT cod_org_fk, cod_conflito_fk, data_incorporacao FROM Organizacao_Intervem_Conflito",
+        [('organizacao', 'chave'), ('conflito', 'chave'), ('data', 'data')]),
+    'grupo_armado_participa_conflito': (
+        "SELECT cod_grupo_fk, cod_conflito_fk, data_incorporacao FROM Grupo_Armado_Participa_Conflito",
+        [('grupo', 'chave'), ('conflito', 'chave'), ('data', 'data')]),
+    'pais': ("SELECT cod_pais, nome_pais FROM Pais", [('cod', 'chave'), ('nome', 'texto')]),
+    'regiao': ("SELECT id_regiao, nome_regiao FROM Regiao", [('cod', 'chave'), ('nome', 'texto')]),
+    'grupo_armado': ("SELECT cod_grupo, nome_grupo FROM Grupo_Armado", [('cod', 'chave'), ('nome', 'texto')]),
+    'organizacao_mediadora': ("SELECT cod_org, nome_org FROM Organizacao_Mediadora",
+                              [('cod', 'chave'), ('nome', 'texto')]),
+    'traficante_armas': ("SELECT id_traficante, nome_traficante FROM Traficante_Armas",
+                         [('cod', 'chave'), ('nome', 'texto')]),
+}
+
+# Rótulos dos tipos de conflito (os mesmos do relatório 'tipos-conflito') e a tabela de cada um
+TIPOS_CONFLITO = [('Territorial', 'conflito_territorial'), ('Religioso', 'conflito_religioso'),
+                  ('Econômico', 'conflito_economico'), ('Racial', 'conflito_racial')]
+
+# Dimensões dos conflitos (além de 'tipo'): nome -> (tabela ponte, coluna da ponte, tabela da dimensão)
+PONTES_CONFLITO = {
+    'pais': ('conflito_afeta_pais', 'pais', 'pais'),
+    'regiao': ('conflito_territorial_afeta_regiao', 'regiao', 'regiao'),
+    'grupo': ('grupo_armado_participa_conflito', 'grupo', 'grupo_armado'),
+    'organizacao': ('organizacao_intervem_conflito', 'organizacao', 'organizacao_mediadora'),
+}
+# Dimensões dos fornecimentos: nome -> tabela da dimensão (None: a coluna de texto do próprio fornecimento)
+DIMENSOES_FORNECIMENTO = {'arma': None, 'grupo': 'grupo_armado', 'traficante': 'traficante_armas'}
+
+# Medidas: nome -> (fato, coluna somada ou None para contar linhas)
+MEDIDAS = {
+    'conflitos': ('conflito', None),
+    'mortos': ('conflito', 'mortos'),
+    'feridos': ('conflito', 'feridos'),
+    'fornecimentos': ('fornecimento', None),
+    'armas': ('fornecimento', 'quantidade'),
+}
+DIMENSOES = {'conflito': ['tipo'] + list(PONTES_CONFLITO), 'fornecimento': list(DIMENSOES_FORNECIMENTO)}
+# Filtros de período (AAAA-MM-DD), aplicados à data dos fornecimentos
+FILTROS_DATA = ['desde', 'ate']
+
+
+def _numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("A análise em memória requer o pacote 'numpy' (pip install numpy).") from None
+        np = numpy
+    return np
+
+
+def ler_filtros(texto):
+    """
+    Filtros digitados como "tipo=Religioso; pais=Síria, Iraque; desde=2024-01-01": dimensão ->
+    lista de nomes (ou data, em desde/ate). ValueError se algum filtro for inválido.
+    """
+    filtros = {}
+    for item in (texto or "").split(';'):
+        if not item.strip():
+            continue
+        nome, separador, valor = item.partition('=')
+        nome = nome.strip()
+        if not separador or not valor.strip():
+            raise ValueError(f"Filtro inválido: '{item.strip()}' (use nome=valor)")
+        if nome in FILTROS_DATA:
+            try:
+                filtros[nome] = datetime.date.fromisoformat(valor.strip())
+            except ValueError:
+                raise ValueError(f"{nome}: a data '{valor.strip()}' é inválida. Use o formato AAAA-MM-DD.") from None
+        elif nome in DIMENSOES['conflito'] or nome in DIMENSOES['fornecimento']:
+            filtros[nome] = [parte.strip() for parte in valor.split(',') if parte.strip()]
+        else:
+            raise ValueError(f"Filtro desconhecido: {nome}")
+    return filtros
+
+
+def _converter(tipo, valores):
+    if tipo == 'chave':
+        return np.array([-1 if valor is None else valor for valor in valores], dtype=np.int32)
+    if tipo == 'int':
+        return np.array([0 if valor is None else valor for valor in valores], dtype=np.int64)
+    if tipo == 'data':
+        return np.array(valores, dtype='datetime64[D]')
+    return np.array(["" if valor is None else valor for valor in valores], dtype=object)
+
+
+def _top(valores, limite):
+    """Índices dos 'limite' maiores valores, do maior para o menor (argpartition + ordenação só do topo)."""
+    if limite is not None and limite < len(valores):
+        indices = np.argpartition(-valores, limite - 1)[:limite]
+    else:
+        indices = np.arange(len(valores))
+    return indices[np.argsort(-valores[indices], kind='stable')]
+
+
+class _Tabela:
+    """Colunas de uma tabela carregada: arrays NumPy e, nas colunas de texto, os valores distintos."""
+
+    def __init__(self, versao, colunas, categorias, linhas):
+        self.versao = versao
+        self.colunas = colunas
+        self.categorias = categorias
+        self.linhas = linhas
+
+    def bytes(self):
+        return sum(coluna.nbytes for coluna in self.colunas.values())
+
+
+class AnalyticsCache:
+    """
+    Cache colunar das tabelas de fatos, para análises interativas sem consultar o banco.
+
+    Cada tabela de TABELAS_ANALISE é lida uma vez (cursor nomeado, em lotes) para
+    arrays NumPy, com os textos codificados em dicionário. Os relatórios de top-N e de
+    agrupamento (responder) e os recortes ad hoc (resumir: medida por dimensão, com
+    filtros) viram operações vetorizadas (bincount, argpartition, isin) sobre esses
+    arrays. As chaves estrangeiras são traduzidas para posições na dimensão uma vez
+    por carga e guardadas junto com as tabelas.
+
+    invalidar(tabela) (escritas da aplicação e NOTIFYs, via ReferenceCache) só marca a
+    tabela: a próxima análise recarrega apenas as tabelas alteradas, e os arrays
+    derivados delas são recalculados.
+    """
+
+    def __init__(self, obter_pool, tabelas=TABELAS_ANALISE):
+        # obter_pool é uma função porque o pool é recriado a cada "Testar Conexão"
+        self.obter_pool = obter_pool
+        self.tabelas = tabelas
+        self._lock = threading.Lock()
+        # Uma carga por vez: duas análises simultâneas não leem a mesma tabela duas vezes
+        self._lock_carga = threading.Lock()
+        self._dados = {}
+        # Versão de cada tabela, incrementada por invalidar(); a tabela carregada guarda a da carga
+        self._versoes = {tabela: 0 for tabela in tabelas}
+        # chave -> (nomes das tabelas, tabelas usadas no cálculo, valor): posições das chaves, pontes etc.
+        self._derivados = {}
+        self._contador_cursores = itertools.count(1)
+        self._stats = {'acertos': 0, 'cargas': 0, 'linhas_carregadas': 0, 'tempo_cargas': 0.0,
+                       'invalidacoes': 0, 'consultas': 0}
+
+    # --- CARGA ---
+    def _tabela(self, nome):
+        """A tabela em memória, recarregada do banco se tiver sido invalidada."""
+        with self._lock:
+            tabela = self._dados.get(nome)
+            if tabela is not None and tabela.versao == self._versoes[nome]:
+                self._stats['acertos'] += 1
+                return tabela
+
+        with self._lock_carga:
+            with self._lock:
+                # Outra análise pode tê-la carregado enquanto esperávamos
+                tabela = self._dados.get(nome)
+                versao = self._versoes[nome]
+                if tabela is not None and tabela.versao == versao:
+                    return tabela
+            inicio = time.perf_counter()
+            tabela = self._carregar(nome, versao)
+            with self._lock:
+                # Guardada mesmo se invalidada durante a carga: serve a esta análise e a próxima recarrega
+                self._dados[nome] = tabela
+                self._stats['cargas'] += 1
+                self._stats['linhas_carregadas'] += tabela.linhas
+                self._stats['tempo_cargas'] += time.perf_counter() - inicio
+        return tabela
+
+    def _carregar(self, nome, versao):
+        _numpy()
+        query, colunas = self.tabelas[nome]
+        partes = [[] for _ in colunas]
+        with self.obter_pool().conexao() as conn:
+            cursor = conn.cursor(name=f"analise_{next(self._contador_cursores)}")
+            try:
+                cursor.itersize = ITERSIZE_CARGA
+                cursor.execute(query)
+                while True:
+                    lote = cursor.fetchmany(ITERSIZE_CARGA)
+                    if not lote:
+                        break
+                    # Cada lote vira arrays na hora: só um lote de tuplas fica em memória
+                    for parte, (_, tipo), valores in zip(partes, colunas, zip(*lote)):
+                        parte.append(_converter(tipo, valores))
+            finally:
+                cursor.close()
+            conn.rollback()
+
+        arrays, categorias = {}, {}
+        for parte, (coluna, tipo) in zip(partes, colunas):
+            valores = np.concatenate(parte) if parte else _converter(tipo, [])
+            if tipo == 'texto':
+                distintos, codigos = np.unique(valores, return_inverse=True)
+                categorias[coluna] = distintos
+                valores = codigos.astype(np.int32).ravel()
+            arrays[coluna] = valores
+        linhas = len(next(iter(arrays.values()))) if arrays else 0
+        return _Tabela(versao, arrays, categorias, linhas)
+
+    def _derivado(self, chave, nomes, calcular):
+        """calcular(*tabelas), guardado até alguma das tabelas ser recarregada."""
+        tabelas = [self._tabela(nome) for nome in nomes]
+        with self._lock:
+            guardado = self._derivados.get(chave)
+            if guardado is not None and all(a is b for a, b in zip(guardado[1], tabelas)):
+                return guardado[2]
+        valor = calcular(*tabelas)
+        with self._lock:
+            self._derivados[chave] = (tuple(nomes), tabelas, valor)
+        return valor
+
+    def _posicoes(self, fato, coluna, dimensao):
+        """Posição, na tabela da dimensão, da chave de cada linha do fato (-1 se não existir)."""
+        def calcular(tabela_fato, tabela_dimensao):
+            chaves = tabela_fato.colunas[coluna]
+            codigos = tabela_dimensao.colunas['cod']
+            ordem = np.argsort(codigos, kind='stable')
+            ordenados = codigos[ordem]
+            if not len(ordenados):
+                return np.full(len(chaves), -1, dtype=np.int32)
+            indices = np.minimum(np.searchsorted(ordenados, chaves), len(ordenados) - 1)
+            return np.where(ordenados[indices] == chaves, ordem[indices], -1).astype(np.int32)
+        return self._derivado(('posicoes', fato, coluna, dimensao), (fato, dimensao), calcular)
+
+    def _rotulos(self, fato, coluna, dimensao):
+        """(código do nome na dimensão de cada linha do fato ou -1, nomes distintos da dimensão)."""
+        def calcular(tabela_fato, tabela_dimensao):
+            posicoes = self._posicoes(fato, coluna, dimensao)
+            nomes = tabela_dimensao.colunas['nome']
+            if not len(nomes):
+                return np.full(len(posicoes), -1, dtype=np.int32), tabela_dimensao.categorias['nome']
+            return np.where(posicoes >= 0, nomes[np.maximum(posicoes, 0)], -1), tabela_dimensao.categorias['nome']
+        return self._derivado(('rotulos', fato, coluna, dimensao), (fato, dimensao), calcular)
+
+    def _ponte(self, dimensao):
+        """
+        Pares (posição do conflito, código do rótulo) da dimensão de conflito e os rótulos.
+        Um conflito aparece uma vez para cada país, região, grupo etc. a que está ligado.
+        """
+        if dimensao == 'tipo':
+            nomes = ['conflito'] + [tabela for _, tabela in TIPOS_CONFLITO]
+
+            def calcular(*tabelas):
+                conflitos, grupos = [], []
+                for indice, (_, tabela) in enumerate(TIPOS_CONFLITO):
+                    posicoes = self._posicoes(tabela, 'conflito', 'conflito')
+                    posicoes = posicoes[posicoes >= 0]
+                    conflitos.append(posicoes)
+                    grupos.append(np.full(len(posicoes), indice, dtype=np.int32))
+                rotulos = np.array([rotulo for rotulo, _ in TIPOS_CONFLITO], dtype=object)
+                return np.concatenate(conflitos), np.concatenate(grupos), rotulos
+            return self._derivado(('ponte', 'tipo'), nomes, calcular)
+
+        ponte, coluna, tabela_dimensao = PONTES_CONFLITO[dimensao]
+
+        def calcular(tabela_ponte, tabela_conflito, tabela):
+            conflitos = self._posicoes(ponte, 'conflito', 'conflito')
+            grupos, rotulos = self._rotulos(ponte, coluna, tabela_dimensao)
+            validos = (conflitos >= 0) & (grupos >= 0)
+            return conflitos[validos], grupos[validos], rotulos
+        return self._derivado(('ponte', dimensao), (ponte, 'conflito', tabela_dimensao), calcular)
+
+    # --- FILTROS ---
+    def _mascara_conflitos(self, filtros):
+        """Conflitos ligados a algum dos nomes de cada filtro de dimensão de conflito."""
+        mascara = np.ones(self._tabela('conflito').linhas, dtype=bool)
+        for dimensao in DIMENSOES['conflito']:
+            if not filtros.get(dimensao):
+                continue
+            conflitos, grupos, rotulos = self._ponte(dimensao)
+            escolhidos = np.isin(rotulos, filtros[dimensao])[grupos]
+            ligados = np.zeros_like(mascara)
+            ligados[conflitos[escolhidos]] = True
+            mascara &= ligados
+        return mascara
+
+    def _grupos_fornecimento(self, dimensao):
+        """(código do rótulo de cada fornecimento ou -1, rótulos) da dimensão de fornecimento."""
+        if DIMENSOES_FORNECIMENTO[dimensao] is None:
+            tabela = self._tabela('fornecimento_arma_grupo')
+            return tabela.colunas[dimensao], tabela.categorias[dimensao]
+        return self._rotulos('fornecimento_arma_grupo', dimensao, DIMENSOES_FORNECIMENTO[dimensao])
+
+    def _mascara_fornecimentos(self, filtros):
+        tabela = self._tabela('fornecimento_arma_grupo')
+        mascara = np.ones(tabela.linhas, dtype=bool)
+        for dimensao in DIMENSOES['fornecimento']:
+            if filtros.get(dimensao):
+                grupos, rotulos = self._grupos_fornecimento(dimensao)
+                mascara &= (grupos >= 0) & np.isin(rotulos, filtros[dimensao])[np.maximum(grupos, 0)]
+        if filtros.get('desde'):
+            mascara &= tabela.colunas['data'] >= np.datetime64(filtros['desde'], 'D')
+        if filtros.get('ate'):
+            mascara &= tabela.colunas['data'] <= np.datetime64(filtros['ate'], 'D')
+        return mascara
+
+    # --- ANÁLISES ---
+    def resumir(self, medida, por, filtros=None, limite=None):
+        """
+        [(rótulo, valor)] da medida agrupada pela dimensão 'por', do maior para o menor valor,
+        só com os grupos que têm alguma linha. Medidas de conflitos (conflitos, mortos, feridos)
+        agrupam por tipo, pais, regiao, grupo ou organizacao; as de fornecimentos (fornecimentos,
+        armas) por arma, grupo ou traficante. Os filtros (ler_filtros) aceitam as dimensões
+        do mesmo fato e, nos fornecimentos, desde/ate. ValueError se a combinação não existir.
+        """
+        if medida not in MEDIDAS:
+            raise ValueError(f"Medida desconhecida: {medida} (use {', '.join(MEDIDAS)})")
+        fato, coluna = MEDIDAS[medida]
+        if por not in DIMENSOES[fato]:
+            raise ValueError(f"A medida '{medida}' agrupa por {', '.join(DIMENSOES[fato])}.")
+        filtros = dict(filtros or {})
+        invalidos = set(filtros) - set(DIMENSOES[fato]) - (set(FILTROS_DATA) if fato == 'fornecimento' else set())
+        if invalidos:
+            raise ValueError(f"Filtros que não se aplicam a '{medida}': {', '.join(sorted(invalidos))}")
+        _numpy()
+        with self._lock:
+            self._stats['consultas'] += 1
+
+        if fato == 'conflito':
+            conflitos, grupos, rotulos = self._ponte(por)
+            escolhidos = self._mascara_conflitos(filtros)[conflitos]
+            grupos = grupos[escolhidos]
+            pesos = self._tabela('conflito').colunas[coluna][conflitos[escolhidos]] if coluna else None
+        else:
+            grupos, rotulos = self._grupos_fornecimento(por)
+            escolhidos = self._mascara_fornecimentos(filtros) & (grupos >= 0)
+            grupos = grupos[escolhidos]
+            pesos = self._tabela('fornecimento_arma_grupo').colunas[coluna][escolhidos] if coluna else None
+
+        contagens = np.bincount(grupos, minlength=len(rotulos))
+        valores = contagens if pesos is None else np.bincount(grupos, weights=pesos, minlength=len(rotulos))
+        valores = valores.astype(np.int64)
+        presentes = np.flatnonzero(contagens)
+        ordem = presentes[_top(valores[presentes], limite)]
+        return [(rotulos[i], int(valores[i])) for i in ordem]
+
+    def responder(self, relatorio, valores=None):
+        """
+        (linhas, colunas) do relatório calculado em memória, como o da consulta SQL,
+        ou None se o relatório não tiver versão em memória (ver RESPOSTAS).
+        """
+        responder = RESPOSTAS.get(relatorio.nome)
+        if responder is None:
+            return None
+        _numpy()
+        with self._lock:
+            self._stats['consultas'] += 1
+        return responder(self, relatorio.valores(valores)), list(relatorio.colunas)
+
+    def _tipos_conflito(self, valores):
+        return [(rotulo, self._tabela(tabela).linhas) for rotulo, tabela in TIPOS_CONFLITO]
+
+    def _traficantes_por_arma(self, valores):
+        armas, rotulos_armas = self._grupos_fornecimento('arma')
+        traficantes, nomes_traficantes = self._grupos_fornecimento('traficante')
+        grupos, nomes_grupos = self._grupos_fornecimento('grupo')
+        escolhidos = np.isin(rotulos_armas, valores['armas'] or [])[armas] & (traficantes >= 0) & (grupos >= 0)
+        # Pares distintos (traficante, grupo) pelos códigos dos nomes, como o SELECT DISTINCT dos nomes
+        pares = np.unique(traficantes[escolhidos].astype(np.int64) * len(nomes_grupos) + grupos[escolhidos])
+        return sorted((nomes_traficantes[par // len(nomes_grupos)], nomes_grupos[par % len(nomes_grupos)])
+                      for par in pares.tolist())
+
+    def _top_conflitos_mortos(self, valores):
+        conflito = self._tabela('conflito')
+        indices = np.flatnonzero(self._mascara_conflitos({'pais': [valores['pais']] if valores['pais'] else []}))
+        mortos, nulos = conflito.colunas['mortos'], conflito.colunas['mortos_nulo'].astype(bool)
+        # Como no ORDER BY num_mortos_atual DESC do SQL, os conflitos sem número vêm antes de todos
+        ordem = np.where(nulos, np.iinfo(np.int64).max, mortos)
+        indices = indices[_top(ordem[indices], valores['limite'])]
+        nomes = conflito.categorias['nome'][conflito.colunas['nome'][indices]]
+        return [(nome, None if nulos[i] else int(mortos[i])) for nome, i in zip(nomes, indices)]
+
+    def _top_por_nome(self, fato, coluna, dimensao, limite, pesos=None):
+        # LEFT JOIN: todos os nomes da dimensão entram, com 0 se não tiverem nenhuma linha
+        grupos, rotulos = self._rotulos(fato, coluna, dimensao)
+        validos = grupos >= 0
+        totais = np.bincount(grupos[validos], weights=None if pesos is None else pesos[validos],
+                             minlength=len(rotulos)).astype(np.int64)
+        return [(rotulos[i], int(totais[i])) for i in _top(totais, limite)]
+
+    def _top_organizacoes(self, valores):
+        return self._top_por_nome('organizacao_intervem_conflito', 'organizacao', 'organizacao_mediadora',
+                                  valores['limite'])
+
+    def _top_grupos_armas(self, valores):
+        pesos = self._tabela('fornecimento_arma_grupo').colunas['quantidade']
+        return self._top_por_nome('fornecimento_arma_grupo', 'grupo', 'grupo_armado', valores['limite'], pesos)
+
+    def _paises_religiosos(self, valores):
+        conflitos, grupos, rotulos = self._ponte('pais')
+        religiosos = self._mascara_conflitos({'tipo': ['Religioso']})[conflitos]
+        # Conflitos distintos por nome de país (COUNT(DISTINCT cod_conflito) ... GROUP BY nome_pais)
+        total_conflitos = max(self._tabela('conflito').linhas, 1)
+        pares = np.unique(grupos[religiosos].astype(np.int64) * total_conflitos + conflitos[religiosos])
+        contagens = np.bincount(pares // total_conflitos, minlength=len(rotulos))
+        maximo = int(contagens.max()) if len(contagens) else 0
+        if maximo <= 0:
+            return []
+        return sorted((rotulos[i], maximo) for i in np.flatnonzero(contagens == maximo))
+
+    # --- ACESSO PARA OUTRAS ANÁLISES EM MEMÓRIA (ex.: supply_graph.py) ---
+    def tabela(self, nome):
+        """A tabela de TABELAS_ANALISE em memória (carregada ou recarregada se preciso)."""
+        return self._tabela(nome)
+
+    def posicoes(self, fato, coluna, dimensao):
+        """Posição, na tabela da dimensão, da chave de cada linha do fato (-1 se não existir)."""
+        return self._posicoes(fato, coluna, dimensao)
+
+    def derivado(self, chave, nomes, calcular):
+        """calcular(*tabelas), guardado até alguma das tabelas 'nomes' ser invalidada e recarregada."""
+        return self._derivado(chave, nomes, calcular)
+
+    # --- MANUTENÇÃO ---
+    def invalidar(self, *tabelas):
+        """Marca as tabelas informadas (ou todas) para recarga na próxima análise que as usar."""
+        tabelas = {tabela.lower() for tabela in tabelas} or set(self.tabelas)
+        with self._lock:
+            for tabela in tabelas & self._versoes.keys():
+                self._versoes[tabela] += 1
+                self._stats['invalidacoes'] += 1
+            # Libera já a memória das versões antigas (as análises em andamento mantêm suas referências)
+            for tabela in tabelas:
+                self._dados.pop(tabela, None)
+            for chave in [chave for chave, (nomes, _, _) in self._derivados.items() if tabelas & set(nomes)]:
+                del self._derivados[chave]
+
+    def estatisticas(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['tabelas_em_memoria'] = sorted(self._dados)
+            stats['linhas'] = sum(tabela.linhas for tabela in self._dados.values())
+            stats['bytes'] = sum(tabela.bytes() for tabela in self._dados.values())
+            stats['derivados'] = len(self._derivados)
+        return stats
+
+
+# Relatórios de reports.py com versão em memória: nome -> método(cache, valores tipados)
+RESPOSTAS = {
+    'tipos-conflito': AnalyticsCache._tipos_conflito,
+    'traficantes-barrett': AnalyticsCache._traficantes_por_arma,
+    'top-conflitos-mortos': AnalyticsCache._top_conflitos_mortos,
+    'top-organizacoes': AnalyticsCache._top_organizacoes,
+    'top-grupos-armas': AnalyticsCache._top_grupos_armas,
+    'paises-religiosos': AnalyticsCache._paises_religiosos,
+}
@@ -0,0 +1,482 @@
+"""
+Benchmark da aplicação sobre dados sintéticos em escala.
+
+Gera dados válidos para o esquema (países, conflitos dos quatro tipos, grupos com
+líderes, divisões e chefes, organizações, traficantes, estoques, fornecimentos,
+mediações e diálogos) em múltiplos da população de Populacao_BD2.pdf e mede:
+    - as consultas de todos os relatórios e listagens;
+    - as consultas de atualização dos combos/listboxes (atualizar_*), a frio e pelo cache;
+    - as transações de cadastro (cadastrar_*), confirmadas de verdade.
+O resultado (p50/p95/p99, média e vazão por operação) é gravado em JSON para
+comparar versões: python benchmark.py ... --comparar resultado_anterior.json
+
+Use um banco dedicado: os dados sintéticos não são removidos ao final.
+
+Uso:
+    python benchmark.py --database conflitos_bench --escalas 10 100 1000 --saida bench.json
+"""
+import argparse
+import datetime
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+
+import psycopg2
+
+import cadastros
+from db_pool import ConnectionPool, adicionar_argumentos_conexao, config_dos_argumentos
+from reference_cache import ReferenceCache, TABELAS_REFERENCIA
+from reports import RELATORIOS, TAMANHO_PAGINA, EstadoResumos, compilar
+
+# Quantidade de registros de cada entidade por unidade de escala (população original)
+POPULACAO_BASE = {
+    'paises': 15, 'regioes': 10, 'religioes': 10, 'materias_primas': 14, 'etnias': 15,
+    'conflitos': 5, 'grupos': 5, 'organizacoes': 10, 'traficantes': 8,
+    'fornecimentos': 17, 'intervencoes': 10, 'dialogos': 10,
+}
+
+TIPOS_CONFLITO = ['territorial', 'religioso', 'economico', 'racial']
+TIPOS_ORG = ['governamental', 'não governamental', 'internacional']
+TIPOS_AJUDA = ['médica', 'diplomática', 'presencial']
+ARMAS_PADRAO = ['Barrett M82', 'M200 Intervention', 'AK-47', 'M16', 'RPG-7', 'Glock 17',
+                'FN FAL', 'Uzi', 'Dragunov SVD', 'M249', 'Javelin', 'Stinger']
+
+DATA_INICIAL = datetime.date(1990, 1, 1)
+
+
+class GeradorDados:
+    """Insere dados sintéticos em lotes (INSERT ... SELECT unnest), todos válidos para os triggers."""
+
+    def __init__(self, conn, semente=42):
+        self.conn = conn
+        self.aleatorio = random.Random(semente)
+        # Prefixo único por execução, para não colidir com nomes UNIQUE de execuções anteriores
+        self.execucao = f"Sint {int(time.time() * 1000) % 10 ** 9:09d}"
+        self.rodada = 0
+        self.prefixo = self.execucao
+
+    def _data(self):
+        return DATA_INICIAL + datetime.timedelta(days=self.aleatorio.randrange(12000))
+
+    def _amostra(self, ids, minimo, maximo):
+        return self.aleatorio.sample(ids, min(len(ids), self.aleatorio.randint(minimo, maximo)))
+
+    def _nomes(self, cursor, tabela, coluna_id, coluna_nome, rotulo, quantidade):
+        cursor.execute(
+            f"INSERT INTO {tabela} ({coluna_nome}) "
+            f"SELECT %s || ' ' || g FROM generate_series(1, %s) g RETURNING {coluna_id}",
+            (f"{self.prefixo} {rotulo}", quantidade))
+        return [row[0] for row in cursor.fetchall()]
+
+    def gerar(self, unidades):
+        """Acrescenta 'unidades' vezes a população base. Retorna a contagem inserida por entidade."""
+        n = {chave: valor * unidades for chave, valor in POPULACAO_BASE.items()}
+        self.rodada += 1
+        self.prefixo = f"{self.execucao}.{self.rodada}"
+        aleatorio = self.aleatorio
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT to_regproc('sp_recalcular_resumos') IS NOT NULL")
+            recalcular_resumos = cursor.fetchone()[0]
+            if recalcular_resumos:
+                cursor.execute("SET LOCAL conflitos.modo_resumos = 'adiado'")
+
+            paises = self._nomes(cursor, 'Pais', 'cod_pais', 'nome_pais', 'País', n['paises'])
+            detalhes = {
+                'territorial': self._nomes(cursor, 'Regiao', 'id_regiao', 'nome_regiao', 'Região', n['regioes']),
+                'religioso': self._nomes(cursor, 'Religiao_Entidade', 'id_religiao', 'nome_religiao',
+                                         'Religião', n['religioes']),
+                'economico': self._nomes(cursor, 'Materia_Prima', 'id_materia_prima', 'nome_materia_prima',
+                                         'Matéria-Prima', n['materias_primas']),
+                'racial': self._nomes(cursor, 'Etnia', 'id_etnia', 'nome_etnia', 'Etnia', n['etnias']),
+            }
+
+            # Conflitos: o tipo alterna entre os quatro subtipos
+            cursor.execute("""
+                INSERT INTO Conflito (nome_conflito, num_mortos_atual, num_feridos_atual)
+                SELECT %s || ' ' || g, (random() * 100000)::int, (random() * 200000)::int
+                FROM generate_series(1, %s) g RETURNING cod_conflito
+            """, (f"{self.prefixo} Conflito", n['conflitos']))
+            conflitos = [row[0] for row in cursor.fetchall()]
+            tabelas_tipo = {
+                'territorial': ('Conflito_Territorial', 'Conflito_Territorial_Afeta_Regiao',
+                                'cod_conflito_territorial_fk', 'id_regiao_fk'),
+                'religioso': ('Conflito_Religioso', 'Conflito_Religioso_Afeta_Religiao',
+                              'cod_conflito_religioso_fk', 'id_religiao_fk'),
+                'economico': ('Conflito_Economico', 'Conflito_Economico_Afeta_MateriaPrima',
+                              'cod_conflito_economico_fk', 'id_materia_prima_fk'),
+                'racial': ('Conflito_Racial', 'Conflito_Racial_Afeta_Etnia',
+                           'cod_conflito_racial_fk', 'id_etnia_fk'),
+            }
+            for i, tipo in enumerate(TIPOS_CONFLITO):
+                do_tipo = conflitos[i::4]
+                subtipo, associativa, col_conflito, col_detalhe = tabelas_tipo[tipo]
+                cursor.execute(f"INSERT INTO {subtipo} (cod_conflito_fk) SELECT unnest(%s::int[])", (do_tipo,))
+                pares = [(c, d) for c in do_tipo for d in self._amostra(detalhes[tipo], 1, 3)]
+                cursor.execute(
+                    f"INSERT INTO {associativa} ({col_conflito}, {col_detalhe}) "
+                    f"SELECT * FROM unnest(%s::int[], %s::int[])",
+                    ([c for c, _ in pares], [d for _, d in pares]))
+
+            pares = [(c, p) for c in conflitos for p in self._amostra(paises, 1, 4)]
+            cursor.execute("INSERT INTO Conflito_Afeta_Pais SELECT * FROM unnest(%s::int[], %s::int[])",
+                           ([c for c, _ in pares], [p for _, p in pares]))
+
+            # Grupos: cada um com líder, três divisões e um chefe por divisão
+            grupos = self._nomes(cursor, 'Grupo_Armado', 'cod_grupo', 'nome_grupo', 'Grupo', n['grupos'])
+            cursor.execute("""
+                INSERT INTO Lider_Politico (nome_lider, cod_grupo_liderado_fk, apoios_descricao)
+                SELECT %s || ' ' || g, g, 'Apoio sintético' FROM unnest(%s::int[]) g
+                RETURNING id_lider_politico, cod_grupo_liderado_fk
+            """, (f"{self.prefixo} Líder", grupos))
+            lideres = cursor.fetchall()
+            cursor.execute("""
+                INSERT INTO Divisao (cod_grupo_fk, num_barcos, num_tanques, num_avioes, num_homens, num_baixas_divisao)
+                SELECT g, (random() * 20)::int, (random() * 100)::int, (random() * 30)::int,
+                       (random() * 10000)::int, (random() * 500)::int
+                FROM unnest(%s::int[]) g CROSS JOIN generate_series(1, 3)
+                RETURNING cod_grupo_fk, num_divisao
+            """, (grupos,))
+            divisoes = cursor.fetchall()
+            lider_do_grupo = {grupo: lider for lider, grupo in lideres}
+            cursor.execute("""
+                INSERT INTO Chefe_Militar (nome_chefe, faixa_hierarquica, id_lider_politico_obedece_fk,
+                                           cod_grupo_divisao_liderada_fk, num_divisao_liderada_fk)
+                SELECT %s || ' ' || g || '/' || d, 'Comandante', l, g, d
+                FROM unnest(%s::int[], %s::int[], %s::int[]) AS t(g, d, l)
+            """, (f"{self.prefixo} Chefe", [g for g, _ in divisoes], [d for _, d in divisoes],
+                  [lider_do_grupo[g] for g, _ in divisoes]))
+
+            # Participações: 2 a 4 grupos distintos por conflito
+            participacoes = []
+            for c in conflitos:
+                for g in self._amostra(grupos, 2, 4):
+                    entrada = self._data()
+                    saida = entrada + datetime.timedelta(days=aleatorio.randrange(2000)) \
+                        if aleatorio.random() < 0.3 else None
+                    participacoes.append((g, c, entrada, saida))
+            cursor.execute("""
+                INSERT INTO Grupo_Armado_Participa_Conflito (cod_grupo_fk, cod_conflito_fk, data_incorporacao, data_saida)
+                SELECT * FROM unnest(%s::int[], %s::int[], %s::date[], %s::date[])
+            """, tuple(list(coluna) for coluna in zip(*participacoes)))
+
+            # Organizações mediadoras, intervenções e diálogos com líderes
+            cursor.execute("""
+                INSERT INTO Organizacao_Mediadora (nome_org, tipo_org)
+                SELECT %s || ' ' || g, (%s::text[])[1 + g %% 3] FROM generate_series(1, %s) g
+                RETURNING cod_org
+            """, (f"{self.prefixo} Org", TIPOS_ORG, n['organizacoes']))
+            organizacoes = [row[0] for row in cursor.fetchall()]
+            intervencoes = {(aleatorio.choice(organizacoes), aleatorio.choice(conflitos), self._data())
+                            for _ in range(n['intervencoes'])}
+            cursor.execute("""
+                INSERT INTO Organizacao_Intervem_Conflito
+                    (cod_org_fk, cod_conflito_fk, data_incorporacao, num_pessoas, tipo_ajuda)
+                SELECT o, c, d, (random() * 500)::int, (%s::text[])[1 + (random() * 2)::int]
+                FROM unnest(%s::int[], %s::int[], %s::date[]) AS t(o, c, d)
+            """, (TIPOS_AJUDA,) + tuple(list(coluna) for coluna in zip(*intervencoes)))
+            dialogos = {(aleatorio.choice(lideres)[0], aleatorio.choice(organizacoes), self._data())
+                        for _ in range(n['dialogos'])}
+            cursor.execute("""
+                INSERT INTO Dialogo_Lider_Organizacao (id_lider_politico_fk, cod_org_fk, data_dialogo, descricao_dialogo)
+                SELECT l, o, d, 'Diálogo sintético' FROM unnest(%s::int[], %s::int[], %s::date[]) AS t(l, o, d)
+            """, tuple(list(coluna) for coluna in zip(*dialogos)))
+
+            # Traficantes com estoque folgado, para que os fornecimentos passem na validação de estoque
+            cursor.execute("INSERT INTO Tipo_Arma (nome_arma_pk) SELECT unnest(%s::text[]) ON CONFLICT DO NOTHING",
+                           (ARMAS_PADRAO,))
+            cursor.execute("SELECT nome_arma_pk FROM Tipo_Arma")
+            armas = [row[0] for row in cursor.fetchall()]
+            traficantes = self._nomes(cursor, 'Traficante_Armas', 'id_traficante', 'nome_traficante',
+                                      'Traficante', n['traficantes'])
+            estoque = [(t, a) for t in traficantes for a in self._amostra(armas, 2, 4)]
+            cursor.execute("""
+                INSERT INTO Traficante_Dispoe_Tipo_Arma (id_traficante_fk, nome_arma_fk, quantidade_disponivel)
+                SELECT t, a, 1000000 FROM unnest(%s::int[], %s::text[]) AS e(t, a)
+            """, ([t for t, _ in estoque], [a for _, a in estoque]))
+            fornecimentos = {aleatorio.choice(estoque) + (aleatorio.choice(grupos), self._data())
+                             for _ in range(n['fornecimentos'])}
+            cursor.execute("""
+                INSERT INTO Fornecimento_Arma_Grupo
+                    (id_traficante_fk, nome_arma_fk, cod_grupo_fk, data_fornecimento, quantidade_fornecida)
+                SELECT t, a, g, d, 1 + (random() * 50)::int
+                FROM unnest(%s::int[], %s::text[], %s::int[], %s::date[]) AS f(t, a, g, d)
+            """, tuple(list(coluna) for coluna in zip(*fornecimentos)))
+
+            if recalcular_resumos:
+                cursor.execute("SELECT sp_recalcular_resumos()")
+        self.conn.commit()
+
+        with self.conn.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.conn.commit()
+        return {
+            'paises': len(paises), 'conflitos': len(conflitos), 'grupos': len(grupos),
+            'divisoes': len(divisoes), 'organizacoes': len(organizacoes), 'traficantes': len(traficantes),
+            'participacoes': len(participacoes), 'intervencoes': len(intervencoes),
+            'dialogos': len(dialogos), 'fornecimentos': len(fornecimentos),
+        }
+
+
+# --- TRANSAÇÕES DE CADASTRO (mesmas instruções de gui.py, em cadastros.py) ---
+def cadastrar_conflito(cursor, nome, tipo, paises, grupos, detalhes):
+    cursor.execute(cadastros.CRIAR_CONFLITO, (nome, tipo, 10, 20))
+    cod_conflito = cursor.fetchone()[0]
+    cursor.execute(cadastros.ASSOCIAR_PAISES, (cod_conflito, paises))
+    cursor.execute(cadastros.ASSOCIAR_GRUPOS, (cod_conflito, datetime.date.today(), grupos))
+    if tipo in cadastros.DETALHES_CONFLITO:
+        _, insert_detalhe = cadastros.DETALHES_CONFLITO[tipo]
+        cursor.execute(insert_detalhe, (cod_conflito, detalhes))
+    return cod_conflito
+
+
+def cadastrar_grupo(cursor, nome, nome_lider, conflitos):
+    cursor.execute(cadastros.CRIAR_GRUPO, (nome, nome_lider, 'Benchmark'))
+    cod_grupo = cursor.fetchone()[0]
+    cursor.execute(cadastros.ASSOCIAR_CONFLITOS,
+                   (cod_grupo, conflitos, [datetime.date.today()] * len(conflitos)))
+    return cod_grupo
+
+
+def cadastrar_divisao(cursor, cod_grupo, id_lider, nome_chefe):
+    cursor.execute(cadastros.INSERIR_DIVISAO, (cod_grupo, 1, 2, 3, 400, 5))
+    num_divisao = cursor.fetchone()[0]
+    cursor.execute(cadastros.INSERIR_CHEFE, (nome_chefe, 'Coronel', id_lider, cod_grupo, num_divisao))
+    return num_divisao
+
+
+def cadastrar_lider(cursor, nome, cod_grupo):
+    cursor.execute(cadastros.INSERIR_LIDER, (nome, cod_grupo, 'Benchmark'))
+
+
+def cadastrar_chefe(cursor, nome, id_lider, cod_grupo, num_divisao):
+    cursor.execute(cadastros.INSERIR_CHEFE, (nome, 'Major', id_lider, cod_grupo, num_divisao))
+
+
+# --- MEDIÇÃO ---
+def percentil(amostras_ordenadas, p):
+    """Percentil pelo método nearest-rank."""
+    # p * n antes da divisão: p / 100 * n acumula erro (70 / 100 * 10 = 7.000000000000001)
+    indice = max(0, math.ceil(p * len(amostras_ordenadas) / 100) - 1)
+    return amostras_ordenadas[indice]
+
+
+def resumir(tempos):
+    ordenados = sorted(tempos)
+    total = sum(ordenados)
+    return {
+        'execucoes': len(ordenados),
+        'p50_ms': percentil(ordenados, 50) * 1000,
+        'p95_ms': percentil(ordenados, 95) * 1000,
+        'p99_ms': percentil(ordenados, 99) * 1000,
+        'media_ms': total / len(ordenados) * 1000,
+        'max_ms': ordenados[-1] * 1000,
+        'vazao_ops_s': len(ordenados) / total if total else None,
+    }
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for i in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(i)
+        tempos.append(time.perf_counter() - inicio)
+    return resumir(tempos)
+
+
+def consultas_relatorios():
+    """
+    (sql, parâmetros) dos relatórios do catálogo (reports.py) com os valores padrão, também nas
+    versões sobre os resumos; as listagens, pela primeira página, como na interface.
+    """
+    resumos_em_dia = EstadoResumos('incremental', False, None, True)
+    consultas = {}
+    for nome, relatorio in RELATORIOS.items():
+        tamanho = TAMANHO_PAGINA if relatorio.chave else None
+        consultas[nome] = compilar(relatorio, tamanho=tamanho)
+        if relatorio.query_resumo:
+            consultas[f"{nome} (resumo)"] = compilar(relatorio, estado_resumos=resumos_em_dia, tamanho=tamanho)
+    return consultas
+
+
+def executar_benchmark(pool, repeticoes, aleatorio):
+    resultados = {}
+
+    def executar_consulta(sql, params=None):
+        def funcao(_):
+            with pool.conexao() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                conn.rollback()
+        return funcao
+
+    for nome, (sql, params) in consultas_relatorios().items():
+        resultados[f"relatorio:{nome}"] = medir(executar_consulta(sql, params), repeticoes)
+
+    for tabela, sql in TABELAS_REFERENCIA.items():
+        resultados[f"atualizar:{tabela}"] = medir(executar_consulta(sql), repeticoes)
+    cache = ReferenceCache(lambda: pool)
+
+    def atualizar_todos(_, frio):
+        if frio:
+            cache.invalidar()
+        for tabela in TABELAS_REFERENCIA:
+            cache.obter(tabela)
+    resultados["atualizar_todos_os_combos (frio)"] = medir(lambda i: atualizar_todos(i, True), repeticoes)
+    resultados["atualizar_todos_os_combos (cache)"] = medir(lambda i: atualizar_todos(i, False), repeticoes)
+
+    # Ids para as transações de cadastro, vindos do cache já carregado
+    paises = [row[0] for row in cache.obter('pais')]
+    grupos = [row[0] for row in cache.obter('grupo_armado')]
+    conflitos = [row[0] for row in cache.obter('conflito')]
+    lideres = cache.obter('lider_politico')
+    detalhes = {'religioso': [row[0] for row in cache.obter('religiao_entidade')],
+                'economico': [row[0] for row in cache.obter('materia_prima')],
+                'racial': [row[0] for row in cache.obter('etnia')], 'territorial': []}
+    prefixo = f"Bench {int(time.time() * 1000) % 10 ** 9:09d}"
+    divisoes_criadas = []
+
+    def transacao(funcao):
+        def executar(i):
+            with pool.conexao() as conn:
+                try:
+                    with conn.cursor() as cursor:
+                        funcao(cursor, i)
+                    conn.commit()
+                except psycopg2.Error:
+                    conn.rollback()
+                    raise
+        return executar
+
+    def conflito(cursor, i):
+        tipo = TIPOS_CONFLITO[i % 4]
+        cadastrar_conflito(cursor, f"{prefixo} Conflito {i}", tipo, aleatorio.sample(paises, 2),
+                           aleatorio.sample(grupos, 2), aleatorio.sample(detalhes[tipo], min(2, len(detalhes[tipo]))))
+
+    def grupo(cursor, i):
+        cadastrar_grupo(cursor, f"{prefixo} Grupo {i}", f"{prefixo} Líder {i}", aleatorio.sample(conflitos, 2))
+
+    def divisao(cursor, i):
+        id_lider, _, cod_grupo = aleatorio.choice(lideres)
+        num = cadastrar_divisao(cursor, cod_grupo, id_lider, f"{prefixo} Chefe D{i}")
+        divisoes_criadas.append((id_lider, cod_grupo, num))
+
+    def lider(cursor, i):
+        cadastrar_lider(cursor, f"{prefixo} Líder L{i}", aleatorio.choice(grupos))
+
+    def chefe(cursor, i):
+        # Cada divisão criada acima recebe até mais dois chefes (limite de 3 por divisão)
+        id_lider, cod_grupo, num = divisoes_criadas[i // 2]
+        cadastrar_chefe(cursor, f"{prefixo} Chefe C{i}", id_lider, cod_grupo, num)
+
+    resultados["cadastrar_conflito"] = medir(transacao(conflito), repeticoes)
+    resultados["cadastrar_grupo"] = medir(transacao(grupo), repeticoes)
+    resultados["cadastrar_divisao"] = medir(transacao(divisao), repeticoes)
+    resultados["cadastrar_lider"] = medir(transacao(lider), repeticoes)
+    resultados["cadastrar_chefe"] = medir(transacao(chefe), repeticoes)
+    return resultados
+
+
+def contar_linhas(conn):
+    tabelas = ['Pais', 'Conflito', 'Grupo_Armado', 'Divisao', 'Chefe_Militar', 'Organizacao_Mediadora',
+               'Traficante_Armas', 'Fornecimento_Arma_Grupo', 'Grupo_Armado_Participa_Conflito',
+               'Organizacao_Intervem_Conflito']
+    with conn.cursor() as cursor:
+        cursor.execute(" UNION ALL ".join(f"SELECT '{t}', COUNT(*) FROM {t}" for t in tabelas))
+        contagens = dict(cursor.fetchall())
+    conn.rollback()
+    return contagens
+
+
+def versao_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual, anterior):
+    """Imprime a variação de p95 de cada operação em relação a um resultado anterior."""
+    escalas_anteriores = {execucao['escala']: execucao['resultados'] for execucao in anterior['execucoes']}
+    for execucao in atual['execucoes']:
+        base = escalas_anteriores.get(execucao['escala'])
+        if not base:
+            continue
+        print(f"\nEscala {execucao['escala']}x - p95 atual vs. {anterior.get('versao') or 'anterior'}:")
+        for nome, medida in execucao['resultados'].items():
+            if nome in base:
+                antes, depois = base[nome]['p95_ms'], medida['p95_ms']
+                variacao = (depois - antes) / antes * 100 if antes else 0.0
+                alerta = "  <-- regressão" if variacao > 20 else ""
+                print(f"    {nome:55s} {antes:9.2f} -> {depois:9.2f} ms ({variacao:+.0f}%){alerta}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark com dados sintéticos em escala.")
+    parser.add_argument("--escalas", type=int, nargs='+', default=[10],
+                        help="fatores de escala em relação à população original (ex.: 10 100 1000)")
+    parser.add_argument("--repeticoes", type=int, default=30, help="execuções de cada operação")
+    parser.add_argument("--semente", type=int, default=42, help="semente do gerador de dados")
+    parser.add_argument("--sem-gerar", action="store_true", help="mede os dados existentes, sem gerar")
+    parser.add_argument("--saida", help="arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    adicionar_argumentos_conexao(parser)
+    args = parser.parse_args(argv)
+
+    config = config_dos_argumentos(args)
+    try:
+        conn = psycopg2.connect(**config)
+        pool = ConnectionPool(config, minconn=1, maxconn=2)
+    except psycopg2.Error as e:
+        print(f"Erro ao conectar ao banco: {e}", file=sys.stderr)
+        return 2
+
+    gerador = GeradorDados(conn, args.semente)
+    aleatorio = random.Random(args.semente)
+    resultado = {
+        'versao': versao_codigo(),
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'repeticoes': args.repeticoes,
+        'execucoes': [],
+    }
+    unidades_geradas = 0
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW server_version")
+            resultado['postgres'] = cursor.fetchone()[0]
+        conn.rollback()
+
+        for escala in sorted(args.escalas):
+            if not args.sem_gerar and escala > unidades_geradas:
+                inicio = time.perf_counter()
+                gerador.gerar(escala - unidades_geradas)
+                unidades_geradas = escala
+                print(f"Escala {escala}x: dados gerados em {time.perf_counter() - inicio:.1f}s")
+            execucao = {'escala': escala, 'linhas': contar_linhas(conn),
+                        'resultados': executar_benchmark(pool, args.repeticoes, aleatorio)}
+            resultado['execucoes'].append(execucao)
+            for nome, medida in execucao['resultados'].items():
+                print(f"    {nome:55s} p50 {medida['p50_ms']:8.2f}  p95 {medida['p95_ms']:8.2f}  "
+                      f"p99 {medida['p99_ms']:8.2f} ms  {medida['vazao_ops_s']:9.1f} ops/s")
+    except psycopg2.Error as e:
+        print(f"Falha no benchmark: {e}", file=sys.stderr)
+        return 1
+    finally:
+        pool.closeall()
+        conn.close()
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            comparar(resultado, json.load(arquivo))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
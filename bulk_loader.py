@@ -0,0 +1,479 @@
+"""
+Carga em massa de conflitos, grupos armados, divisões e fornecimentos de armas.
+
+Os arquivos (CSV ou Parquet) são enviados para tabelas temporárias de staging
+com COPY FROM STDIN, as chaves estrangeiras são resolvidas por nome em operações
+de conjunto e os registros válidos são mesclados nas tabelas reais em uma única
+transação. Linhas inválidas não abortam a carga: são rejeitadas com o motivo.
+
+Uso:
+    python bulk_loader.py --grupos grupos.csv --conflitos conflitos.parquet --rejeitos rejeitos.csv
+
+Colunas esperadas (cabeçalho do CSV / nomes das colunas do Parquet):
+    grupos:        nome_grupo, nome_lider, [apoios_descricao]
+    conflitos:     nome_conflito, tipo_conflito, paises, grupos, [num_mortos], [num_feridos],
+                   [detalhes], [data_incorporacao]
+    divisoes:      nome_grupo, [num_barcos], [num_tanques], [num_avioes], [num_homens], [num_baixas_divisao]
+    fornecimentos: nome_traficante, nome_arma, nome_grupo, quantidade_fornecida, [data_fornecimento]
+
+Listas (paises, grupos, detalhes) usam ';' como separador. Os detalhes de um conflito
+são regiões, religiões, matérias-primas ou etnias, conforme o tipo do conflito.
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+
+import psycopg2
+
+from db_pool import adicionar_argumentos_conexao, config_dos_argumentos
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet é opcional; CSV funciona sem pyarrow
+    pq = None
+
+# Ordem de processamento: grupos antes de quem os referencia
+ORDEM_FEEDS = ['grupos', 'conflitos', 'divisoes', 'fornecimentos']
+
+TAMANHO_LOTE_PARQUET = 10000
+
+# Funções auxiliares de conversão: devolvem NULL em vez de abortar a transação
+FUNCOES_AUXILIARES = """
+    CREATE OR REPLACE FUNCTION pg_temp.int_seguro(t TEXT, padrao INT) RETURNS INT AS $$
+    BEGIN
+        IF t IS NULL OR btrim(t) = '' THEN
+            RETURN padrao;
+        END IF;
+        RETURN btrim(t)::INT;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql IMMUTABLE;
+
+    CREATE OR REPLACE FUNCTION pg_temp.data_segura(t TEXT, padrao DATE) RETURNS DATE AS $$
+    BEGIN
+        IF t IS NULL OR btrim(t) = '' THEN
+            RETURN padrao;
+        END IF;
+        RETURN btrim(t)::DATE;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql STABLE;
+"""
+
+# Para cada feed: colunas do arquivo (obrigatórias e opcionais), colunas extras do staging
+# (valores resolvidos) e os passos SQL de validação e de mescla. {stg} e {rej} são os nomes
+# das tabelas temporárias do feed. Toda validação só insere motivos em {rej}; a coluna
+# 'valida' é calculada depois, e a mescla considera apenas as linhas válidas.
+FEEDS = {
+    'grupos': {
+        'obrigatorias': ['nome_grupo', 'nome_lider'],
+        'opcionais': ['apoios_descricao'],
+        'resolvidas': 'cod_grupo INT',
+        'validacao': [
+            "INSERT INTO {rej} SELECT linha, 'nome_grupo vazio' FROM {stg} WHERE coalesce(btrim(nome_grupo), '') = ''",
+            "INSERT INTO {rej} SELECT linha, 'nome_lider vazio' FROM {stg} WHERE coalesce(btrim(nome_lider), '') = ''",
+            """INSERT INTO {rej}
+               SELECT s.linha, 'grupo já cadastrado: ' || btrim(s.nome_grupo)
+               FROM {stg} s JOIN Grupo_Armado g ON g.nome_grupo = btrim(s.nome_grupo)""",
+            """INSERT INTO {rej}
+               SELECT linha, 'nome_grupo repetido no arquivo (primeira ocorrência na linha ' || primeira || ')'
+               FROM (SELECT linha, min(linha) OVER (PARTITION BY btrim(nome_grupo)) AS primeira
+                     FROM {stg} WHERE coalesce(btrim(nome_grupo), '') <> '') d
+               WHERE linha > primeira""",
+        ],
+        # Mesmo efeito de sp_criar_grupo_armado_completo: grupo, líder e primeira divisão
+        'mescla': [
+            "UPDATE {stg} SET cod_grupo = nextval(pg_get_serial_sequence('grupo_armado', 'cod_grupo')) WHERE valida",
+            "INSERT INTO Grupo_Armado (cod_grupo, nome_grupo) SELECT cod_grupo, btrim(nome_grupo) FROM {stg} WHERE valida",
+            """INSERT INTO Lider_Politico (nome_lider, cod_grupo_liderado_fk, apoios_descricao)
+               SELECT btrim(nome_lider), cod_grupo, NULLIF(btrim(apoios_descricao), '') FROM {stg} WHERE valida""",
+            "INSERT INTO Divisao (cod_grupo_fk) SELECT cod_grupo FROM {stg} WHERE valida ORDER BY linha",
+        ],
+    },
+    'conflitos': {
+        'obrigatorias': ['nome_conflito', 'tipo_conflito', 'paises', 'grupos'],
+        'opcionais': ['num_mortos', 'num_feridos', 'detalhes', 'data_incorporacao'],
+        'resolvidas': 'tipo TEXT, mortos INT, feridos INT, data_inc DATE, cod_conflito INT',
+        'validacao': [
+            """UPDATE {stg} SET tipo = lower(btrim(tipo_conflito)),
+                   mortos = pg_temp.int_seguro(num_mortos, 0),
+                   feridos = pg_temp.int_seguro(num_feridos, 0),
+                   data_inc = pg_temp.data_segura(data_incorporacao, CURRENT_DATE)""",
+            "INSERT INTO {rej} SELECT linha, 'nome_conflito vazio' FROM {stg} WHERE coalesce(btrim(nome_conflito), '') = ''",
+            """INSERT INTO {rej} SELECT linha, 'tipo_conflito inválido: ' || coalesce(tipo_conflito, '')
+               FROM {stg} WHERE tipo IS NULL OR tipo NOT IN ('territorial', 'religioso', 'economico', 'racial')""",
+            "INSERT INTO {rej} SELECT linha, 'num_mortos inválido' FROM {stg} WHERE mortos IS NULL OR mortos < 0",
+            "INSERT INTO {rej} SELECT linha, 'num_feridos inválido' FROM {stg} WHERE feridos IS NULL OR feridos < 0",
+            "INSERT INTO {rej} SELECT linha, 'data_incorporacao inválida' FROM {stg} WHERE data_inc IS NULL",
+            # Listas explodidas e resolvidas por nome com um único join cada
+            """CREATE TEMP TABLE {stg}_paises ON COMMIT DROP AS
+               SELECT s.linha, btrim(x.nome) AS nome, p.cod_pais
+               FROM {stg} s CROSS JOIN LATERAL unnest(string_to_array(s.paises, ';')) AS x(nome)
+               LEFT JOIN Pais p ON p.nome_pais = btrim(x.nome)
+               WHERE btrim(x.nome) <> ''""",
+            """CREATE TEMP TABLE {stg}_grupos ON COMMIT DROP AS
+               SELECT s.linha, btrim(x.nome) AS nome, g.cod_grupo
+               FROM {stg} s CROSS JOIN LATERAL unnest(string_to_array(s.grupos, ';')) AS x(nome)
+               LEFT JOIN Grupo_Armado g ON g.nome_grupo = btrim(x.nome)
+               WHERE btrim(x.nome) <> ''""",
+            """CREATE TEMP TABLE {stg}_detalhes ON COMMIT DROP AS
+               SELECT s.linha, btrim(x.nome) AS nome,
+                      COALESCE(r.id_regiao, re.id_religiao, mp.id_materia_prima, e.id_etnia) AS id
+               FROM {stg} s CROSS JOIN LATERAL unnest(string_to_array(s.detalhes, ';')) AS x(nome)
+               LEFT JOIN Regiao r ON s.tipo = 'territorial' AND r.nome_regiao = btrim(x.nome)
+               LEFT JOIN Religiao_Entidade re ON s.tipo = 'religioso' AND re.nome_religiao = btrim(x.nome)
+               LEFT JOIN Materia_Prima mp ON s.tipo = 'economico' AND mp.nome_materia_prima = btrim(x.nome)
+               LEFT JOIN Etnia e ON s.tipo = 'racial' AND e.nome_etnia = btrim(x.nome)
+               WHERE btrim(x.nome) <> ''""",
+            """INSERT INTO {rej} SELECT linha, 'país desconhecido: ' || string_agg(nome, ', ')
+               FROM {stg}_paises WHERE cod_pais IS NULL GROUP BY linha""",
+            """INSERT INTO {rej} SELECT linha, 'grupo desconhecido: ' || string_agg(nome, ', ')
+               FROM {stg}_grupos WHERE cod_grupo IS NULL GROUP BY linha""",
+            """INSERT INTO {rej} SELECT linha, 'detalhe desconhecido para o tipo: ' || string_agg(nome, ', ')
+               FROM {stg}_detalhes WHERE id IS NULL GROUP BY linha""",
+            """INSERT INTO {rej} SELECT s.linha, 'informe ao menos um país'
+               FROM {stg} s WHERE NOT EXISTS (
+                   SELECT 1 FROM {stg}_paises sp WHERE sp.linha = s.linha AND sp.cod_pais IS NOT NULL)""",
+            """INSERT INTO {rej} SELECT s.linha, 'um conflito deve ter pelo menos dois grupos armados'
+               FROM {stg} s WHERE (SELECT COUNT(DISTINCT sg.cod_grupo) FROM {stg}_grupos sg
+                                   WHERE sg.linha = s.linha) < 2""",
+            """INSERT INTO {rej} SELECT s.linha, 'conflitos do tipo ' || s.tipo || ' exigem ao menos um detalhe'
+               FROM {stg} s WHERE s.tipo IN ('religioso', 'economico', 'racial') AND NOT EXISTS (
+                   SELECT 1 FROM {stg}_detalhes sd WHERE sd.linha = s.linha AND sd.id IS NOT NULL)""",
+        ],
+        # Mesmo efeito de sp_criar_conflito_com_tipo, mas para todas as linhas de uma vez
+        'mescla': [
+            "UPDATE {stg} SET cod_conflito = nextval(pg_get_serial_sequence('conflito', 'cod_conflito')) WHERE valida",
+            """INSERT INTO Conflito (cod_conflito, nome_conflito, num_mortos_atual, num_feridos_atual)
+               SELECT cod_conflito, btrim(nome_conflito), mortos, feridos FROM {stg} WHERE valida""",
+            "INSERT INTO Conflito_Territorial (cod_conflito_fk) SELECT cod_conflito FROM {stg} WHERE valida AND tipo = 'territorial'",
+            "INSERT INTO Conflito_Religioso (cod_conflito_fk) SELECT cod_conflito FROM {stg} WHERE valida AND tipo = 'religioso'",
+            "INSERT INTO Conflito_Economico (cod_conflito_fk) SELECT cod_conflito FROM {stg} WHERE valida AND tipo = 'economico'",
+            "INSERT INTO Conflito_Racial (cod_conflito_fk) SELECT cod_conflito FROM {stg} WHERE valida AND tipo = 'racial'",
+            """INSERT INTO Conflito_Afeta_Pais (cod_conflito_fk, cod_pais_fk)
+               SELECT DISTINCT s.cod_conflito, sp.cod_pais FROM {stg} s JOIN {stg}_paises sp USING (linha) WHERE s.valida""",
+            """INSERT INTO Grupo_Armado_Participa_Conflito (cod_grupo_fk, cod_conflito_fk, data_incorporacao)
+               SELECT DISTINCT sg.cod_grupo, s.cod_conflito, s.data_inc FROM {stg} s JOIN {stg}_grupos sg USING (linha) WHERE s.valida""",
+            """INSERT INTO Conflito_Territorial_Afeta_Regiao (cod_conflito_territorial_fk, id_regiao_fk)
+               SELECT DISTINCT s.cod_conflito, sd.id FROM {stg} s JOIN {stg}_detalhes sd USING (linha)
+               WHERE s.valida AND s.tipo = 'territorial'""",
+            """INSERT INTO Conflito_Religioso_Afeta_Religiao (cod_conflito_religioso_fk, id_religiao_fk)
+               SELECT DISTINCT s.cod_conflito, sd.id FROM {stg} s JOIN {stg}_detalhes sd USING (linha)
+               WHERE s.valida AND s.tipo = 'religioso'""",
+            """INSERT INTO Conflito_Economico_Afeta_MateriaPrima (cod_conflito_economico_fk, id_materia_prima_fk)
+               SELECT DISTINCT s.cod_conflito, sd.id FROM {stg} s JOIN {stg}_detalhes sd USING (linha)
+               WHERE s.valida AND s.tipo = 'economico'""",
+            """INSERT INTO Conflito_Racial_Afeta_Etnia (cod_conflito_racial_fk, id_etnia_fk)
+               SELECT DISTINCT s.cod_conflito, sd.id FROM {stg} s JOIN {stg}_detalhes sd USING (linha)
+               WHERE s.valida AND s.tipo = 'racial'""",
+        ],
+    },
+    'divisoes': {
+        'obrigatorias': ['nome_grupo'],
+        'opcionais': ['num_barcos', 'num_tanques', 'num_avioes', 'num_homens', 'num_baixas_divisao'],
+        'resolvidas': 'cod_grupo INT, barcos INT, tanques INT, avioes INT, homens INT, baixas INT',
+        'validacao': [
+            """UPDATE {stg} SET barcos = pg_temp.int_seguro(num_barcos, 0),
+                   tanques = pg_temp.int_seguro(num_tanques, 0),
+                   avioes = pg_temp.int_seguro(num_avioes, 0),
+                   homens = pg_temp.int_seguro(num_homens, 0),
+                   baixas = pg_temp.int_seguro(num_baixas_divisao, 0)""",
+            "UPDATE {stg} s SET cod_grupo = g.cod_grupo FROM Grupo_Armado g WHERE g.nome_grupo = btrim(s.nome_grupo)",
+            """INSERT INTO {rej} SELECT linha, 'grupo desconhecido: ' || coalesce(nome_grupo, '')
+               FROM {stg} WHERE cod_grupo IS NULL""",
+            "INSERT INTO {rej} SELECT linha, 'num_barcos inválido' FROM {stg} WHERE barcos IS NULL OR barcos < 0",
+            "INSERT INTO {rej} SELECT linha, 'num_tanques inválido' FROM {stg} WHERE tanques IS NULL OR tanques < 0",
+            "INSERT INTO {rej} SELECT linha, 'num_avioes inválido' FROM {stg} WHERE avioes IS NULL OR avioes < 0",
+            "INSERT INTO {rej} SELECT linha, 'num_homens inválido' FROM {stg} WHERE homens IS NULL OR homens < 0",
+            "INSERT INTO {rej} SELECT linha, 'num_baixas_divisao inválido' FROM {stg} WHERE baixas IS NULL OR baixas < 0",
+        ],
+        # O trigger tg_define_num_divisao_consecutiva numera as divisões na ordem das linhas
+        'mescla': [
+            """INSERT INTO Divisao (cod_grupo_fk, num_barcos, num_tanques, num_avioes, num_homens, num_baixas_divisao)
+               SELECT cod_grupo, barcos, tanques, avioes, homens, baixas FROM {stg} WHERE valida ORDER BY linha""",
+        ],
+    },
+    'fornecimentos': {
+        'obrigatorias': ['nome_traficante', 'nome_arma', 'nome_grupo', 'quantidade_fornecida'],
+        'opcionais': ['data_fornecimento'],
+        'resolvidas': 'id_traficante INT, arma TEXT, cod_grupo INT, qtd INT, data_forn DATE',
+        'validacao': [
+            """UPDATE {stg} SET qtd = pg_temp.int_seguro(quantidade_fornecida, NULL),
+                   data_forn = pg_temp.data_segura(data_fornecimento, CURRENT_DATE)""",
+            "UPDATE {stg} s SET id_traficante = t.id_traficante FROM Traficante_Armas t WHERE t.nome_traficante = btrim(s.nome_traficante)",
+            "UPDATE {stg} s SET arma = a.nome_arma_pk FROM Tipo_Arma a WHERE a.nome_arma_pk = btrim(s.nome_arma)",
+            "UPDATE {stg} s SET cod_grupo = g.cod_grupo FROM Grupo_Armado g WHERE g.nome_grupo = btrim(s.nome_grupo)",
+            "INSERT INTO {rej} SELECT linha, 'traficante desconhecido: ' || coalesce(nome_traficante, '') FROM {stg} WHERE id_traficante IS NULL",
+            "INSERT INTO {rej} SELECT linha, 'arma desconhecida: ' || coalesce(nome_arma, '') FROM {stg} WHERE arma IS NULL",
+            "INSERT INTO {rej} SELECT linha, 'grupo desconhecido: ' || coalesce(nome_grupo, '') FROM {stg} WHERE cod_grupo IS NULL",
+            "INSERT INTO {rej} SELECT linha, 'quantidade_fornecida deve ser inteira e positiva' FROM {stg} WHERE qtd IS NULL OR qtd <= 0",
+            "INSERT INTO {rej} SELECT linha, 'data_fornecimento inválida' FROM {stg} WHERE data_forn IS NULL",
+            """INSERT INTO {rej}
+               SELECT linha, 'fornecimento repetido no arquivo (primeira ocorrência na linha ' || primeira || ')'
+               FROM (SELECT linha, min(linha) OVER (PARTITION BY id_traficante, arma, cod_grupo, data_forn) AS primeira
+                     FROM {stg} WHERE id_traficante IS NOT NULL AND arma IS NOT NULL AND cod_grupo IS NOT NULL) d
+               WHERE linha > primeira""",
+            """INSERT INTO {rej} SELECT s.linha, 'fornecimento já registrado'
+               FROM {stg} s JOIN Fornecimento_Arma_Grupo f
+                 ON f.id_traficante_fk = s.id_traficante AND f.nome_arma_fk = s.arma
+                AND f.cod_grupo_fk = s.cod_grupo AND f.data_fornecimento = s.data_forn""",
+            # Bloqueia o estoque envolvido para que a checagem abaixo continue válida até o commit
+            """SELECT 1 FROM Traficante_Dispoe_Tipo_Arma t
+               JOIN (SELECT DISTINCT id_traficante, arma FROM {stg}) s
+                 ON t.id_traficante_fk = s.id_traficante AND t.nome_arma_fk = s.arma
+               FOR UPDATE OF t""",
+            # Mesma regra de fn_valida_estoque_armas, aplicada ao acumulado na ordem do arquivo:
+            # assim que o estoque de um par traficante/arma se esgota, as linhas seguintes são rejeitadas
+            """INSERT INTO {rej}
+               SELECT linha, CASE WHEN estoque IS NULL THEN 'traficante não dispõe desta arma'
+                                  ELSE 'estoque insuficiente (disponível: ' || estoque || ', acumulado: ' || acumulado || ')' END
+               FROM (SELECT s.linha, t.quantidade_disponivel AS estoque,
+                            SUM(s.qtd) OVER (PARTITION BY s.id_traficante, s.arma ORDER BY s.linha) AS acumulado
+                     FROM {stg} s
+                     LEFT JOIN Traficante_Dispoe_Tipo_Arma t
+                       ON t.id_traficante_fk = s.id_traficante AND t.nome_arma_fk = s.arma
+                     WHERE NOT EXISTS (SELECT 1 FROM {rej} r WHERE r.linha = s.linha)) x
+               WHERE estoque IS NULL OR acumulado > estoque""",
+        ],
+        'mescla': [
+            """INSERT INTO Fornecimento_Arma_Grupo
+               (id_traficante_fk, nome_arma_fk, cod_grupo_fk, quantidade_fornecida, data_fornecimento)
+               SELECT id_traficante, arma, cod_grupo, qtd, data_forn FROM {stg} WHERE valida ORDER BY linha""",
+        ],
+    },
+}
+
+
+class ResultadoCarga:
+    """Resumo da carga de um feed: linhas lidas, inseridas e rejeitadas (com motivo)."""
+
+    def __init__(self, feed, lidas, inseridas, rejeitos):
+        self.feed = feed
+        self.lidas = lidas
+        self.inseridas = inseridas
+        self.rejeitos = rejeitos  # Lista de (linha, motivo)
+
+    def __str__(self):
+        return (f"{self.feed}: {self.lidas} linhas lidas, {self.inseridas} inseridas, "
+                f"{len(self.rejeitos)} rejeitadas")
+
+
+class _FluxoCopy:
+    """Adapta um gerador de linhas ao objeto 'arquivo' consumido pelo COPY FROM STDIN, sem materializar o arquivo."""
+
+    def __init__(self, linhas):
+        self._linhas = iter(linhas)
+        self._buffer = io.StringIO()
+        self._escritor = csv.writer(self._buffer, lineterminator='\n')
+        self._pendente = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pendente) < size:
+            try:
+                self._escritor.writerow(next(self._linhas))
+            except StopIteration:
+                break
+            self._pendente += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        if size < 0:
+            size = len(self._pendente)
+        dados, self._pendente = self._pendente[:size], self._pendente[size:]
+        return dados
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+
+def _validar_cabecalho(feed, caminho, colunas):
+    faltando = [c for c in FEEDS[feed]['obrigatorias'] if c not in colunas]
+    if faltando:
+        raise ValueError(f"{caminho}: colunas obrigatórias ausentes para '{feed}': {', '.join(faltando)}")
+
+
+def _ler_csv(feed, caminho, colunas, delimitador, contador):
+    """Gera (linha, erro_estrutura, valores...) para cada registro do CSV."""
+    with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+        leitor = csv.reader(arquivo, delimiter=delimitador)
+        cabecalho = [c.strip() for c in next(leitor, [])]
+        _validar_cabecalho(feed, caminho, cabecalho)
+        posicoes = [cabecalho.index(c) if c in cabecalho else None for c in colunas]
+        while True:
+            try:
+                registro = next(leitor)
+            except StopIteration:
+                break
+            except csv.Error as e:
+                contador[0] += 1
+                yield [leitor.line_num, f"linha malformada: {e}"] + [None] * len(colunas)
+                continue
+            if not any(campo.strip() for campo in registro):
+                continue  # Ignora linhas em branco
+            contador[0] += 1
+            erro = None
+            if len(registro) != len(cabecalho):
+                erro = f"esperadas {len(cabecalho)} colunas, encontradas {len(registro)}"
+            valores = [registro[p] if p is not None and p < len(registro) else None for p in posicoes]
+            yield [leitor.line_num, erro] + valores
+
+
+def _ler_parquet(feed, caminho, colunas, contador):
+    """Gera (linha, erro_estrutura, valores...) lendo o Parquet em lotes, sem carregá-lo inteiro."""
+    if pq is None:
+        raise RuntimeError("Leitura de Parquet requer o pacote 'pyarrow' (pip install pyarrow).")
+    arquivo = pq.ParquetFile(caminho)
+    disponiveis = arquivo.schema_arrow.names
+    _validar_cabecalho(feed, caminho, disponiveis)
+    presentes = [c for c in colunas if c in disponiveis]
+    linha = 0
+    for lote in arquivo.iter_batches(batch_size=TAMANHO_LOTE_PARQUET, columns=presentes):
+        dados = lote.to_pydict()
+        for i in range(lote.num_rows):
+            linha += 1
+            valores = []
+            for coluna in colunas:
+                valor = dados[coluna][i] if coluna in dados else None
+                if isinstance(valor, (list, tuple)):
+                    valor = ';'.join(str(v) for v in valor if v is not None)
+                elif valor is not None:
+                    valor = str(valor)
+                valores.append(valor)
+            contador[0] += 1
+            yield [linha, None] + valores
+
+
+def _carregar_feed(cursor, feed, caminho, delimitador=','):
+    """Executa staging, validação e mescla de um feed dentro da transação corrente."""
+    spec = FEEDS[feed]
+    colunas = spec['obrigatorias'] + spec['opcionais']
+    stg, rej = f"stg_{feed}", f"rej_{feed}"
+
+    cursor.execute(
+        f"CREATE TEMP TABLE {stg} (linha INT PRIMARY KEY, erro_estrutura TEXT, "
+        + ", ".join(f"{c} TEXT" for c in colunas)
+        + f", valida BOOLEAN, {spec['resolvidas']}) ON COMMIT DROP")
+    cursor.execute(f"CREATE TEMP TABLE {rej} (linha INT NOT NULL, motivo TEXT NOT NULL) ON COMMIT DROP")
+
+    # 1. Staging via COPY FROM STDIN, em fluxo
+    contador = [0]
+    if caminho.lower().endswith(('.parquet', '.pq')):
+        linhas = _ler_parquet(feed, caminho, colunas, contador)
+    else:
+        linhas = _ler_csv(feed, caminho, colunas, delimitador, contador)
+    cursor.copy_expert(
+        f"COPY {stg} (linha, erro_estrutura, {', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)",
+        _FluxoCopy(linhas))
+    cursor.execute(f"ANALYZE {stg}")
+
+    # 2. Validação e resolução de chaves estrangeiras em operações de conjunto
+    cursor.execute(f"INSERT INTO {rej} SELECT linha, erro_estrutura FROM {stg} WHERE erro_estrutura IS NOT NULL")
+    for passo in spec['validacao']:
+        cursor.execute(passo.format(stg=stg, rej=rej))
+    cursor.execute(
+        f"UPDATE {stg} s SET valida = NOT EXISTS (SELECT 1 FROM {rej} r WHERE r.linha = s.linha)")
+
+    # 3. Mescla nas tabelas reais
+    for passo in spec['mescla']:
+        cursor.execute(passo.format(stg=stg, rej=rej))
+
+    cursor.execute(f"SELECT COUNT(*) FROM {stg} WHERE valida")
+    inseridas = cursor.fetchone()[0]
+    cursor.execute(
+        f"SELECT linha, string_agg(motivo, '; ') FROM {rej} GROUP BY linha ORDER BY linha")
+    return ResultadoCarga(feed, contador[0], inseridas, cursor.fetchall())
+
+
+def carregar(conn, arquivos, delimitador=',', simular=False):
+    """
+    Carrega os arquivos informados ({feed: caminho}) em uma única transação.
+    Com simular=True tudo é validado e mesclado, mas a transação é desfeita ao final.
+    """
+    desconhecidos = set(arquivos) - set(FEEDS)
+    if desconhecidos:
+        raise ValueError(f"Feeds desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    resultados = []
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(FUNCOES_AUXILIARES)
+            # Tabelas de resumo (sql/002_resumos.sql): em vez de atualizá-las linha a linha
+            # pelos triggers, recalcula tudo uma vez ao final da carga
+            cursor.execute("SELECT to_regproc('sp_recalcular_resumos') IS NOT NULL")
+            recalcular_resumos = cursor.fetchone()[0]
+            if recalcular_resumos:
+                cursor.execute("SET LOCAL conflitos.modo_resumos = 'adiado'")
+            for feed in ORDEM_FEEDS:
+                if feed in arquivos:
+                    resultados.append(_carregar_feed(cursor, feed, arquivos[feed], delimitador))
+            if recalcular_resumos:
+                cursor.execute("SELECT sp_recalcular_resumos()")
+        if simular:
+            conn.rollback()
+        else:
+            conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Carga em massa de conflitos, grupos, divisões e fornecimentos (CSV/Parquet) via COPY.")
+    for feed in ORDEM_FEEDS:
+        parser.add_argument(f"--{feed}", metavar="ARQUIVO", help=f"arquivo CSV ou Parquet de {feed}")
+    parser.add_argument("--delimitador", default=",", help="delimitador dos arquivos CSV (padrão: ',')")
+    parser.add_argument("--rejeitos", metavar="ARQUIVO",
+                        help="grava as linhas rejeitadas (feed, linha, motivo) neste CSV")
+    parser.add_argument("--simular", action="store_true",
+                        help="valida e mescla, mas desfaz a transação ao final")
+    adicionar_argumentos_conexao(parser)
+    args = parser.parse_args(argv)
+
+    arquivos = {feed: getattr(args, feed) for feed in ORDEM_FEEDS if getattr(args, feed)}
+    if not arquivos:
+        parser.error("informe ao menos um arquivo (--grupos, --conflitos, --divisoes ou --fornecimentos)")
+    for caminho in arquivos.values():
+        if not os.path.exists(caminho):
+            parser.error(f"arquivo não encontrado: {caminho}")
+
+    try:
+        conn = psycopg2.connect(**config_dos_argumentos(args))
+    except psycopg2.Error as e:
+        print(f"Erro ao conectar ao banco: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        resultados = carregar(conn, arquivos, args.delimitador, args.simular)
+    except (psycopg2.Error, ValueError, RuntimeError, OSError) as e:
+        print(f"Carga abortada e revertida: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+    for resultado in resultados:
+        print(resultado)
+    if args.simular:
+        print("Simulação: nenhuma alteração foi efetivada.")
+
+    if args.rejeitos:
+        with open(args.rejeitos, 'w', newline='', encoding='utf-8') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(['feed', 'linha', 'motivo'])
+            for resultado in resultados:
+                for linha, motivo in resultado.rejeitos:
+                    escritor.writerow([resultado.feed, linha, motivo])
+    else:
+        for resultado in resultados:
+            for linha, motivo in resultado.rejeitos:
+                print(f"  [{resultado.feed}] linha {linha}: {motivo}", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
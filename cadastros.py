@@ -0,0 +1,68 @@
+"""
+Instruções SQL dos cadastros, usadas pelos formulários da interface (gui.py) e
+pelo benchmark, que mede exatamente as mesmas transações.
+"""
+
+# Conflito: a Stored Procedure cria o conflito e a linha da subclasse do tipo
+CRIAR_CONFLITO = "SELECT sp_criar_conflito_com_tipo(%s, %s, %s, %s)"
+
+# Cada tabela associativa é escrita com um único INSERT ... SELECT unnest(array)
+ASSOCIAR_PAISES = """
+    INSERT INTO Conflito_Afeta_Pais (cod_conflito_fk, cod_pais_fk)
+    SELECT %s, cod_pais FROM unnest(%s::int[]) AS t(cod_pais)
+"""
+
+ASSOCIAR_GRUPOS = """
+    INSERT INTO Grupo_Armado_Participa_Conflito
+    (cod_grupo_fk, cod_conflito_fk, data_incorporacao)
+    SELECT cod_grupo, %s, %s FROM unnest(%s::int[]) AS t(cod_grupo)
+"""
+
+# Detalhes de cada tipo de conflito: tabela associativa escrita (em minúsculas, como
+# nos caches) e a instrução, com os ids afetados em um único array
+DETALHES_CONFLITO = {
+    'religioso': ('conflito_religioso_afeta_religiao', """
+        INSERT INTO Conflito_Religioso_Afeta_Religiao (cod_conflito_religioso_fk, id_religiao_fk)
+        SELECT %s, id FROM unnest(%s::int[]) AS t(id)
+    """),
+    'economico': ('conflito_economico_afeta_materiaprima', """
+        INSERT INTO Conflito_Economico_Afeta_MateriaPrima (cod_conflito_economico_fk, id_materia_prima_fk)
+        SELECT %s, id FROM unnest(%s::int[]) AS t(id)
+    """),
+    'racial': ('conflito_racial_afeta_etnia', """
+        INSERT INTO Conflito_Racial_Afeta_Etnia (cod_conflito_racial_fk, id_etnia_fk)
+        SELECT %s, id FROM unnest(%s::int[]) AS t(id)
+    """),
+}
+
+# Grupo: a Stored Procedure cria o grupo, o líder e a primeira divisão
+CRIAR_GRUPO = "SELECT sp_criar_grupo_armado_completo(%s, %s, %s)"
+
+# Participações do grupo, com os arrays paralelos de conflitos e datas
+ASSOCIAR_CONFLITOS = """
+    INSERT INTO Grupo_Armado_Participa_Conflito
+    (cod_grupo_fk, cod_conflito_fk, data_incorporacao)
+    SELECT %s, cod_conflito, data_incorporacao
+    FROM unnest(%s::int[], %s::date[]) AS t(cod_conflito, data_incorporacao)
+"""
+
+# O número da divisão é gerado pelo trigger do banco
+INSERIR_DIVISAO = """
+    INSERT INTO Divisao
+    (cod_grupo_fk, num_barcos, num_tanques, num_avioes, num_homens, num_baixas_divisao)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    RETURNING num_divisao
+"""
+
+INSERIR_CHEFE = """
+    INSERT INTO Chefe_Militar
+    (nome_chefe, faixa_hierarquica, id_lider_politico_obedece_fk,
+     cod_grupo_divisao_liderada_fk, num_divisao_liderada_fk)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+INSERIR_LIDER = """
+    INSERT INTO Lider_Politico
+    (nome_lider, cod_grupo_liderado_fk, apoios_descricao)
+    VALUES (%s, %s, %s)
+"""
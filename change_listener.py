@@ -0,0 +1,73 @@
+import select
+import threading
+
+import psycopg2
+from psycopg2 import extensions
+
+# Canal usado pelos triggers de sql/001_notificacoes.sql
+CANAL_ALTERACOES = 'conflitos_alteracoes'
+
+
+class ChangeListener:
+    """
+    Escuta NOTIFYs do PostgreSQL em uma conexão dedicada (fora do pool) e repassa
+    cada notificação para os assinantes: ao_notificar(tabela, pid_backend).
+
+    Os assinantes são chamados na thread do listener e precisam ser thread-safe.
+    Se a conexão cair, notificações podem ter sido perdidas; por isso, após
+    reconectar, os assinantes de ao_reconectar() são avisados para invalidar tudo.
+    """
+
+    def __init__(self, config, canal=CANAL_ALTERACOES, intervalo=1.0, backoff_maximo=30.0):
+        self.config = dict(config)
+        self.canal = canal
+        self.intervalo = intervalo
+        self.backoff_maximo = backoff_maximo
+        self._assinantes = []
+        self._assinantes_reconexao = []
+        self._parar = threading.Event()
+        self._thread = None
+
+    def assinar(self, ao_notificar, ao_reconectar=None):
+        self._assinantes.append(ao_notificar)
+        if ao_reconectar is not None:
+            self._assinantes_reconexao.append(ao_reconectar)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._executar, name="listener-notify", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._parar.set()
+
+    def _executar(self):
+        espera = 1.0
+        primeira_conexao = True
+        while not self._parar.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.config)
+                conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.canal}")
+                if not primeira_conexao:
+                    for assinante in self._assinantes_reconexao:
+                        assinante()
+                primeira_conexao = False
+                espera = 1.0
+
+                while not self._parar.is_set():
+                    if select.select([conn], [], [], self.intervalo) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notificacao = conn.notifies.pop(0)
+                        for assinante in self._assinantes:
+                            assinante(notificacao.payload, notificacao.pid)
+            except (psycopg2.Error, OSError):
+                # Reconecta com backoff exponencial
+                self._parar.wait(espera)
+                espera = min(espera * 2, self.backoff_maximo)
+            finally:
+                if conn is not None and not conn.closed:
+                    conn.close()
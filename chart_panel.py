@@ -0,0 +1,163 @@
+import tkinter as tk
+from tkinter import ttk
+
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+# Cores do tema escuro (mesma paleta da interface)
+COR_FUNDO = "#2B2B2B"
+COR_TEXTO = "white"
+# Folga acima da maior barra; se os novos valores couberem no eixo atual, não é preciso redesenhá-lo
+FOLGA_EIXO_Y = 1.15
+
+
+class BarChart(ttk.Frame):
+    """
+    Gráfico de barras com uma única Figure/Canvas reaproveitada entre atualizações.
+
+    A figura é criada sem o pyplot (nada de estado global nem figuras órfãs) e,
+    quando as categorias não mudam, atualizar() só troca a altura das barras e o
+    texto dos rótulos: as barras e rótulos são artistas "animated", desenhados por
+    blitting sobre o fundo (eixos, títulos, ticks) guardado do último desenho
+    completo. O redesenho completo só acontece quando as categorias mudam, quando
+    os valores não cabem no eixo Y atual ou quando a janela é redimensionada.
+    """
+
+    def __init__(self, master, titulo, rotulo_x, rotulo_y, cores=None, tamanho=(8, 6)):
+        super().__init__(master)
+        self.cores = cores
+        self.figura = Figure(figsize=tamanho, facecolor=COR_FUNDO)
+        self.eixo = self.figura.add_subplot()
+        self.eixo.set_facecolor(COR_FUNDO)
+        self.eixo.set_title(titulo, color=COR_TEXTO)
+        self.eixo.set_xlabel(rotulo_x, color=COR_TEXTO)
+        self.eixo.set_ylabel(rotulo_y, color=COR_TEXTO)
+        self.eixo.tick_params(axis='x', rotation=45, colors=COR_TEXTO)
+        self.eixo.tick_params(axis='y', colors=COR_TEXTO)
+        for spine in self.eixo.spines.values():
+            spine.set_color(COR_TEXTO)
+
+        self.canvas = FigureCanvasTkAgg(self.figura, master=self)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self._fundo = None
+        self._conexao_desenho = self.canvas.mpl_connect('draw_event', self._ao_desenhar)
+
+        self.categorias = []
+        self.barras = []
+        self.rotulos = []
+
+    def atualizar(self, categorias, valores):
+        """
+        Exibe os valores (qualquer sequência: linhas do cursor, listas, arrays NumPy).
+        Retorna True se a atualização foi feita só por blitting.
+        """
+        categorias = [str(categoria) for categoria in categorias]
+        valores = [float(valor) for valor in valores]
+        topo = max(valores, default=0) * FOLGA_EIXO_Y or 1
+
+        if categorias != self.categorias:
+            self._recriar_barras(categorias, valores, topo)
+            return False
+
+        for barra, rotulo, valor in zip(self.barras, self.rotulos, valores):
+            barra.set_height(valor)
+            rotulo.xy = (barra.get_x() + barra.get_width() / 2, valor)
+            rotulo.set_text(self._formatar(valor))
+
+        if self._fundo is None or topo > self.eixo.get_ylim()[1]:
+            self.eixo.set_ylim(0, topo)
+            self.canvas.draw_idle()
+            return False
+
+        self.canvas.restore_region(self._fundo)
+        self._desenhar_animados()
+        self.canvas.blit(self.eixo.bbox)
+        return True
+
+    def _recriar_barras(self, categorias, valores, topo):
+        for artista in self.barras + self.rotulos:
+            artista.remove()
+        # Posições numéricas: o eixo categórico do matplotlib acumularia as categorias antigas
+        posicoes = range(len(categorias))
+        container = self.eixo.bar(posicoes, valores, color=self.cores[:len(categorias)] if self.cores else None)
+        self.eixo.set_xticks(posicoes, categorias)
+        self.barras = list(container)
+        self.rotulos = self.eixo.bar_label(container, labels=[self._formatar(v) for v in valores],
+                                           color=COR_TEXTO)
+        for artista in self.barras + self.rotulos:
+            artista.set_animated(True)
+        self.categorias = categorias
+        self.eixo.set_ylim(0, topo)
+        self.figura.tight_layout()
+        self.canvas.draw_idle()
+
+    def _ao_desenhar(self, event):
+        """Após cada desenho completo (que omite os artistas animados), guarda o fundo e desenha as barras."""
+        self._fundo = self.canvas.copy_from_bbox(self.eixo.bbox)
+        self._desenhar_animados()
+
+    def _desenhar_animados(self):
+        for artista in self.barras + self.rotulos:
+            self.eixo.draw_artist(artista)
+
+    @staticmethod
+    def _formatar(valor):
+        return f"{valor:.0f}" if float(valor).is_integer() else f"{valor:.2f}"
+
+    def destroy(self):
+        """Libera a figura junto com o widget (o pyplot nunca a referenciou, então nada fica retido)."""
+        self.canvas.mpl_disconnect(self._conexao_desenho)
+        self.figura.clear()
+        self._fundo = None
+        self.barras, self.rotulos = [], []
+        super().destroy()
+
+
+class LineChart(ttk.Frame):
+    """
+    Gráfico de linhas (séries temporais) com uma única Figure/Canvas reaproveitada.
+
+    Ao contrário do BarChart, cada atualização redesenha o eixo inteiro: o número de
+    pontos e de linhas muda com o período e os parâmetros do relatório, então não há
+    fundo estável para o blitting.
+    """
+
+    # Acima disso, a legenda cobriria o gráfico e fica de fora
+    MAX_LEGENDA = 12
+    # Acima disso, as linhas são desenhadas sem marcadores
+    MAX_MARCADORES = 60
+
+    def __init__(self, master, tamanho=(8, 6)):
+        super().__init__(master)
+        self.figura = Figure(figsize=tamanho, facecolor=COR_FUNDO)
+        self.eixo = self.figura.add_subplot()
+        self.canvas = FigureCanvasTkAgg(self.figura, master=self)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    def atualizar(self, titulo, rotulo_x, rotulo_y, series):
+        """series: [(nome da linha, valores de X, valores de Y)], na ordem de exibição."""
+        self.eixo.clear()
+        self.eixo.set_facecolor(COR_FUNDO)
+        self.eixo.set_title(titulo, color=COR_TEXTO)
+        self.eixo.set_xlabel(rotulo_x, color=COR_TEXTO)
+        self.eixo.set_ylabel(rotulo_y, color=COR_TEXTO)
+        self.eixo.tick_params(axis='x', rotation=45, colors=COR_TEXTO)
+        self.eixo.tick_params(axis='y', colors=COR_TEXTO)
+        for spine in self.eixo.spines.values():
+            spine.set_color(COR_TEXTO)
+
+        for nome, xs, ys in series:
+            ys = [None if valor is None else float(valor) for valor in ys]
+            self.eixo.plot(xs, ys, label=str(nome), marker='o' if len(xs) <= self.MAX_MARCADORES else None,
+                           markersize=3)
+        if 1 < len(series) <= self.MAX_LEGENDA:
+            legenda = self.eixo.legend(facecolor=COR_FUNDO, edgecolor=COR_TEXTO, fontsize='small')
+            for texto in legenda.get_texts():
+                texto.set_color(COR_TEXTO)
+        self.figura.tight_layout()
+        self.canvas.draw_idle()
+
+    def destroy(self):
+        """Libera a figura junto com o widget."""
+        self.figura.clear()
+        super().destroy()
@@ -0,0 +1,271 @@
+import contextlib
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+# Configuração padrão da conexão com o banco (ajuste conforme o seu PostgreSQL)
+DB_CONFIG_PADRAO = {
+    'host': 'localhost',
+    'database': 'conflitos',
+    'user': 'postgres',
+    'password': '123'
+}
+
+
+def adicionar_argumentos_conexao(parser):
+    """Adiciona a um argparse.ArgumentParser as opções de conexão, com os padrões de DB_CONFIG_PADRAO."""
+    grupo = parser.add_argument_group("conexão")
+    for chave in ('host', 'database', 'user', 'password'):
+        grupo.add_argument(f"--{chave}", default=DB_CONFIG_PADRAO[chave])
+
+
+def config_dos_argumentos(args):
+    """Monta o dicionário de conexão a partir dos argumentos de linha de comando."""
+    return {chave: getattr(args, chave) for chave in ('host', 'database', 'user', 'password')}
+
+
+class ConnectionPool:
+    """
+    Pool de conexões PostgreSQL thread-safe.
+
+    As conexões são emprestadas com getconn()/putconn() ou, de preferência,
+    com o gerenciador de contexto conexao(). Conexões devolvidas com uma
+    transação aberta sofrem rollback antes de voltar ao pool.
+    """
+
+    def __init__(self, config, minconn=1, maxconn=8, timeout=10.0, idle_timeout=300.0,
+                 intervalo_ping=30.0, tentativas_reconexao=4, backoff_inicial=0.5, backoff_maximo=8.0,
+                 cursor_factory=None):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Tamanhos de pool inválidos: exige 0 <= minconn <= maxconn e maxconn >= 1.")
+
+        self.config = dict(config)
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout  # Espera máxima (s) por uma conexão livre
+        self.idle_timeout = idle_timeout  # Conexões ociosas além do mínimo são fechadas após esse tempo
+        self.intervalo_ping = intervalo_ping  # Ociosas há mais tempo que isso recebem um SELECT 1 no checkout
+        self.tentativas_reconexao = tentativas_reconexao
+        self.backoff_inicial = backoff_inicial
+        self.backoff_maximo = backoff_maximo
+        # Classe de cursor das conexões criadas (ex.: o cursor instrumentado de query_metrics.py)
+        self.cursor_factory = cursor_factory
+
+        self._cond = threading.Condition()
+        self._ociosas = []  # Pilha de (conexão, instante em que foi devolvida)
+        self._em_uso = set()
+        self._reservadas = 0  # Vagas reservadas por checkouts que ainda estão conectando/verificando
+        self._fechado = False
+        self._stats = {
+            'checkouts': 0,
+            'esperas': 0,
+            'tempo_espera_total': 0.0,
+            'timeouts': 0,
+            'conexoes_criadas': 0,
+            'reconexoes': 0,
+            'falhas_health_check': 0,
+            'conexoes_recolhidas': 0,
+            'pico_em_uso': 0,
+        }
+
+        # As conexões iniciais são abertas sem retentativas: um erro de configuração
+        # (senha, host) deve aparecer imediatamente para o usuário.
+        try:
+            for _ in range(minconn):
+                self._ociosas.append((self._conectar(tentativas=1), time.monotonic()))
+        except psycopg2.Error:
+            self._fechar_ociosas()
+            raise
+
+        self._parar_coletor = threading.Event()
+        self._coletor = threading.Thread(
+            target=self._coletar_ociosas, name="pool-coletor", daemon=True)
+        self._coletor.start()
+
+    # --- CHECKOUT / DEVOLUÇÃO ---
+    def getconn(self):
+        """Empresta uma conexão saudável do pool, esperando até 'timeout' segundos se ele estiver cheio."""
+        inicio = time.monotonic()
+        esperou = False
+        with self._cond:
+            while True:
+                if self._fechado:
+                    raise PoolError("O pool de conexões está fechado.")
+                if self._ociosas:
+                    conn, devolvida_em = self._ociosas.pop()
+                    break
+                if self._total() < self.maxconn:
+                    conn, devolvida_em = None, None
+                    break
+                esperou = True
+                restante = self.timeout - (time.monotonic() - inicio)
+                if restante <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolError(
+                        f"Nenhuma conexão livre após {self.timeout:.1f}s (máximo de {self.maxconn} conexões).")
+                self._cond.wait(restante)
+
+            self._reservadas += 1
+            self._stats['checkouts'] += 1
+            if esperou:
+                self._stats['esperas'] += 1
+                self._stats['tempo_espera_total'] += time.monotonic() - inicio
+
+        # Conexão e health check acontecem fora do lock para não bloquear os outros checkouts
+        try:
+            if conn is None:
+                conn = self._conectar()
+            else:
+                conn = self._verificar(conn, devolvida_em)
+        except BaseException:
+            with self._cond:
+                self._reservadas -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._reservadas -= 1
+            self._em_uso.add(conn)
+            self._stats['pico_em_uso'] = max(self._stats['pico_em_uso'], len(self._em_uso))
+        return conn
+
+    def putconn(self, conn, descartar=False):
+        """Devolve uma conexão ao pool, desfazendo qualquer transação que tenha ficado aberta."""
+        if not descartar and not conn.closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                descartar = True
+
+        with self._cond:
+            self._em_uso.discard(conn)
+            fechar = descartar or conn.closed or self._fechado
+            if not fechar:
+                self._ociosas.append((conn, time.monotonic()))
+            self._cond.notify()
+
+        if fechar:
+            self._fechar(conn)
+
+    @contextlib.contextmanager
+    def conexao(self):
+        """Gerenciador de contexto: empresta uma conexão e sempre a devolve ao final do bloco."""
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    # --- CONEXÃO, HEALTH CHECK E RECONEXÃO ---
+    def _conectar(self, tentativas=None):
+        """Abre uma nova conexão, tentando novamente com backoff exponencial em falhas operacionais."""
+        tentativas = tentativas or self.tentativas_reconexao
+        espera = self.backoff_inicial
+        for tentativa in range(1, tentativas + 1):
+            try:
+                conn = psycopg2.connect(**self.config, cursor_factory=self.cursor_factory)
+                with self._cond:
+                    self._stats['conexoes_criadas'] += 1
+                return conn
+            except psycopg2.OperationalError:
+                if tentativa == tentativas:
+                    raise
+                time.sleep(espera)
+                espera = min(espera * 2, self.backoff_maximo)
+
+    def _verificar(self, conn, devolvida_em):
+        """Garante que uma conexão ociosa ainda está viva; se não estiver, reconecta."""
+        saudavel = not conn.closed
+        if saudavel and time.monotonic() - devolvida_em >= self.intervalo_ping:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                saudavel = False
+
+        if saudavel:
+            return conn
+
+        with self._cond:
+            self._stats['falhas_health_check'] += 1
+        self._fechar(conn)
+        nova = self._conectar()
+        with self._cond:
+            self._stats['reconexoes'] += 1
+        return nova
+
+    # --- COLETA DE OCIOSAS ---
+    def _coletar_ociosas(self):
+        """Thread de fundo que fecha conexões ociosas há mais de idle_timeout, preservando o mínimo."""
+        intervalo = max(1.0, min(self.idle_timeout / 2, 30.0))
+        while not self._parar_coletor.wait(intervalo):
+            self.recolher_ociosas()
+
+    def recolher_ociosas(self):
+        """Fecha as conexões ociosas expiradas acima de minconn. Retorna quantas foram fechadas."""
+        agora = time.monotonic()
+        expiradas = []
+        with self._cond:
+            # A pilha tem as mais antigas no início
+            while (self._ociosas and self._total() > self.minconn
+                   and agora - self._ociosas[0][1] >= self.idle_timeout):
+                expiradas.append(self._ociosas.pop(0)[0])
+            self._stats['conexoes_recolhidas'] += len(expiradas)
+        for conn in expiradas:
+            self._fechar(conn)
+        return len(expiradas)
+
+    # --- ESTADO E ENCERRAMENTO ---
+    def backend_pids(self):
+        """PIDs dos backends das conexões do pool (sem round trip), para reconhecer NOTIFYs da própria aplicação."""
+        with self._cond:
+            conexoes = [conn for conn, _ in self._ociosas] + list(self._em_uso)
+        return {conn.info.backend_pid for conn in conexoes if not conn.closed}
+
+    def estatisticas(self):
+        """Retorna um retrato das estatísticas do pool, útil para dimensionar minconn/maxconn."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'minconn': self.minconn,
+                'maxconn': self.maxconn,
+                'em_uso': len(self._em_uso),
+                'ociosas': len(self._ociosas),
+                'tamanho': self._total(),
+            })
+        stats['tempo_espera_medio'] = (
+            stats['tempo_espera_total'] / stats['esperas'] if stats['esperas'] else 0.0)
+        return stats
+
+    @property
+    def fechado(self):
+        return self._fechado
+
+    def closeall(self):
+        """Fecha o pool: conexões ociosas são fechadas agora e as emprestadas, quando devolvidas."""
+        with self._cond:
+            self._fechado = True
+            self._cond.notify_all()
+        self._parar_coletor.set()
+        self._fechar_ociosas()
+
+    def _fechar_ociosas(self):
+        with self._cond:
+            ociosas, self._ociosas = self._ociosas, []
+        for conn, _ in ociosas:
+            self._fechar(conn)
+
+    def _total(self):
+        return len(self._ociosas) + len(self._em_uso) + self._reservadas
+
+    @staticmethod
+    def _fechar(conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
@@ -0,0 +1,144 @@
+import datetime
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+# Colunas de cada aba: (título, largura)
+COLUNAS_INSTRUCOES = [("SQL", 420), ("Execuções", 80), ("Total (ms)", 90), ("Médio (ms)", 90),
+                      ("Máx. (ms)", 90), ("Linhas", 80), ("Erros", 60), ("Lentas", 60)]
+COLUNAS_ACOES = [("Ação", 260), ("Execuções", 80), ("Round trips (média)", 130), ("Round trips (máx.)", 120),
+                 ("Round trips (última)", 130), ("Total (ms)", 90), ("SQL (ms)", 90)]
+COLUNAS_RECENTES = [("Hora", 80), ("Duração (ms)", 90), ("Linhas", 70), ("Ação", 180),
+                    ("Erro", 200), ("SQL", 420)]
+
+
+class DiagnosticsWindow(tk.Toplevel):
+    """
+    Janela de diagnóstico das consultas (QueryMetrics): instruções mais custosas,
+    round trips por ação do usuário e as execuções recentes, com ajuste do
+    limite de consulta lenta e exportação em JSON ou no formato do Prometheus.
+    Com um StatementCache, mostra também os acertos das instruções preparadas, e com
+    um ResultCache, os dos resultados de relatórios.
+    """
+
+    def __init__(self, master, metricas, cache_instrucoes=None, cache_resultados=None):
+        super().__init__(master)
+        self.metricas = metricas
+        self.cache_instrucoes = cache_instrucoes
+        self.cache_resultados = cache_resultados
+        self.title("Diagnóstico de Consultas")
+        self.geometry("1100x600")
+
+        topo = ttk.Frame(self)
+        topo.pack(fill=tk.X, padx=10, pady=(10, 0))
+        resumos = ttk.Frame(topo)
+        resumos.pack(side=tk.LEFT)
+        self.resumo_label = ttk.Label(resumos, text="")
+        self.resumo_label.pack(anchor=tk.W)
+        self.preparadas_label = ttk.Label(resumos, text="")
+        self.preparadas_label.pack(anchor=tk.W)
+        self.resultados_label = ttk.Label(resumos, text="")
+        self.resultados_label.pack(anchor=tk.W)
+
+        ttk.Button(topo, text="Aplicar", command=self.aplicar_limite).pack(side=tk.RIGHT)
+        self.limite_var = tk.IntVar(value=int(metricas.limite_lenta * 1000))
+        ttk.Entry(topo, textvariable=self.limite_var, width=8).pack(side=tk.RIGHT, padx=5)
+        ttk.Label(topo, text="Consulta lenta a partir de (ms):").pack(side=tk.RIGHT)
+
+        abas = ttk.Notebook(self)
+        abas.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.tree_instrucoes = self._criar_tabela(abas, "Instruções", COLUNAS_INSTRUCOES)
+        self.tree_acoes = self._criar_tabela(abas, "Ações do Usuário", COLUNAS_ACOES)
+        self.tree_recentes = self._criar_tabela(abas, "Execuções Recentes", COLUNAS_RECENTES)
+
+        botoes = ttk.Frame(self)
+        botoes.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Button(botoes, text="Atualizar", command=self.atualizar).pack(side=tk.LEFT, padx=5)
+        ttk.Button(botoes, text="Limpar", command=self.limpar).pack(side=tk.LEFT, padx=5)
+        ttk.Button(botoes, text="Exportar JSON", command=self.exportar_json).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(botoes, text="Exportar Prometheus",
+                   command=self.exportar_prometheus).pack(side=tk.RIGHT, padx=5)
+
+        self.atualizar()
+
+    @staticmethod
+    def _criar_tabela(abas, titulo, colunas):
+        frame = ttk.Frame(abas)
+        abas.add(frame, text=titulo)
+        nomes = [nome for nome, _ in colunas]
+        scroll_y = ttk.Scrollbar(frame, orient=tk.VERTICAL)
+        tree = ttk.Treeview(frame, columns=nomes, show='headings', yscrollcommand=scroll_y.set)
+        scroll_y.config(command=tree.yview)
+        scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+        for nome, largura in colunas:
+            tree.heading(nome, text=nome)
+            tree.column(nome, anchor=tk.W, width=largura, stretch=nome == "SQL")
+        return tree
+
+    @staticmethod
+    def _preencher(tree, linhas):
+        tree.delete(*tree.get_children())
+        for linha in linhas:
+            tree.insert("", tk.END, values=linha)
+
+    def atualizar(self):
+        stats = self.metricas.estatisticas()
+        self.resumo_label.config(
+            text=f"{stats['execucoes']} execuções ({stats['instrucoes_distintas']} instruções distintas), "
+                 f"{stats['tempo_total'] * 1000:.0f} ms no total, {stats['erros']} erros, {stats['lentas']} lentas")
+        if self.cache_instrucoes is not None:
+            cache = self.cache_instrucoes.estatisticas()
+            self.preparadas_label.config(
+                text=f"Instruções preparadas: {cache['acertos']} acertos, {cache['preparacoes']} preparações "
+                     f"({cache['taxa_acertos']:.0%} de acertos), {cache['repreparacoes']} repreparações, "
+                     f"{cache['instrucoes_preparadas']} em {cache['conexoes']} conexões")
+        if self.cache_resultados is not None:
+            cache = self.cache_resultados.estatisticas()
+            self.resultados_label.config(
+                text=f"Resultados de relatórios: {cache['acertos']} acertos, {cache['faltas']} faltas "
+                     f"({cache['taxa_acertos']:.0%} de acertos), {cache['resultados']} em cache "
+                     f"({cache['bytes'] / (1024 * 1024):.1f} MB), {cache['invalidados']} invalidados, "
+                     f"{cache['expirados']} expirados, {cache['descartados']} descartados")
+
+        self._preencher(self.tree_instrucoes, [
+            (i['sql'], i['execucoes'], f"{i['tempo_total'] * 1000:.1f}", f"{i['tempo_medio'] * 1000:.2f}",
+             f"{i['tempo_maximo'] * 1000:.1f}", i['linhas'], i['erros'], i['lentas'])
+            for i in self.metricas.instrucoes()])
+        self._preencher(self.tree_acoes, [
+            (a['nome'], a['execucoes'], f"{a['media_round_trips']:.1f}", a['max_round_trips'],
+             a['ultimo_round_trips'], f"{a['tempo_total'] * 1000:.1f}", f"{a['tempo_sql'] * 1000:.1f}")
+            for a in self.metricas.acoes()])
+        self._preencher(self.tree_recentes, [
+            (datetime.datetime.fromtimestamp(r['instante']).strftime('%H:%M:%S'), f"{r['duracao_ms']:.2f}",
+             '' if r['linhas'] is None else r['linhas'], r['acao'] or '', r['erro'] or '', r['sql'])
+            for r in self.metricas.historico()])
+
+    def aplicar_limite(self):
+        try:
+            limite_ms = self.limite_var.get()
+        except tk.TclError:
+            limite_ms = -1
+        if limite_ms < 0:
+            messagebox.showwarning("Diagnóstico", "Informe o limite em milissegundos (inteiro >= 0).", parent=self)
+            self.limite_var.set(int(self.metricas.limite_lenta * 1000))
+            return
+        self.metricas.limite_lenta = limite_ms / 1000
+
+    def limpar(self):
+        self.metricas.limpar()
+        self.atualizar()
+
+    def exportar_json(self):
+        self._exportar(self.metricas.exportar_json, ".json", [("JSON", "*.json")])
+
+    def exportar_prometheus(self):
+        self._exportar(self.metricas.exportar_prometheus, ".prom", [("Prometheus", "*.prom"), ("Texto", "*.txt")])
+
+    def _exportar(self, exportar, extensao, tipos):
+        destino = filedialog.asksaveasfilename(parent=self, defaultextension=extensao, filetypes=tipos)
+        if not destino:
+            return
+        try:
+            exportar(destino)
+        except OSError as e:
+            messagebox.showerror("Diagnóstico", f"Falha ao exportar: {str(e)}", parent=self)
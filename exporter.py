@@ -0,0 +1,284 @@
+"""
+Exportação de relatórios para arquivos CSV, TSV, JSON, Parquet e XLSX, em fluxo.
+
+Nenhum formato materializa o resultado: CSV e TSV são gerados pelo próprio
+servidor com COPY (...) TO STDOUT e gravados à medida que chegam; os demais leem
+um cursor nomeado no servidor, ITERSIZE_EXPORTACAO linhas por round trip. O
+Parquet é escrito em row groups de LINHAS_POR_GRUPO linhas e o XLSX com o
+openpyxl em modo write_only, então a memória usada não depende do número de
+linhas exportadas. Parquet requer o pyarrow e XLSX o openpyxl, importados só
+quando usados. Usado pela aba Relatórios (ReportExecutor.submit_exportacao) e
+por python main.py report.
+"""
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+
+from reports import compilar, ler_estado_resumos
+
+FORMATOS = ['csv', 'tsv', 'json', 'parquet', 'xlsx']
+# Formatos binários: precisam de um arquivo (ou de um fluxo de bytes) como destino
+FORMATOS_BINARIOS = {'parquet', 'xlsx'}
+EXTENSOES = {'.csv': 'csv', '.tsv': 'tsv', '.json': 'json', '.parquet': 'parquet', '.xlsx': 'xlsx'}
+
+# Linhas por round trip do cursor nomeado
+ITERSIZE_EXPORTACAO = 10000
+# Linhas por row group do Parquet (também o tamanho do lote convertido para colunas)
+LINHAS_POR_GRUPO = 100000
+# Linhas de dados por planilha do XLSX (o limite do Excel, descontado o cabeçalho)
+LINHAS_POR_PLANILHA = 1048575
+# Intervalo (em linhas) entre os avisos de progresso e as verificações de cancelamento
+INTERVALO_PROGRESSO = 10000
+
+# OID do tipo no PostgreSQL -> tipo da coluna no Parquet; os demais tipos são gravados como texto.
+# numeric vira float64 (SUM de inteiros, por exemplo, é numeric sem escala definida)
+TIPOS_ARROW = {
+    16: 'bool_', 20: 'int64', 21: 'int16', 23: 'int32', 700: 'float32', 701: 'float64', 1700: 'float64',
+    25: 'string', 1042: 'string', 1043: 'string', 1082: 'date32',
+}
+OID_NUMERIC = 1700
+OID_TIMESTAMP = 1114
+OID_TIMESTAMPTZ = 1184
+
+_contador_cursores = itertools.count(1)
+
+
+class ExportacaoCancelada(Exception):
+    """A exportação foi interrompida por cancelado(); o arquivo incompleto é removido."""
+
+
+def formato_do_arquivo(caminho):
+    """Formato correspondente à extensão do arquivo, ou None se não for conhecida."""
+    return EXTENSOES.get(os.path.splitext(str(caminho))[1].lower())
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Exportação para Parquet requer o pacote 'pyarrow' (pip install pyarrow).") from None
+    return pa, pq
+
+
+def _openpyxl():
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("Exportação para XLSX requer o pacote 'openpyxl' (pip install openpyxl).") from None
+    return Workbook
+
+
+def _acompanhar(linhas, ao_progredir, cancelado):
+    """Repassa as linhas, avisando o progresso e verificando o cancelamento a cada INTERVALO_PROGRESSO."""
+    total = 0
+    for linha in linhas:
+        yield linha
+        total += 1
+        if total % INTERVALO_PROGRESSO == 0:
+            if cancelado is not None and cancelado():
+                raise ExportacaoCancelada()
+            if ao_progredir is not None:
+                ao_progredir(total)
+
+
+def escrever_texto(saida, formato, colunas, linhas):
+    """Escreve as linhas em CSV, TSV ou JSON à medida que chegam. Retorna quantas foram escritas."""
+    total = 0
+    if formato == 'json':
+        saida.write("[")
+        for linha in linhas:
+            saida.write(",\n " if total else "\n ")
+            saida.write(json.dumps(dict(zip(colunas, linha)), ensure_ascii=False, default=str))
+            total += 1
+        saida.write("\n]\n" if total else "]\n")
+        return total
+
+    escritor = csv.writer(saida, delimiter='\t' if formato == 'tsv' else ',', lineterminator='\n')
+    escritor.writerow(colunas)
+    for linha in linhas:
+        escritor.writerow(linha)
+        total += 1
+    return total
+
+
+def _tipo_arrow(pa, oid):
+    if oid == OID_TIMESTAMP:
+        return pa.timestamp('us')
+    if oid == OID_TIMESTAMPTZ:
+        return pa.timestamp('us', tz='UTC')
+    return getattr(pa, TIPOS_ARROW.get(oid, 'string'))()
+
+
+def _conversor(oid):
+    """Função aplicada aos valores não nulos da coluna antes de passá-los ao Arrow (ou None)."""
+    if oid == OID_NUMERIC:
+        return float
+    if oid in TIPOS_ARROW or oid in (OID_TIMESTAMP, OID_TIMESTAMPTZ):
+        return None
+    return str
+
+
+def escrever_parquet(destino, colunas, tipos, linhas):
+    """
+    Escreve as linhas em Parquet, um row group a cada LINHAS_POR_GRUPO linhas. O esquema
+    vem dos tipos das colunas no PostgreSQL (OIDs), não dos valores: um lote só com
+    nulos não muda o tipo da coluna. Retorna quantas linhas foram escritas.
+    """
+    pa, pq = _pyarrow()
+    esquema = pa.schema([(nome, _tipo_arrow(pa, oid)) for nome, oid in zip(colunas, tipos)])
+    conversores = [_conversor(oid) for oid in tipos]
+    total = 0
+    with pq.ParquetWriter(destino, esquema) as escritor:
+        linhas = iter(linhas)
+        while True:
+            lote = list(itertools.islice(linhas, LINHAS_POR_GRUPO))
+            if not lote:
+                break
+            arrays = []
+            for i, (campo, converter) in enumerate(zip(esquema, conversores)):
+                valores = [linha[i] for linha in lote]
+                if converter is not None:
+                    valores = [None if valor is None else converter(valor) for valor in valores]
+                arrays.append(pa.array(valores, type=campo.type))
+            escritor.write_table(pa.Table.from_arrays(arrays, schema=esquema))
+            total += len(lote)
+    return total
+
+
+def escrever_xlsx(destino, colunas, linhas):
+    """
+    Escreve as linhas em XLSX (openpyxl write_only: cada linha vai direto para o arquivo
+    temporário da planilha). Acima de LINHAS_POR_PLANILHA, continua em outra planilha,
+    com o cabeçalho repetido. Retorna quantas linhas foram escritas.
+    """
+    Workbook = _openpyxl()
+    livro = Workbook(write_only=True)
+    planilha = None
+    total = 0
+    for linha in linhas:
+        if total % LINHAS_POR_PLANILHA == 0:
+            numero = total // LINHAS_POR_PLANILHA + 1
+            planilha = livro.create_sheet("Dados" if numero == 1 else f"Dados {numero}")
+            planilha.append(colunas)
+        planilha.append(linha)
+        total += 1
+    if planilha is None:
+        livro.create_sheet("Dados").append(colunas)
+    livro.save(destino)
+    return total
+
+
+class _SaidaCopy(io.TextIOBase):
+    """Repassa ao destino o texto do COPY, contando as linhas e verificando o cancelamento."""
+
+    def __init__(self, saida, ao_progredir, cancelado):
+        self.saida = saida
+        self.ao_progredir = ao_progredir
+        self.cancelado = cancelado
+        # Quebras de linha recebidas (inclui a do cabeçalho e as de dentro de campos entre aspas)
+        self.quebras = 0
+        self._proximo_aviso = INTERVALO_PROGRESSO
+
+    def writable(self):
+        return True
+
+    def write(self, texto):
+        self.saida.write(texto)
+        self.quebras += texto.count('\n')
+        if self.quebras >= self._proximo_aviso:
+            self._proximo_aviso = self.quebras + INTERVALO_PROGRESSO
+            if self.cancelado is not None and self.cancelado():
+                raise ExportacaoCancelada()
+            if self.ao_progredir is not None:
+                self.ao_progredir(self.quebras - 1)
+        return len(texto)
+
+
+def _copiar(conn, query, params, saida, formato, ao_progredir, cancelado):
+    """CSV/TSV gerado pelo servidor com COPY (consulta) TO STDOUT. Retorna quantas linhas foram escritas."""
+    delimitador = b", DELIMITER E'\\t'" if formato == 'tsv' else b""
+    destino = _SaidaCopy(saida, ao_progredir, cancelado)
+    with conn.cursor() as cursor:
+        # COPY não aceita parâmetros: a consulta vai com os valores já citados pelo driver.
+        # A quebra antes do ')' encerra um eventual comentário '--' na última linha
+        copia = (b"COPY (" + cursor.mogrify(query, params) + b"\n) TO STDOUT WITH (FORMAT csv, HEADER"
+                 + delimitador + b")")
+        cursor.copy_expert(copia, destino)
+        # rowcount de um COPY é o número de linhas copiadas (-1 em versões antigas do driver)
+        return cursor.rowcount if cursor.rowcount >= 0 else max(destino.quebras - 1, 0)
+
+
+def _ler_cursor(conn, query, params):
+    """(colunas, OIDs dos tipos, iterador de linhas) de um cursor nomeado no servidor."""
+    cursor = conn.cursor(name=f"exportacao_{next(_contador_cursores)}")
+    cursor.itersize = ITERSIZE_EXPORTACAO
+    cursor.execute(query, params)
+    primeira = cursor.fetchmany(1)  # Obriga o servidor a executar, para termos a descrição das colunas
+    colunas = [desc[0] for desc in cursor.description]
+    tipos = [desc[1] for desc in cursor.description]
+
+    def linhas():
+        try:
+            yield from itertools.chain(primeira, cursor)
+        finally:
+            cursor.close()
+    return colunas, tipos, linhas()
+
+
+def exportar(conn, relatorio, destino, formato, valores=None, estado_resumos=None, timeout=None,
+             ao_progredir=None, cancelado=None, usar_copy=True):
+    """
+    Exporta o resultado completo do relatório (sem paginação) para 'destino', um caminho
+    ou um arquivo já aberto (texto para CSV/TSV/JSON). Retorna quantas linhas foram escritas.
+
+    ao_progredir(linhas) é chamado a cada INTERVALO_PROGRESSO linhas; se cancelado()
+    retornar verdadeiro, a exportação para com ExportacaoCancelada. Quando destino é um
+    caminho, o arquivo incompleto é removido em caso de erro ou cancelamento. A transação
+    fica aberta ao final; quem chama faz o rollback/close.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {formato} (use {', '.join(FORMATOS)})")
+    # Dependência opcional ausente: falha antes de executar a consulta
+    if formato == 'parquet':
+        _pyarrow()
+    elif formato == 'xlsx':
+        _openpyxl()
+    if estado_resumos is None and relatorio.query_resumo:
+        estado_resumos = ler_estado_resumos(conn)
+    query, params = compilar(relatorio, valores, estado_resumos, visiveis=True)
+    if timeout:
+        with conn.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = %s", (int(timeout * 1000),))
+
+    if not isinstance(destino, (str, os.PathLike)):
+        return _exportar(conn, query, params, destino, formato, ao_progredir, cancelado, usar_copy)
+    try:
+        if formato in FORMATOS_BINARIOS:
+            return _exportar(conn, query, params, destino, formato, ao_progredir, cancelado, usar_copy)
+        with open(destino, 'w', encoding='utf-8', newline='') as saida:
+            return _exportar(conn, query, params, saida, formato, ao_progredir, cancelado, usar_copy)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(destino)
+        raise
+
+
+def _exportar(conn, query, params, destino, formato, ao_progredir, cancelado, usar_copy):
+    if usar_copy and formato in ('csv', 'tsv'):
+        total = _copiar(conn, query, params, destino, formato, ao_progredir, cancelado)
+    else:
+        colunas, tipos, linhas = _ler_cursor(conn, query, params)
+        linhas = _acompanhar(linhas, ao_progredir, cancelado)
+        if formato == 'parquet':
+            total = escrever_parquet(destino, colunas, tipos, linhas)
+        elif formato == 'xlsx':
+            total = escrever_xlsx(destino, colunas, linhas)
+        else:
+            total = escrever_texto(destino, formato, colunas, linhas)
+    if ao_progredir is not None:
+        ao_progredir(total)
+    return total
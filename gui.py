@@ -0,0 +1,2034 @@
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox, scrolledtext
+import psycopg2
+from psycopg2 import sql
+import datetime
+import functools
+import logging
+import time
+
+from analytics_cache import DIMENSOES, MEDIDAS, RESPOSTAS, AnalyticsCache, ler_filtros
+import cadastros
+from change_listener import ChangeListener
+from db_pool import DB_CONFIG_PADRAO, ConnectionPool
+from option_list import OptionList
+from diagnostics_window import DiagnosticsWindow
+from exporter import formato_do_arquivo
+from query_metrics import QueryMetrics
+from reference_cache import ReferenceCache
+from report_executor import CANCELADO, CONCLUIDO, EXPIRADO, ReportExecutor
+from reference_search import ReferenceSearch
+from reports import RELATORIOS, TAMANHO_PAGINA, compilar, ler_estado_resumos
+from result_cache import ResultCache
+from search_listbox import SearchListbox
+from statement_cache import StatementCache
+from supply_graph import CONSULTAS, MEDIDAS_RANKING, TIPOS_NO, SupplyGraph
+from write_queue import Escrita, WriteQueue
+
+# Intervalo (ms) com que a interface verifica se o relatório em segundo plano terminou
+INTERVALO_POLLING_RELATORIO = 100
+
+# Intervalo (ms) com que a interface verifica os lotes gravados pela fila de cadastros
+INTERVALO_POLLING_GRAVACAO = 100
+# Tempo máximo (s) que o fechamento da janela espera a fila de cadastros terminar
+TEMPO_MAXIMO_FECHAMENTO = 10
+
+# Tipos de arquivo oferecidos por "Exportar…" (o formato vem da extensão escolhida)
+TIPOS_ARQUIVO_EXPORTACAO = [("CSV", "*.csv"), ("TSV", "*.tsv"), ("JSON", "*.json"),
+                            ("Parquet", "*.parquet"), ("Excel", "*.xlsx")]
+
+# Cabeçalhos das colunas dos recortes da análise em memória (AnalyticsCache.resumir)
+ROTULOS_ANALISE = {'conflitos': "Conflitos", 'mortos': "Mortos", 'feridos': "Feridos",
+                   'fornecimentos': "Fornecimentos", 'armas': "Armas Fornecidas", 'tipo': "Tipo de Conflito",
+                   'pais': "País", 'regiao': "Região", 'grupo': "Grupo Armado", 'organizacao': "Organização",
+                   'arma': "Arma", 'traficante': "Traficante"}
+
+# Formato esperado nos campos de parâmetros dos relatórios, por tipo (reports.Parametro)
+DICAS_PARAMETRO = {'data': " (AAAA-MM-DD)", 'lista': " (separadas por vírgula)"}
+
+# Espera (ms) após a última troca de grupo na aba Divisões antes de filtrar os líderes:
+# percorrer o combo com as setas gera uma rajada de seleções e só a última importa
+ATRASO_FILTRO_LIDERES = 150
+
+# Inicialização acima disso (s, do início do processo à primeira pintura) gera um aviso no log
+LIMITE_INICIALIZACAO = 1.0
+
+logger = logging.getLogger('conflitos.gui')
+
+
+def acao_usuario(metodo):
+    """Conta as instruções SQL executadas pelo método (e por tudo o que ele chamar) como uma ação do usuário."""
+    @functools.wraps(metodo)
+    def executar(self, *args, **kwargs):
+        with self.metricas.acao(metodo.__name__):
+            return metodo(self, *args, **kwargs)
+    return executar
+
+
+class ConflictosBelicosApp:
+    def __init__(self, root, inicio=None, ao_pintar=None):
+        # inicio: instante (time.perf_counter) em que o processo começou, para medir a inicialização;
+        # ao_pintar(tempos): chamado depois da primeira pintura da janela
+        self.inicio = inicio if inicio is not None else time.perf_counter()
+        self.ao_pintar = ao_pintar
+        self.tempos_inicializacao = {'importacoes': time.perf_counter() - self.inicio}
+        self.root = root
+        self.root.title("Sistema de Gerenciamento de Conflitos Bélicos")
+        self.root.geometry("1200x800")
+
+        # Configuração da conexão com banco padrão (definida em db_pool.py)
+        self.db_config = dict(DB_CONFIG_PADRAO)
+        # Tamanho do pool de conexões compartilhado por consultas, cadastros e relatórios
+        self.pool_config = {'minconn': 1, 'maxconn': 8}
+        self.pool = None
+        # Latência, linhas e erros de toda instrução executada pelas conexões do pool
+        self.metricas = QueryMetrics()
+        # Instruções da aplicação preparadas uma vez por conexão e executadas pelo nome
+        self.cache_instrucoes = StatementCache(metricas=self.metricas)
+        self.janela_diagnostico = None
+        # Gráfico de tipos de conflito: criado no primeiro uso e reaproveitado nas atualizações
+        self.grafico = None
+        # Último estado dos resumos lido em segundo plano (EstadoResumos ou None se desconhecido)
+        self.estado_resumos_atual = None
+        # Gráfico de linhas das séries temporais, reaproveitado da mesma forma
+        self.grafico_serie = None
+        # Listagem exibida em páginas: relatório, valores dos parâmetros e a chave de início de cada página
+        self.paginacao = None
+        # Relatórios rodam em threads de fundo; a interface acompanha o job atual via root.after
+        self.report_executor = ReportExecutor(lambda: self.pool, metricas=self.metricas,
+                                              cache_instrucoes=self.cache_instrucoes)
+        self.relatorio_em_andamento = None
+        # Exportação em segundo plano (independente do relatório exibido)
+        self.exportacao_em_andamento = None
+        # Tabelas de referência dos combos/listboxes, invalidadas por escritas e por NOTIFY
+        self.cache_referencia = ReferenceCache(lambda: self.pool, cache_instrucoes=self.cache_instrucoes)
+        # Busca por nome nas listas grandes (países, grupos, conflitos), invalidada junto com o cache
+        self.busca_referencia = ReferenceSearch(lambda: self.pool, cache_instrucoes=self.cache_instrucoes)
+        self.cache_referencia.assinar_invalidacao(self.busca_referencia.invalidar)
+        # Resultados dos relatórios: as mesmas invalidações (escritas e NOTIFY) incrementam a versão das tabelas
+        self.cache_resultados = ResultCache()
+        self.cache_referencia.assinar_invalidacao(self.cache_resultados.invalidar)
+        # Tabelas de fatos em arrays NumPy (opcional): só as tabelas alteradas são recarregadas
+        self.analise = AnalyticsCache(lambda: self.pool)
+        self.cache_referencia.assinar_invalidacao(self.analise.invalidar)
+        # Rede de fornecimento em CSR sobre as mesmas tabelas (invalidada junto com elas)
+        self.grafo = SupplyGraph(self.analise)
+        self.listener = None
+        # Cadastros gravados em lotes por uma thread; a interface acompanha a fila via root.after
+        self.fila_gravacao = WriteQueue(lambda: self.pool, metricas=self.metricas)
+        self.verificacao_gravacao_agendada = None
+        self.ultima_gravacao = None
+        # Filtro de líderes da aba Divisões agendado (root.after) e ainda não executado
+        self.filtro_lideres_agendado = None
+        self.formularios = {}
+        self.formularios_construidos = set()
+        self.setup_gui()
+        self.root.protocol("WM_DELETE_WINDOW", self.fechar_aplicacao)
+        self.tempos_inicializacao['construcao'] = time.perf_counter() - self.inicio
+        # Os redesenhos pendentes também são tarefas ociosas do Tk: esta roda depois deles
+        self.root.after_idle(self._registrar_primeira_pintura)
+        # self.test_connection()  # Conectar ao iniciar
+
+    def _registrar_primeira_pintura(self):
+        self.root.update_idletasks()
+        tempos = self.tempos_inicializacao
+        tempos['primeira_pintura'] = time.perf_counter() - self.inicio
+        nivel = logging.WARNING if tempos['primeira_pintura'] > LIMITE_INICIALIZACAO else logging.INFO
+        logger.log(nivel, "Inicialização: importações %.0f ms, construção %.0f ms, primeira pintura %.0f ms",
+                   tempos['importacoes'] * 1000, tempos['construcao'] * 1000, tempos['primeira_pintura'] * 1000)
+        if self.ao_pintar:
+            self.ao_pintar(dict(tempos))
+
+    def connect_db(self):
+        """(Re)cria o pool de conexões com o banco de dados PostgreSQL"""
+        try:
+            # Se já houver um pool, fecha antes de abrir um novo. Conexões emprestadas
+            # a operações em andamento são fechadas quando forem devolvidas.
+            if self.pool and not self.pool.fechado:
+                self.pool.closeall()
+            self.pool = ConnectionPool(self.db_config, cursor_factory=self.metricas.cursor_factory,
+                                       **self.pool_config)
+            # O banco pode ter mudado (ou ser outro): descarta o cache e volta a escutar alterações
+            self.cache_referencia.invalidar()
+            self.iniciar_listener()
+            return True
+        except psycopg2.Error as e:
+            self.pool = None
+            messagebox.showerror(
+                "Erro de Conexão", f"Erro ao conectar ao banco: {str(e)}")
+            return False
+
+    def fechar_aplicacao(self):
+        """Fecha o pool de conexões e encerra a janela."""
+        self.cancelar_relatorio()
+        self.cancelar_exportacao()
+        if self.filtro_lideres_agendado is not None:
+            self.root.after_cancel(self.filtro_lideres_agendado)
+        if self.verificacao_gravacao_agendada is not None:
+            self.root.after_cancel(self.verificacao_gravacao_agendada)
+        # Os cadastros ainda na fila são gravados antes de fechar o pool
+        self.fila_gravacao.shutdown(timeout=TEMPO_MAXIMO_FECHAMENTO)
+        self.report_executor.shutdown()
+        if self.listener:
+            self.listener.stop()
+        if self.pool_ativo():
+            self.pool.closeall()
+        self.root.destroy()
+
+    def iniciar_listener(self):
+        """(Re)inicia a escuta de NOTIFYs que invalidam o cache de referência."""
+        if self.listener:
+            self.listener.stop()
+        self.listener = ChangeListener(self.db_config)
+        self.listener.assinar(self._ao_notificar_alteracao, self.cache_referencia.invalidar)
+        self.listener.start()
+
+    def _ao_notificar_alteracao(self, tabela, pid):
+        """Chamado na thread do listener. Escritas da própria aplicação já invalidam o cache ao confirmar."""
+        pool = self.pool
+        if pool is not None and pid in pool.backend_pids():
+            return
+        self.cache_referencia.invalidar(tabela)
+
+    def dados_referencia(self, tabela):
+        """Linhas de uma tabela de referência, servidas pelo cache. Retorna [] em caso de erro."""
+        if not self.pool_ativo():
+            if not self.connect_db():
+                return []
+        try:
+            return self.cache_referencia.obter(tabela)
+        except psycopg2.Error as e:
+            messagebox.showerror(
+                "Erro na Query", f"Erro ao carregar {tabela}: {str(e)}")
+            return []
+
+    def indice_referencia(self, tabela, coluna):
+        """Linhas de uma tabela de referência agrupadas por uma coluna, servidas pelo cache. Retorna {} em caso de erro."""
+        if not self.pool_ativo():
+            if not self.connect_db():
+                return {}
+        try:
+            return self.cache_referencia.indice(tabela, coluna)
+        except psycopg2.Error as e:
+            messagebox.showerror(
+                "Erro na Query", f"Erro ao carregar {tabela}: {str(e)}")
+            return {}
+
+    @acao_usuario
+    def buscar_referencia(self, tabela, termo):
+        """Linhas (código, nome) de uma tabela de referência cujo nome contém o termo. Retorna [] em caso de erro."""
+        if not self.pool_ativo():
+            if not self.connect_db():
+                return []
+        try:
+            return self.busca_referencia.buscar(tabela, termo)
+        except psycopg2.Error as e:
+            messagebox.showerror(
+                "Erro na Query", f"Erro ao buscar em {tabela}: {str(e)}")
+            return []
+
+    def pool_ativo(self):
+        """Indica se há um pool de conexões aberto."""
+        return self.pool is not None and not self.pool.fechado
+
+    def execute_query(self, query, params=None, fetch=True):
+        """Executa uma query no banco de dados usando uma conexão emprestada do pool"""
+        if not self.pool_ativo():
+            if not self.connect_db():
+                return None
+
+        try:
+            with self.pool.conexao() as conn:
+                try:
+                    cursor = conn.cursor()
+                    self.cache_instrucoes.executar(cursor, query, params)
+
+                    if fetch:
+                        results = cursor.fetchall()
+                        columns = [desc[0]
+                                   for desc in cursor.description] if cursor.description else []
+                        cursor.close()
+                        return results, columns
+                    else:
+                        conn.commit()
+                        cursor.close()
+                        return True
+                except psycopg2.Error:
+                    if not conn.closed:  # Verifica se a conexão ainda está aberta
+                        try:
+                            conn.rollback()
+                        except psycopg2.Error as re:
+                            print(f"Erro durante o rollback: {re}")
+                    raise
+        except psycopg2.Error as e:
+            messagebox.showerror(
+                "Erro na Query", f"Erro ao executar query: {str(e)}\nQuery: {query}")
+            return None
+
+    def setup_gui(self):
+        """Configura a interface gráfica"""
+        # --- Configuração de Estilos (Início das Alterações) ---
+        style = ttk.Style()
+
+        # Tentar usar um tema escuro se disponível. Nem todos os sistemas operacionais suportam todos os temas.
+        # 'clam' é um bom ponto de partida para personalização
+        try:
+            style.theme_use('clam')
+        except tk.TclError:
+            print("Tema 'clam' não disponível, usando o tema padrão.")
+
+        # Cores para o tema escuro
+        BG_COLOR = "#2B2B2B"  # Quase preto
+        FG_COLOR = "#FFFFFF"  # Branco
+        ACCENT_COLOR = "#4CAF50"  # Um verde suave para destaque (botões, etc.)
+        BORDER_COLOR = "#4A4A4A"  # Cinza escuro para bordas
+
+        # Estilo para o Root (janela principal)
+        self.root.configure(bg=BG_COLOR)
+
+        # Estilo para Frames e LabelFrames (fundo e borda)
+        style.configure("TFrame", background=BG_COLOR)
+        style.configure("TLabelframe", background=BG_COLOR,
+                        foreground=FG_COLOR, bordercolor=BORDER_COLOR)
+        style.configure("TLabelframe.Label", background=BG_COLOR,
+                        foreground=FG_COLOR)  # Cor do texto do LabelFrame
+
+        # Estilo para Labels
+        style.configure("TLabel", background=BG_COLOR, foreground=FG_COLOR)
+
+        # Estilo para Buttons
+        style.configure("TButton", background=ACCENT_COLOR,
+                        foreground="black", font=('Arial', 10, 'bold'))
+        style.map("TButton",
+                  background=[('active', '#66BB6A'), ('pressed', '#388E3C')],
+                  foreground=[('active', 'white'), ('pressed', 'white')])
+
+        # Estilo para Entry e Combobox (normalmente têm sua própria cor de fundo do sistema)
+        # Para forçar cores escuras em Entry/Combobox, é preciso mexer em seus "elements"
+        # Isso pode ser mais complexo e variar entre plataformas.
+        # Uma abordagem mais simples é apenas definir o foreground (cor do texto).
+        style.configure("TEntry", fieldbackground="#3C3C3C",
+                        foreground=FG_COLOR, bordercolor=BORDER_COLOR)
+        style.map("TEntry", fieldbackground=[
+                  ('focus', '#5C5C5C')])  # Cor ao focar
+
+        style.configure("TCombobox", fieldbackground="#3C3C3C", foreground=FG_COLOR,
+                        selectbackground="#5C5C5C", selectforeground=FG_COLOR, bordercolor=BORDER_COLOR)
+        style.map("TCombobox",
+                  # Cor de fundo quando readonly
+                  fieldbackground=[('readonly', '#3C3C3C')],
+                  # Cor de seleção quando readonly
+                  selectbackground=[('readonly', '#5C5C5C')],
+                  # Cor do texto selecionado quando readonly
+                  selectforeground=[('readonly', FG_COLOR)],
+                  # Cor do dropdown ao passar o mouse
+                  background=[('active', '#5C5C5C')])
+
+        # Estilo para Notebook (abas)
+        style.configure("TNotebook", background=BG_COLOR,
+                        bordercolor=BORDER_COLOR)
+        style.configure("TNotebook.Tab", background=BG_COLOR,
+                        foreground=FG_COLOR, bordercolor=BORDER_COLOR)
+        style.map("TNotebook.Tab",
+                  background=[('selected', ACCENT_COLOR)],
+                  foreground=[('selected', 'black')],
+                  # Expande levemente a aba selecionada
+                  expand=[('selected', [1, 1, 1, 0])])
+
+        # --- Fim das Alterações de Estilos ---
+
+        # Notebook para as abas
+        self.notebook = ttk.Notebook(self.root)
+        self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        # Abas
+        self.tab_cadastro = ttk.Frame(self.notebook)
+        self.tab_relatorios = ttk.Frame(self.notebook)
+        self.tab_conexao = ttk.Frame(self.notebook)
+
+        self.notebook.add(self.tab_cadastro, text="Cadastros")
+        self.notebook.add(self.tab_relatorios, text="Relatórios")
+        self.notebook.add(self.tab_conexao, text="Conexão DB")
+
+        # Cada aba é construída na primeira vez em que é selecionada
+        self.abas_pendentes = {
+            str(self.tab_cadastro): self.setup_cadastro_tab,
+            str(self.tab_relatorios): self.setup_relatorios_tab,
+            str(self.tab_conexao): self.setup_conexao_tab,
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self.construir_aba_selecionada)
+        self.construir_aba_selecionada(notebook=self.notebook)
+
+    def construir_aba_selecionada(self, event=None, notebook=None):
+        """Constrói a aba selecionada de um notebook (principal ou de cadastros), se ainda não foi construída."""
+        notebook = notebook or event.widget
+        construir = self.abas_pendentes.pop(notebook.select(), None)
+        if construir is not None:
+            construir()
+
+    def setup_conexao_tab(self):
+        """Configura a aba de conexão com banco"""
+        # Usar as cores definidas na classe para consistência
+        frame = ttk.LabelFrame(
+            self.tab_conexao, text="Configuração do Banco de Dados")
+        frame.pack(fill=tk.BOTH, expand=True, padx=20,
+                   pady=20)  # Aumenta padding
+
+        ttk.Label(frame, text="Host:").grid(
+            row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        self.host_var = tk.StringVar(value=self.db_config['host'])
+        ttk.Entry(frame, textvariable=self.host_var, width=35).grid(  # Aumenta largura
+            row=0, column=1, padx=5, pady=5)
+
+        ttk.Label(frame, text="Database:").grid(
+            row=1, column=0, sticky=tk.W, padx=5, pady=5)
+        self.db_var = tk.StringVar(value=self.db_config['database'])
+        ttk.Entry(frame, textvariable=self.db_var, width=35).grid(  # Aumenta largura
+            row=1, column=1, padx=5, pady=5)
+
+        # Campo de entrada para o usuário
+        ttk.Label(frame, text="Usuário:").grid(
+            row=2, column=0, sticky=tk.W, padx=5, pady=5)
+        self.user_var = tk.StringVar(value=self.db_config['user'])
+        ttk.Entry(frame, textvariable=self.user_var, width=35).grid(
+            row=2, column=1, padx=5, pady=5)
+
+        ttk.Label(frame, text="Senha:").grid(
+            row=3, column=0, sticky=tk.W, padx=5, pady=5)
+        self.pass_var = tk.StringVar(value=self.db_config['password'])
+        ttk.Entry(frame, textvariable=self.pass_var, width=35,  # Aumenta largura
+                  show="*").grid(row=3, column=1, padx=5, pady=5)
+
+        # Tamanho do pool de conexões (mínimo e máximo de conexões simultâneas)
+        ttk.Label(frame, text="Pool (mín / máx):").grid(
+            row=4, column=0, sticky=tk.W, padx=5, pady=5)
+        pool_frame = ttk.Frame(frame)
+        pool_frame.grid(row=4, column=1, sticky=tk.W, padx=5, pady=5)
+        self.pool_min_var = tk.IntVar(value=self.pool_config['minconn'])
+        self.pool_max_var = tk.IntVar(value=self.pool_config['maxconn'])
+        ttk.Entry(pool_frame, textvariable=self.pool_min_var,
+                  width=6).pack(side=tk.LEFT)
+        ttk.Label(pool_frame, text=" / ").pack(side=tk.LEFT)
+        ttk.Entry(pool_frame, textvariable=self.pool_max_var,
+                  width=6).pack(side=tk.LEFT)
+
+        # Botões (ajustados para a próxima linha)
+        ttk.Button(frame, text="Testar Conexão", command=self.test_connection).grid(
+            row=5, column=0, padx=5, pady=15, sticky="ew")  # Preenche horizontalmente
+        ttk.Button(frame, text="Salvar Configuração", command=self.save_config).grid(
+            row=5, column=1, padx=5, pady=15, sticky="ew")  # Preenche horizontalmente
+
+        self.status_label = ttk.Label(
+            frame, text="Status: Não conectado", font=('Segoe UI', 10, 'bold'))
+        self.status_label.grid(row=6, column=0, columnspan=2, pady=10)
+        # Configuração de cor do status_label será feita dinamicamente em test_connection
+
+        ttk.Button(frame, text="Estatísticas do Pool", command=self.mostrar_estatisticas_pool).grid(
+            row=7, column=0, columnspan=2, padx=5, pady=5)
+        ttk.Button(frame, text="Diagnóstico de Consultas", command=self.mostrar_diagnostico).grid(
+            row=8, column=0, columnspan=2, padx=5, pady=5)
+
+        # Centralizar colunas
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_columnconfigure(1, weight=1)
+
+    @acao_usuario
+    def test_connection(self):
+        """Testa a conexão com o banco"""
+        self.update_config()
+        if self.connect_db():
+            self.status_label.config(
+                text="Status: Conectado com sucesso!", foreground="#00FF00")  # Verde para sucesso
+            messagebox.showinfo("Sucesso", "Conexão estabelecida com sucesso!")
+            # Atualizar combos que dependem de dados do banco
+            self.atualizar_todos_os_combos()
+        else:
+            self.status_label.config(
+                text="Status: Erro na conexão", foreground="#FF0000")  # Vermelho para erro
+
+    def save_config(self):
+        """Salva a configuração do banco"""
+        self.update_config()
+        messagebox.showinfo("Sucesso", "Configuração salva!")
+
+    def update_config(self):
+        """Atualiza a configuração do banco"""
+        self.db_config.update({
+            'host': self.host_var.get(),
+            'database': self.db_var.get(),
+            'user': self.user_var.get(),
+            'password': self.pass_var.get()
+        })
+        try:
+            minconn, maxconn = self.pool_min_var.get(), self.pool_max_var.get()
+        except tk.TclError:
+            minconn, maxconn = -1, -1
+        if 0 <= minconn <= maxconn and maxconn >= 1:
+            self.pool_config.update({'minconn': minconn, 'maxconn': maxconn})
+        else:
+            messagebox.showwarning(
+                "Pool de Conexões", "Tamanho de pool inválido. Mantendo "
+                f"{self.pool_config['minconn']} / {self.pool_config['maxconn']}.")
+            self.pool_min_var.set(self.pool_config['minconn'])
+            self.pool_max_var.set(self.pool_config['maxconn'])
+
+    def mostrar_estatisticas_pool(self):
+        """Exibe as estatísticas do pool de conexões (checkouts, esperas, reconexões...)"""
+        if not self.pool_ativo():
+            messagebox.showinfo("Pool de Conexões", "Não há pool ativo. Teste a conexão primeiro.")
+            return
+        stats = self.pool.estatisticas()
+        texto = "\n".join([
+            f"Conexões: {stats['tamanho']} (em uso: {stats['em_uso']}, ociosas: {stats['ociosas']})",
+            f"Limites: mín {stats['minconn']} / máx {stats['maxconn']} (pico em uso: {stats['pico_em_uso']})",
+            f"Checkouts: {stats['checkouts']}",
+            f"Esperas: {stats['esperas']} (média {stats['tempo_espera_medio'] * 1000:.1f} ms, timeouts: {stats['timeouts']})",
+            f"Conexões criadas: {stats['conexoes_criadas']}",
+            f"Reconexões: {stats['reconexoes']} (falhas de health check: {stats['falhas_health_check']})",
+            f"Ociosas recolhidas: {stats['conexoes_recolhidas']}",
+        ])
+        messagebox.showinfo("Pool de Conexões", texto)
+
+    def mostrar_diagnostico(self):
+        """Abre a janela de diagnóstico das consultas (ou a traz para frente, se já estiver aberta)"""
+        janela = self.janela_diagnostico
+        if janela is not None and janela.winfo_exists():
+            janela.atualizar()
+            janela.lift()
+            return
+        self.janela_diagnostico = DiagnosticsWindow(self.root, self.metricas, self.cache_instrucoes,
+                                                    self.cache_resultados)
+
+    def setup_cadastro_tab(self):
+        """Configura a aba de cadastros"""
+        self.gravacao_status_label = ttk.Label(self.tab_cadastro, text="")
+        self.gravacao_status_label.pack(side=tk.BOTTOM, anchor=tk.W, padx=10, pady=(0, 5))
+        cadastro_notebook = ttk.Notebook(self.tab_cadastro)
+        cadastro_notebook.pack(fill=tk.BOTH, expand=True)
+
+        self.tab_conflitos = ttk.Frame(cadastro_notebook)
+        self.tab_grupos = ttk.Frame(cadastro_notebook)
+        self.tab_divisoes = ttk.Frame(cadastro_notebook)
+        self.tab_lideres = ttk.Frame(cadastro_notebook)
+        self.tab_chefes = ttk.Frame(cadastro_notebook)
+
+        cadastro_notebook.add(self.tab_conflitos, text="Conflitos")
+        cadastro_notebook.add(self.tab_grupos, text="Grupos Militares")
+        cadastro_notebook.add(self.tab_divisoes, text="Divisões")
+        cadastro_notebook.add(self.tab_lideres, text="Líderes Políticos")
+        cadastro_notebook.add(self.tab_chefes, text="Chefes Militares")
+
+        # Formulário -> (aba, construção, atualizações dos seus combos/listboxes).
+        # Só os formulários já construídos são atualizados; os demais são preenchidos ao serem abertos.
+        self.formularios = {
+            'conflitos': (self.tab_conflitos, self.setup_conflitos_form, [
+                self.atualizar_paises_listbox, self.atualizar_religioes_listbox,
+                self.atualizar_materias_primas_listbox, self.atualizar_etnias_listbox,
+                self.atualizar_regioes_listbox, self.atualizar_grupos_listbox]),
+            'grupos': (self.tab_grupos, self.setup_grupos_form, [self.atualizar_conflitos_listbox_grupo]),
+            'divisoes': (self.tab_divisoes, self.setup_divisoes_form, [self.handle_atualizar_divisao_listas]),
+            'lideres': (self.tab_lideres, self.setup_lideres_form, [self.atualizar_grupos_combo_lider]),
+            'chefes': (self.tab_chefes, self.setup_chefes_form, [self.atualizar_combos_chefes]),
+        }
+        for nome, (aba, _, _) in self.formularios.items():
+            self.abas_pendentes[str(aba)] = functools.partial(self.construir_formulario, nome)
+        cadastro_notebook.bind("<<NotebookTabChanged>>", self.construir_aba_selecionada)
+        self.construir_aba_selecionada(notebook=cadastro_notebook)
+
+    def construir_formulario(self, nome):
+        """Constrói um formulário de cadastro e, se já houver conexão, preenche suas listas."""
+        _, construir, _ = self.formularios[nome]
+        construir()
+        self.formularios_construidos.add(nome)
+        if self.pool_ativo():
+            self.atualizar_formularios(nome)
+
+    def atualizar_formularios(self, *nomes):
+        """Atualiza as listas dos formulários informados (ou de todos) que já foram construídos."""
+        for nome in nomes or list(self.formularios):
+            if nome in self.formularios_construidos:
+                for atualizar in self.formularios[nome][2]:
+                    atualizar()
+
+    def setup_conflitos_form(self):
+        """Formulário de cadastro de conflitos com seções dinâmicas para detalhes."""
+        BG_COLOR = "#2B2B2B"
+        FG_COLOR = "#FFFFFF"
+        SELECT_BG_COLOR = "#5C5C5C"  # Cor de fundo para itens selecionados em Listbox
+
+        main_frame = ttk.Frame(self.tab_conflitos)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        # Frame superior para dados gerais e listas de seleção
+        top_frame = ttk.LabelFrame(main_frame, text="Dados Gerais do Conflito")
+        top_frame.pack(fill=tk.X, expand=False, pady=(0, 10))
+
+        # --- Configuração do Grid ---
+        # Coluna dos campos de entrada
+        top_frame.grid_columnconfigure(1, weight=1)
+        # Coluna para a lista de países
+        top_frame.grid_columnconfigure(2, weight=1)
+        # Coluna para a lista de grupos
+        top_frame.grid_columnconfigure(3, weight=1)
+
+        # --- Widgets de Entrada ---
+        ttk.Label(top_frame, text="Nome do Conflito:").grid(
+            row=0, column=0, sticky=tk.W, pady=5, padx=5)
+        self.conflito_nome = tk.StringVar()
+        ttk.Entry(top_frame, textvariable=self.conflito_nome, width=50).grid(
+            row=0, column=1, sticky="ew", pady=5)
+
+        ttk.Label(top_frame, text="Tipo de Conflito:").grid(
+            row=1, column=0, sticky=tk.W, pady=5, padx=5)
+        self.conflito_tipo = tk.StringVar()
+        tipo_combo = ttk.Combobox(top_frame, textvariable=self.conflito_tipo,
+                                  values=['territorial', 'religioso',
+                                          'economico', 'racial'],
+                                  state="readonly", width=48)
+        tipo_combo.grid(row=1, column=1, sticky="ew", pady=5)
+        tipo_combo.bind("<<ComboboxSelected>>",
+                        self.handle_conflito_tipo_change)
+
+        ttk.Label(top_frame, text="Número de Mortos:").grid(
+            row=2, column=0, sticky=tk.W, pady=5, padx=5)
+        self.conflito_mortos = tk.IntVar(value=0)
+        ttk.Entry(top_frame, textvariable=self.conflito_mortos,
+                  width=20).grid(row=2, column=1, sticky="w", pady=5)
+
+        ttk.Label(top_frame, text="Número de Feridos:").grid(
+            row=3, column=0, sticky=tk.W, pady=5, padx=5)
+        self.conflito_feridos = tk.IntVar(value=0)
+        ttk.Entry(top_frame, textvariable=self.conflito_feridos,
+                  width=20).grid(row=3, column=1, sticky="w", pady=5)
+
+        ttk.Button(top_frame, text="Atualizar Todas as Listas", command=self.atualizar_todos_os_combos).grid(
+            row=4, column=1, padx=5, pady=10, sticky="w")
+
+        # --- Lista de Países Afetados ---
+        # Listas grandes: o campo acima de cada uma busca pelo nome e a lista mostra só as correspondências
+        paises_frame = ttk.LabelFrame(
+            top_frame, text="Países Afetados (busca; Ctrl+Click)")
+        paises_frame.grid(row=0, column=2, rowspan=5,
+                          padx=10, pady=5, sticky="nsew")
+        paises_frame.grid_rowconfigure(0, weight=1)
+        paises_frame.grid_columnconfigure(0, weight=1)
+
+        self.paises_busca = SearchListbox(
+            paises_frame, functools.partial(self.buscar_referencia, 'pais'), altura=8,
+            bg=BG_COLOR, fg=FG_COLOR, selectbackground=SELECT_BG_COLOR, selectforeground=FG_COLOR,
+            borderwidth=1, relief="solid")
+        self.paises_busca.grid(row=0, column=0, sticky="nsew")
+
+        # --- NOVA: Lista de Grupos Armados Envolvidos ---
+        grupos_frame = ttk.LabelFrame(
+            top_frame, text="Grupos Armados (busca; Ctrl+Click)")
+        grupos_frame.grid(row=0, column=3, rowspan=5,  # Adicionado na nova coluna 3
+                          padx=10, pady=5, sticky="nsew")
+        grupos_frame.grid_rowconfigure(0, weight=1)
+        grupos_frame.grid_columnconfigure(0, weight=1)
+
+        self.grupos_busca = SearchListbox(
+            grupos_frame, functools.partial(self.buscar_referencia, 'grupo_armado'), altura=8,
+            bg=BG_COLOR, fg=FG_COLOR, selectbackground=SELECT_BG_COLOR, selectforeground=FG_COLOR,
+            borderwidth=1, relief="solid")
+        self.grupos_busca.grid(row=0, column=0, sticky="nsew")
+
+        # Frame inferior para os detalhes dinâmicos (sem alterações)
+        self.dynamic_details_frame = ttk.Frame(main_frame)
+        self.dynamic_details_frame.pack(fill=tk.X, expand=False, pady=5)
+
+        self.frame_conflito_territorial = ttk.LabelFrame(
+            self.dynamic_details_frame, text="Regiões Afetadas")
+        self.regioes_listbox = tk.Listbox(
+            self.frame_conflito_territorial, selectmode=tk.EXTENDED, height=5, exportselection=False,
+            bg=BG_COLOR, fg=FG_COLOR, selectbackground=SELECT_BG_COLOR, selectforeground=FG_COLOR,
+            borderwidth=1, relief="solid")
+        self.regioes_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.regioes_opcoes = OptionList(self.regioes_listbox)
+        self.frame_conflito_territorial.grid(row=0, column=0, sticky="ew")
+
+        self.frame_conflito_religioso = ttk.LabelFrame(
+            self.dynamic_details_frame, text="Religiões Envolvidas")
+        self.religioes_listbox = tk.Listbox(
+            self.frame_conflito_religioso, selectmode=tk.EXTENDED, height=5, exportselection=False,
+            bg=BG_COLOR, fg=FG_COLOR, selectbackground=SELECT_BG_COLOR, selectforeground=FG_COLOR,
+            borderwidth=1, relief="solid")
+        self.religioes_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.religioes_opcoes = OptionList(self.religioes_listbox)
+        self.frame_conflito_religioso.grid(row=0, column=0, sticky="ew")
+
+        self.frame_conflito_economico = ttk.LabelFrame(
+            self.dynamic_details_frame, text="Matérias-Primas Disputadas")
+        self.materias_primas_listbox = tk.Listbox(
+            self.frame_conflito_economico, selectmode=tk.EXTENDED, height=5, exportselection=False,
+            bg=BG_COLOR, fg=FG_COLOR, selectbackground=SELECT_BG_COLOR, selectforeground=FG_COLOR,
+            borderwidth=1, relief="solid")
+        self.materias_primas_listbox.pack(
+            fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.materias_primas_opcoes = OptionList(self.materias_primas_listbox)
+        self.frame_conflito_economico.grid(row=0, column=0, sticky="ew")
+
+        self.frame_conflito_racial = ttk.LabelFrame(
+            self.dynamic_details_frame, text="Etnias Enfrentadas")
+        self.etnias_listbox = tk.Listbox(
+            self.frame_conflito_racial, selectmode=tk.EXTENDED, height=5, exportselection=False,
+            bg=BG_COLOR, fg=FG_COLOR, selectbackground=SELECT_BG_COLOR, selectforeground=FG_COLOR,
+            borderwidth=1, relief="solid")
+        self.etnias_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.etnias_opcoes = OptionList(self.etnias_listbox)
+        self.frame_conflito_racial.grid(row=0, column=0, sticky="ew")
+
+        self.handle_conflito_tipo_change()  # Esconde todos no início
+
+        ttk.Button(main_frame, text="Cadastrar Conflito Completo",
+                   command=self.cadastrar_conflito).pack(pady=10)
+
+    def setup_grupos_form(self):
+        """Formulário de cadastro de grupos militares com associação a múltiplos conflitos."""
+        BG_COLOR = "#2B2B2B"
+        FG_COLOR = "#FFFFFF"
+        SELECT_BG_COLOR = "#5C5C5C"
+
+        # Dicionário para guardar as entradas de data que serão criadas dinamicamente
+        self.date_entries = {}
+
+        frame = ttk.LabelFrame(
+            self.tab_grupos, text="Cadastro de Grupos Militares e Participação em Conflito")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        # --- Frame para Dados do Grupo e Listas ---
+        left_frame = ttk.Frame(frame)
+        left_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
+
+        # --- Frame para as Datas Dinâmicas ---
+        self.datas_frame = ttk.LabelFrame(
+            frame, text="Datas de Incorporação (AAAA-MM-DD)")
+        self.datas_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # --- Campos de Nome, Líder e Apoios (no frame da esquerda) ---
+        ttk.Label(left_frame, text="Nome do Grupo:").grid(
+            row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        self.grupo_nome = tk.StringVar()
+        ttk.Entry(left_frame, textvariable=self.grupo_nome, width=40).grid(
+            row=0, column=1, padx=5, pady=5)
+
+        ttk.Label(left_frame, text="Nome do Líder Inicial:").grid(
+            row=1, column=0, sticky=tk.W, padx=5, pady=5)
+        self.grupo_lider = tk.StringVar()
+        ttk.Entry(left_frame, textvariable=self.grupo_lider, width=40).grid(
+            row=1, column=1, padx=5, pady=5)
+
+        ttk.Label(left_frame, text="Apoios/Descrição do Líder:").grid(row=2,
+                                                                      column=0, sticky=tk.W, padx=5, pady=5)
+        self.grupo_apoios = scrolledtext.ScrolledText(
+            left_frame, width=40, height=5, bg="#3C3C3C", fg=FG_COLOR, insertbackground=FG_COLOR)
+        self.grupo_apoios.grid(row=2, column=1, padx=5, pady=5)
+
+        # --- NOVA: Lista de Conflitos para Associação ---
+        conflitos_list_frame = ttk.LabelFrame(
+            left_frame, text="Associar aos Conflitos (busca; Ctrl+Click)")
+        conflitos_list_frame.grid(
+            row=3, column=0, columnspan=2, pady=10, sticky="ew")
+
+        self.conflitos_busca_grupo = SearchListbox(
+            conflitos_list_frame, functools.partial(self.buscar_referencia, 'conflito'), altura=6,
+            bg=BG_COLOR, fg=FG_COLOR, selectbackground=SELECT_BG_COLOR, selectforeground=FG_COLOR,
+            borderwidth=1, relief="solid")
+        self.conflitos_busca_grupo.pack(fill=tk.BOTH, expand=True)
+
+        # Evento que chama a função para criar as entradas de data quando a seleção muda
+        self.conflitos_busca_grupo.bind(
+            "<<SelecaoAlterada>>", self.atualizar_entradas_data_conflito)
+
+        ttk.Button(left_frame, text="Atualizar Lista de Conflitos",
+                   command=self.atualizar_conflitos_listbox_grupo).grid(row=4, column=0, columnspan=2, pady=5)
+
+        # --- Botão de Cadastro (agora dentro do frame principal) ---
+        ttk.Button(frame, text="Cadastrar Grupo e Associar a Conflitos",
+                   command=self.cadastrar_grupo).pack(side=tk.BOTTOM, pady=20)
+
+    def setup_divisoes_form(self):
+        """Formulário de cadastro de divisões e seu primeiro chefe militar."""
+        BG_COLOR = "#2B2B2B"
+        FG_COLOR = "#FFFFFF"
+
+        frame = ttk.LabelFrame(
+            self.tab_divisoes, text="Cadastro de Nova Divisão com Chefe de Comando")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        # --- DADOS DA DIVISÃO ---
+        ttk.Label(frame, text="--- Dados da Divisão ---", font=("Arial", 10, "bold"), background=BG_COLOR, foreground=FG_COLOR).grid(
+            row=0, column=0, columnspan=3, pady=(5, 10))
+
+        ttk.Label(frame, text="Grupo da Divisão:").grid(
+            row=1, column=0, sticky=tk.W, padx=5, pady=5)
+        self.divisao_grupo = ttk.Combobox(frame, width=38, state="readonly")
+        self.divisao_grupo.grid(row=1, column=1, padx=5, pady=5)
+        self.divisao_grupo_opcoes = OptionList(self.divisao_grupo)
+        # Evento que agenda o filtro dos líderes quando um grupo é selecionado
+        self.divisao_grupo.bind("<<ComboboxSelected>>",
+                                self.agendar_lideres_para_divisao)
+
+        ttk.Label(frame, text="N° Barcos:").grid(
+            row=2, column=0, sticky=tk.W, padx=5, pady=2)
+        self.divisao_barcos = tk.IntVar(value=0)
+        ttk.Entry(frame, textvariable=self.divisao_barcos, width=15).grid(
+            row=2, column=1, sticky=tk.W, padx=5, pady=2)
+
+        ttk.Label(frame, text="N° Tanques:").grid(
+            row=3, column=0, sticky=tk.W, padx=5, pady=2)
+        self.divisao_tanques = tk.IntVar(value=0)
+        ttk.Entry(frame, textvariable=self.divisao_tanques, width=15).grid(
+            row=3, column=1, sticky=tk.W, padx=5, pady=2)
+
+        ttk.Label(frame, text="N° Aviões:").grid(
+            row=2, column=2, sticky=tk.W, padx=5, pady=2)
+        self.divisao_avioes = tk.IntVar(value=0)
+        ttk.Entry(frame, textvariable=self.divisao_avioes, width=15).grid(
+            row=2, column=3, sticky=tk.W, padx=5, pady=2)
+
+        ttk.Label(frame, text="N° Homens:").grid(
+            row=3, column=2, sticky=tk.W, padx=5, pady=2)
+        self.divisao_homens = tk.IntVar(value=0)
+        ttk.Entry(frame, textvariable=self.divisao_homens, width=15).grid(
+            row=3, column=3, sticky=tk.W, padx=5, pady=2)
+
+        ttk.Label(frame, text="N° Baixas:").grid(
+            row=4, column=0, sticky=tk.W, padx=5, pady=2)
+        self.divisao_baixas = tk.IntVar(value=0)
+        ttk.Entry(frame, textvariable=self.divisao_baixas, width=15).grid(
+            row=4, column=1, sticky=tk.W, padx=5, pady=2)
+
+        # --- DADOS DO NOVO CHEFE MILITAR ---
+        ttk.Label(frame, text="--- Dados do Novo Chefe de Comando ---", font=("Arial", 10, "bold"), background=BG_COLOR, foreground=FG_COLOR).grid(
+            row=5, column=0, columnspan=3, pady=(20, 10))
+
+        ttk.Label(frame, text="Nome do Novo Chefe:").grid(
+            row=6, column=0, sticky=tk.W, padx=5, pady=5)
+        self.divisao_nome_chefe = tk.StringVar()
+        ttk.Entry(frame, textvariable=self.divisao_nome_chefe, width=40).grid(
+            row=6, column=1, columnspan=2, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(frame, text="Faixa Hierárquica:").grid(
+            row=7, column=0, sticky=tk.W, padx=5, pady=5)
+        self.divisao_faixa_chefe = tk.StringVar()
+        ttk.Combobox(frame, textvariable=self.divisao_faixa_chefe,
+                     values=['General', 'Coronel', 'Major', 'Capitão', 'Comandante'], state="readonly", width=38).grid(
+                         row=7, column=1, columnspan=2, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(frame, text="Obedece ao Líder:").grid(
+            row=8, column=0, sticky=tk.W, padx=5, pady=5)
+        self.divisao_lider_combo = ttk.Combobox(
+            frame, width=38, state="readonly")
+        self.divisao_lider_combo.grid(
+            row=8, column=1, columnspan=2, sticky=tk.W, padx=5, pady=5)
+        self.divisao_lider_opcoes = OptionList(self.divisao_lider_combo)
+
+        ttk.Button(frame, text="Atualizar Listas", command=self.handle_atualizar_divisao_listas).grid(
+            row=1, column=2, padx=5, pady=5)
+
+        # --- BOTÃO DE CADASTRO ---
+        ttk.Button(frame, text="Cadastrar Divisão e Chefe", command=self.cadastrar_divisao).grid(
+            row=9, column=0, columnspan=4, pady=25)
+
+    def setup_lideres_form(self):
+        """Formulário de cadastro de líderes políticos"""
+        BG_COLOR = "#2B2B2B"
+        FG_COLOR = "#FFFFFF"
+
+        frame = ttk.LabelFrame(
+            self.tab_lideres, text="Cadastro de Líderes Políticos")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        ttk.Label(frame, text="Nome do Líder:").grid(
+            row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        self.lider_nome = tk.StringVar()
+        ttk.Entry(frame, textvariable=self.lider_nome, width=40).grid(
+            row=0, column=1, padx=5, pady=5)
+
+        ttk.Label(frame, text="Grupo Liderado:").grid(
+            row=1, column=0, sticky=tk.W, padx=5, pady=5)
+        self.lider_grupo = ttk.Combobox(
+            frame, width=38, state="readonly")
+        self.lider_grupo.grid(row=1, column=1, padx=5, pady=5)
+        self.lider_grupo_opcoes = OptionList(self.lider_grupo)
+        ttk.Button(frame, text="Atualizar Grupos",
+                   command=self.atualizar_grupos_combo_lider).grid(row=1, column=2, padx=5, pady=5)
+
+        ttk.Label(frame, text="Apoios/Descrição:").grid(row=2,
+                                                        column=0, sticky=tk.W, padx=5, pady=5)
+        self.lider_apoios = scrolledtext.ScrolledText(
+            frame, width=40, height=5, bg="#3C3C3C", fg=FG_COLOR, insertbackground=FG_COLOR)
+        self.lider_apoios.grid(row=2, column=1, padx=5, pady=5)
+
+        ttk.Button(frame, text="Cadastrar Líder",
+                   command=self.cadastrar_lider).grid(row=3, column=0, columnspan=2, padx=5, pady=10)
+
+    def setup_chefes_form(self):
+        """Formulário de cadastro de chefes militares"""
+        BG_COLOR = "#2B2B2B"
+        FG_COLOR = "#FFFFFF"
+
+        frame = ttk.LabelFrame(
+            self.tab_chefes, text="Cadastro de Chefes Militares")
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        ttk.Label(frame, text="Nome do Chefe:").grid(
+            row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        self.chefe_nome = tk.StringVar()
+        ttk.Entry(frame, textvariable=self.chefe_nome, width=40).grid(
+            row=0, column=1, padx=5, pady=5)
+
+        ttk.Label(frame, text="Faixa Hierárquica:").grid(
+            row=1, column=0, sticky=tk.W, padx=5, pady=5)
+        self.chefe_faixa = tk.StringVar()
+        combo_faixa = ttk.Combobox(frame, textvariable=self.chefe_faixa,
+                                   values=['General', 'Coronel', 'Major', 'Capitão', 'Comandante'], state="readonly")
+        combo_faixa.grid(row=1, column=1, padx=5, pady=5)
+
+        ttk.Label(frame, text="Líder Político:").grid(
+            row=2, column=0, sticky=tk.W, padx=5, pady=5)
+        self.chefe_lider = ttk.Combobox(
+            frame, width=38, state="readonly")
+        self.chefe_lider.grid(row=2, column=1, padx=5, pady=5)
+        self.chefe_lider_opcoes = OptionList(self.chefe_lider)
+
+        ttk.Label(frame, text="Divisão Liderada:").grid(
+            row=3, column=0, sticky=tk.W, padx=5, pady=5)
+        self.chefe_divisao = ttk.Combobox(
+            frame, width=38, state="readonly")
+        self.chefe_divisao.grid(row=3, column=1, padx=5, pady=5)
+        # Chaves das divisões: (cod_grupo, num_divisao)
+        self.chefe_divisao_opcoes = OptionList(self.chefe_divisao)
+
+        # Botão para atualizar combos de líderes e divisões
+        ttk.Button(frame, text="Atualizar Listas",
+                   command=self.atualizar_combos_chefes).grid(row=2, column=2, rowspan=2, padx=5, pady=5, sticky=tk.W)
+
+        ttk.Button(frame, text="Cadastrar Chefe",
+                   command=self.cadastrar_chefe).grid(row=4, column=0, columnspan=2, padx=5, pady=10)
+
+    def setup_relatorios_tab(self):
+        """Configura a aba de relatórios"""
+        BG_COLOR = "#2B2B2B"
+
+        # Escolha do relatório (catálogo de reports.py) e seus parâmetros
+        selecao_frame = ttk.Frame(self.tab_relatorios)
+        selecao_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        ttk.Label(selecao_frame, text="Relatório:").pack(side=tk.LEFT, padx=5)
+        self.relatorios_por_titulo = {relatorio.titulo: relatorio for relatorio in RELATORIOS.values()}
+        self.relatorio_var = tk.StringVar(value=next(iter(self.relatorios_por_titulo)))
+        relatorio_combo = ttk.Combobox(selecao_frame, textvariable=self.relatorio_var,
+                                       values=list(self.relatorios_por_titulo), state="readonly", width=40)
+        relatorio_combo.pack(side=tk.LEFT, padx=5)
+        relatorio_combo.bind("<<ComboboxSelected>>", self.selecionar_relatorio)
+        ttk.Button(selecao_frame, text="Executar",
+                   command=self.exibir_relatorio).pack(side=tk.LEFT, padx=5)
+        ttk.Button(selecao_frame, text="Exportar…",
+                   command=self.exportar_relatorio).pack(side=tk.LEFT, padx=5)
+
+        # Navegação das listagens, lidas em páginas de TAMANHO_PAGINA linhas
+        self.proxima_pagina_btn = ttk.Button(selecao_frame, text="Próxima ▶", state=tk.DISABLED,
+                                             command=lambda: self.exibir_pagina(self.paginacao['indice'] + 1))
+        self.proxima_pagina_btn.pack(side=tk.RIGHT, padx=5)
+        self.pagina_anterior_btn = ttk.Button(selecao_frame, text="◀ Anterior", state=tk.DISABLED,
+                                              command=lambda: self.exibir_pagina(self.paginacao['indice'] - 1))
+        self.pagina_anterior_btn.pack(side=tk.RIGHT, padx=5)
+        self.pagina_label = ttk.Label(selecao_frame, text="")
+        self.pagina_label.pack(side=tk.RIGHT, padx=5)
+
+        self.relatorio_descricao_label = ttk.Label(self.tab_relatorios, text="")
+        self.relatorio_descricao_label.pack(fill=tk.X, padx=15)
+        self.parametros_frame = ttk.Frame(self.tab_relatorios)
+        self.parametros_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.parametros_vars = {}
+        self.selecionar_relatorio()
+
+        # Indicador de execução: aparece enquanto um relatório roda em segundo plano
+        status_frame = ttk.Frame(self.tab_relatorios)
+        status_frame.pack(fill=tk.X, padx=10)
+
+        ttk.Label(status_frame, text="Timeout (s):").pack(side=tk.LEFT, padx=5)
+        self.timeout_relatorio_var = tk.IntVar(value=60)
+        ttk.Entry(status_frame, textvariable=self.timeout_relatorio_var,
+                  width=6).pack(side=tk.LEFT)
+
+        self.relatorio_cancelar_btn = ttk.Button(
+            status_frame, text="Cancelar", command=self.cancelar_relatorio, state=tk.DISABLED)
+        self.relatorio_cancelar_btn.pack(side=tk.RIGHT, padx=5)
+        self.relatorio_progresso = ttk.Progressbar(
+            status_frame, mode="indeterminate", length=150)
+        self.relatorio_progresso.pack(side=tk.RIGHT, padx=5)
+        self.relatorio_status_label = ttk.Label(status_frame, text="")
+        self.relatorio_status_label.pack(side=tk.RIGHT, padx=5)
+
+        # Exportação em andamento: linhas escritas até agora
+        exportacao_frame = ttk.Frame(self.tab_relatorios)
+        exportacao_frame.pack(fill=tk.X, padx=10)
+        self.exportacao_cancelar_btn = ttk.Button(
+            exportacao_frame, text="Cancelar Exportação", command=self.cancelar_exportacao, state=tk.DISABLED)
+        self.exportacao_cancelar_btn.pack(side=tk.RIGHT, padx=5)
+        self.exportacao_status_label = ttk.Label(exportacao_frame, text="")
+        self.exportacao_status_label.pack(side=tk.RIGHT, padx=5)
+
+        # Tabelas de resumo (sql/002_resumos.sql): modo de atualização e recálculo manual
+        resumos_frame = ttk.Frame(self.tab_relatorios)
+        resumos_frame.pack(fill=tk.X, padx=10, pady=(5, 0))
+
+        ttk.Label(resumos_frame, text="Resumos:").pack(side=tk.LEFT, padx=5)
+        self.modo_resumos_var = tk.StringVar()
+        modo_combo = ttk.Combobox(resumos_frame, textvariable=self.modo_resumos_var,
+                                  values=["incremental", "adiado"], state="readonly", width=12)
+        modo_combo.pack(side=tk.LEFT)
+        modo_combo.bind("<<ComboboxSelected>>", self.definir_modo_resumos)
+        ttk.Button(resumos_frame, text="Recalcular Resumos",
+                   command=self.recalcular_resumos).pack(side=tk.LEFT, padx=5)
+        self.resumos_status_label = ttk.Label(resumos_frame, text="")
+        self.resumos_status_label.pack(side=tk.LEFT, padx=5)
+
+        # Análise em memória (analytics_cache.py): relatórios de top-N e recortes ad hoc sem SQL
+        analise_frame = ttk.Frame(self.tab_relatorios)
+        analise_frame.pack(fill=tk.X, padx=10, pady=(5, 0))
+
+        self.analise_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(analise_frame, text="Em memória", variable=self.analise_var).pack(side=tk.LEFT, padx=5)
+        ttk.Label(analise_frame, text="Recorte:").pack(side=tk.LEFT, padx=(15, 5))
+        self.analise_medida_var = tk.StringVar(value='mortos')
+        medida_combo = ttk.Combobox(analise_frame, textvariable=self.analise_medida_var,
+                                    values=list(MEDIDAS), state="readonly", width=13)
+        medida_combo.pack(side=tk.LEFT)
+        medida_combo.bind("<<ComboboxSelected>>", self.selecionar_medida_analise)
+        ttk.Label(analise_frame, text="por").pack(side=tk.LEFT, padx=5)
+        self.analise_por_var = tk.StringVar()
+        self.analise_por_combo = ttk.Combobox(analise_frame, textvariable=self.analise_por_var,
+                                              state="readonly", width=12)
+        self.analise_por_combo.pack(side=tk.LEFT)
+        self.selecionar_medida_analise()
+        ttk.Label(analise_frame, text="Filtros (ex.: tipo=Religioso; pais=Síria, Iraque):").pack(
+            side=tk.LEFT, padx=5)
+        self.analise_filtros_var = tk.StringVar()
+        ttk.Entry(analise_frame, textvariable=self.analise_filtros_var, width=35).pack(side=tk.LEFT)
+        ttk.Label(analise_frame, text="Quantidade:").pack(side=tk.LEFT, padx=5)
+        self.analise_limite_var = tk.StringVar(value="10")
+        ttk.Entry(analise_frame, textvariable=self.analise_limite_var, width=5).pack(side=tk.LEFT)
+        ttk.Button(analise_frame, text="Analisar", command=self.analisar_recorte).pack(side=tk.LEFT, padx=5)
+
+        # Rede de fornecimento (supply_graph.py): consultas de vários saltos sobre as tabelas em memória
+        grafo_frame = ttk.Frame(self.tab_relatorios)
+        grafo_frame.pack(fill=tk.X, padx=10, pady=(5, 0))
+        ttk.Label(grafo_frame, text="Rede de fornecimento:").pack(side=tk.LEFT, padx=5)
+        self.grafo_consulta_var = tk.StringVar(value='conflitos-abastecidos')
+        consulta_combo = ttk.Combobox(grafo_frame, textvariable=self.grafo_consulta_var,
+                                      values=list(CONSULTAS), state="readonly", width=22)
+        consulta_combo.pack(side=tk.LEFT)
+        consulta_combo.bind("<<ComboboxSelected>>", self.selecionar_consulta_grafo)
+        ttk.Label(grafo_frame, text="Nomes (separados por vírgula):").pack(side=tk.LEFT, padx=5)
+        self.grafo_nomes_var = tk.StringVar()
+        self.grafo_nomes_entry = ttk.Entry(grafo_frame, textvariable=self.grafo_nomes_var, width=30)
+        self.grafo_nomes_entry.pack(side=tk.LEFT)
+        ttk.Label(grafo_frame, text="Ranking de").pack(side=tk.LEFT, padx=5)
+        self.grafo_tipo_var = tk.StringVar(value='traficante')
+        self.grafo_tipo_combo = ttk.Combobox(grafo_frame, textvariable=self.grafo_tipo_var,
+                                             values=list(TIPOS_NO), state="readonly", width=10)
+        self.grafo_tipo_combo.pack(side=tk.LEFT)
+        ttk.Label(grafo_frame, text="por").pack(side=tk.LEFT, padx=5)
+        self.grafo_medida_var = tk.StringVar(value='grau')
+        self.grafo_medida_combo = ttk.Combobox(grafo_frame, textvariable=self.grafo_medida_var,
+                                               values=list(MEDIDAS_RANKING), state="readonly", width=12)
+        self.grafo_medida_combo.pack(side=tk.LEFT)
+        ttk.Label(grafo_frame, text="Quantidade:").pack(side=tk.LEFT, padx=5)
+        self.grafo_limite_var = tk.StringVar(value="10")
+        ttk.Entry(grafo_frame, textvariable=self.grafo_limite_var, width=5).pack(side=tk.LEFT)
+        ttk.Button(grafo_frame, text="Consultar", command=self.consultar_grafo).pack(side=tk.LEFT, padx=5)
+        self.selecionar_consulta_grafo()
+
+        # Frame para resultados
+        self.result_frame = ttk.Frame(self.tab_relatorios)
+        self.result_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    # --- MÉTODOS DE CADASTRO ---
+    # Os cadastros são validados aqui e gravados pela fila (WriteQueue) em segundo plano:
+    # cada método lê os widgets, monta a função gravar(cursor) com esses valores e
+    # enfileira o registro. O resultado de cada registro chega em verificar_gravacoes().
+    def enfileirar_cadastro(self, escrita):
+        """Envia um registro validado à fila de gravação e acompanha a fila pela interface."""
+        if not self.pool_ativo():
+            if not self.connect_db():
+                return False
+        self.fila_gravacao.enviar(escrita)
+        self.atualizar_status_gravacao()
+        if self.verificacao_gravacao_agendada is None:
+            self.verificacao_gravacao_agendada = self.root.after(
+                INTERVALO_POLLING_GRAVACAO, self.verificar_gravacoes)
+        return True
+
+    def verificar_gravacoes(self):
+        """Recebe (via root.after) os lotes gravados: resultados por registro e uma atualização das listas por lote."""
+        self.verificacao_gravacao_agendada = None
+        for lote in self.fila_gravacao.lotes_concluidos():
+            tabelas = set()
+            formularios = set()
+            falhas = []
+            for escrita in lote:
+                if escrita.sucesso():
+                    tabelas.update(escrita.tabelas)
+                    formularios.update(escrita.formularios)
+                    self.ultima_gravacao = escrita.mensagem
+                else:
+                    falhas.append(f"• {escrita.descricao}: {escrita.erro}")
+            if tabelas:
+                self.cache_referencia.invalidar(*tabelas)
+            if formularios:
+                self.atualizar_formularios(*formularios)
+            if falhas:
+                messagebox.showerror(
+                    "Erro na Transação",
+                    "Os cadastros abaixo falharam e foram totalmente revertidos:\n\n" + "\n".join(falhas))
+
+        self.atualizar_status_gravacao()
+        if self.fila_gravacao.pendentes():
+            self.verificacao_gravacao_agendada = self.root.after(
+                INTERVALO_POLLING_GRAVACAO, self.verificar_gravacoes)
+
+    def atualizar_status_gravacao(self):
+        stats = self.fila_gravacao.estatisticas()
+        texto = (f"Fila de gravação: {stats['pendentes']} pendente(s), "
+                 f"{stats['registros'] - stats['erros']} gravado(s), {stats['erros']} com erro")
+        if self.ultima_gravacao:
+            texto += f" — último: {self.ultima_gravacao}"
+        self.gravacao_status_label.config(text=texto)
+
+    @acao_usuario
+    def cadastrar_conflito(self):
+        """Cadastra um novo conflito com todos os seus detalhes em uma única transação."""
+        tipo_conflito = self.conflito_tipo.get()
+        # Seleções feitas em qualquer busca, já com os códigos
+        paises_ids = [cod for cod, _ in self.paises_busca.selecionados()]
+        grupos_ids = [cod for cod, _ in self.grupos_busca.selecionados()]
+
+        # --- VALIDAÇÃO PRINCIPAL ---
+        if not all([self.conflito_nome.get(), tipo_conflito]) or not paises_ids:
+            messagebox.showerror(
+                "Erro de Validação", "Nome, Tipo e pelo menos um País são obrigatórios!")
+            return
+
+        if len(grupos_ids) < 2:
+            messagebox.showerror(
+                "Erro de Validação", "Um conflito deve ter pelo menos dois grupos armados selecionados.")
+            return
+
+        try:
+            num_mortos = self.conflito_mortos.get()
+            num_feridos = self.conflito_feridos.get()
+        except tk.TclError:
+            messagebox.showerror(
+                "Erro de Validação", "Número de mortos e feridos devem ser números inteiros válidos.")
+            return
+
+        if tipo_conflito == 'religioso' and not self.religioes_opcoes.selecionadas():
+            messagebox.showerror(
+                "Erro de Validação", "Para conflitos religiosos, selecione ao menos uma religião.")
+            return
+        if tipo_conflito == 'economico' and not self.materias_primas_opcoes.selecionadas():
+            messagebox.showerror(
+                "Erro de Validação", "Para conflitos econômicos, selecione ao menos uma matéria-prima.")
+            return
+        if tipo_conflito == 'racial' and not self.etnias_opcoes.selecionadas():
+            messagebox.showerror(
+                "Erro de Validação", "Para conflitos raciais, selecione ao menos uma etnia.")
+            return
+
+        nome = self.conflito_nome.get()
+        # Insere detalhes específicos do tipo de conflito
+        detalhes = {
+            'religioso': self.religioes_opcoes,
+            'economico': self.materias_primas_opcoes,
+            'racial': self.etnias_opcoes,
+        }
+        data_hoje = datetime.date.today()
+        # Tabelas escritas (caches de referência e de resultados de relatórios)
+        tabelas_escritas = ['conflito', f'conflito_{tipo_conflito}', 'conflito_afeta_pais',
+                            'grupo_armado_participa_conflito']
+        detalhe = None
+        if tipo_conflito in detalhes:
+            tabela_detalhe, insert_detalhe = cadastros.DETALHES_CONFLITO[tipo_conflito]
+            detalhe = (insert_detalhe, detalhes[tipo_conflito].selecionadas())
+            tabelas_escritas.append(tabela_detalhe)
+
+        def gravar(cursor):
+            # 1. Cria o conflito principal usando a Stored Procedure
+            sp_params = (nome, tipo_conflito, num_mortos, num_feridos)
+            self.cache_instrucoes.executar(cursor, cadastros.CRIAR_CONFLITO, sp_params)
+            novo_cod_conflito = cursor.fetchone()[0]
+
+            # Cada tabela associativa é escrita com um único INSERT ... SELECT unnest(array),
+            # de modo que o conflito inteiro é criado em um número constante de round trips.
+            # 2. Associa os países afetados
+            self.cache_instrucoes.executar(
+                cursor, cadastros.ASSOCIAR_PAISES, (novo_cod_conflito, paises_ids))
+
+            # 3. Associa os grupos armados participantes
+            self.cache_instrucoes.executar(
+                cursor, cadastros.ASSOCIAR_GRUPOS, (novo_cod_conflito, data_hoje, grupos_ids))
+
+            # 4. Detalhes do tipo
+            if detalhe is not None:
+                insert_detalhe, ids = detalhe
+                self.cache_instrucoes.executar(cursor, insert_detalhe, (novo_cod_conflito, ids))
+            return f"conflito '{nome}' (ID: {novo_cod_conflito})"
+
+        if self.enfileirar_cadastro(Escrita(f"Conflito '{nome}'", gravar,
+                                            tabelas=tabelas_escritas, formularios=['grupos'])):
+            self.limpar_form_conflito()
+
+    @acao_usuario
+    def cadastrar_grupo(self):
+        """
+        Cadastra um novo grupo, seu líder, sua primeira divisão e o associa
+        a um ou mais conflitos com suas respectivas datas de incorporação.
+        Tudo é feito em uma única transação.
+        """
+        # --- Validações Iniciais ---
+        if not all([self.grupo_nome.get(), self.grupo_lider.get()]):
+            messagebox.showerror(
+                "Erro de Validação", "Nome do Grupo e Nome do Líder são obrigatórios!")
+            return
+
+        if not self.date_entries:
+            messagebox.showerror(
+                "Erro de Validação", "Selecione pelo menos um conflito para associar o grupo.")
+            return
+
+        # Valida as datas e as armazena em um dicionário
+        participacoes = {}
+        for cod_conflito, entry_widget in self.date_entries.items():
+            data_str = entry_widget.get()
+            if not data_str:
+                messagebox.showerror(
+                    "Erro de Validação", f"A data para o conflito ID {cod_conflito} é obrigatória.")
+                return
+            try:
+                data_incorporacao = datetime.date.fromisoformat(data_str)
+                participacoes[cod_conflito] = data_incorporacao
+            except ValueError:
+                messagebox.showerror(
+                    "Erro de Formato", f"A data '{data_str}' é inválida. Use o formato AAAA-MM-DD.")
+                return
+
+        nome = self.grupo_nome.get()
+        sp_params = (nome, self.grupo_lider.get(),
+                     self.grupo_apoios.get("1.0", tk.END).strip())
+
+        def gravar(cursor):
+            # 1. Cria o grupo, líder e primeira divisão usando a Stored Procedure
+            self.cache_instrucoes.executar(cursor, cadastros.CRIAR_GRUPO, sp_params)
+
+            result_sp = cursor.fetchone()
+            if not result_sp:
+                raise psycopg2.DatabaseError(
+                    "O procedimento armazenado não retornou um ID para o novo grupo.")
+
+            novo_cod_grupo = result_sp[0]
+
+            # 2. Associa o novo grupo aos conflitos selecionados com as datas fornecidas,
+            #    em um único INSERT com os arrays paralelos de conflitos e datas
+            insert_params = (novo_cod_grupo, list(participacoes.keys()),
+                             list(participacoes.values()))
+            self.cache_instrucoes.executar(cursor, cadastros.ASSOCIAR_CONFLITOS, insert_params)
+            return f"grupo '{nome}' (ID: {novo_cod_grupo})"
+
+        if self.enfileirar_cadastro(Escrita(f"Grupo '{nome}'", gravar,
+                                            tabelas=['grupo_armado', 'lider_politico', 'divisao',
+                                                     'grupo_armado_participa_conflito'],
+                                            formularios=self.formularios)):
+            self.limpar_form_grupo()
+
+    @acao_usuario
+    def cadastrar_divisao(self):
+        """Cadastra uma nova divisão e seu primeiro chefe militar em uma única transação."""
+        # --- Validação dos dados de entrada ---
+        if not all([self.divisao_grupo.get(), self.divisao_nome_chefe.get(),
+                    self.divisao_faixa_chefe.get(), self.divisao_lider_combo.get()]):
+            messagebox.showerror(
+                "Erro de Validação", "Todos os campos para a divisão e para o novo chefe são obrigatórios!")
+            return
+
+        cod_grupo = self.divisao_grupo_opcoes.selecionada()
+        id_lider = self.divisao_lider_opcoes.selecionada()
+        if cod_grupo is None or id_lider is None:
+            messagebox.showerror(
+                "Erro de Validação", "Selecione o Grupo e o Líder nas listas. Atualize as listas se necessário.")
+            return
+
+        try:
+            divisao_params = (
+                cod_grupo, self.divisao_barcos.get(), self.divisao_tanques.get(),
+                self.divisao_avioes.get(), self.divisao_homens.get(), self.divisao_baixas.get()
+            )
+        except tk.TclError:
+            messagebox.showerror(
+                "Erro de Validação", "Barcos, tanques, aviões, homens e baixas devem ser números inteiros válidos.")
+            return
+        nome_chefe = self.divisao_nome_chefe.get()
+        faixa_chefe = self.divisao_faixa_chefe.get()
+
+        def gravar(cursor):
+            # 1. INSERE a divisão e retorna o número gerado pelo trigger do banco
+            self.cache_instrucoes.executar(cursor, cadastros.INSERIR_DIVISAO, divisao_params)
+            novo_num_divisao = cursor.fetchone()[0]
+
+            # 2. INSERE o novo chefe, já associando à divisão recém-criada
+            chefe_params = (nome_chefe, faixa_chefe, id_lider, cod_grupo, novo_num_divisao)
+            self.cache_instrucoes.executar(cursor, cadastros.INSERIR_CHEFE, chefe_params)
+            return f"divisão N° {novo_num_divisao} e chefe '{nome_chefe}'"
+
+        if self.enfileirar_cadastro(Escrita(f"Divisão do grupo {cod_grupo} (chefe '{nome_chefe}')", gravar,
+                                            tabelas=['divisao', 'chefe_militar'], formularios=self.formularios)):
+            self.limpar_form_divisao()
+
+    @acao_usuario
+    def cadastrar_lider(self):
+        """Cadastra um novo líder político"""
+        if not self.lider_nome.get() or not self.lider_grupo.get():
+            messagebox.showerror(
+                "Erro de Validação", "Nome do Líder e Grupo Liderado são obrigatórios!")
+            return
+
+        cod_grupo = self.lider_grupo_opcoes.selecionada()
+        if cod_grupo is None:
+            messagebox.showerror(
+                "Erro de Validação", "Selecione um grupo da lista. Atualize a lista de grupos se necessário.")
+            return
+
+        nome = self.lider_nome.get()
+        params = (nome, cod_grupo, self.lider_apoios.get("1.0", tk.END).strip())
+
+        def gravar(cursor):
+            self.cache_instrucoes.executar(cursor, cadastros.INSERIR_LIDER, params)
+            return f"líder político '{nome}'"
+
+        # Atualiza combo de líderes para chefes
+        if self.enfileirar_cadastro(Escrita(f"Líder '{nome}'", gravar,
+                                            tabelas=['lider_politico'], formularios=['chefes'])):
+            self.limpar_form_lider()
+
+    @acao_usuario
+    def cadastrar_chefe(self):
+        """Cadastra um novo chefe militar"""
+        if not self.chefe_nome.get() or not self.chefe_lider.get() or not self.chefe_faixa.get():  # Faixa também é importante
+            messagebox.showerror(
+                "Erro de Validação", "Nome do Chefe, Faixa Hierárquica e Líder Político são obrigatórios!")
+            return
+
+        id_lider = self.chefe_lider_opcoes.selecionada()
+        if id_lider is None:
+            messagebox.showerror(
+                "Erro de Validação", "Selecione um líder da lista. Atualize a lista de líderes se necessário.")
+            return
+
+        # A divisão é opcional; a chave já é o par (cod_grupo, num_divisao)
+        cod_grupo_div, num_div = self.chefe_divisao_opcoes.selecionada() or (None, None)
+
+        nome = self.chefe_nome.get()
+        params = (nome, self.chefe_faixa.get(), id_lider, cod_grupo_div, num_div)
+
+        def gravar(cursor):
+            self.cache_instrucoes.executar(cursor, cadastros.INSERIR_CHEFE, params)
+            return f"chefe militar '{nome}'"
+
+        if self.enfileirar_cadastro(Escrita(f"Chefe '{nome}'", gravar, tabelas=['chefe_militar'])):
+            self.limpar_form_chefe()
+
+    # --- MÉTODOS AUXILIARES PARA LIMPAR FORMULÁRIOS ---
+    def limpar_form_conflito(self):
+        self.conflito_nome.set("")
+        self.conflito_tipo.set("")
+        self.conflito_mortos.set(0)
+        self.conflito_feridos.set(0)
+        if hasattr(self, 'paises_busca'):
+            self.paises_busca.limpar_selecao()
+        if hasattr(self, 'grupos_busca'):
+            self.grupos_busca.limpar_selecao()
+        if hasattr(self, 'religioes_opcoes'):
+            self.religioes_opcoes.limpar_selecao()
+        if hasattr(self, 'materias_primas_opcoes'):
+            self.materias_primas_opcoes.limpar_selecao()
+        if hasattr(self, 'etnias_opcoes'):
+            self.etnias_opcoes.limpar_selecao()
+        self.handle_conflito_tipo_change()
+
+    def limpar_form_grupo(self):
+        self.grupo_nome.set("")
+        self.grupo_lider.set("")
+        self.grupo_apoios.delete("1.0", tk.END)
+        # Limpa a seleção da lista, o que também aciona o evento para limpar os campos de data
+        self.conflitos_busca_grupo.limpar_selecao()
+
+    def limpar_form_divisao(self):
+        self.divisao_grupo.set("")
+        self.divisao_barcos.set(0)
+        self.divisao_tanques.set(0)
+        self.divisao_avioes.set(0)
+        self.divisao_homens.set(0)
+        self.divisao_baixas.set(0)
+        self.divisao_nome_chefe.set("")
+        self.divisao_faixa_chefe.set("")
+        self.divisao_lider_opcoes.preencher([])
+
+    def limpar_form_lider(self):
+        self.lider_nome.set("")
+        self.lider_grupo.set("")  # Limpa a seleção do combobox
+        self.lider_apoios.delete("1.0", tk.END)
+
+    def limpar_form_chefe(self):
+        self.chefe_nome.set("")
+        self.chefe_faixa.set("")
+        self.chefe_lider.set("")  # Limpa a seleção do combobox
+        self.chefe_divisao.set("")  # Limpa a seleção do combobox
+
+    # --- MÉTODOS PARA ATUALIZAR COMBOS ---
+    @acao_usuario
+    def atualizar_todos_os_combos(self):
+        """Chama todas as funções de atualização de combos e listboxes."""
+        if self.pool_ativo():
+            self.atualizar_formularios()
+        else:
+            print("Não é possível atualizar combos: Sem conexão com o banco.")
+
+    def atualizar_grupos_combo_divisao(self):
+        """Atualiza o combo de grupos na aba de divisões"""
+        grupos = [(cod, f"{cod} - {nome}") for cod, nome in self.dados_referencia('grupo_armado')]
+        # Seleciona o primeiro por padrão
+        self.divisao_grupo_opcoes.preencher(grupos, selecionar_primeiro=True)
+
+    @acao_usuario
+    def atualizar_grupos_combo_lider(self):
+        """Atualiza o combo de grupos na aba de líderes"""
+        grupos = [(cod, f"{cod} - {nome}") for cod, nome in self.dados_referencia('grupo_armado')]
+        self.lider_grupo_opcoes.preencher(grupos, selecionar_primeiro=True)
+
+    @acao_usuario
+    def atualizar_conflitos_listbox_grupo(self):
+        """Atualiza a lista de conflitos (busca pelo termo atual) na aba de cadastro de grupos."""
+        self.conflitos_busca_grupo.recarregar()
+
+    def atualizar_entradas_data_conflito(self, event=None):
+        """Cria campos de entrada de data dinamicamente com base nos conflitos selecionados."""
+        # Guarda as datas já digitadas (a seleção pode mudar em outra busca) e limpa o frame
+        datas_digitadas = {cod: entry.get() for cod, entry in self.date_entries.items()}
+        for widget in self.datas_frame.winfo_children():
+            widget.destroy()
+        self.date_entries.clear()
+
+        itens_selecionados = self.conflitos_busca_grupo.selecionados()
+
+        if not itens_selecionados:
+            ttk.Label(self.datas_frame, text="Selecione um ou mais conflitos na lista.").pack(
+                padx=10, pady=10)
+            return
+
+        # Para cada conflito selecionado, cria um label e uma entrada de data
+        for cod_conflito, nome_conflito in itens_selecionados:
+            # Cria um frame para cada linha (label + entry)
+            row_frame = ttk.Frame(self.datas_frame)
+            row_frame.pack(fill=tk.X, padx=5, pady=2)
+
+            label = ttk.Label(
+                row_frame, text=f"{nome_conflito}:", width=30, anchor="w")
+            label.pack(side=tk.LEFT)
+
+            entry = ttk.Entry(row_frame, width=20)
+            entry.insert(0, datas_digitadas.get(cod_conflito, ""))
+            entry.pack(side=tk.LEFT)
+
+            # Armazena o widget de entrada no dicionário usando o código do conflito como chave
+            self.date_entries[cod_conflito] = entry
+
+    @acao_usuario
+    def atualizar_combos_chefes(self):
+        """Atualiza os combos na aba de chefes militares (Líderes e Divisões)"""
+        # Os nomes dos grupos vêm do cache; o "join" com líderes e divisões é feito aqui
+        nomes_grupos = dict(self.dados_referencia('grupo_armado'))
+
+        # Atualizar Líderes
+        lideres = [(id_lider, f"{id_lider} - {nome} ({nomes_grupos[cod_grupo]})")
+                   for id_lider, nome, cod_grupo in self.dados_referencia('lider_politico')
+                   if cod_grupo in nomes_grupos]
+        self.chefe_lider_opcoes.preencher(lideres, selecionar_primeiro=True)
+
+        # Atualizar Divisões (ordenadas pelo nome do grupo e número da divisão)
+        divisoes = sorted(((nomes_grupos[cod_grupo], num, cod_grupo)
+                           for cod_grupo, num in self.dados_referencia('divisao')
+                           if cod_grupo in nomes_grupos))
+        divisoes = [((cod_grupo, num), f"{cod_grupo} - Divisão {num} ({nome_grupo})")
+                    for nome_grupo, num, cod_grupo in divisoes]
+        self.chefe_divisao_opcoes.preencher(divisoes, selecionar_primeiro=True)
+
+    def agendar_lideres_para_divisao(self, event=None):
+        """Adia o filtro de líderes até a seleção de grupo parar de mudar por ATRASO_FILTRO_LIDERES ms."""
+        if self.filtro_lideres_agendado is not None:
+            self.root.after_cancel(self.filtro_lideres_agendado)
+        self.filtro_lideres_agendado = self.root.after(ATRASO_FILTRO_LIDERES,
+                                                       self.atualizar_lideres_para_divisao)
+
+    @acao_usuario
+    def atualizar_lideres_para_divisao(self, event=None):
+        """Filtra e atualiza o combo de líderes na aba de divisões com base no grupo selecionado."""
+        if self.filtro_lideres_agendado is not None:
+            self.root.after_cancel(self.filtro_lideres_agendado)
+            self.filtro_lideres_agendado = None
+
+        cod_grupo = self.divisao_grupo_opcoes.selecionada()
+        if cod_grupo is None:
+            self.divisao_lider_opcoes.preencher([])
+            return
+
+        # Índice líderes por grupo (coluna 2, cod_grupo_liderado_fk), montado uma vez por carga da
+        # tabela e descartado quando Lider_Politico muda (cadastro de líder ou de grupo, ou NOTIFY)
+        lideres = [(id_lider, f"{id_lider} - {nome}")
+                   for id_lider, nome, _ in self.indice_referencia('lider_politico', 2).get(cod_grupo, [])]
+        self.divisao_lider_opcoes.preencher(lideres, selecionar_primeiro=True)
+
+    @acao_usuario
+    def handle_atualizar_divisao_listas(self):
+        """
+        Função intermediária para o botão 'Atualizar Listas' da aba Divisões.
+        Atualiza a lista de grupos e, em seguida, a lista de líderes baseada no grupo selecionado.
+        """
+        # 1. Atualiza a lista de grupos. Isso vai selecionar o primeiro item por padrão.
+        self.atualizar_grupos_combo_divisao()
+
+        # 2. Em seguida, atualiza a lista de líderes, que depende do grupo agora selecionado.
+        self.atualizar_lideres_para_divisao()
+
+    def atualizar_grupos_listbox(self):
+        """Atualiza a lista de grupos armados (busca pelo termo atual) na aba de conflitos."""
+        self.grupos_busca.recarregar()
+
+    def atualizar_paises_listbox(self):
+        """Atualiza a lista de países (busca pelo termo atual) na aba de conflitos."""
+        self.paises_busca.recarregar()
+
+    def atualizar_regioes_listbox(self):
+        """Atualiza o Listbox de regiões."""
+        self.regioes_opcoes.preencher([(cod, f"{cod} - {nome}") for cod, nome in self.dados_referencia('regiao')])
+
+    def atualizar_religioes_listbox(self):
+        """Atualiza o Listbox de religiões."""
+        self.religioes_opcoes.preencher([(cod, f"{cod} - {nome}") for cod, nome in self.dados_referencia('religiao_entidade')])
+
+    def atualizar_materias_primas_listbox(self):
+        """Atualiza o Listbox de matérias-primas."""
+        self.materias_primas_opcoes.preencher([(cod, f"{cod} - {nome}") for cod, nome in self.dados_referencia('materia_prima')])
+
+    def atualizar_etnias_listbox(self):
+        """Atualiza o Listbox de etnias."""
+        self.etnias_opcoes.preencher([(cod, f"{cod} - {nome}") for cod, nome in self.dados_referencia('etnia')])
+
+    def handle_conflito_tipo_change(self, event=None):
+        """Mostra ou esconde os frames de detalhes com base no tipo de conflito selecionado."""
+        selected_type = self.conflito_tipo.get()
+
+        # Primeiro, esconde todos os frames de detalhes
+        self.frame_conflito_territorial.grid_remove()
+        self.frame_conflito_religioso.grid_remove()
+        self.frame_conflito_economico.grid_remove()
+        self.frame_conflito_racial.grid_remove()
+
+        # Depois, mostra o frame correto
+        if selected_type == 'territorial':
+            self.frame_conflito_territorial.grid()
+        elif selected_type == 'religioso':
+            self.frame_conflito_religioso.grid()
+        elif selected_type == 'economico':
+            self.frame_conflito_economico.grid()
+        elif selected_type == 'racial':
+            self.frame_conflito_racial.grid()
+
+    # --- MÉTODOS DE RELATÓRIOS ---
+
+    def executar_relatorio(self, titulo, ao_concluir, relatorio, valores, apos=None, tamanho=None, timeout=None):
+        """
+        Executa o relatório em segundo plano e chama ao_concluir(dados, colunas) na thread
+        do Tk quando o resultado chegar. Um novo relatório cancela o anterior. O estado dos
+        resumos (que decide entre a consulta sobre os resumos e a sobre as tabelas base) é
+        lido pelo próprio job. Se o mesmo relatório (consulta e parâmetros) já estiver no
+        cache de resultados, e nenhuma tabela lida por ele tiver mudado, é exibido direto
+        da memória.
+        """
+        if not self.pool_ativo():
+            if not self.connect_db():
+                return
+
+        self.cancelar_relatorio()
+        # Busca no cache pela variante do último estado conhecido dos resumos: um resultado sobre
+        # os resumos só continua em cache enquanto Resumo_Controle não muda, então não fica obsoleto
+        query, params = compilar(relatorio, valores, self.estado_resumos_atual, apos, tamanho)
+        em_cache = self.cache_resultados.obter(query, params)
+        if em_cache is not None:
+            self.relatorio_status_label.config(text=f"“{titulo}” exibido do cache (sem alterações nas tabelas).")
+            ao_concluir(*em_cache)
+            return
+        # Versões das tabelas antes da consulta: uma escrita durante a execução impede de guardar o resultado
+        versoes = self.cache_resultados.versoes(query)
+
+        def guardar_e_exibir(dados, colunas):
+            if relatorio.query_resumo:
+                self.exibir_estado_resumos(job.estado_resumos)
+            # Se o job compilou outra variante (o estado mudou), as versões capturadas não valem para ela
+            if (job.query, job.params) == (query, params):
+                self.cache_resultados.guardar(query, params, dados, colunas, versoes)
+            ao_concluir(dados, colunas)
+
+        if timeout is None:
+            try:
+                timeout = self.timeout_relatorio_var.get()
+            except tk.TclError:
+                timeout = 60
+        timeout = timeout if timeout and timeout > 0 else None
+
+        job = self.report_executor.submit_relatorio(titulo, relatorio, valores, timeout, apos, tamanho)
+        self.relatorio_em_andamento = job
+
+        self.relatorio_status_label.config(text=f"Executando “{titulo}”…")
+        self.relatorio_progresso.start(10)
+        self.relatorio_cancelar_btn.config(state=tk.NORMAL)
+        self.root.after(INTERVALO_POLLING_RELATORIO,
+                        self._acompanhar_relatorio, job, guardar_e_exibir)
+
+    def _acompanhar_relatorio(self, job, ao_concluir):
+        """Verifica periodicamente (via root.after) se o job terminou e entrega o resultado à interface."""
+        if not job.concluido():
+            if job.expirou():
+                # Salvaguarda do lado do cliente caso o statement_timeout do servidor não dispare
+                job.cancelar(EXPIRADO)
+            else:
+                self.relatorio_status_label.config(
+                    text=f"Executando “{job.nome}”… {job.tempo_decorrido():.1f}s")
+            self.root.after(INTERVALO_POLLING_RELATORIO,
+                            self._acompanhar_relatorio, job, ao_concluir)
+            return
+
+        if job is not self.relatorio_em_andamento:
+            job.descartar()
+            return  # Resultado de um relatório já substituído por outro
+
+        self.relatorio_em_andamento = None
+        self.relatorio_progresso.stop()
+        self.relatorio_cancelar_btn.config(state=tk.DISABLED)
+
+        if job.estado == CONCLUIDO:
+            self.relatorio_status_label.config(
+                text=f"“{job.nome}” concluído em {job.tempo_decorrido():.2f}s")
+            ao_concluir(*job.resultado)
+        elif job.estado == CANCELADO:
+            self.relatorio_status_label.config(text=f"“{job.nome}” cancelado.")
+        elif job.estado == EXPIRADO:
+            self.relatorio_status_label.config(text=f"“{job.nome}” excedeu o tempo limite.")
+            messagebox.showwarning(
+                "Tempo Esgotado", f"O relatório '{job.nome}' excedeu o limite de {job.timeout}s e foi cancelado.")
+        else:
+            self.relatorio_status_label.config(text=f"“{job.nome}” falhou.")
+            messagebox.showerror(
+                "Erro na Query", f"Erro ao executar query: {str(job.erro)}\nQuery: {job.query}")
+
+    def executar_analise(self, titulo, ao_concluir, funcao, *args):
+        """
+        Como executar_relatorio(), mas calcula o resultado na análise em memória: funcao(*args)
+        retorna (dados, colunas). A primeira análise (e a primeira depois de uma alteração
+        nas tabelas usadas) inclui a carga dessas tabelas.
+        """
+        if not self.pool_ativo():
+            if not self.connect_db():
+                return
+
+        self.cancelar_relatorio()
+        job = self.report_executor.submit_funcao(f"{titulo} (em memória)", f"análise em memória: {titulo}",
+                                                 funcao, *args)
+        self.relatorio_em_andamento = job
+        self.relatorio_status_label.config(text=f"Executando “{job.nome}”…")
+        self.relatorio_progresso.start(10)
+        self.relatorio_cancelar_btn.config(state=tk.NORMAL)
+        self.root.after(INTERVALO_POLLING_RELATORIO, self._acompanhar_relatorio, job, ao_concluir)
+
+    def selecionar_medida_analise(self, event=None):
+        """Oferece as dimensões do fato da medida escolhida (conflitos ou fornecimentos)."""
+        dimensoes = DIMENSOES[MEDIDAS[self.analise_medida_var.get()][0]]
+        self.analise_por_combo['values'] = dimensoes
+        if self.analise_por_var.get() not in dimensoes:
+            self.analise_por_var.set(dimensoes[0])
+
+    def analisar_recorte(self):
+        """Agrupa a medida escolhida pela dimensão, com os filtros, na análise em memória."""
+        medida, por = self.analise_medida_var.get(), self.analise_por_var.get()
+        try:
+            filtros = ler_filtros(self.analise_filtros_var.get())
+            limite = int(self.analise_limite_var.get()) if self.analise_limite_var.get().strip() else None
+            if limite is not None and limite < 1:
+                raise ValueError("Quantidade: o valor mínimo é 1.")
+        except ValueError as e:
+            messagebox.showwarning("Filtro Inválido", str(e))
+            return
+        colunas = [ROTULOS_ANALISE[por], ROTULOS_ANALISE[medida]]
+
+        def recortar():
+            return self.analise.resumir(medida, por, filtros, limite), colunas
+
+        def ao_concluir(data, columns):
+            self.paginacao = None
+            self.atualizar_navegacao_paginas()
+            self.exibir_resultados_tabela(data, columns)
+        self.executar_analise(f"{ROTULOS_ANALISE[medida]} por {ROTULOS_ANALISE[por]}", ao_concluir, recortar)
+
+    def selecionar_consulta_grafo(self, event=None):
+        """Habilita só os campos usados pela consulta escolhida (nomes ou tipo e medida do ranking)."""
+        consulta = self.grafo_consulta_var.get()
+        self.grafo_nomes_entry.config(
+            state=tk.NORMAL if consulta in ('conflitos-abastecidos', 'fornecedores-comuns') else tk.DISABLED)
+        estado_ranking = "readonly" if consulta == 'ranking' else tk.DISABLED
+        self.grafo_tipo_combo.config(state=estado_ranking)
+        self.grafo_medida_combo.config(state=estado_ranking)
+
+    def consultar_grafo(self):
+        """Executa a consulta escolhida na rede de fornecimento, em segundo plano como a análise em memória."""
+        consulta = self.grafo_consulta_var.get()
+        nomes = [nome.strip() for nome in self.grafo_nomes_var.get().split(',') if nome.strip()]
+        try:
+            limite = int(self.grafo_limite_var.get()) if self.grafo_limite_var.get().strip() else None
+            if limite is not None and limite < 1:
+                raise ValueError("Quantidade: o valor mínimo é 1.")
+        except ValueError as e:
+            messagebox.showwarning("Parâmetro Inválido", str(e))
+            return
+
+        def ao_concluir(data, columns):
+            self.paginacao = None
+            self.atualizar_navegacao_paginas()
+            self.exibir_resultados_tabela(data, columns)
+        self.executar_analise(f"Rede de fornecimento: {consulta}", ao_concluir, self.grafo.consultar, consulta,
+                              nomes, self.grafo_tipo_var.get(), self.grafo_medida_var.get(), limite)
+
+    def cancelar_relatorio(self):
+        """Cancela o relatório em execução, se houver."""
+        job = self.relatorio_em_andamento
+        if job is not None and not job.concluido():
+            job.cancelar()
+            self.relatorio_em_andamento = None
+            self.relatorio_progresso.stop()
+            self.relatorio_cancelar_btn.config(state=tk.DISABLED)
+            self.relatorio_status_label.config(text=f"“{job.nome}” cancelado.")
+
+    # --- EXPORTAÇÃO ---
+    @acao_usuario
+    def exportar_relatorio(self):
+        """
+        Exporta o resultado completo do relatório escolhido (todas as páginas, no caso das
+        listagens) para um arquivo CSV, TSV, JSON, Parquet ou XLSX, em segundo plano.
+        """
+        relatorio = self.relatorio_selecionado()
+        try:
+            valores = relatorio.valores({nome: var.get() for nome, var in self.parametros_vars.items()})
+        except ValueError as e:
+            messagebox.showwarning("Parâmetro Inválido", str(e))
+            return
+        if self.exportacao_em_andamento is not None:
+            messagebox.showinfo("Exportação em Andamento",
+                                f"Aguarde o fim da exportação de “{self.exportacao_em_andamento.nome}” ou cancele-a.")
+            return
+
+        destino = filedialog.asksaveasfilename(
+            parent=self.root, title="Exportar Relatório", initialfile=f"{relatorio.nome}.csv",
+            defaultextension=".csv", filetypes=TIPOS_ARQUIVO_EXPORTACAO)
+        if not destino:
+            return
+        formato = formato_do_arquivo(destino)
+        if formato is None:
+            messagebox.showwarning("Formato Desconhecido",
+                                   "Use uma das extensões .csv, .tsv, .json, .parquet ou .xlsx.")
+            return
+
+        if not self.pool_ativo():
+            if not self.connect_db():
+                return
+        # O estado dos resumos é lido pela própria exportação, na conexão dela
+        job = self.report_executor.submit_exportacao(relatorio.titulo, relatorio, destino, formato, valores)
+        self.exportacao_em_andamento = job
+        self.exportacao_status_label.config(text=f"Exportando “{relatorio.titulo}”…")
+        self.exportacao_cancelar_btn.config(state=tk.NORMAL)
+        self.root.after(INTERVALO_POLLING_RELATORIO, self._acompanhar_exportacao, job)
+
+    def _acompanhar_exportacao(self, job):
+        """Mostra as linhas já exportadas e, ao final, o resultado da exportação."""
+        if not job.concluido():
+            self.exportacao_status_label.config(
+                text=f"Exportando “{job.nome}”… {job.progresso} linhas, {job.tempo_decorrido():.0f}s")
+            self.root.after(INTERVALO_POLLING_RELATORIO, self._acompanhar_exportacao, job)
+            return
+
+        if job is not self.exportacao_em_andamento and self.exportacao_em_andamento is not None:
+            return  # Exportação cancelada e já substituída por outra
+        self.exportacao_em_andamento = None
+        self.exportacao_cancelar_btn.config(state=tk.DISABLED)
+        if job.estado == CONCLUIDO:
+            total, destino = job.resultado
+            self.exportacao_status_label.config(
+                text=f"“{job.nome}” exportado: {total} linhas em {job.tempo_decorrido():.1f}s ({destino})")
+        elif job.estado == CANCELADO:
+            self.exportacao_status_label.config(text=f"Exportação de “{job.nome}” cancelada.")
+        else:
+            self.exportacao_status_label.config(text=f"Exportação de “{job.nome}” falhou.")
+            messagebox.showerror("Erro na Exportação", f"Erro ao exportar '{job.nome}': {str(job.erro)}")
+
+    def cancelar_exportacao(self):
+        """Cancela a exportação em andamento, se houver (o arquivo incompleto é removido)."""
+        job = self.exportacao_em_andamento
+        if job is not None and not job.concluido():
+            job.cancelar()
+            self.exportacao_em_andamento = None
+            self.exportacao_cancelar_btn.config(state=tk.DISABLED)
+            self.exportacao_status_label.config(text=f"Cancelando a exportação de “{job.nome}”…")
+
+    # --- TABELAS DE RESUMO ---
+    def atualizar_estado_resumos(self):
+        """Lê o estado de Resumo_Controle em segundo plano e, quando chegar, atualiza os controles da aba."""
+        job = self.report_executor.submit_funcao("Estado dos resumos", "SELECT ... FROM Resumo_Controle",
+                                                 self._ler_estado_resumos)
+        self.root.after(INTERVALO_POLLING_RELATORIO, self._acompanhar_estado_resumos, job)
+
+    def _ler_estado_resumos(self):
+        pool = self.pool
+        if pool is None:
+            return None
+        with pool.conexao() as conn:
+            return ler_estado_resumos(conn)
+
+    def _acompanhar_estado_resumos(self, job):
+        if not job.concluido():
+            self.root.after(INTERVALO_POLLING_RELATORIO, self._acompanhar_estado_resumos, job)
+            return
+        self.exibir_estado_resumos(job.resultado if job.estado == CONCLUIDO else None)
+
+    def exibir_estado_resumos(self, estado):
+        """
+        Guarda o estado (modo, desatualizado, recalculado_em) lido de Resumo_Controle e atualiza os
+        controles da aba. None: resumos indisponíveis (migração 002 não aplicada).
+        """
+        self.estado_resumos_atual = estado
+        if estado is None:
+            self.resumos_status_label.config(text="indisponíveis (execute migrations.py)")
+            return None
+
+        modo, desatualizado, recalculado_em, _ = estado
+        self.modo_resumos_var.set(modo)
+        if desatualizado:
+            texto = "desatualizados: relatórios calculados sobre as tabelas base"
+        elif recalculado_em:
+            texto = f"em dia (último recálculo completo: {recalculado_em:%d/%m/%Y %H:%M})"
+        else:
+            texto = "em dia"
+        self.resumos_status_label.config(text=texto)
+
+    @acao_usuario
+    def definir_modo_resumos(self, event=None):
+        """Troca o modo de atualização dos resumos (voltar para incremental recalcula se preciso)."""
+        if self.execute_query("SELECT sp_definir_modo_resumos(%s)",
+                              (self.modo_resumos_var.get(),), fetch=False):
+            self.cache_resultados.invalidar('resumo_controle')
+            self.atualizar_estado_resumos()
+
+    @acao_usuario
+    def recalcular_resumos(self):
+        """Reconstrói as tabelas de resumo a partir das tabelas base."""
+        if self.execute_query("SELECT sp_recalcular_resumos()", fetch=False):
+            self.cache_resultados.invalidar('resumo_controle')
+            self.atualizar_estado_resumos()
+
+    def relatorio_selecionado(self):
+        return self.relatorios_por_titulo[self.relatorio_var.get()]
+
+    def selecionar_relatorio(self, event=None):
+        """Monta os campos dos parâmetros do relatório escolhido, com os valores padrão."""
+        relatorio = self.relatorio_selecionado()
+        self.relatorio_descricao_label.config(text=relatorio.descricao)
+        for widget in self.parametros_frame.winfo_children():
+            widget.destroy()
+        self.parametros_vars = {}
+        for coluna, parametro in enumerate(relatorio.parametros):
+            dica = DICAS_PARAMETRO.get(parametro.tipo, "")
+            ttk.Label(self.parametros_frame, text=f"{parametro.rotulo}{dica}:").grid(
+                row=0, column=2 * coluna, padx=5, sticky=tk.W)
+            var = tk.StringVar(value=parametro.formatar(parametro.padrao))
+            ttk.Entry(self.parametros_frame, textvariable=var,
+                      width=35 if parametro.tipo == 'lista' else 12).grid(row=0, column=2 * coluna + 1, padx=5)
+            self.parametros_vars[parametro.nome] = var
+
+    @acao_usuario
+    def exibir_relatorio(self):
+        """
+        Executa o relatório escolhido com os parâmetros informados. Relatórios com versão sobre
+        as tabelas de resumo usam-na quando os resumos estão em dia; se estiverem desatualizados
+        (modo adiado) ou não existirem, usam a consulta sobre as tabelas base. Listagens são
+        exibidas em páginas.
+        """
+        relatorio = self.relatorio_selecionado()
+        try:
+            valores = relatorio.valores({nome: var.get() for nome, var in self.parametros_vars.items()})
+        except ValueError as e:
+            messagebox.showwarning("Parâmetro Inválido", str(e))
+            return
+
+        if not self.pool_ativo():
+            if not self.connect_db():
+                return
+        if relatorio.chave:
+            # inicios[i]: chave da última linha antes da página i (None na primeira)
+            self.paginacao = {'relatorio': relatorio, 'valores': valores, 'inicios': [None], 'indice': 0}
+            self.exibir_pagina(0)
+            return
+
+        self.paginacao = None
+        self.atualizar_navegacao_paginas()
+        if relatorio.grafico:
+            ao_concluir = self.exibir_grafico_tipos_conflito
+        elif relatorio.serie:
+            ao_concluir = functools.partial(self.exibir_serie, relatorio)
+        else:
+            def ao_concluir(data, columns):
+                self.exibir_resultados_tabela(data, columns if columns else relatorio.colunas)
+        if self.analise_var.get() and relatorio.nome in RESPOSTAS:
+            self.executar_analise(relatorio.titulo, ao_concluir, self.analise.responder, relatorio, valores)
+            return
+        self.executar_relatorio(relatorio.titulo, ao_concluir, relatorio, valores)
+
+    def exibir_pagina(self, indice):
+        """Busca a página 'indice' da listagem atual, continuando da chave em que a anterior terminou."""
+        paginacao = self.paginacao
+        relatorio = paginacao['relatorio']
+        self.executar_relatorio(f"{relatorio.titulo} (página {indice + 1})",
+                                functools.partial(self._receber_pagina, paginacao, indice), relatorio,
+                                paginacao['valores'], apos=paginacao['inicios'][indice], tamanho=TAMANHO_PAGINA)
+
+    def _receber_pagina(self, paginacao, indice, data, columns):
+        if paginacao is not self.paginacao:
+            return  # Outra consulta foi pedida enquanto esta página era buscada
+        relatorio = paginacao['relatorio']
+        tem_proxima = len(data) > TAMANHO_PAGINA
+        data = data[:TAMANHO_PAGINA]
+        del paginacao['inicios'][indice + 1:]
+        if tem_proxima:
+            paginacao['inicios'].append(relatorio.chave_da_linha(data[-1], list(columns)))
+        paginacao['indice'] = indice
+
+        visiveis = len(relatorio.colunas)
+        self.exibir_resultados_tabela([linha[:visiveis] for linha in data], relatorio.colunas)
+        self.atualizar_navegacao_paginas(len(data))
+
+    def atualizar_navegacao_paginas(self, linhas=0):
+        paginacao = self.paginacao
+        if paginacao is None:
+            self.pagina_label.config(text="")
+            self.pagina_anterior_btn.config(state=tk.DISABLED)
+            self.proxima_pagina_btn.config(state=tk.DISABLED)
+            return
+        indice = paginacao['indice']
+        primeira = indice * TAMANHO_PAGINA + 1
+        self.pagina_label.config(
+            text=f"Página {indice + 1} (linhas {primeira}–{primeira + linhas - 1})" if linhas else "")
+        self.pagina_anterior_btn.config(state=tk.NORMAL if indice > 0 else tk.DISABLED)
+        self.proxima_pagina_btn.config(
+            state=tk.NORMAL if len(paginacao['inicios']) > indice + 1 else tk.DISABLED)
+
+    def limpar_result_frame(self):
+        """Limpa o frame de resultados (os gráficos só são escondidos, para serem reaproveitados)"""
+        for widget in self.result_frame.winfo_children():
+            if widget is self.grafico or widget is self.grafico_serie:
+                widget.pack_forget()
+            else:
+                widget.destroy()
+
+    def exibir_resultados_tabela(self, data, columns):
+        """Exibe os resultados em uma Treeview."""
+        self.limpar_result_frame()
+        if not data:
+            ttk.Label(self.result_frame, text="Nenhum resultado encontrado.").pack(
+                padx=10, pady=10)
+            return
+
+        tree_frame = ttk.Frame(self.result_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        tree_scroll_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
+        tree_scroll_x = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL)
+
+        # Estilo para o Treeview
+        style = ttk.Style()
+        style.configure("Treeview",
+                        background="#3C3C3C",  # Fundo da área de dados
+                        foreground="#FFFFFF",  # Cor do texto dos dados
+                        # Fundo da área de dados (geralmente o mesmo do background)
+                        fieldbackground="#3C3C3C",
+                        bordercolor="#4A4A4A")  # Cor da borda
+        style.map("Treeview", background=[
+                  ('selected', '#5C5C5C')])  # Cor de seleção
+
+        style.configure("Treeview.Heading",
+                        background="#4A4A4A",  # Fundo do cabeçalho
+                        foreground="#FFFFFF",  # Cor do texto do cabeçalho
+                        font=('Arial', 10, 'bold'))
+        style.map("Treeview.Heading", background=[('active', '#5A5A5A')])
+
+        tree = ttk.Treeview(tree_frame, columns=columns, show='headings',
+                            yscrollcommand=tree_scroll_y.set, xscrollcommand=tree_scroll_x.set)
+
+        tree_scroll_y.config(command=tree.yview)
+        tree_scroll_x.config(command=tree.xview)
+
+        tree_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        tree_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        tree.pack(fill=tk.BOTH, expand=True)
+
+        # Usar enumerate para ter índice e nome
+        for col_idx, col_name in enumerate(columns):
+            tree.heading(col_name, text=col_name)
+            tree.column(col_name, anchor=tk.W, width=150)
+
+        for row in data:
+            tree.insert("", tk.END, values=row)
+
+    def exibir_grafico_tipos_conflito(self, data, columns):
+        """Desenha o gráfico de barras com a contagem de conflitos por tipo."""
+        self.limpar_result_frame()
+        # A consulta terminou, mas nenhum tipo de conflito existe
+        if not data:
+            ttk.Label(self.result_frame, text="Nenhum conflito cadastrado para gerar o gráfico.").pack(
+                padx=10, pady=10)
+            return
+        if sum(numero for _, numero in data) == 0:
+            ttk.Label(self.result_frame, text="Não há dados suficientes para gerar o gráfico.").pack(
+                padx=10, pady=10)
+            return
+
+        if self.grafico is None or not self.grafico.winfo_exists():
+            # matplotlib só é carregado no primeiro gráfico (custa centenas de ms na inicialização)
+            from chart_panel import BarChart
+            self.grafico = BarChart(self.result_frame, 'Número de Conflitos por Tipo', 'Tipo de Conflito',
+                                    'Número de Conflitos', cores=['skyblue', 'lightcoral', 'lightgreen', 'gold'])
+        self.grafico.pack(fill=tk.BOTH, expand=True)
+        self.grafico.atualizar([tipo for tipo, _ in data], [numero for _, numero in data])
+
+    def exibir_serie(self, relatorio, data, columns):
+        """Desenha a série temporal do relatório: uma linha por medida e por valor da coluna de agrupamento."""
+        self.limpar_result_frame()
+        if not data:
+            ttk.Label(self.result_frame, text="Nenhuma participação no período.").pack(padx=10, pady=10)
+            return
+
+        coluna_x, colunas_y, _, _ = relatorio.serie
+
+        if self.grafico_serie is None or not self.grafico_serie.winfo_exists():
+            from chart_panel import LineChart
+            self.grafico_serie = LineChart(self.result_frame)
+        self.grafico_serie.pack(fill=tk.BOTH, expand=True)
+        self.grafico_serie.atualizar(relatorio.titulo, coluna_x, " / ".join(colunas_y),
+                                     relatorio.series(data, columns))
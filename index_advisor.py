@@ -0,0 +1,279 @@
+"""
+Consultor de índices: coleta todas as instruções SQL da aplicação, executa
+EXPLAIN (ANALYZE, BUFFERS) de cada uma em um banco populado e sugere índices.
+
+As instruções são extraídas do código-fonte (literais SQL de gui.py, cadastros.py e
+reference_cache.py), então novas consultas entram na análise automaticamente. Os
+relatórios de reports.py são compilados com compilar(), como a aplicação os executa:
+as consultas sobre as tabelas base e sobre os resumos e, nas listagens, a primeira
+página e a seguinte (com a condição da chave). As buscas incrementais de
+reference_search.py, montadas por tabela, entram a partir de TABELAS_BUSCA.
+Instruções com parâmetros (%s ou %(nome)s) são analisadas com EXPLAIN (GENERIC_PLAN),
+que mostra o plano e o custo sem executá-las (PostgreSQL 16 ou superior).
+Tudo roda dentro de uma transação desfeita ao final: INSERTs não gravam nada.
+
+Uso:
+    python index_advisor.py                    # analisa as consultas e lista FKs sem índice
+    python index_advisor.py --comparar         # custo antes/depois das migrações pendentes (sem aplicá-las)
+    python index_advisor.py --comparar --aplicar --json relatorio.json
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import sys
+
+import psycopg2
+
+from db_pool import adicionar_argumentos_conexao, config_dos_argumentos
+from migrations import aplicar_migracoes
+from reference_search import TABELAS_BUSCA, _consultas
+from reports import RELATORIOS, TAMANHO_PAGINA, EstadoResumos, compilar
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+MODULOS_APP = ['gui.py', 'cadastros.py', 'reference_cache.py']
+
+PADRAO_SQL = re.compile(r'^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b', re.IGNORECASE)
+# Parâmetros posicionais (%s) e nomeados (%(nome)s) do psycopg2
+PADRAO_PARAMETRO = re.compile(r'%s|%\((\w+)\)s')
+
+# Chaves estrangeiras cujas colunas não são prefixo de nenhum índice da tabela
+QUERY_FKS_SEM_INDICE = """
+    SELECT c.conrelid::regclass::text AS tabela,
+           array_agg(a.attname::text ORDER BY k.ordem) AS colunas,
+           c.confrelid::regclass::text AS referencia
+    FROM pg_constraint c
+    CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(num, ordem)
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.num
+    WHERE c.contype = 'f'
+      AND c.connamespace = 'public'::regnamespace
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_index i
+          WHERE i.indrelid = c.conrelid
+            AND (i.indkey::int2[])[0:cardinality(c.conkey) - 1] = c.conkey)
+    GROUP BY c.oid, c.conrelid, c.confrelid
+    ORDER BY 1, 2
+"""
+
+
+class Consulta:
+    """Uma instrução SQL encontrada no código, com a função de origem."""
+
+    def __init__(self, origem, sql):
+        self.origem = origem
+        self.sql = sql.strip().rstrip(';')
+
+    @property
+    def parametrizada(self):
+        return PADRAO_PARAMETRO.search(self.sql) is not None
+
+    def numerada(self):
+        """A instrução com $1, $2... no lugar dos parâmetros (um mesmo nome usa sempre o mesmo número)."""
+        numeros = {}
+
+        def numerar(encontrado):
+            nome = encontrado.group(1)
+            if nome is None:
+                nome = object()  # Cada %s é um parâmetro distinto
+            return f"${numeros.setdefault(nome, len(numeros) + 1)}"
+        return PADRAO_PARAMETRO.sub(numerar, self.sql)
+
+
+def coletar_consultas(modulos=MODULOS_APP, diretorio=DIRETORIO):
+    """Extrai, via AST, os literais de texto que são instruções SQL completas."""
+    consultas = []
+    vistas = set()
+    for modulo in modulos:
+        with open(os.path.join(diretorio, modulo), encoding='utf-8-sig') as arquivo:
+            arvore = ast.parse(arquivo.read(), modulo)
+        # Atribui cada literal à função mais interna que o contém (ast.walk visita
+        # as funções externas antes das aninhadas, que sobrescrevem a origem)
+        origem_por_no = {}
+        # Os pedaços de texto de uma f-string não são instruções completas
+        fragmentos = set()
+        for no in ast.walk(arvore):
+            if isinstance(no, ast.FunctionDef):
+                for filho in ast.walk(no):
+                    origem_por_no[id(filho)] = f"{modulo}:{no.name}"
+            elif isinstance(no, ast.JoinedStr):
+                fragmentos.update(id(filho) for filho in ast.walk(no))
+        for no in ast.walk(arvore):
+            if (isinstance(no, ast.Constant) and isinstance(no.value, str) and id(no) not in fragmentos
+                    and PADRAO_SQL.match(no.value) and ' ' in no.value.strip()):
+                texto = ' '.join(no.value.split())
+                if texto in vistas:
+                    continue
+                vistas.add(texto)
+                origem = origem_por_no.get(id(no), modulo)
+                consultas.append((modulo, no.lineno, Consulta(f"{origem} (linha {no.lineno})", no.value)))
+    return [consulta for _, _, consulta in sorted(consultas, key=lambda item: item[:2])]
+
+
+def consultas_dos_relatorios(relatorios=RELATORIOS):
+    """
+    As consultas dos relatórios compiladas com compilar(), em cada variante executada
+    pela aplicação (tabelas base ou resumos; primeira página ou seguinte).
+    """
+    estados = [('base', None), ('resumos', EstadoResumos('incremental', False, None, True))]
+    consultas = []
+    vistas = set()
+    for relatorio in relatorios.values():
+        for rotulo, estado in estados:
+            paginas = [(rotulo, None)]
+            if relatorio.chave:
+                # Os valores da chave não importam: a consulta é analisada com o plano genérico
+                paginas.append((f"{rotulo}, página seguinte", (None,) * len(relatorio.chave)))
+            for variante, apos in paginas:
+                tamanho = TAMANHO_PAGINA if relatorio.chave else None
+                sql, _ = compilar(relatorio, estado_resumos=estado, apos=apos, tamanho=tamanho, visiveis=True)
+                if sql in vistas:
+                    continue
+                vistas.add(sql)
+                consultas.append(Consulta(f"reports.py:{relatorio.nome} ({variante})", sql))
+    return consultas
+
+
+def consultas_da_busca(tabelas=TABELAS_BUSCA):
+    """As duas consultas da busca incremental de cada tabela (sem termo e com ILIKE)."""
+    consultas = []
+    for chave, colunas in tabelas.items():
+        todas, filtradas = _consultas(*colunas)
+        consultas.append(Consulta(f"reference_search.py:{chave} (sem termo)", todas))
+        consultas.append(Consulta(f"reference_search.py:{chave} (com termo)", filtradas))
+    return consultas
+
+
+def todas_as_consultas():
+    return coletar_consultas() + consultas_dos_relatorios() + consultas_da_busca()
+
+
+def _percorrer_plano(no):
+    yield no
+    for filho in no.get('Plans', []):
+        yield from _percorrer_plano(filho)
+
+
+def analisar(cursor, consulta):
+    """Executa EXPLAIN da consulta dentro de um savepoint e resume o plano."""
+    cursor.execute("SAVEPOINT analise")
+    try:
+        if consulta.parametrizada:
+            cursor.execute(f"EXPLAIN (GENERIC_PLAN, FORMAT JSON) {consulta.numerada()}")
+        else:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {consulta.sql}")
+        explain = cursor.fetchone()[0][0]
+    except psycopg2.Error as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT analise")
+        return {'origem': consulta.origem, 'erro': str(e).strip()}
+    cursor.execute("ROLLBACK TO SAVEPOINT analise")
+
+    plano = explain['Plan']
+    varreduras = [
+        {'tabela': no['Relation Name'], 'filtro': no.get('Filter'), 'linhas': no.get('Plan Rows')}
+        for no in _percorrer_plano(plano) if no['Node Type'] == 'Seq Scan']
+    return {
+        'origem': consulta.origem,
+        'custo': plano['Total Cost'],
+        'tempo_ms': explain.get('Execution Time'),
+        'buffers_cache': plano.get('Shared Hit Blocks'),
+        'buffers_lidos': plano.get('Shared Read Blocks'),
+        'varreduras_sequenciais': varreduras,
+    }
+
+
+def analisar_todas(cursor, consultas):
+    return [analisar(cursor, consulta) for consulta in consultas]
+
+
+def fks_sem_indice(cursor):
+    """Sugere um CREATE INDEX para cada chave estrangeira sem índice de apoio."""
+    cursor.execute(QUERY_FKS_SEM_INDICE)
+    sugestoes = []
+    for tabela, colunas, referencia in cursor.fetchall():
+        nome = f"idx_{tabela}_{'_'.join(colunas)}"[:63]
+        sugestoes.append({
+            'tabela': tabela,
+            'referencia': referencia,
+            'ddl': f"CREATE INDEX {nome} ON {tabela} ({', '.join(colunas)});",
+        })
+    return sugestoes
+
+
+def _formatar(valor, casas=2):
+    return '-' if valor is None else f"{valor:.{casas}f}"
+
+
+def imprimir_analise(antes, depois=None):
+    depois = depois or [None] * len(antes)
+    for a, d in zip(antes, depois):
+        print(a['origem'])
+        if 'erro' in a:
+            print(f"    não analisada: {a['erro'].splitlines()[0]}")
+            continue
+        linha = f"    custo {_formatar(a['custo'])}  tempo {_formatar(a['tempo_ms'], 3)} ms"
+        if d and 'erro' not in d:
+            linha += f"  ->  custo {_formatar(d['custo'])}  tempo {_formatar(d['tempo_ms'], 3)} ms"
+        if a['tempo_ms'] is None:
+            linha += "  (plano genérico, sem execução)"
+        print(linha)
+        for varredura in (d or a)['varreduras_sequenciais']:
+            filtro = f" filtro: {varredura['filtro']}" if varredura['filtro'] else ""
+            print(f"    seq scan em {varredura['tabela']} (~{varredura['linhas']} linhas){filtro}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Analisa com EXPLAIN todas as consultas da aplicação e sugere índices.")
+    parser.add_argument("--comparar", action="store_true",
+                        help="mede o custo antes e depois das migrações pendentes da pasta sql/")
+    parser.add_argument("--aplicar", action="store_true",
+                        help="com --comparar, confirma as migrações em vez de desfazê-las")
+    parser.add_argument("--json", help="grava o resultado completo neste arquivo JSON")
+    adicionar_argumentos_conexao(parser)
+    args = parser.parse_args(argv)
+
+    consultas = todas_as_consultas()
+    try:
+        conn = psycopg2.connect(**config_dos_argumentos(args))
+    except psycopg2.Error as e:
+        print(f"Erro ao conectar ao banco: {e}", file=sys.stderr)
+        return 2
+
+    resultado = {'consultas': len(consultas)}
+    try:
+        with conn.cursor() as cursor:
+            resultado['antes'] = analisar_todas(cursor, consultas)
+            if args.comparar:
+                resultado['migracoes'] = aplicar_migracoes(conn, confirmar=False)
+                resultado['depois'] = analisar_todas(cursor, consultas)
+            resultado['fks_sem_indice'] = fks_sem_indice(cursor)
+        if args.comparar and args.aplicar:
+            conn.commit()
+        else:
+            conn.rollback()
+    except psycopg2.Error as e:
+        print(f"Falha na análise: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+    print(f"{len(consultas)} instruções SQL encontradas em {', '.join(MODULOS_APP)}, nos relatórios e nas buscas\n")
+    imprimir_analise(resultado['antes'], resultado.get('depois'))
+    if args.comparar:
+        migracoes = resultado['migracoes']
+        estado = "aplicadas" if args.aplicar else "avaliadas e desfeitas"
+        print(f"\nMigrações {estado}: {', '.join(migracoes) if migracoes else 'nenhuma pendente'}")
+    if resultado['fks_sem_indice']:
+        print("\nChaves estrangeiras sem índice:")
+        for sugestao in resultado['fks_sem_indice']:
+            print(f"    {sugestao['ddl']}  -- referencia {sugestao['referencia']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2, default=str)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Aplica, em ordem, os scripts versionados da pasta sql/ (NNN_descricao.sql).
+
+Os scripts complementam o esquema criado a partir de SQL_BD2.pdf e Triggers_BD2.pdf.
+As versões já aplicadas ficam registradas na tabela schema_migrations, então o
+comando pode ser executado novamente com segurança.
+
+Uso:
+    python migrations.py            # aplica as migrações pendentes
+    python migrations.py --listar   # mostra o estado de cada migração
+"""
+import argparse
+import os
+import re
+import sys
+
+import psycopg2
+
+from db_pool import adicionar_argumentos_conexao, config_dos_argumentos
+
+DIRETORIO_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sql')
+PADRAO_ARQUIVO = re.compile(r'^(\d+)_.+\.sql$')
+
+
+def migracoes_disponiveis(diretorio=DIRETORIO_SQL):
+    """Lista (versão, nome do arquivo, caminho) das migrações, ordenadas pela versão."""
+    migracoes = []
+    for nome in os.listdir(diretorio):
+        encontrado = PADRAO_ARQUIVO.match(nome)
+        if encontrado:
+            migracoes.append((int(encontrado.group(1)), nome, os.path.join(diretorio, nome)))
+    return sorted(migracoes)
+
+
+def versoes_aplicadas(conn):
+    """Versões já aplicadas, criando schema_migrations se preciso. Não confirma: quem chama decide."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                versao INT PRIMARY KEY,
+                nome VARCHAR(255) NOT NULL,
+                aplicada_em TIMESTAMP NOT NULL DEFAULT now()
+            )
+        """)
+        cursor.execute("SELECT versao FROM schema_migrations")
+        versoes = {row[0] for row in cursor.fetchall()}
+    return versoes
+
+
+def aplicar_migracoes(conn, diretorio=DIRETORIO_SQL, confirmar=True):
+    """
+    Aplica as migrações pendentes, cada uma em sua própria transação. Retorna os nomes aplicados.
+    Com confirmar=False nada é confirmado, nem a criação de schema_migrations: fica tudo na
+    transação aberta, e o chamador faz o commit ou o rollback.
+    """
+    aplicadas = versoes_aplicadas(conn)
+    if confirmar:
+        conn.commit()
+    novas = []
+    for versao, nome, caminho in migracoes_disponiveis(diretorio):
+        if versao in aplicadas:
+            continue
+        with open(caminho, encoding='utf-8-sig') as arquivo:
+            script = arquivo.read()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(script)
+                cursor.execute("INSERT INTO schema_migrations (versao, nome) VALUES (%s, %s)",
+                               (versao, nome))
+            if confirmar:
+                conn.commit()
+        except psycopg2.Error:
+            conn.rollback()
+            raise
+        novas.append(nome)
+    return novas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aplica as migrações SQL versionadas da pasta sql/.")
+    parser.add_argument("--listar", action="store_true", help="apenas lista as migrações e seu estado")
+    adicionar_argumentos_conexao(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        conn = psycopg2.connect(**config_dos_argumentos(args))
+    except psycopg2.Error as e:
+        print(f"Erro ao conectar ao banco: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        if args.listar:
+            aplicadas = versoes_aplicadas(conn)
+            conn.rollback()
+            for versao, nome, _ in migracoes_disponiveis():
+                print(f"[{'x' if versao in aplicadas else ' '}] {nome}")
+            return 0
+        novas = aplicar_migracoes(conn)
+    except psycopg2.Error as e:
+        print(f"Falha ao aplicar migração: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+    if novas:
+        for nome in novas:
+            print(f"Aplicada: {nome}")
+    else:
+        print("Nenhuma migração pendente.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class OptionList:
+    """
+    Chaves e rótulos de uma Listbox ou Combobox em listas paralelas.
+
+    O widget só recebe os rótulos; as chaves (códigos, ou tuplas como
+    (cod_grupo, num_divisao)) ficam aqui, na mesma posição. A seleção é resolvida
+    pelos índices, com uma única chamada ao Tk (curselection/current), sem ler o
+    texto de cada item nem depender do formato do rótulo.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.chaves = []
+        self.rotulos = []
+
+    def preencher(self, itens, selecionar_primeiro=False):
+        """Substitui as opções por itens (chave, rótulo)."""
+        self.chaves = [chave for chave, _ in itens]
+        self.rotulos = [rotulo for _, rotulo in itens]
+        if isinstance(self.widget, ttk.Combobox):
+            self.widget['values'] = self.rotulos
+            if selecionar_primeiro and self.rotulos:
+                self.widget.current(0)
+            else:
+                self.widget.set("")
+        else:
+            self.widget.delete(0, tk.END)
+            if self.rotulos:
+                self.widget.insert(tk.END, *self.rotulos)
+
+    def selecionadas(self):
+        """Chaves dos itens selecionados, na ordem da lista."""
+        if isinstance(self.widget, ttk.Combobox):
+            indice = self.widget.current()
+            return [self.chaves[indice]] if 0 <= indice < len(self.chaves) else []
+        return [self.chaves[indice] for indice in self.widget.curselection()]
+
+    def selecionada(self):
+        """Chave do item selecionado (Combobox) ou None."""
+        chaves = self.selecionadas()
+        return chaves[0] if chaves else None
+
+    def limpar_selecao(self):
+        if isinstance(self.widget, ttk.Combobox):
+            self.widget.set("")
+        else:
+            self.widget.selection_clear(0, tk.END)
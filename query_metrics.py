@@ -0,0 +1,289 @@
+import contextlib
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions, sql
+
+logger = logging.getLogger('conflitos.sql')
+
+# Consultas que demoram mais que isso (s) são registradas no log com os parâmetros
+LIMITE_LENTA_PADRAO = 0.5
+# Quantidade de execuções mantidas no buffer circular
+TAMANHO_HISTORICO = 1000
+# Tamanho máximo do repr dos parâmetros guardado em cada registro (arrays de ids podem ser enormes)
+TAMANHO_MAXIMO_PARAMETROS = 300
+
+
+def normalizar_sql(query, cursor=None):
+    """Texto da instrução em uma linha só, usado como chave das estatísticas."""
+    if isinstance(query, sql.Composable):
+        query = query.as_string(cursor)
+    elif isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    return ' '.join(str(query).split())
+
+
+class InstrumentedCursor(extensions.cursor):
+    """
+    Cursor do psycopg2 que mede cada execute()/executemany()/callproc().
+
+    Não é usado diretamente: QueryMetrics.cursor_factory devolve uma subclasse
+    ligada à instância de métricas, passada ao psycopg2.connect() do pool. Assim
+    toda conexão do pool (execute_query, cadastros, relatórios, exportações) é
+    medida sem mudar quem abre os cursores.
+    """
+
+    metricas = None
+
+    def execute(self, query, vars=None):
+        return self._medir(super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._medir(super().executemany, query, vars_list)
+
+    def callproc(self, procname, parameters=None):
+        return self._medir(super().callproc, procname, parameters)
+
+    def _medir(self, executar, query, vars):
+        inicio = time.perf_counter()
+        erro = None
+        try:
+            return executar(query, vars)
+        except psycopg2.Error as e:
+            erro = e
+            raise
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.metricas.registrar(self, query, vars, duracao, self.rowcount, erro)
+
+
+class QueryMetrics:
+    """
+    Métricas de todas as instruções SQL executadas pela aplicação.
+
+    Para cada execução guarda latência, linhas retornadas/afetadas e erro em um
+    buffer circular, agrega por instrução (texto normalizado) e conta os round
+    trips de cada ação do usuário delimitada por acao(). Instruções acima do
+    limite de lentidão vão para o logger 'conflitos.sql' com os parâmetros.
+    O retrato pode ser exportado em JSON ou no formato texto do Prometheus.
+    """
+
+    def __init__(self, limite_lenta=LIMITE_LENTA_PADRAO, tamanho_historico=TAMANHO_HISTORICO):
+        self.limite_lenta = limite_lenta
+        self._lock = threading.Lock()
+        self._historico = deque(maxlen=tamanho_historico)
+        self._por_instrucao = {}
+        self._acoes = {}
+        self._local = threading.local()
+        self._contadores = {'execucoes': 0, 'erros': 0, 'lentas': 0, 'tempo_total': 0.0}
+        # Texto normalizado -> texto a exibir (ex.: EXECUTE ps_... -> a instrução preparada)
+        self._apelidos = {}
+        self.cursor_factory = type('InstrumentedCursor', (InstrumentedCursor,), {'metricas': self})
+
+    # --- COLETA ---
+    def registrar(self, cursor, query, vars, duracao, linhas, erro=None):
+        """Chamado pelo cursor instrumentado após cada execução (com sucesso ou não)."""
+        try:
+            texto = normalizar_sql(query, cursor)
+        except (TypeError, ValueError, psycopg2.Error):
+            texto = repr(query)
+        texto = self._apelidos.get(texto, texto)
+        pilha = getattr(self._local, 'acoes', None) or []
+        for acao in pilha:
+            acao['round_trips'] += 1
+            acao['tempo_sql'] += duracao
+        acao = pilha[-1] if pilha else None
+
+        registro = {
+            'instante': time.time(),
+            'sql': texto,
+            'parametros': self._resumir_parametros(vars),
+            'duracao_ms': duracao * 1000,
+            'linhas': linhas if linhas is not None and linhas >= 0 else None,
+            'erro': str(erro).strip() if erro is not None else None,
+            'acao': acao['nome'] if acao is not None else None,
+            'thread': threading.current_thread().name,
+        }
+        lenta = duracao >= self.limite_lenta
+        with self._lock:
+            self._historico.append(registro)
+            self._contadores['execucoes'] += 1
+            self._contadores['tempo_total'] += duracao
+            agregado = self._por_instrucao.get(texto)
+            if agregado is None:
+                agregado = self._por_instrucao[texto] = {
+                    'execucoes': 0, 'tempo_total': 0.0, 'tempo_maximo': 0.0,
+                    'linhas': 0, 'erros': 0, 'lentas': 0}
+            agregado['execucoes'] += 1
+            agregado['tempo_total'] += duracao
+            agregado['tempo_maximo'] = max(agregado['tempo_maximo'], duracao)
+            agregado['linhas'] += registro['linhas'] or 0
+            if erro is not None:
+                agregado['erros'] += 1
+                self._contadores['erros'] += 1
+            if lenta:
+                agregado['lentas'] += 1
+                self._contadores['lentas'] += 1
+
+        if lenta:
+            logger.warning("Consulta lenta (%.1f ms, ação: %s): %s", duracao * 1000,
+                           registro['acao'] or '-', self._sql_com_parametros(cursor, query, vars, texto))
+
+    def apelidar(self, instrucao, texto):
+        """Agrega as execuções de 'instrucao' (texto normalizado) sob 'texto', como se fossem dele."""
+        with self._lock:
+            self._apelidos[instrucao] = texto
+
+    @staticmethod
+    def _resumir_parametros(vars):
+        if vars is None:
+            return None
+        texto = repr(vars)
+        if len(texto) > TAMANHO_MAXIMO_PARAMETROS:
+            texto = texto[:TAMANHO_MAXIMO_PARAMETROS] + '…'
+        return texto
+
+    @staticmethod
+    def _sql_com_parametros(cursor, query, vars, texto):
+        """A instrução com os parâmetros já interpolados (mogrify não vai ao servidor)."""
+        if vars is None:
+            return texto
+        try:
+            return ' '.join(cursor.mogrify(query, vars).decode('utf-8', 'replace').split())
+        except (TypeError, ValueError, psycopg2.Error):
+            return f"{texto} | parâmetros: {vars!r}"
+
+    # --- AÇÕES DO USUÁRIO ---
+    @contextlib.contextmanager
+    def acao(self, nome):
+        """
+        Delimita uma ação do usuário (um cadastro, uma atualização de listas, um relatório):
+        as instruções executadas nesta thread dentro do bloco são contadas para ela.
+        Em ações aninhadas, cada instrução conta para todas as ações abertas; o
+        registro no histórico leva o nome da mais interna.
+        """
+        pilha = getattr(self._local, 'acoes', None)
+        if pilha is None:
+            pilha = self._local.acoes = []
+        atual = {'nome': nome, 'round_trips': 0, 'tempo_sql': 0.0}
+        pilha.append(atual)
+        inicio = time.perf_counter()
+        try:
+            yield atual
+        finally:
+            pilha.pop()
+            duracao = time.perf_counter() - inicio
+            with self._lock:
+                agregado = self._acoes.get(nome)
+                if agregado is None:
+                    agregado = self._acoes[nome] = {
+                        'execucoes': 0, 'round_trips': 0, 'max_round_trips': 0,
+                        'ultimo_round_trips': 0, 'tempo_total': 0.0, 'tempo_sql': 0.0}
+                agregado['execucoes'] += 1
+                agregado['round_trips'] += atual['round_trips']
+                agregado['max_round_trips'] = max(agregado['max_round_trips'], atual['round_trips'])
+                agregado['ultimo_round_trips'] = atual['round_trips']
+                agregado['tempo_total'] += duracao
+                agregado['tempo_sql'] += atual['tempo_sql']
+
+    # --- CONSULTA E EXPORTAÇÃO ---
+    def historico(self, apenas_erros=False):
+        """Execuções mais recentes primeiro."""
+        with self._lock:
+            registros = list(self._historico)
+        registros.reverse()
+        if apenas_erros:
+            registros = [registro for registro in registros if registro['erro']]
+        return registros
+
+    def instrucoes(self):
+        """Agregados por instrução, ordenados pelo tempo total (as mais custosas primeiro)."""
+        with self._lock:
+            itens = [dict(agregado, sql=texto) for texto, agregado in self._por_instrucao.items()]
+        for item in itens:
+            item['tempo_medio'] = item['tempo_total'] / item['execucoes']
+        return sorted(itens, key=lambda item: item['tempo_total'], reverse=True)
+
+    def acoes(self):
+        with self._lock:
+            itens = [dict(agregado, nome=nome) for nome, agregado in self._acoes.items()]
+        for item in itens:
+            item['media_round_trips'] = item['round_trips'] / item['execucoes']
+        return sorted(itens, key=lambda item: item['tempo_total'], reverse=True)
+
+    def estatisticas(self):
+        with self._lock:
+            stats = dict(self._contadores)
+            stats['instrucoes_distintas'] = len(self._por_instrucao)
+            stats['limite_lenta'] = self.limite_lenta
+        return stats
+
+    def limpar(self):
+        with self._lock:
+            self._historico.clear()
+            self._por_instrucao.clear()
+            self._acoes.clear()
+            self._contadores.update({'execucoes': 0, 'erros': 0, 'lentas': 0, 'tempo_total': 0.0})
+
+    def exportar_json(self, destino=None):
+        """Retorna (e, se destino for informado, grava) o retrato completo das métricas em JSON."""
+        retrato = {
+            'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'resumo': self.estatisticas(),
+            'instrucoes': self.instrucoes(),
+            'acoes': self.acoes(),
+            'historico': self.historico(),
+        }
+        texto = json.dumps(retrato, ensure_ascii=False, indent=2, default=str)
+        if destino:
+            with open(destino, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(texto)
+        return texto
+
+    def exportar_prometheus(self, destino=None):
+        """Métricas no formato texto de exposição do Prometheus, com um rótulo por instrução."""
+        linhas = []
+
+        def metrica(nome, tipo, ajuda, amostras):
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            for rotulos, valor in amostras:
+                texto_rotulos = ','.join(f'{chave}="{_escapar_rotulo(v)}"' for chave, v in rotulos.items())
+                linhas.append(f"{nome}{{{texto_rotulos}}} {valor}" if rotulos else f"{nome} {valor}")
+
+        instrucoes = self.instrucoes()
+        acoes = self.acoes()
+        rotulos = [{'id': hashlib.sha1(item['sql'].encode('utf-8')).hexdigest()[:12],
+                    'sql': item['sql'][:120]} for item in instrucoes]
+        metrica('conflitos_sql_execucoes_total', 'counter', 'Execuções por instrução SQL.',
+                [(r, i['execucoes']) for r, i in zip(rotulos, instrucoes)])
+        metrica('conflitos_sql_duracao_segundos_total', 'counter', 'Tempo total de execução por instrução SQL.',
+                [(r, f"{i['tempo_total']:.6f}") for r, i in zip(rotulos, instrucoes)])
+        metrica('conflitos_sql_duracao_maxima_segundos', 'gauge', 'Maior tempo de execução observado.',
+                [(r, f"{i['tempo_maximo']:.6f}") for r, i in zip(rotulos, instrucoes)])
+        metrica('conflitos_sql_linhas_total', 'counter', 'Linhas retornadas ou afetadas por instrução SQL.',
+                [(r, i['linhas']) for r, i in zip(rotulos, instrucoes)])
+        metrica('conflitos_sql_erros_total', 'counter', 'Execuções que terminaram em erro.',
+                [(r, i['erros']) for r, i in zip(rotulos, instrucoes)])
+        metrica('conflitos_sql_lentas_total', 'counter', 'Execuções acima do limite de consulta lenta.',
+                [(r, i['lentas']) for r, i in zip(rotulos, instrucoes)])
+        metrica('conflitos_acao_execucoes_total', 'counter', 'Execuções de cada ação do usuário.',
+                [({'acao': a['nome']}, a['execucoes']) for a in acoes])
+        metrica('conflitos_acao_round_trips_total', 'counter', 'Round trips ao banco por ação do usuário.',
+                [({'acao': a['nome']}, a['round_trips']) for a in acoes])
+        metrica('conflitos_acao_duracao_segundos_total', 'counter', 'Tempo total de cada ação do usuário.',
+                [({'acao': a['nome']}, f"{a['tempo_total']:.6f}") for a in acoes])
+        texto = '\n'.join(linhas) + '\n'
+        if destino:
+            with open(destino, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(texto)
+        return texto
+
+
+def _escapar_rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
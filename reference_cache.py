@@ -0,0 +1,110 @@
+import threading
+
+# Consulta de carga de cada tabela de referência. As chaves são os nomes das tabelas
+# em minúsculas, iguais ao payload enviado pelos triggers de notificação.
+TABELAS_REFERENCIA = {
+    'pais': "SELECT cod_pais, nome_pais FROM Pais ORDER BY nome_pais",
+    'regiao': "SELECT id_regiao, nome_regiao FROM Regiao ORDER BY nome_regiao",
+    'religiao_entidade': "SELECT id_religiao, nome_religiao FROM Religiao_Entidade ORDER BY nome_religiao",
+    'materia_prima': "SELECT id_materia_prima, nome_materia_prima FROM Materia_Prima ORDER BY nome_materia_prima",
+    'etnia': "SELECT id_etnia, nome_etnia FROM Etnia ORDER BY nome_etnia",
+    'grupo_armado': "SELECT cod_grupo, nome_grupo FROM Grupo_Armado ORDER BY nome_grupo",
+    'lider_politico': """SELECT id_lider_politico, nome_lider, cod_grupo_liderado_fk
+                         FROM Lider_Politico ORDER BY nome_lider""",
+    'divisao': "SELECT cod_grupo_fk, num_divisao FROM Divisao ORDER BY cod_grupo_fk, num_divisao",
+    'conflito': "SELECT cod_conflito, nome_conflito FROM Conflito ORDER BY nome_conflito",
+}
+
+
+class ReferenceCache:
+    """
+    Cache em memória das tabelas de referência usadas por combos e listboxes.
+
+    Cada tabela é lida no máximo uma vez até ser invalidada, seja por uma escrita
+    da própria aplicação, seja por um NOTIFY de outro cliente. Enquanto nada muda,
+    atualizar os widgets não custa nenhuma consulta.
+
+    indice() agrupa as linhas de uma tabela por uma coluna (ex.: líderes por grupo)
+    e guarda o agrupamento junto com as linhas: é descartado na mesma invalidação.
+    """
+
+    def __init__(self, obter_pool, tabelas=TABELAS_REFERENCIA, cache_instrucoes=None):
+        self.obter_pool = obter_pool
+        self.tabelas = tabelas
+        # StatementCache opcional: as recargas executam a consulta já preparada na conexão
+        self.cache_instrucoes = cache_instrucoes
+        self._lock = threading.Lock()
+        self._dados = {}
+        # (tabela, coluna) -> {valor da coluna: [linhas]}, derivado de _dados[tabela]
+        self._indices = {}
+        # Geração de cada tabela: incrementada a cada invalidação, para descartar
+        # cargas que estavam em andamento quando a tabela mudou
+        self._geracao = {tabela: 0 for tabela in tabelas}
+        self._stats = {'acertos': 0, 'faltas': 0, 'invalidacoes': 0}
+        # Funções chamadas com as tabelas invalidadas (caches derivados, ex.: ReferenceSearch)
+        self._assinantes = []
+
+    def obter(self, tabela):
+        """Retorna as linhas da tabela, consultando o banco apenas se não estiverem em cache."""
+        with self._lock:
+            if tabela in self._dados:
+                self._stats['acertos'] += 1
+                return self._dados[tabela]
+            self._stats['faltas'] += 1
+            geracao = self._geracao[tabela]
+
+        with self.obter_pool().conexao() as conn:
+            with conn.cursor() as cursor:
+                if self.cache_instrucoes is not None:
+                    self.cache_instrucoes.executar(cursor, self.tabelas[tabela])
+                else:
+                    cursor.execute(self.tabelas[tabela])
+                linhas = cursor.fetchall()
+            conn.rollback()
+
+        with self._lock:
+            if self._geracao[tabela] == geracao:
+                self._dados[tabela] = linhas
+        return linhas
+
+    def indice(self, tabela, coluna):
+        """Linhas da tabela agrupadas pelo valor na posição 'coluna', montado uma vez por carga da tabela."""
+        with self._lock:
+            indice = self._indices.get((tabela, coluna))
+            if indice is not None and tabela in self._dados:
+                return indice
+
+        linhas = self.obter(tabela)
+        indice = {}
+        for linha in linhas:
+            indice.setdefault(linha[coluna], []).append(linha)
+
+        with self._lock:
+            # Só guarda se as linhas usadas ainda forem as do cache (sem invalidação no meio)
+            if self._dados.get(tabela) is linhas:
+                self._indices[(tabela, coluna)] = indice
+        return indice
+
+    def assinar_invalidacao(self, ao_invalidar):
+        """Registra ao_invalidar(*tabelas), chamada a cada invalidação (sem argumentos quando for de todas)."""
+        self._assinantes.append(ao_invalidar)
+
+    def invalidar(self, *tabelas):
+        """Descarta as tabelas informadas (ou todas, se nenhuma for informada)."""
+        for ao_invalidar in self._assinantes:
+            ao_invalidar(*tabelas)
+        with self._lock:
+            for tabela in tabelas or list(self.tabelas):
+                if tabela in self._geracao:
+                    self._geracao[tabela] += 1
+                    self._dados.pop(tabela, None)
+                    for chave in [chave for chave in self._indices if chave[0] == tabela]:
+                        del self._indices[chave]
+                    self._stats['invalidacoes'] += 1
+
+    def estatisticas(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['tabelas_em_cache'] = sorted(self._dados)
+            stats['indices_em_cache'] = sorted(f"{tabela}.{coluna}" for tabela, coluna in self._indices)
+        return stats
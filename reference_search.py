@@ -0,0 +1,125 @@
+import collections
+import threading
+
+# Tabelas com busca incremental: chave do cache de referência -> (tabela, código, nome).
+# As colunas de nome têm índices GIN de trigramas (sql/006_busca_trigramas.sql).
+TABELAS_BUSCA = {
+    'pais': ('Pais', 'cod_pais', 'nome_pais'),
+    'grupo_armado': ('Grupo_Armado', 'cod_grupo', 'nome_grupo'),
+    'conflito': ('Conflito', 'cod_conflito', 'nome_conflito'),
+}
+
+# Linhas trazidas por busca: a listbox nunca recebe mais do que isso
+LIMITE_BUSCA = 50
+# Resultados de busca guardados (por tabela e termo); os mais antigos são descartados
+MAX_TERMOS_EM_CACHE = 200
+
+
+def _consultas(tabela, codigo, nome):
+    # Sem termo, os primeiros pelo nome; com termo, ILIKE '%termo%', que o índice de trigramas atende
+    todas = f"SELECT {codigo}, {nome} FROM {tabela} ORDER BY {nome} LIMIT %(limite)s"
+    filtradas = (f"SELECT {codigo}, {nome} FROM {tabela} WHERE {nome} ILIKE %(padrao)s "
+                 f"ORDER BY {nome} LIMIT %(limite)s")
+    return todas, filtradas
+
+
+def _padrao_ilike(termo):
+    """'%termo%' com os curingas do próprio termo escapados (o escape padrão do ILIKE é a barra)."""
+    termo = termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{termo}%"
+
+
+class ReferenceSearch:
+    """
+    Busca incremental (type-ahead) nas tabelas de referência grandes.
+
+    Cada busca traz do servidor no máximo 'limite' linhas cujo nome contém o termo.
+    Quando uma busca anterior por um prefixo do termo veio completa (menos linhas
+    que o limite), o resultado é filtrado em memória: digitar "Sír" depois de "Sí"
+    não consulta o banco. Os resultados são descartados com a tabela, seja por uma
+    escrita da aplicação, seja por um NOTIFY (ReferenceCache.assinar_invalidacao).
+    """
+
+    def __init__(self, obter_pool, tabelas=TABELAS_BUSCA, limite=LIMITE_BUSCA,
+                 max_termos=MAX_TERMOS_EM_CACHE, cache_instrucoes=None):
+        self.obter_pool = obter_pool
+        self.consultas = {chave: _consultas(*colunas) for chave, colunas in tabelas.items()}
+        self.limite = limite
+        self.max_termos = max_termos
+        # StatementCache opcional: as buscas repetem a mesma instrução com outro termo
+        self.cache_instrucoes = cache_instrucoes
+        self._lock = threading.Lock()
+        # (tabela, termo) -> (linhas, completo), na ordem de uso (LRU)
+        self._resultados = collections.OrderedDict()
+        self._geracao = {tabela: 0 for tabela in tabelas}
+        self._stats = {'acertos': 0, 'filtradas': 0, 'consultas': 0, 'invalidacoes': 0}
+
+    def buscar(self, tabela, termo):
+        """Até 'limite' linhas (código, nome) cujo nome contém o termo, em ordem de nome."""
+        termo = ' '.join(termo.split()).lower()
+        with self._lock:
+            encontrado = self._do_cache(tabela, termo)
+            geracao = self._geracao[tabela]
+        if encontrado is not None:
+            return encontrado
+
+        todas, filtradas = self.consultas[tabela]
+        query, params = (filtradas, {'padrao': _padrao_ilike(termo)}) if termo else (todas, {})
+        # Uma linha a mais que o limite diz se o resultado está completo
+        params['limite'] = self.limite + 1
+        with self.obter_pool().conexao() as conn:
+            with conn.cursor() as cursor:
+                if self.cache_instrucoes is not None:
+                    self.cache_instrucoes.executar(cursor, query, params)
+                else:
+                    cursor.execute(query, params)
+                linhas = cursor.fetchall()
+            conn.rollback()
+
+        completo = len(linhas) <= self.limite
+        linhas = linhas[:self.limite]
+        with self._lock:
+            self._stats['consultas'] += 1
+            if self._geracao[tabela] == geracao:
+                self._guardar(tabela, termo, linhas, completo)
+        return linhas
+
+    def _do_cache(self, tabela, termo):
+        """Resultado exato em cache ou filtrado do maior prefixo com resultado completo (com o lock)."""
+        resultado = self._resultados.get((tabela, termo))
+        if resultado is not None:
+            self._resultados.move_to_end((tabela, termo))
+            self._stats['acertos'] += 1
+            return resultado[0]
+
+        for tamanho in range(len(termo) - 1, -1, -1):
+            resultado = self._resultados.get((tabela, termo[:tamanho]))
+            if resultado is not None and resultado[1]:
+                linhas = [linha for linha in resultado[0] if termo in linha[1].lower()]
+                self._guardar(tabela, termo, linhas, True)
+                self._stats['filtradas'] += 1
+                return linhas
+        return None
+
+    def _guardar(self, tabela, termo, linhas, completo):
+        self._resultados[(tabela, termo)] = (linhas, completo)
+        self._resultados.move_to_end((tabela, termo))
+        while len(self._resultados) > self.max_termos:
+            self._resultados.popitem(last=False)
+
+    def invalidar(self, *tabelas):
+        """Descarta os resultados das tabelas informadas (ou de todas)."""
+        with self._lock:
+            for tabela in tabelas or list(self._geracao):
+                if tabela not in self._geracao:
+                    continue
+                self._geracao[tabela] += 1
+                for chave in [chave for chave in self._resultados if chave[0] == tabela]:
+                    del self._resultados[chave]
+                self._stats['invalidacoes'] += 1
+
+    def estatisticas(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['termos_em_cache'] = len(self._resultados)
+        return stats
@@ -0,0 +1,254 @@
+import contextlib
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+from psycopg2 import errors
+
+from exporter import exportar
+from reports import compilar, ler_estado_resumos
+from statement_cache import ERROS_REPREPARAR
+
+# Estados possíveis de um ReportJob
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDO = 'concluido'
+ERRO = 'erro'
+CANCELADO = 'cancelado'
+EXPIRADO = 'expirado'
+
+
+class ReportJob:
+    """
+    Uma consulta de relatório executada em segundo plano.
+
+    O resultado nunca é entregue diretamente à interface: a thread do Tk
+    consulta concluido() periodicamente (via root.after) e lê 'resultado'
+    ou 'erro' quando o job termina.
+    """
+
+    def __init__(self, nome, query, params, timeout):
+        self.nome = nome
+        self.query = query
+        self.params = params
+        self.timeout = timeout
+        self.estado = PENDENTE
+        self.resultado = None  # (linhas, colunas) quando CONCLUIDO
+        self.progresso = 0  # Linhas já escritas, nas exportações
+        # Estado dos resumos lido pelo job (submit_relatorio, relatórios com versão sobre os resumos)
+        self.estado_resumos = None
+        self.erro = None
+        self.inicio = time.monotonic()
+        self.fim = None
+        self._lock = threading.Lock()
+        self._conn = None
+        self._motivo_cancelamento = None
+        self._terminou = threading.Event()
+
+    def concluido(self):
+        return self._terminou.is_set()
+
+    def tempo_decorrido(self):
+        return (self.fim or time.monotonic()) - self.inicio
+
+    def expirou(self):
+        return self.timeout is not None and self.tempo_decorrido() > self.timeout
+
+    def cancelar(self, motivo=CANCELADO):
+        """Cancela o job. Se a consulta já estiver no servidor, envia um cancel request ao backend."""
+        with self._lock:
+            if self._terminou.is_set() or self._motivo_cancelamento:
+                return
+            self._motivo_cancelamento = motivo
+            conn = self._conn
+            # Ainda com o lock: o worker limpa _conn (com o mesmo lock) antes de devolver a conexão
+            # ao pool, então o cancel request nunca atinge a consulta de outro job
+            if conn is not None and not conn.closed:
+                try:
+                    # Equivalente a pg_cancel_backend() para o backend desta conexão
+                    conn.cancel()
+                except psycopg2.Error:
+                    pass
+
+    def descartar(self):
+        """Libera o resultado de um job que não será exibido."""
+        self.resultado = None
+
+    def _finalizar(self, estado, resultado=None, erro=None):
+        self.estado = estado
+        self.resultado = resultado
+        self.erro = erro
+        self.fim = time.monotonic()
+        self._terminou.set()
+
+
+class ReportExecutor:
+    """Executa consultas de relatório em um pool de threads, com cancelamento e timeout por relatório."""
+
+    def __init__(self, obter_pool, max_workers=4, metricas=None, cache_instrucoes=None):
+        # obter_pool é uma função porque o pool é recriado a cada "Testar Conexão"
+        self.obter_pool = obter_pool
+        # QueryMetrics opcional: cada job conta como uma ação, com seus round trips
+        self.metricas = metricas
+        # StatementCache opcional: relatórios repetidos (e as páginas das listagens) usam a consulta preparada
+        self.cache_instrucoes = cache_instrucoes
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="relatorio")
+
+    def submit(self, nome, query, params=None, timeout=None):
+        """Agenda a consulta e retorna imediatamente o ReportJob correspondente."""
+        job = ReportJob(nome, query, params, timeout)
+        self._executor.submit(self._medir, self._executar, job)
+        return job
+
+    def submit_relatorio(self, nome, relatorio, valores=None, timeout=None, apos=None, tamanho=None):
+        """
+        Como submit(), mas o relatório é compilado na thread de fundo: o estado dos resumos
+        (reports.ler_estado_resumos) é lido na mesma conexão da consulta, sem round trip na
+        thread de quem chama. job.query e job.params passam a ser os compilados e
+        job.estado_resumos, o estado lido (relatórios com versão sobre os resumos).
+        """
+        job = ReportJob(nome, None, None, timeout)
+        preparar = functools.partial(self._compilar, relatorio=relatorio, valores=valores, apos=apos,
+                                     tamanho=tamanho)
+        self._executor.submit(self._medir, functools.partial(self._executar, preparar=preparar), job)
+        return job
+
+    def submit_exportacao(self, nome, relatorio, destino, formato, valores=None, estado_resumos=None):
+        """
+        Exporta o relatório inteiro para o arquivo 'destino' (exporter.exportar), sem timeout.
+        O job conclui com (linhas escritas, destino) e job.progresso acompanha as linhas já
+        escritas; cancelar() interrompe a exportação e remove o arquivo incompleto.
+        """
+        job = ReportJob(nome, None, None, None)
+        exportacao = functools.partial(exportar, relatorio=relatorio, destino=destino, formato=formato,
+                                       valores=valores, estado_resumos=estado_resumos)
+        self._executor.submit(self._medir, functools.partial(self._executar_exportacao, exportacao=exportacao),
+                              job)
+        return job
+
+    def submit_funcao(self, nome, descricao, funcao, *args):
+        """
+        Executa funcao(*args) em segundo plano (ex.: análise em memória, que não passa pelo
+        pool) e conclui com o seu retorno. 'descricao' faz o papel da consulta nas mensagens.
+        Cancelar só descarta o resultado: a função roda até o fim.
+        """
+        job = ReportJob(nome, descricao, None, None)
+        self._executor.submit(self._medir, functools.partial(self._executar_funcao, funcao=funcao, args=args),
+                              job)
+        return job
+
+    def _medir(self, executar, job):
+        acao = self.metricas.acao(job.nome) if self.metricas else contextlib.nullcontext()
+        with acao:
+            executar(job)
+
+    @staticmethod
+    def _compilar(conn, job, relatorio, valores, apos, tamanho):
+        estado = ler_estado_resumos(conn) if relatorio.query_resumo else None
+        job.estado_resumos = estado
+        job.query, job.params = compilar(relatorio, valores, estado, apos, tamanho)
+
+    def _executar(self, job, preparar=None):
+        if job._motivo_cancelamento:
+            job._finalizar(job._motivo_cancelamento)
+            return
+
+        try:
+            pool = self.obter_pool()
+            if pool is None:
+                raise psycopg2.InterfaceError("Sem conexão com o banco.")
+            with pool.conexao() as conn:
+                with job._lock:
+                    job._conn = conn
+                    cancelado = job._motivo_cancelamento
+                try:
+                    if cancelado:
+                        job._finalizar(cancelado)
+                        return
+                    job.estado = EXECUTANDO
+                    for tentativa in range(2):
+                        try:
+                            linhas, colunas = self._consultar(conn, job, preparar)
+                            break
+                        except psycopg2.Error as e:
+                            # Instrução preparada que o servidor descartou ou cujo resultado mudou: o
+                            # SET LOCAL já abriu a transação, então o cache só a esqueceu e repassou o
+                            # erro. Desfeita a transação, a nova tentativa a prepara de novo
+                            if e.pgcode not in ERROS_REPREPARAR or tentativa or conn.closed:
+                                raise
+                            conn.rollback()
+                    conn.rollback()  # Encerra a transação somente leitura
+                finally:
+                    with job._lock:
+                        job._conn = None
+            job._finalizar(CONCLUIDO, (linhas, colunas))
+        except errors.QueryCanceled as e:
+            # Tanto o cancel request quanto o statement_timeout chegam aqui
+            job._finalizar(job._motivo_cancelamento or EXPIRADO, erro=e)
+        except Exception as e:
+            job._finalizar(job._motivo_cancelamento or ERRO, erro=e)
+
+    def _consultar(self, conn, job, preparar):
+        if preparar is not None:
+            preparar(conn, job)
+        with conn.cursor() as cursor:
+            if job.timeout:
+                # Timeout também no servidor, para a consulta não continuar rodando sozinha
+                cursor.execute("SET LOCAL statement_timeout = %s", (int(job.timeout * 1000),))
+            if self.cache_instrucoes is not None:
+                self.cache_instrucoes.executar(cursor, job.query, job.params)
+            else:
+                cursor.execute(job.query, job.params)
+            linhas = cursor.fetchall() if cursor.description else []
+            colunas = [desc[0] for desc in cursor.description] if cursor.description else []
+        return linhas, colunas
+
+    def _executar_funcao(self, job, funcao, args):
+        if job._motivo_cancelamento:
+            job._finalizar(job._motivo_cancelamento)
+            return
+        try:
+            job.estado = EXECUTANDO
+            resultado = funcao(*args)
+        except Exception as e:
+            job._finalizar(job._motivo_cancelamento or ERRO, erro=e)
+            return
+        job._finalizar(job._motivo_cancelamento or CONCLUIDO, None if job._motivo_cancelamento else resultado)
+
+    def _executar_exportacao(self, job, exportacao):
+        if job._motivo_cancelamento:
+            job._finalizar(job._motivo_cancelamento)
+            return
+
+        def progredir(linhas):
+            job.progresso = linhas
+
+        try:
+            pool = self.obter_pool()
+            if pool is None:
+                raise psycopg2.InterfaceError("Sem conexão com o banco.")
+            with pool.conexao() as conn:
+                with job._lock:
+                    job._conn = conn
+                    cancelado = job._motivo_cancelamento
+                try:
+                    if cancelado:
+                        job._finalizar(cancelado)
+                        return
+                    job.estado = EXECUTANDO
+                    total = exportacao(conn, ao_progredir=progredir,
+                                       cancelado=lambda: job._motivo_cancelamento is not None)
+                    conn.rollback()
+                finally:
+                    with job._lock:
+                        job._conn = None
+            job._finalizar(CONCLUIDO, (total, exportacao.keywords['destino']))
+        except Exception as e:
+            # Cancel request (QueryCanceled) ou ExportacaoCancelada entre dois lotes
+            job._finalizar(job._motivo_cancelamento or ERRO, erro=e)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
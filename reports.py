@@ -0,0 +1,527 @@
+"""
+Catálogo dos relatórios e listagens da aplicação, sem nenhuma dependência de interface.
+
+Cada Relatorio traz a consulta sobre as tabelas base e, quando existe, a versão
+sobre as tabelas de resumo (sql/002_resumos.sql), usada enquanto os resumos
+estiverem em dia (a contagem por tipo, de sql/004_contagem_tipos.sql, está
+sempre em dia). A interface gráfica (gui.py) e o modo de linha de comando
+(python main.py report ...) executam os mesmos relatórios a partir daqui.
+
+As consultas recebem parâmetros tipados (quantidade do top-N, lista de armas,
+intervalo de datas, país) como parâmetros nomeados do driver (%(nome)s): um
+novo recorte é só um novo valor, sem nova consulta. As listagens têm uma chave
+de ordenação única e são lidas em páginas por keyset (continuando depois da
+última chave vista), com custo constante por página em vez de OFFSET.
+"""
+import collections
+import datetime
+
+import psycopg2
+
+# Linhas por página das listagens na interface gráfica
+TAMANHO_PAGINA = 500
+
+# Estado de Resumo_Controle; contagem_tipos indica se a migração 004 (Resumo_Conflitos_Tipo) foi aplicada
+EstadoResumos = collections.namedtuple('EstadoResumos', 'modo desatualizado recalculado_em contagem_tipos')
+
+
+class Parametro:
+    """
+    Parâmetro tipado de um relatório. Os tipos são 'inteiro', 'texto', 'lista'
+    (de textos, separados por vírgula quando digitados) e 'data' (AAAA-MM-DD).
+    Um valor vazio vale o padrão; padrão None significa "sem filtro".
+    """
+
+    def __init__(self, nome, rotulo, tipo, padrao=None, minimo=None):
+        self.nome = nome
+        self.rotulo = rotulo
+        self.tipo = tipo
+        self.padrao = padrao
+        self.minimo = minimo
+
+    def converter(self, valor):
+        """Converte o texto digitado (ou um valor já tipado); ValueError se for inválido."""
+        if valor is None or (isinstance(valor, str) and not valor.strip()):
+            return self.padrao
+
+        if self.tipo == 'inteiro':
+            try:
+                valor = int(valor)
+            except (TypeError, ValueError):
+                raise ValueError(f"{self.rotulo}: informe um número inteiro.") from None
+            if self.minimo is not None and valor < self.minimo:
+                raise ValueError(f"{self.rotulo}: o valor mínimo é {self.minimo}.")
+            return valor
+        if self.tipo == 'lista':
+            itens = valor.split(',') if isinstance(valor, str) else valor
+            return [str(item).strip() for item in itens if str(item).strip()] or self.padrao
+        if self.tipo == 'data':
+            if isinstance(valor, datetime.date):
+                return valor
+            try:
+                return datetime.date.fromisoformat(valor.strip())
+            except ValueError:
+                raise ValueError(f"{self.rotulo}: a data '{valor}' é inválida. Use o formato AAAA-MM-DD.") from None
+        return str(valor).strip()
+
+    def formatar(self, valor):
+        """Texto a exibir no campo do parâmetro."""
+        if valor is None:
+            return ""
+        if self.tipo == 'lista':
+            return ", ".join(valor)
+        return str(valor)
+
+
+class Relatorio:
+    """Definição de um relatório: título, consultas, parâmetros e colunas a exibir."""
+
+    def __init__(self, nome, titulo, descricao, query, colunas, query_resumo=None, parametros=(),
+                 chave=None, grafico=False, contagem_tipos=False, serie=None):
+        self.nome = nome  # Identificador usado na linha de comando
+        self.titulo = titulo
+        self.descricao = descricao
+        self.query = query
+        self.colunas = colunas
+        self.query_resumo = query_resumo
+        self.parametros = list(parametros)
+        # Listagens: [(coluna do resultado, 'ASC' ou 'DESC'), ...], única por linha. As colunas
+        # além de 'colunas' só existem para a chave e não são exibidas nem exportadas
+        self.chave = chave
+        self.grafico = grafico  # Exibido como gráfico de barras na interface
+        # query_resumo lê Resumo_Conflitos_Tipo, mantida em qualquer modo (vale mesmo com os resumos desatualizados)
+        self.contagem_tipos = contagem_tipos
+        # Séries temporais, exibidas como gráfico de linhas: (coluna do eixo X, [colunas do eixo Y],
+        # coluna que separa as linhas ou None, coluna com o nome de cada linha). A que separa é
+        # um código único e, como as colunas só da chave, pode ficar fora de 'colunas'
+        self.serie = serie
+
+    def valores(self, brutos=None):
+        """Valores tipados de todos os parâmetros (os ausentes com o padrão)."""
+        brutos = dict(brutos or {})
+        desconhecidos = set(brutos) - {parametro.nome for parametro in self.parametros}
+        if desconhecidos:
+            raise ValueError(f"Parâmetro desconhecido para '{self.nome}': {', '.join(sorted(desconhecidos))}")
+        return {parametro.nome: parametro.converter(brutos.get(parametro.nome)) for parametro in self.parametros}
+
+    def chave_da_linha(self, linha, colunas):
+        """Valores da chave de uma linha do resultado, para pedir a página seguinte."""
+        return tuple(linha[colunas.index(coluna)] for coluna, _ in self.chave)
+
+    def series(self, linhas, colunas):
+        """
+        Linhas do gráfico de uma série temporal, [(nome, valores de X, valores de Y)]: uma por
+        medida e por valor da coluna que separa as linhas, nunca juntando grupos de mesmo nome.
+        """
+        coluna_x, colunas_y, coluna_grupo, coluna_nome = self.serie
+        indice_x = self.colunas.index(coluna_x)
+        indices_y = [self.colunas.index(coluna) for coluna in colunas_y]
+        indice_grupo = colunas.index(coluna_grupo) if coluna_grupo else None
+        indice_nome = self.colunas.index(coluna_nome) if coluna_nome else None
+        series = {}
+        for linha in linhas:
+            for coluna, indice in zip(colunas_y, indices_y):
+                if indice_grupo is None:
+                    chave, nome = coluna, coluna
+                else:
+                    chave = (linha[indice_grupo], coluna)
+                    nome = linha[indice_nome] if len(colunas_y) == 1 else f"{linha[indice_nome]} ({coluna})"
+                _, xs, ys = series.setdefault(chave, (nome, [], []))
+                xs.append(linha[indice_x])
+                ys.append(linha[indice])
+        return list(series.values())
+
+
+RELATORIOS = {}
+
+
+def _registrar(*args, **kwargs):
+    relatorio = Relatorio(*args, **kwargs)
+    RELATORIOS[relatorio.nome] = relatorio
+    return relatorio
+
+
+def _limite(padrao=5):
+    return Parametro('limite', "Quantidade", 'inteiro', padrao, minimo=1)
+
+
+_registrar(
+    'tipos-conflito', "Gráfico: Tipos de Conflito", "Número de conflitos de cada tipo.",
+    """
+    SELECT 'Territorial' AS tipo, COUNT(*) AS numero FROM Conflito_Territorial
+    UNION ALL
+    SELECT 'Religioso' AS tipo, COUNT(*) AS numero FROM Conflito_Religioso
+    UNION ALL
+    SELECT 'Econômico' AS tipo, COUNT(*) AS numero FROM Conflito_Economico
+    UNION ALL
+    SELECT 'Racial' AS tipo, COUNT(*) AS numero FROM Conflito_Racial;
+    """,
+    ["Tipo de Conflito", "Número de Conflitos"],
+    query_resumo="""
+    SELECT tipo, num_conflitos AS numero
+    FROM Resumo_Conflitos_Tipo
+    ORDER BY ordem;
+    """,
+    grafico=True,
+    contagem_tipos=True)
+
+_registrar(
+    'traficantes-barrett', "Traficantes por Arma",
+    "i. Traficantes e os grupos armados para os quais fornecem as armas informadas "
+    "(por padrão, “Barrett M82” ou “M200 Intervention”).",
+    """
+    SELECT DISTINCT t.nome_traficante, ga.nome_grupo
+    FROM Traficante_Armas t
+    JOIN Fornecimento_Arma_Grupo fag ON t.id_traficante = fag.id_traficante_fk
+    JOIN Grupo_Armado ga ON fag.cod_grupo_fk = ga.cod_grupo
+    WHERE fag.nome_arma_fk = ANY(%(armas)s::text[])
+    ORDER BY t.nome_traficante, ga.nome_grupo;
+    """,
+    ["Traficante", "Grupo Armado"],
+    query_resumo="""
+    SELECT DISTINCT t.nome_traficante, ga.nome_grupo
+    FROM Resumo_Fornecedores_Grupo r
+    JOIN Traficante_Armas t ON r.id_traficante_fk = t.id_traficante
+    JOIN Grupo_Armado ga ON r.cod_grupo_fk = ga.cod_grupo
+    WHERE r.nome_arma_fk = ANY(%(armas)s::text[])
+    ORDER BY t.nome_traficante, ga.nome_grupo;
+    """,
+    parametros=[Parametro('armas', "Armas", 'lista', ['Barrett M82', 'M200 Intervention'])])
+
+_registrar(
+    'top-conflitos-mortos', "Top N Conflitos (Mortos)",
+    "ii. Os maiores conflitos em número de mortos (5 por padrão), opcionalmente de um país.",
+    """
+    SELECT c.nome_conflito, c.num_mortos_atual
+    FROM Conflito c
+    WHERE %(pais)s::text IS NULL
+       OR EXISTS (SELECT 1 FROM Conflito_Afeta_Pais cap
+                  JOIN Pais p ON cap.cod_pais_fk = p.cod_pais
+                  WHERE cap.cod_conflito_fk = c.cod_conflito AND p.nome_pais = %(pais)s::text)
+    ORDER BY c.num_mortos_atual DESC
+    LIMIT %(limite)s;
+    """,
+    ["Conflito", "Número de Mortos"],
+    parametros=[_limite(), Parametro('pais', "País", 'texto')])
+
+# LEFT JOIN inclui organizações sem mediações (com 0), que não chegam ao topo
+_registrar(
+    'top-organizacoes', "Top N Organizações (Mediações)",
+    "iii. As maiores organizações em número de mediações (5 por padrão).",
+    """
+    SELECT om.nome_org, COUNT(oic.cod_conflito_fk) AS numero_mediacoes
+    FROM Organizacao_Mediadora om
+    LEFT JOIN Organizacao_Intervem_Conflito oic ON om.cod_org = oic.cod_org_fk
+    GROUP BY om.nome_org
+    ORDER BY numero_mediacoes DESC
+    LIMIT %(limite)s;
+    """,
+    ["Organização", "Número de Mediações"],
+    query_resumo="""
+    SELECT om.nome_org, r.num_mediacoes AS numero_mediacoes
+    FROM Resumo_Mediacoes_Org r
+    JOIN Organizacao_Mediadora om ON r.cod_org_fk = om.cod_org
+    ORDER BY r.num_mediacoes DESC
+    LIMIT %(limite)s;
+    """,
+    parametros=[_limite()])
+
+_registrar(
+    'top-grupos-armas', "Top N Grupos (Armas Recebidas)",
+    "iv. Os grupos armados com maior número de armas fornecidas (5 por padrão).",
+    """
+    SELECT ga.nome_grupo, COALESCE(SUM(fag.quantidade_fornecida), 0) AS total_armas_recebidas
+    FROM Grupo_Armado ga
+    LEFT JOIN Fornecimento_Arma_Grupo fag ON ga.cod_grupo = fag.cod_grupo_fk
+    GROUP BY ga.nome_grupo
+    ORDER BY total_armas_recebidas DESC
+    LIMIT %(limite)s;
+    """,
+    ["Grupo Armado", "Total de Armas Recebidas"],
+    query_resumo="""
+    SELECT ga.nome_grupo, r.total_armas AS total_armas_recebidas
+    FROM Resumo_Armas_Grupo r
+    JOIN Grupo_Armado ga ON r.cod_grupo_fk = ga.cod_grupo
+    ORDER BY r.total_armas DESC
+    LIMIT %(limite)s;
+    """,
+    parametros=[_limite()])
+
+# Os países empatados no topo aparecem todos
+_registrar(
+    'paises-religiosos', "País com Mais Conflitos Religiosos",
+    "v. O país (e o número de conflitos) com maior número de conflitos religiosos.",
+    """
+    WITH ConflitosReligiososPorPais AS (
+        SELECT
+            p.nome_pais,
+            COUNT(DISTINCT cr.cod_conflito_fk) AS numero_conflitos_religiosos
+        FROM Pais p
+        JOIN Conflito_Afeta_Pais cap ON p.cod_pais = cap.cod_pais_fk
+        JOIN Conflito c ON cap.cod_conflito_fk = c.cod_conflito
+        JOIN Conflito_Religioso cr ON c.cod_conflito = cr.cod_conflito_fk
+        GROUP BY p.nome_pais
+    ),
+    MaxConflitosReligiosos AS (
+        SELECT MAX(numero_conflitos_religiosos) AS max_cr
+        FROM ConflitosReligiososPorPais
+        WHERE numero_conflitos_religiosos > 0 -- Adicionado para garantir que haja pelo menos um
+    )
+    SELECT crpp.nome_pais, crpp.numero_conflitos_religiosos
+    FROM ConflitosReligiososPorPais crpp, MaxConflitosReligiosos mcr
+    WHERE crpp.numero_conflitos_religiosos = mcr.max_cr AND crpp.numero_conflitos_religiosos > 0
+    ORDER BY crpp.nome_pais;
+    """,
+    ["País", "Número de Conflitos Religiosos"],
+    query_resumo="""
+    SELECT p.nome_pais, r.num_conflitos_religiosos AS numero_conflitos_religiosos
+    FROM Resumo_Religiosos_Pais r
+    JOIN Pais p ON r.cod_pais_fk = p.cod_pais
+    WHERE r.num_conflitos_religiosos > 0
+      AND r.num_conflitos_religiosos = (SELECT MAX(num_conflitos_religiosos) FROM Resumo_Religiosos_Pais)
+    ORDER BY p.nome_pais;
+    """)
+
+# Listagens: sem ORDER BY aqui; a ordem (e a página) vem da chave. A chave de fornecimentos
+# é a própria chave primária, na ordem do índice idx_fornecimento_data_chave (sql/005)
+_registrar(
+    'fornecimentos', "Listar Fornecimentos de Armas",
+    "Fornecimentos de armas, opcionalmente por período e por armas.",
+    """
+    SELECT t.nome_traficante AS "Traficante", f.nome_arma_fk AS "Arma", g.nome_grupo AS "Grupo Armado",
+           f.quantidade_fornecida AS "Quantidade", f.data_fornecimento AS "Data",
+           f.id_traficante_fk, f.cod_grupo_fk
+    FROM Fornecimento_Arma_Grupo f
+    JOIN Traficante_Armas t ON f.id_traficante_fk = t.id_traficante
+    JOIN Grupo_Armado g ON f.cod_grupo_fk = g.cod_grupo
+    WHERE (%(desde)s::date IS NULL OR f.data_fornecimento >= %(desde)s::date)
+      AND (%(ate)s::date IS NULL OR f.data_fornecimento <= %(ate)s::date)
+      AND (%(armas)s::text[] IS NULL OR f.nome_arma_fk = ANY(%(armas)s::text[]))
+    """,
+    ["Traficante", "Arma", "Grupo Armado", "Quantidade", "Data"],
+    parametros=[Parametro('desde', "De", 'data'), Parametro('ate', "Até", 'data'),
+                Parametro('armas', "Armas", 'lista')],
+    chave=[("Data", 'DESC'), ("id_traficante_fk", 'ASC'), ("Arma", 'ASC'), ("cod_grupo_fk", 'ASC')])
+
+# A chave de participações vai até a incorporação, que também faz parte da chave primária: o
+# mesmo grupo pode entrar mais de uma vez no mesmo conflito, e uma chave com empates pularia
+# linhas na virada da página
+_registrar(
+    'participacoes', "Listar Participações em Conflitos",
+    "Participações de grupos armados em conflitos, opcionalmente por período de incorporação e por país.",
+    """
+    SELECT c.nome_conflito AS "Conflito", g.nome_grupo AS "Grupo Armado",
+           p.data_incorporacao AS "Incorporação", p.data_saida AS "Saída",
+           p.cod_conflito_fk, p.cod_grupo_fk
+    FROM Grupo_Armado_Participa_Conflito p
+    JOIN Conflito c ON p.cod_conflito_fk = c.cod_conflito
+    JOIN Grupo_Armado g ON p.cod_grupo_fk = g.cod_grupo
+    WHERE (%(desde)s::date IS NULL OR p.data_incorporacao >= %(desde)s::date)
+      AND (%(ate)s::date IS NULL OR p.data_incorporacao <= %(ate)s::date)
+      AND (%(pais)s::text IS NULL
+           OR EXISTS (SELECT 1 FROM Conflito_Afeta_Pais cap
+                      JOIN Pais pa ON cap.cod_pais_fk = pa.cod_pais
+                      WHERE cap.cod_conflito_fk = p.cod_conflito_fk AND pa.nome_pais = %(pais)s::text))
+    """,
+    ["Conflito", "Grupo Armado", "Incorporação", "Saída"],
+    parametros=[Parametro('desde', "Incorporação de", 'data'), Parametro('ate', "Até", 'data'),
+                Parametro('pais', "País", 'texto')],
+    chave=[("Conflito", 'ASC'), ("cod_conflito_fk", 'ASC'), ("Grupo Armado", 'ASC'), ("cod_grupo_fk", 'ASC'),
+           ("Incorporação", 'ASC')])
+
+# Séries temporais das participações (sql/009): o período vai do mês de 'desde' (por padrão, cinco
+# anos atrás) ao mês de 'ate' (por padrão, o atual), em meses inteiros. As condições de data usam
+# expressões estáveis, sem subconsulta, para o índice BRIN de data_incorporacao descartar as faixas
+# fora do período mesmo com a consulta preparada (plano genérico).
+_PRIMEIRO_MES = "date_trunc('month', COALESCE(%(desde)s::date, CURRENT_DATE - interval '5 years'))::date"
+_ULTIMO_MES = "date_trunc('month', COALESCE(%(ate)s::date, CURRENT_DATE))::date"
+_APOS_ULTIMO_MES = f"({_ULTIMO_MES} + interval '1 month')::date"
+
+
+def _periodo():
+    return [Parametro('desde', "De", 'data'), Parametro('ate', "Até", 'data')]
+
+
+_registrar(
+    'entradas-mensais', "Série: Entradas Mensais por Conflito",
+    "Grupos armados que entraram em cada conflito, mês a mês, nos conflitos com mais entradas no "
+    "período (5 por padrão; últimos cinco anos se não houver datas), com o total acumulado.",
+    f"""
+    WITH entradas AS (
+        SELECT p.cod_conflito_fk, date_trunc('month', p.data_incorporacao)::date AS mes, COUNT(*) AS entradas
+        FROM Grupo_Armado_Participa_Conflito p
+        WHERE p.data_incorporacao >= {_PRIMEIRO_MES} AND p.data_incorporacao < {_APOS_ULTIMO_MES}
+          AND (%(conflito)s::text IS NULL
+               OR p.cod_conflito_fk IN (SELECT cod_conflito FROM Conflito WHERE nome_conflito = %(conflito)s::text))
+        GROUP BY p.cod_conflito_fk, mes
+    ),
+    principais AS (
+        SELECT cod_conflito_fk
+        FROM entradas
+        GROUP BY cod_conflito_fk
+        ORDER BY SUM(entradas) DESC, cod_conflito_fk
+        LIMIT %(limite)s
+    )
+    SELECT e.mes, c.nome_conflito, e.entradas,
+           SUM(e.entradas) OVER (PARTITION BY e.cod_conflito_fk ORDER BY e.mes) AS acumulado,
+           e.cod_conflito_fk
+    FROM entradas e
+    JOIN principais pr ON pr.cod_conflito_fk = e.cod_conflito_fk
+    JOIN Conflito c ON c.cod_conflito = e.cod_conflito_fk
+    ORDER BY e.mes, c.nome_conflito, e.cod_conflito_fk;
+    """,
+    ["Mês", "Conflito", "Entradas", "Acumulado"],
+    parametros=[_limite()] + _periodo() + [Parametro('conflito', "Conflito", 'texto')],
+    serie=("Mês", ["Entradas"], "cod_conflito_fk", "Conflito"))
+
+# Uma participação está ativa do mês de incorporação ao mês da saída (ou até hoje, sem saída): a
+# contagem mensal é a das ativas no início do período mais a soma acumulada de entradas e saídas
+_registrar(
+    'participacoes-ativas', "Série: Participações Ativas em Conflitos",
+    "Participações de grupos armados em conflitos ativas em cada mês (últimos cinco anos se não "
+    "houver datas), com a média móvel de N meses (3 por padrão).",
+    f"""
+    WITH base AS (
+        SELECT COUNT(*) AS ativas
+        FROM Grupo_Armado_Participa_Conflito p
+        WHERE p.data_incorporacao < {_PRIMEIRO_MES}
+          AND (p.data_saida IS NULL OR p.data_saida >= {_PRIMEIRO_MES})
+    ),
+    variacao AS (
+        SELECT date_trunc('month', p.data_incorporacao)::date AS mes, COUNT(*) AS delta
+        FROM Grupo_Armado_Participa_Conflito p
+        WHERE p.data_incorporacao >= {_PRIMEIRO_MES} AND p.data_incorporacao < {_APOS_ULTIMO_MES}
+        GROUP BY 1
+        UNION ALL
+        -- A participação encerrada deixa de contar no mês seguinte ao da saída
+        SELECT (date_trunc('month', p.data_saida) + interval '1 month')::date, -COUNT(*)
+        FROM Grupo_Armado_Participa_Conflito p
+        WHERE p.data_saida >= {_PRIMEIRO_MES} AND p.data_saida < {_ULTIMO_MES}
+        GROUP BY 1
+    ),
+    serie AS (
+        SELECT m.mes::date AS mes, b.ativas + SUM(COALESCE(v.delta, 0)) OVER (ORDER BY m.mes) AS ativas
+        FROM generate_series({_PRIMEIRO_MES}, {_ULTIMO_MES}, interval '1 month') AS m(mes)
+        CROSS JOIN base b
+        LEFT JOIN (SELECT mes, SUM(delta) AS delta FROM variacao GROUP BY mes) v ON v.mes = m.mes::date
+    )
+    SELECT mes, ativas,
+           ROUND(AVG(ativas) OVER (ORDER BY mes ROWS BETWEEN %(janela)s - 1 PRECEDING AND CURRENT ROW), 1)
+               AS media_movel
+    FROM serie
+    ORDER BY mes;
+    """,
+    ["Mês", "Participações Ativas", "Média Móvel"],
+    parametros=_periodo() + [Parametro('janela', "Média de (meses)", 'inteiro', 3, minimo=1)],
+    serie=("Mês", ["Participações Ativas", "Média Móvel"], None, None))
+
+_registrar(
+    'escalada-conflitos', "Série: Curva de Escalada dos Conflitos",
+    "Grupos armados acumulados em cada conflito, mês a mês desde a primeira entrada no período, "
+    "nos conflitos com mais grupos (5 por padrão), com a variação das entradas sobre o mês anterior.",
+    f"""
+    WITH entradas AS (
+        SELECT p.cod_conflito_fk, date_trunc('month', p.data_incorporacao)::date AS mes, COUNT(*) AS novos
+        FROM Grupo_Armado_Participa_Conflito p
+        WHERE p.data_incorporacao >= {_PRIMEIRO_MES} AND p.data_incorporacao < {_APOS_ULTIMO_MES}
+        GROUP BY p.cod_conflito_fk, mes
+    ),
+    principais AS (
+        SELECT cod_conflito_fk
+        FROM entradas
+        GROUP BY cod_conflito_fk
+        ORDER BY SUM(novos) DESC, cod_conflito_fk
+        LIMIT %(limite)s
+    ),
+    curvas AS (
+        SELECT e.cod_conflito_fk, e.mes, e.novos,
+               SUM(e.novos) OVER janela AS acumulado,
+               e.novos - COALESCE(LAG(e.novos) OVER janela, 0) AS variacao,
+               FIRST_VALUE(e.mes) OVER janela AS inicio
+        FROM entradas e
+        JOIN principais pr ON pr.cod_conflito_fk = e.cod_conflito_fk
+        WINDOW janela AS (PARTITION BY e.cod_conflito_fk ORDER BY e.mes)
+    )
+    SELECT c.nome_conflito,
+           (EXTRACT(YEAR FROM age(cu.mes, cu.inicio)) * 12 + EXTRACT(MONTH FROM age(cu.mes, cu.inicio)))::int
+               AS meses,
+           cu.novos, cu.acumulado, cu.variacao, cu.cod_conflito_fk
+    FROM curvas cu
+    JOIN Conflito c ON c.cod_conflito = cu.cod_conflito_fk
+    ORDER BY c.nome_conflito, cu.cod_conflito_fk, meses;
+    """,
+    ["Conflito", "Meses desde a Primeira Entrada", "Novos Grupos", "Grupos Acumulados", "Variação"],
+    parametros=[_limite()] + _periodo(),
+    serie=("Meses desde a Primeira Entrada", ["Grupos Acumulados"], "cod_conflito_fk", "Conflito"))
+
+
+# --- EXECUÇÃO ---
+def ler_estado_resumos(conn):
+    """
+    EstadoResumos lido de Resumo_Controle, ou None se os resumos não existirem
+    (migração 002 não aplicada). Encerra a transação de leitura.
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT modo, desatualizado, recalculado_em,
+                       to_regclass('resumo_conflitos_tipo') IS NOT NULL AS contagem_tipos
+                FROM Resumo_Controle
+            """)
+            linha = cursor.fetchone()
+    except psycopg2.Error:
+        linha = None
+    conn.rollback()
+    return EstadoResumos(*linha) if linha else None
+
+
+def query_para(relatorio, estado_resumos):
+    """A consulta sobre os resumos quando eles estão em dia; caso contrário, a das tabelas base."""
+    if not relatorio.query_resumo or not estado_resumos:
+        return relatorio.query
+    if relatorio.contagem_tipos:
+        return relatorio.query_resumo if estado_resumos.contagem_tipos else relatorio.query
+    return relatorio.query if estado_resumos.desatualizado else relatorio.query_resumo
+
+
+def _ordenar_por_chave(relatorio, query, params, apos, tamanho, visiveis=False):
+    """
+    Envolve a listagem na ordem da chave e, com 'apos', continua depois dessa chave. A
+    condição expandida (k1 > v1 OR (k1 = v1 AND k2 > v2) ...) aceita direções mistas; a
+    primeira coluna também limita o intervalo (k1 >= v1) para o índice começar dali.
+    Com visiveis, seleciona só as colunas exibidas (a ordem continua sendo a da chave).
+    """
+    colunas = [(f'r."{coluna}"', direcao) for coluna, direcao in relatorio.chave]
+    condicao = ""
+    if apos is not None:
+        params.update({f"_apos_{i}": valor for i, valor in enumerate(apos)})
+        termos = []
+        for i, (coluna, direcao) in enumerate(colunas):
+            comparacoes = [f"{anterior} = %(_apos_{j})s" for j, (anterior, _) in enumerate(colunas[:i])]
+            comparacoes.append(f"{coluna} {'<' if direcao == 'DESC' else '>'} %(_apos_{i})s")
+            termos.append(f"({' AND '.join(comparacoes)})")
+        primeira, direcao = colunas[0]
+        condicao = f"WHERE {primeira} {'<=' if direcao == 'DESC' else '>='} %(_apos_0)s AND ({' OR '.join(termos)})"
+
+    ordem = ", ".join(f"{coluna} {direcao}" for coluna, direcao in colunas)
+    selecao = ", ".join(f'r."{coluna}"' for coluna in relatorio.colunas) if visiveis else "*"
+    query = f"SELECT {selecao} FROM ({query}) AS r {condicao} ORDER BY {ordem}"
+    if tamanho:
+        # Uma linha a mais indica se existe próxima página
+        params['_tamanho'] = tamanho + 1
+        query += " LIMIT %(_tamanho)s"
+    return query, params
+
+
+def compilar(relatorio, valores=None, estado_resumos=None, apos=None, tamanho=None, visiveis=False):
+    """
+    (sql, parâmetros) do relatório com os valores informados (texto ou já tipados).
+    Nas listagens, tamanho limita a uma página e apos é a chave da última linha da
+    página anterior (Relatorio.chave_da_linha); com visiveis, as colunas que só
+    existem para a chave ficam fora do resultado. ValueError se algum valor for inválido.
+    """
+    params = relatorio.valores(valores)
+    query = query_para(relatorio, estado_resumos).strip().rstrip(';')
+    if relatorio.chave:
+        query, params = _ordenar_por_chave(relatorio, query, params, apos, tamanho, visiveis)
+    return query, params
@@ -0,0 +1,147 @@
+import collections
+import re
+import sys
+import threading
+import time
+
+# Resultados guardados, no máximo; os usados há mais tempo saem primeiro
+MAX_RESULTADOS = 64
+# Validade (s) de um resultado, mesmo sem nenhuma alteração conhecida nas tabelas
+TTL_RESULTADO = 300
+# Memória estimada (bytes) ocupada pelas linhas em cache
+MAX_BYTES = 64 * 1024 * 1024
+
+PADRAO_TABELA = re.compile(r'\b(?:FROM|JOIN)\s+([A-Za-z_]\w*)', re.IGNORECASE)
+
+# Tabelas de resumo (sql/002 e 004) -> tabelas base cujos triggers as mantêm. Uma escrita
+# numa tabela base muda o resumo na mesma transação, sem que a aplicação escreva nele;
+# Resumo_Controle muda a cada recálculo completo.
+DEPENDENCIAS_RESUMOS = {
+    'resumo_armas_grupo': ('fornecimento_arma_grupo', 'grupo_armado', 'resumo_controle'),
+    'resumo_fornecedores_grupo': ('fornecimento_arma_grupo', 'grupo_armado', 'resumo_controle'),
+    'resumo_mediacoes_org': ('organizacao_intervem_conflito', 'organizacao_mediadora', 'resumo_controle'),
+    'resumo_religiosos_pais': ('conflito_afeta_pais', 'conflito_religioso', 'resumo_controle'),
+    'resumo_conflitos_tipo': ('conflito_territorial', 'conflito_religioso',
+                              'conflito_economico', 'conflito_racial'),
+}
+
+
+def tabelas_da_consulta(query):
+    """Tabelas lidas pela consulta (nomes após FROM/JOIN, em minúsculas), com as bases dos resumos."""
+    tabelas = {nome.lower() for nome in PADRAO_TABELA.findall(query)}
+    for resumo in tabelas & DEPENDENCIAS_RESUMOS.keys():
+        tabelas.update(DEPENDENCIAS_RESUMOS[resumo])
+    return frozenset(tabelas)
+
+
+def _congelar(valor):
+    """Parâmetros como chave de dicionário (listas viram tuplas)."""
+    if isinstance(valor, dict):
+        return tuple(sorted((chave, _congelar(v)) for chave, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+
+def _tamanho(linhas):
+    """Estimativa da memória ocupada pelas linhas (lista de tuplas)."""
+    total = sys.getsizeof(linhas)
+    for linha in linhas:
+        total += sys.getsizeof(linha) + sum(sys.getsizeof(valor) for valor in linha)
+    return total
+
+
+_Entrada = collections.namedtuple('_Entrada', 'linhas colunas versoes criado_em tamanho')
+
+
+class ResultCache:
+    """
+    Cache dos resultados dos relatórios, com LRU, TTL e limite de memória.
+
+    A chave é a consulta compilada com os seus parâmetros, o que já distingue o
+    relatório, os valores dos parâmetros, a variante (resumos ou tabelas base) e a
+    página. Cada resultado guarda a versão de cada tabela que a consulta lê no
+    momento em que foi pedida; invalidar(tabela) incrementa a versão (escritas da
+    aplicação e NOTIFYs de outros clientes), e um resultado com alguma versão
+    antiga é descartado. O TTL cobre tabelas que mudam sem aviso.
+    """
+
+    def __init__(self, max_resultados=MAX_RESULTADOS, ttl=TTL_RESULTADO, max_bytes=MAX_BYTES):
+        self.max_resultados = max_resultados
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._resultados = collections.OrderedDict()
+        self._versoes = collections.Counter()
+        # Incrementada por invalidar() sem tabelas: invalida tudo, inclusive o que está em andamento
+        self._epoca = 0
+        self._bytes = 0
+        self._stats = {'acertos': 0, 'faltas': 0, 'expirados': 0, 'invalidados': 0, 'descartados': 0}
+
+    def versoes(self, query):
+        """Versões atuais das tabelas da consulta; capture antes de executá-la e passe a guardar()."""
+        with self._lock:
+            return self._epoca, {tabela: self._versoes[tabela] for tabela in tabelas_da_consulta(query)}
+
+    def obter(self, query, params=None):
+        """(linhas, colunas) em cache e ainda válido, ou None."""
+        chave = (query, _congelar(params))
+        with self._lock:
+            entrada = self._resultados.get(chave)
+            if entrada is None:
+                self._stats['faltas'] += 1
+                return None
+            if time.monotonic() - entrada.criado_em > self.ttl:
+                self._remover(chave)
+                self._stats['expirados'] += 1
+                self._stats['faltas'] += 1
+                return None
+            self._resultados.move_to_end(chave)
+            self._stats['acertos'] += 1
+            return entrada.linhas, entrada.colunas
+
+    def guardar(self, query, params, linhas, colunas, versoes):
+        """Guarda o resultado, a menos que alguma tabela tenha mudado desde versoes()."""
+        epoca, versoes_tabelas = versoes
+        tamanho = _tamanho(linhas)
+        if tamanho > self.max_bytes:
+            return
+        chave = (query, _congelar(params))
+        with self._lock:
+            if epoca != self._epoca or any(self._versoes[tabela] != versao
+                                           for tabela, versao in versoes_tabelas.items()):
+                return
+            if chave in self._resultados:
+                self._remover(chave)
+            self._resultados[chave] = _Entrada(linhas, colunas, versoes_tabelas, time.monotonic(), tamanho)
+            self._bytes += tamanho
+            while len(self._resultados) > self.max_resultados or self._bytes > self.max_bytes:
+                self._remover(next(iter(self._resultados)))
+                self._stats['descartados'] += 1
+
+    def invalidar(self, *tabelas):
+        """Incrementa a versão das tabelas (ou de todas) e descarta os resultados que as leem."""
+        tabelas = {tabela.lower() for tabela in tabelas}
+        with self._lock:
+            if not tabelas:
+                self._epoca += 1
+                afetados = list(self._resultados)
+            else:
+                self._versoes.update(tabelas)
+                afetados = [chave for chave, entrada in self._resultados.items()
+                            if tabelas & entrada.versoes.keys()]
+            for chave in afetados:
+                self._remover(chave)
+            self._stats['invalidados'] += len(afetados)
+
+    def _remover(self, chave):
+        self._bytes -= self._resultados.pop(chave).tamanho
+
+    def estatisticas(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['resultados'] = len(self._resultados)
+            stats['bytes'] = self._bytes
+        consultas = stats['acertos'] + stats['faltas']
+        stats['taxa_acertos'] = stats['acertos'] / consultas if consultas else 0.0
+        return stats
@@ -0,0 +1,78 @@
+import tkinter as tk
+from tkinter import ttk
+
+from option_list import OptionList
+
+# Espera (ms) após a última tecla antes de buscar: digitar um nome inteiro gera uma só busca
+ATRASO_BUSCA = 200
+
+
+class SearchListbox(ttk.Frame):
+    """
+    Campo de busca sobre uma Listbox de seleção múltipla.
+
+    A lista mostra só o resultado de buscar(termo), uma função que devolve linhas
+    (código, nome) já limitadas (ReferenceSearch). A seleção é guardada por código,
+    fora da Listbox, e sobrevive às buscas: os itens selecionados ficam sempre no
+    topo da lista, mesmo quando não correspondem ao termo atual. Cada mudança na
+    seleção gera o evento virtual <<SelecaoAlterada>>.
+    """
+
+    def __init__(self, master, buscar, altura=8, **opcoes_listbox):
+        super().__init__(master)
+        self.buscar = buscar
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.termo = tk.StringVar()
+        ttk.Entry(self, textvariable=self.termo).grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 2))
+        self.termo.trace_add('write', self._agendar_busca)
+
+        self.listbox = tk.Listbox(self, selectmode=tk.EXTENDED, height=altura, exportselection=False,
+                                  **opcoes_listbox)
+        self.listbox.grid(row=1, column=0, sticky="nsew")
+        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.listbox.yview)
+        scrollbar.grid(row=1, column=1, sticky="ns")
+        self.listbox.config(yscrollcommand=scrollbar.set)
+        self.listbox.bind("<<ListboxSelect>>", self._ao_selecionar)
+
+        self.opcoes = OptionList(self.listbox)  # Chaves (código, nome) na ordem da Listbox
+        self._selecionados = {}  # código -> nome dos itens selecionados
+        self._busca_agendada = None
+
+    def recarregar(self):
+        """Busca o termo atual imediatamente e preenche a lista."""
+        if self._busca_agendada is not None:
+            self.after_cancel(self._busca_agendada)
+            self._busca_agendada = None
+        linhas = self.buscar(self.termo.get())
+
+        itens = list(self._selecionados.items())
+        itens += [(codigo, nome) for codigo, nome in linhas if codigo not in self._selecionados]
+        self.opcoes.preencher([((codigo, nome), f"{codigo} - {nome}") for codigo, nome in itens])
+        if self._selecionados:
+            self.listbox.selection_set(0, len(self._selecionados) - 1)
+
+    def selecionados(self):
+        """Itens (código, nome) selecionados, em qualquer busca."""
+        return list(self._selecionados.items())
+
+    def limpar_selecao(self):
+        self._selecionados.clear()
+        self.listbox.selection_clear(0, tk.END)
+        self.event_generate("<<SelecaoAlterada>>")
+
+    def _agendar_busca(self, *args):
+        if self._busca_agendada is not None:
+            self.after_cancel(self._busca_agendada)
+        self._busca_agendada = self.after(ATRASO_BUSCA, self.recarregar)
+
+    def _ao_selecionar(self, event=None):
+        # A seleção da Listbox só cobre os itens visíveis, que incluem todos os já selecionados
+        self._selecionados = dict(self.opcoes.selecionadas())
+        self.event_generate("<<SelecaoAlterada>>")
+
+    def destroy(self):
+        if self._busca_agendada is not None:
+            self.after_cancel(self._busca_agendada)
+        super().destroy()
@@ -0,0 +1,31 @@
+-- =====================================================
+-- 001 - NOTIFICAÇÃO DE ALTERAÇÕES (LISTEN/NOTIFY)
+-- =====================================================
+-- Avisa os clientes conectados (canal 'conflitos_alteracoes') sempre que uma
+-- tabela de referência muda, para que invalidem seus caches locais.
+-- O payload é o nome da tabela alterada.
+
+CREATE OR REPLACE FUNCTION fn_notifica_alteracao()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('conflitos_alteracoes', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Triggers por comando (FOR EACH STATEMENT): uma carga com milhares de linhas gera
+-- uma única notificação por tabela, e não uma por linha.
+DO $$
+DECLARE
+    tabela TEXT;
+BEGIN
+    FOREACH tabela IN ARRAY ARRAY['pais', 'regiao', 'religiao_entidade', 'materia_prima', 'etnia',
+                                  'grupo_armado', 'lider_politico', 'divisao', 'conflito']
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS tg_notifica_alteracao ON %I', tabela);
+        EXECUTE format('CREATE TRIGGER tg_notifica_alteracao
+                            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+                            FOR EACH STATEMENT EXECUTE FUNCTION fn_notifica_alteracao()', tabela);
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,264 @@
+-- =====================================================
+-- 002 - TABELAS DE RESUMO DOS RELATÓRIOS
+-- =====================================================
+-- Totais pré-calculados para os relatórios fixos, mantidos por triggers a cada
+-- escrita nas tabelas base. Cada relatório vira uma busca top-k por índice.
+--
+-- Modo de atualização (Resumo_Controle.modo):
+--   'incremental' - os triggers aplicam a variação de cada linha nos resumos;
+--   'adiado'      - os triggers apenas marcam os resumos como desatualizados e
+--                   sp_recalcular_resumos() os reconstrói de uma vez (útil em cargas).
+-- Uma sessão pode sobrepor o modo com SET LOCAL conflitos.modo_resumos = 'adiado'.
+
+CREATE TABLE Resumo_Controle (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    modo VARCHAR(20) NOT NULL DEFAULT 'incremental' CHECK (modo IN ('incremental', 'adiado')),
+    desatualizado BOOLEAN NOT NULL DEFAULT FALSE,
+    recalculado_em TIMESTAMP
+);
+
+INSERT INTO Resumo_Controle DEFAULT VALUES;
+
+-- Total de armas recebidas por grupo (relatório iv)
+CREATE TABLE Resumo_Armas_Grupo (
+    cod_grupo_fk INT PRIMARY KEY REFERENCES Grupo_Armado(cod_grupo) ON DELETE CASCADE,
+    total_armas BIGINT NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_resumo_armas_grupo_total ON Resumo_Armas_Grupo (total_armas DESC);
+
+-- Número de mediações por organização (relatório iii)
+CREATE TABLE Resumo_Mediacoes_Org (
+    cod_org_fk INT PRIMARY KEY REFERENCES Organizacao_Mediadora(cod_org) ON DELETE CASCADE,
+    num_mediacoes INT NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_resumo_mediacoes_org_num ON Resumo_Mediacoes_Org (num_mediacoes DESC);
+
+-- Número de conflitos religiosos que afetam cada país (relatório v)
+CREATE TABLE Resumo_Religiosos_Pais (
+    cod_pais_fk INT PRIMARY KEY REFERENCES Pais(cod_pais) ON DELETE CASCADE,
+    num_conflitos_religiosos INT NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_resumo_religiosos_pais_num ON Resumo_Religiosos_Pais (num_conflitos_religiosos DESC);
+
+-- Pares traficante/grupo por tipo de arma, sem as datas (relatório i)
+CREATE TABLE Resumo_Fornecedores_Grupo (
+    nome_arma_fk VARCHAR(255),
+    id_traficante_fk INT,
+    cod_grupo_fk INT,
+    num_fornecimentos INT NOT NULL,
+    PRIMARY KEY (nome_arma_fk, id_traficante_fk, cod_grupo_fk)
+);
+
+-- Relatório ii já lê uma coluna de Conflito; basta o índice para o top-k
+CREATE INDEX idx_conflito_num_mortos ON Conflito (num_mortos_atual DESC);
+
+-- =====================================================
+-- MODO DE ATUALIZAÇÃO E RECÁLCULO
+-- =====================================================
+-- Retorna TRUE se os triggers devem aplicar a variação; no modo adiado, marca os resumos como desatualizados
+CREATE OR REPLACE FUNCTION fn_resumos_incrementais()
+RETURNS BOOLEAN AS $$
+DECLARE
+    modo_atual TEXT;
+BEGIN
+    modo_atual := NULLIF(current_setting('conflitos.modo_resumos', true), '');
+    IF modo_atual IS NULL THEN
+        SELECT modo INTO modo_atual FROM Resumo_Controle;
+    END IF;
+
+    IF modo_atual = 'incremental' THEN
+        RETURN TRUE;
+    END IF;
+
+    UPDATE Resumo_Controle SET desatualizado = TRUE WHERE NOT desatualizado;
+    RETURN FALSE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Reconstrói todos os resumos a partir das tabelas base
+CREATE OR REPLACE FUNCTION sp_recalcular_resumos()
+RETURNS VOID AS $$
+BEGIN
+    -- DELETE em vez de TRUNCATE para não bloquear os relatórios durante o recálculo
+    DELETE FROM Resumo_Armas_Grupo;
+    INSERT INTO Resumo_Armas_Grupo (cod_grupo_fk, total_armas)
+    SELECT ga.cod_grupo, COALESCE(SUM(fag.quantidade_fornecida), 0)
+    FROM Grupo_Armado ga
+    LEFT JOIN Fornecimento_Arma_Grupo fag ON ga.cod_grupo = fag.cod_grupo_fk
+    GROUP BY ga.cod_grupo;
+
+    DELETE FROM Resumo_Mediacoes_Org;
+    INSERT INTO Resumo_Mediacoes_Org (cod_org_fk, num_mediacoes)
+    SELECT om.cod_org, COUNT(oic.cod_conflito_fk)
+    FROM Organizacao_Mediadora om
+    LEFT JOIN Organizacao_Intervem_Conflito oic ON om.cod_org = oic.cod_org_fk
+    GROUP BY om.cod_org;
+
+    DELETE FROM Resumo_Religiosos_Pais;
+    INSERT INTO Resumo_Religiosos_Pais (cod_pais_fk, num_conflitos_religiosos)
+    SELECT cap.cod_pais_fk, COUNT(*)
+    FROM Conflito_Afeta_Pais cap
+    JOIN Conflito_Religioso cr ON cap.cod_conflito_fk = cr.cod_conflito_fk
+    GROUP BY cap.cod_pais_fk;
+
+    DELETE FROM Resumo_Fornecedores_Grupo;
+    INSERT INTO Resumo_Fornecedores_Grupo (nome_arma_fk, id_traficante_fk, cod_grupo_fk, num_fornecimentos)
+    SELECT nome_arma_fk, id_traficante_fk, cod_grupo_fk, COUNT(*)
+    FROM Fornecimento_Arma_Grupo
+    GROUP BY nome_arma_fk, id_traficante_fk, cod_grupo_fk;
+
+    UPDATE Resumo_Controle SET desatualizado = FALSE, recalculado_em = now();
+END;
+$$ LANGUAGE plpgsql;
+
+-- Troca o modo persistente; ao voltar para 'incremental', recalcula se algo mudou no modo adiado
+CREATE OR REPLACE FUNCTION sp_definir_modo_resumos(novo_modo VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    UPDATE Resumo_Controle SET modo = novo_modo;
+    IF novo_modo = 'incremental' AND (SELECT desatualizado FROM Resumo_Controle) THEN
+        PERFORM sp_recalcular_resumos();
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- TRIGGERS DE MANUTENÇÃO INCREMENTAL
+-- =====================================================
+-- Novos grupos e organizações entram nos resumos com zero (os relatórios consideram quem tem 0)
+CREATE OR REPLACE FUNCTION fn_resumo_nova_entidade()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NOT fn_resumos_incrementais() THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_TABLE_NAME = 'grupo_armado' THEN
+        INSERT INTO Resumo_Armas_Grupo (cod_grupo_fk) VALUES (NEW.cod_grupo);
+    ELSE
+        INSERT INTO Resumo_Mediacoes_Org (cod_org_fk) VALUES (NEW.cod_org);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tg_resumo_novo_grupo
+    AFTER INSERT ON Grupo_Armado
+    FOR EACH ROW EXECUTE FUNCTION fn_resumo_nova_entidade();
+
+CREATE TRIGGER tg_resumo_nova_org
+    AFTER INSERT ON Organizacao_Mediadora
+    FOR EACH ROW EXECUTE FUNCTION fn_resumo_nova_entidade();
+
+-- Fornecimentos: total de armas por grupo e pares traficante/grupo por arma
+CREATE OR REPLACE FUNCTION fn_resumo_fornecimento()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NOT fn_resumos_incrementais() THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE Resumo_Armas_Grupo SET total_armas = total_armas - OLD.quantidade_fornecida
+        WHERE cod_grupo_fk = OLD.cod_grupo_fk;
+
+        UPDATE Resumo_Fornecedores_Grupo SET num_fornecimentos = num_fornecimentos - 1
+        WHERE nome_arma_fk = OLD.nome_arma_fk AND id_traficante_fk = OLD.id_traficante_fk
+          AND cod_grupo_fk = OLD.cod_grupo_fk;
+        DELETE FROM Resumo_Fornecedores_Grupo
+        WHERE nome_arma_fk = OLD.nome_arma_fk AND id_traficante_fk = OLD.id_traficante_fk
+          AND cod_grupo_fk = OLD.cod_grupo_fk AND num_fornecimentos <= 0;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO Resumo_Armas_Grupo (cod_grupo_fk, total_armas)
+        VALUES (NEW.cod_grupo_fk, NEW.quantidade_fornecida)
+        ON CONFLICT (cod_grupo_fk) DO UPDATE
+            SET total_armas = Resumo_Armas_Grupo.total_armas + EXCLUDED.total_armas;
+
+        INSERT INTO Resumo_Fornecedores_Grupo (nome_arma_fk, id_traficante_fk, cod_grupo_fk, num_fornecimentos)
+        VALUES (NEW.nome_arma_fk, NEW.id_traficante_fk, NEW.cod_grupo_fk, 1)
+        ON CONFLICT (nome_arma_fk, id_traficante_fk, cod_grupo_fk) DO UPDATE
+            SET num_fornecimentos = Resumo_Fornecedores_Grupo.num_fornecimentos + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tg_resumo_fornecimento
+    AFTER INSERT OR UPDATE OR DELETE ON Fornecimento_Arma_Grupo
+    FOR EACH ROW EXECUTE FUNCTION fn_resumo_fornecimento();
+
+-- Intervenções: número de mediações por organização
+CREATE OR REPLACE FUNCTION fn_resumo_mediacao()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NOT fn_resumos_incrementais() THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE Resumo_Mediacoes_Org SET num_mediacoes = num_mediacoes - 1
+        WHERE cod_org_fk = OLD.cod_org_fk;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO Resumo_Mediacoes_Org (cod_org_fk, num_mediacoes)
+        VALUES (NEW.cod_org_fk, 1)
+        ON CONFLICT (cod_org_fk) DO UPDATE
+            SET num_mediacoes = Resumo_Mediacoes_Org.num_mediacoes + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tg_resumo_mediacao
+    AFTER INSERT OR UPDATE OR DELETE ON Organizacao_Intervem_Conflito
+    FOR EACH ROW EXECUTE FUNCTION fn_resumo_mediacao();
+
+-- Países afetados por conflitos religiosos: muda quando um país é associado/desassociado
+-- de um conflito religioso, ou quando um conflito passa a ser/deixa de ser religioso
+CREATE OR REPLACE FUNCTION fn_resumo_religiosos_pais()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NOT fn_resumos_incrementais() THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_TABLE_NAME = 'conflito_afeta_pais' THEN
+        IF TG_OP IN ('UPDATE', 'DELETE')
+           AND EXISTS (SELECT 1 FROM Conflito_Religioso WHERE cod_conflito_fk = OLD.cod_conflito_fk) THEN
+            UPDATE Resumo_Religiosos_Pais SET num_conflitos_religiosos = num_conflitos_religiosos - 1
+            WHERE cod_pais_fk = OLD.cod_pais_fk;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE')
+           AND EXISTS (SELECT 1 FROM Conflito_Religioso WHERE cod_conflito_fk = NEW.cod_conflito_fk) THEN
+            INSERT INTO Resumo_Religiosos_Pais (cod_pais_fk, num_conflitos_religiosos)
+            VALUES (NEW.cod_pais_fk, 1)
+            ON CONFLICT (cod_pais_fk) DO UPDATE
+                SET num_conflitos_religiosos = Resumo_Religiosos_Pais.num_conflitos_religiosos + 1;
+        END IF;
+    ELSIF TG_OP = 'INSERT' THEN  -- Conflito_Religioso
+        INSERT INTO Resumo_Religiosos_Pais (cod_pais_fk, num_conflitos_religiosos)
+        SELECT cod_pais_fk, 1 FROM Conflito_Afeta_Pais WHERE cod_conflito_fk = NEW.cod_conflito_fk
+        ON CONFLICT (cod_pais_fk) DO UPDATE
+            SET num_conflitos_religiosos = Resumo_Religiosos_Pais.num_conflitos_religiosos + 1;
+    ELSE  -- DELETE em Conflito_Religioso
+        UPDATE Resumo_Religiosos_Pais r SET num_conflitos_religiosos = r.num_conflitos_religiosos - 1
+        FROM Conflito_Afeta_Pais cap
+        WHERE cap.cod_conflito_fk = OLD.cod_conflito_fk AND r.cod_pais_fk = cap.cod_pais_fk;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tg_resumo_religiosos_pais
+    AFTER INSERT OR UPDATE OR DELETE ON Conflito_Afeta_Pais
+    FOR EACH ROW EXECUTE FUNCTION fn_resumo_religiosos_pais();
+
+CREATE TRIGGER tg_resumo_conflito_religioso
+    AFTER INSERT OR DELETE ON Conflito_Religioso
+    FOR EACH ROW EXECUTE FUNCTION fn_resumo_religiosos_pais();
+
+-- Carga inicial a partir dos dados já existentes
+SELECT sp_recalcular_resumos();
@@ -0,0 +1,37 @@
+-- =====================================================
+-- 003 - ÍNDICES PARA AS CONSULTAS DA APLICAÇÃO
+-- =====================================================
+-- Gerado a partir da análise de index_advisor.py (EXPLAIN ANALYZE de todas as
+-- consultas de main.py e reference_cache.py). O índice de Conflito.num_mortos_atual
+-- (relatório Top 5 Conflitos) já foi criado em 002_resumos.sql.
+
+-- Chaves estrangeiras sem índice: usadas nos joins dos relatórios, nos triggers
+-- de integridade e nas remoções em cascata, que sem índice varrem a tabela inteira
+CREATE INDEX idx_conflito_afeta_pais_pais ON Conflito_Afeta_Pais (cod_pais_fk);
+CREATE INDEX idx_territorial_afeta_regiao_regiao ON Conflito_Territorial_Afeta_Regiao (id_regiao_fk);
+CREATE INDEX idx_religioso_afeta_religiao_religiao ON Conflito_Religioso_Afeta_Religiao (id_religiao_fk);
+CREATE INDEX idx_economico_afeta_materia_materia ON Conflito_Economico_Afeta_MateriaPrima (id_materia_prima_fk);
+CREATE INDEX idx_racial_afeta_etnia_etnia ON Conflito_Racial_Afeta_Etnia (id_etnia_fk);
+CREATE INDEX idx_lider_politico_grupo ON Lider_Politico (cod_grupo_liderado_fk);
+CREATE INDEX idx_chefe_militar_lider ON Chefe_Militar (id_lider_politico_obedece_fk);
+CREATE INDEX idx_chefe_militar_divisao ON Chefe_Militar (cod_grupo_divisao_liderada_fk, num_divisao_liderada_fk);
+CREATE INDEX idx_organizacao_superior ON Organizacao_Mediadora (cod_org_superior_fk);
+CREATE INDEX idx_grupo_participa_conflito_conflito ON Grupo_Armado_Participa_Conflito (cod_conflito_fk);
+CREATE INDEX idx_org_intervem_conflito_conflito ON Organizacao_Intervem_Conflito (cod_conflito_fk);
+CREATE INDEX idx_traficante_dispoe_arma ON Traficante_Dispoe_Tipo_Arma (nome_arma_fk);
+CREATE INDEX idx_fornecimento_arma ON Fornecimento_Arma_Grupo (nome_arma_fk);
+CREATE INDEX idx_fornecimento_grupo ON Fornecimento_Arma_Grupo (cod_grupo_fk, quantidade_fornecida);
+CREATE INDEX idx_dialogo_lider_org_org ON Dialogo_Lider_Organizacao (cod_org_fk);
+
+-- Relatório de traficantes de Barrett M82 / M200 Intervention: índice parcial só com
+-- os fornecimentos dessas armas, já com as colunas do resultado
+CREATE INDEX idx_fornecimento_armas_precisao ON Fornecimento_Arma_Grupo (id_traficante_fk, cod_grupo_fk)
+    WHERE nome_arma_fk IN ('Barrett M82', 'M200 Intervention');
+
+-- ORDER BY nome_conflito da lista de conflitos (as demais listas ordenam por colunas UNIQUE, já indexadas)
+CREATE INDEX idx_conflito_nome ON Conflito (nome_conflito);
+
+ANALYZE Conflito_Afeta_Pais, Conflito_Territorial_Afeta_Regiao, Conflito_Religioso_Afeta_Religiao,
+        Conflito_Economico_Afeta_MateriaPrima, Conflito_Racial_Afeta_Etnia, Lider_Politico, Chefe_Militar,
+        Organizacao_Mediadora, Grupo_Armado_Participa_Conflito, Organizacao_Intervem_Conflito,
+        Traficante_Dispoe_Tipo_Arma, Fornecimento_Arma_Grupo, Dialogo_Lider_Organizacao, Conflito;
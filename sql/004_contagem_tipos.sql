@@ -0,0 +1,76 @@
+-- =====================================================
+-- 004 - CONTAGEM DE CONFLITOS POR TIPO
+-- =====================================================
+-- Número de conflitos de cada tipo (gráfico "Tipos de Conflito"), lido em uma
+-- única consulta sobre 4 linhas em vez de quatro COUNT(*) sobre as tabelas de tipo.
+--
+-- Diferente dos resumos de 002, a contagem é mantida em qualquer modo: os
+-- triggers são por comando (FOR EACH STATEMENT) e leem as linhas afetadas das
+-- tabelas de transição, então uma carga com milhares de conflitos custa um único
+-- UPDATE por tabela de tipo. Por isso ela nunca fica desatualizada.
+
+CREATE TABLE Resumo_Conflitos_Tipo (
+    tabela VARCHAR(63) PRIMARY KEY,  -- Nome (TG_TABLE_NAME) da tabela do tipo
+    tipo VARCHAR(20) NOT NULL UNIQUE,
+    ordem INT NOT NULL,
+    num_conflitos BIGINT NOT NULL DEFAULT 0
+);
+
+-- Bloqueia escritas nas tabelas de tipo até o fim da migração: um conflito gravado
+-- entre a contagem inicial e a criação dos triggers ficaria fora do resumo. É o
+-- mesmo modo que CREATE TRIGGER adquire, apenas tomado antes da contagem.
+LOCK TABLE Conflito_Territorial, Conflito_Religioso, Conflito_Economico, Conflito_Racial
+    IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO Resumo_Conflitos_Tipo (tabela, tipo, ordem, num_conflitos)
+SELECT 'conflito_territorial', 'Territorial', 1, COUNT(*) FROM Conflito_Territorial
+UNION ALL
+SELECT 'conflito_religioso', 'Religioso', 2, COUNT(*) FROM Conflito_Religioso
+UNION ALL
+SELECT 'conflito_economico', 'Econômico', 3, COUNT(*) FROM Conflito_Economico
+UNION ALL
+SELECT 'conflito_racial', 'Racial', 4, COUNT(*) FROM Conflito_Racial;
+
+-- INSERT soma as linhas de "novas", DELETE subtrai as de "antigas" e TRUNCATE zera
+CREATE OR REPLACE FUNCTION fn_resumo_conflitos_tipo()
+RETURNS TRIGGER AS $$
+DECLARE
+    variacao BIGINT;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE Resumo_Conflitos_Tipo SET num_conflitos = 0 WHERE tabela = TG_TABLE_NAME;
+        RETURN NULL;
+    ELSIF TG_OP = 'INSERT' THEN
+        SELECT COUNT(*) INTO variacao FROM novas;
+    ELSE
+        SELECT -COUNT(*) INTO variacao FROM antigas;
+    END IF;
+
+    IF variacao <> 0 THEN
+        UPDATE Resumo_Conflitos_Tipo SET num_conflitos = num_conflitos + variacao
+        WHERE tabela = TG_TABLE_NAME;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Um trigger por evento: tabelas de transição só podem ser declaradas para o evento que as produz
+DO $$
+DECLARE
+    tabela TEXT;
+BEGIN
+    FOREACH tabela IN ARRAY ARRAY['conflito_territorial', 'conflito_religioso',
+                                  'conflito_economico', 'conflito_racial']
+    LOOP
+        EXECUTE format('CREATE TRIGGER tg_resumo_tipo_insert
+                            AFTER INSERT ON %I REFERENCING NEW TABLE AS novas
+                            FOR EACH STATEMENT EXECUTE FUNCTION fn_resumo_conflitos_tipo()', tabela);
+        EXECUTE format('CREATE TRIGGER tg_resumo_tipo_delete
+                            AFTER DELETE ON %I REFERENCING OLD TABLE AS antigas
+                            FOR EACH STATEMENT EXECUTE FUNCTION fn_resumo_conflitos_tipo()', tabela);
+        EXECUTE format('CREATE TRIGGER tg_resumo_tipo_truncate
+                            AFTER TRUNCATE ON %I
+                            FOR EACH STATEMENT EXECUTE FUNCTION fn_resumo_conflitos_tipo()', tabela);
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,10 @@
+-- =====================================================
+-- 005 - ÍNDICE DA LISTAGEM PAGINADA DE FORNECIMENTOS
+-- =====================================================
+-- A listagem de fornecimentos (reports.py) é lida em páginas por keyset, na ordem
+-- (data DESC, traficante, arma, grupo), que é a chave primária com a data na frente.
+-- Com este índice, cada página começa direto na última chave vista e lê só as
+-- linhas da página, seja ela a primeira ou a milésima; o filtro por período usa
+-- o mesmo índice.
+CREATE INDEX idx_fornecimento_data_chave
+    ON Fornecimento_Arma_Grupo (data_fornecimento DESC, id_traficante_fk, nome_arma_fk, cod_grupo_fk);
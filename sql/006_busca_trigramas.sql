@@ -0,0 +1,14 @@
+-- =====================================================
+-- 006 - ÍNDICES DE TRIGRAMAS PARA A BUSCA POR NOME
+-- =====================================================
+-- Os formulários de cadastro buscam países, grupos armados e conflitos enquanto o
+-- usuário digita (reference_search.py), com nome ILIKE '%termo%' e LIMIT. Um
+-- índice B-tree não atende um padrão que começa com curinga; o GIN com
+-- gin_trgm_ops atende, com o termo em qualquer posição do nome e sem diferenciar
+-- maiúsculas de minúsculas. Termos com menos de 3 caracteres não formam trigramas
+-- e continuam varrendo a tabela, mas o LIMIT mantém o resultado pequeno.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX idx_pais_nome_trgm ON Pais USING gin (nome_pais gin_trgm_ops);
+CREATE INDEX idx_grupo_armado_nome_trgm ON Grupo_Armado USING gin (nome_grupo gin_trgm_ops);
+CREATE INDEX idx_conflito_nome_trgm ON Conflito USING gin (nome_conflito gin_trgm_ops);
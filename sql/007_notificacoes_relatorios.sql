@@ -0,0 +1,25 @@
+-- =====================================================
+-- 007 - NOTIFICAÇÃO DAS TABELAS LIDAS PELOS RELATÓRIOS
+-- =====================================================
+-- Estende os avisos de 001 (canal 'conflitos_alteracoes', payload = nome da tabela)
+-- às tabelas que só os relatórios leem. Com eles, o cache de resultados dos
+-- relatórios (result_cache.py) descarta o que leu uma tabela alterada por outro
+-- cliente, em vez de esperar o TTL. Resumo_Controle avisa os recálculos e as
+-- trocas de modo das tabelas de resumo.
+DO $$
+DECLARE
+    tabela TEXT;
+BEGIN
+    FOREACH tabela IN ARRAY ARRAY['traficante_armas', 'fornecimento_arma_grupo', 'organizacao_mediadora',
+                                  'organizacao_intervem_conflito', 'conflito_afeta_pais',
+                                  'grupo_armado_participa_conflito', 'conflito_territorial',
+                                  'conflito_religioso', 'conflito_economico', 'conflito_racial',
+                                  'resumo_controle']
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS tg_notifica_alteracao ON %I', tabela);
+        EXECUTE format('CREATE TRIGGER tg_notifica_alteracao
+                            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+                            FOR EACH STATEMENT EXECUTE FUNCTION fn_notifica_alteracao()', tabela);
+    END LOOP;
+END;
+$$;
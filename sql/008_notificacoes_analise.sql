@@ -0,0 +1,11 @@
+-- =====================================================
+-- 008 - NOTIFICAÇÃO DAS REGIÕES DOS CONFLITOS TERRITORIAIS
+-- =====================================================
+-- A análise em memória (analytics_cache.py) recarrega uma tabela quando recebe o
+-- aviso de 001/007 (canal 'conflitos_alteracoes', payload = nome da tabela). Das
+-- tabelas que ela carrega, só Conflito_Territorial_Afeta_Regiao (recortes por
+-- região) ainda não avisava.
+DROP TRIGGER IF EXISTS tg_notifica_alteracao ON conflito_territorial_afeta_regiao;
+CREATE TRIGGER tg_notifica_alteracao
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON conflito_territorial_afeta_regiao
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_notifica_alteracao();
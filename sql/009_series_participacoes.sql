@@ -0,0 +1,20 @@
+-- =====================================================
+-- 009 - ÍNDICES DAS SÉRIES TEMPORAIS DE PARTICIPAÇÕES
+-- =====================================================
+-- Os relatórios de série (reports.py: entradas mensais, participações ativas e
+-- curvas de escalada) leem Grupo_Armado_Participa_Conflito por intervalo de
+-- data_incorporacao. As participações entram com a data do cadastro, então a
+-- ordem física da tabela acompanha a data: um índice BRIN guarda só o mínimo e o
+-- máximo de cada faixa de 32 páginas (alguns KB mesmo com milhões de linhas) e
+-- descarta as faixas fora do período. autosummarize resume as faixas novas logo
+-- depois das inserções. Uma carga de histórico fora de ordem só alarga as faixas
+-- afetadas; CLUSTER pela data as reordena se isso pesar.
+CREATE INDEX idx_participa_incorporacao_brin
+    ON Grupo_Armado_Participa_Conflito USING brin (data_incorporacao)
+    WITH (pages_per_range = 32, autosummarize = on);
+
+-- As saídas (data_saida) não seguem a ordem física e quase sempre são nulas: um
+-- B-tree parcial, só das participações encerradas, fica pequeno.
+CREATE INDEX idx_participa_saida
+    ON Grupo_Armado_Participa_Conflito (data_saida)
+    WHERE data_saida IS NOT NULL;
@@ -0,0 +1,193 @@
+import collections
+import hashlib
+import itertools
+import re
+import threading
+import weakref
+
+import psycopg2
+from psycopg2 import errorcodes, extensions
+
+from query_metrics import normalizar_sql
+
+# Instruções preparadas mantidas por conexão; as menos usadas recentemente recebem DEALLOCATE
+MAX_INSTRUCOES_POR_CONEXAO = 100
+
+# %% (literal), %s (posicional) e %(nome)s (nomeado), como o psycopg2 os interpreta
+PADRAO_PARAMETRO = re.compile(r'%%|%s|%\((\w+)\)s')
+
+# A instrução preparada não existe mais no backend (DISCARD ALL, pooler) ou o tipo do resultado
+# mudou depois de um ALTER TABLE ("cached plan must not change result type")
+ERROS_REPREPARAR = {errorcodes.INVALID_SQL_STATEMENT_NAME, errorcodes.FEATURE_NOT_SUPPORTED}
+
+
+class _Definicao:
+    """Uma instrução da aplicação traduzida para PREPARE/EXECUTE (o mesmo nome em todas as conexões)."""
+
+    def __init__(self, query):
+        ordem = []
+        numeros = {}
+        posicionais = itertools.count()
+
+        def numerar(encontrado):
+            if encontrado.group(0) == '%%':
+                return '%'
+            chave = encontrado.group(1) if encontrado.group(1) is not None else next(posicionais)
+            if chave not in numeros:
+                numeros[chave] = len(numeros) + 1
+                ordem.append(chave)
+            return f"${numeros[chave]}"
+
+        corpo = PADRAO_PARAMETRO.sub(numerar, query.strip().rstrip(';'))
+        self.nome = 'ps_' + hashlib.sha1(query.encode('utf-8')).hexdigest()[:16]
+        # Executado sem parâmetros: o psycopg2 envia o texto como está, sem interpretar os %
+        self.prepare = f"PREPARE {self.nome} AS {corpo}"
+        self.execute = f"EXECUTE {self.nome} ({', '.join(['%s'] * len(ordem))})" if ordem else f"EXECUTE {self.nome}"
+        self.ordem = ordem  # Índices (parâmetros posicionais) ou nomes, na ordem de $1, $2...
+
+    def valores(self, params):
+        if not self.ordem:
+            return None
+        return [params[chave] for chave in self.ordem]
+
+
+class StatementCache:
+    """
+    Cache de instruções preparadas (PREPARE/EXECUTE) por conexão do pool.
+
+    executar(cursor, query, params) substitui cursor.execute(query, params): na primeira
+    vez em cada conexão a instrução é preparada no servidor (análise e planejamento) e,
+    dali em diante, executada pelo nome. Uma conexão nova (reconexão do pool) começa
+    sem instruções e prepara de novo sob demanda; se o servidor não reconhecer mais a
+    instrução (DISCARD ALL) ou o formato do resultado mudar com uma alteração de
+    esquema, ela é preparada outra vez. Mudanças que não alteram o resultado (índices,
+    ANALYZE) o próprio PostgreSQL já replaneja.
+
+    Quando o erro acontece no meio de uma transação, ela já está abortada: o cache
+    esquece a instrução e repassa o erro (a próxima tentativa prepara de novo). Como
+    ROLLBACK não desfaz um PREPARE, a instrução cujo resultado mudou de tipo recebe
+    DEALLOCATE logo antes de ser preparada outra vez na mesma conexão; se o servidor
+    não a reconhecer mais (DISCARD ALL nesse meio tempo), vale o mesmo que para um
+    EXECUTE de instrução desconhecida.
+    Com a conexão ociosa, desfaz e tenta mais uma vez, sem o erro chegar a quem chamou.
+    Instruções que o servidor não consegue preparar (parâmetro sem tipo definido) passam
+    a ser executadas diretamente.
+    """
+
+    def __init__(self, max_por_conexao=MAX_INSTRUCOES_POR_CONEXAO, metricas=None):
+        self.max_por_conexao = max_por_conexao
+        # QueryMetrics opcional: EXECUTE/PREPARE aparecem no diagnóstico com o texto original
+        self.metricas = metricas
+        self._lock = threading.Lock()
+        self._definicoes = {}
+        # Conexão -> OrderedDict(nome -> _Definicao), na ordem de uso (LRU)
+        self._preparadas = weakref.WeakKeyDictionary()
+        # Conexão -> nomes que ainda existem no servidor mas precisam de DEALLOCATE antes do próximo PREPARE
+        self._desalocar = weakref.WeakKeyDictionary()
+        # Instruções que o servidor não consegue preparar (tipo de parâmetro indeterminado)
+        self._nao_preparaveis = set()
+        self._stats = {'acertos': 0, 'preparacoes': 0, 'repreparacoes': 0, 'descartadas': 0, 'diretas': 0}
+
+    def executar(self, cursor, query, params=None):
+        """Executa a instrução pelo nome, preparando-a antes se esta conexão ainda não a conhece."""
+        with self._lock:
+            direta = not isinstance(query, str) or query in self._nao_preparaveis
+            if direta:
+                self._stats['diretas'] += 1
+        if direta:
+            return cursor.execute(query, params)
+
+        definicao = self._definicao(query)
+        conn = cursor.connection
+        ociosa = conn.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+        try:
+            self._preparar(cursor, definicao)
+        except psycopg2.Error as e:
+            if e.pgcode == errorcodes.INVALID_SQL_STATEMENT_NAME:
+                # DEALLOCATE pendente de um nome que o servidor já descartou
+                return self._repreparar(cursor, definicao, params, e, ociosa)
+            if e.pgcode != errorcodes.INDETERMINATE_DATATYPE:
+                raise
+            with self._lock:
+                self._nao_preparaveis.add(query)
+            if not ociosa:
+                raise
+            conn.rollback()
+            return cursor.execute(query, params)
+
+        try:
+            return cursor.execute(definicao.execute, definicao.valores(params))
+        except psycopg2.Error as e:
+            if e.pgcode not in ERROS_REPREPARAR:
+                raise
+            return self._repreparar(cursor, definicao, params, e, ociosa)
+
+    def _repreparar(self, cursor, definicao, params, erro, ociosa):
+        """Esquece a instrução (todas, se o servidor as descartou) e, com a conexão ociosa, tenta de novo."""
+        conn = cursor.connection
+        self._esquecer(conn, definicao.nome, todas=erro.pgcode == errorcodes.INVALID_SQL_STATEMENT_NAME,
+                       desalocar=erro.pgcode == errorcodes.FEATURE_NOT_SUPPORTED)
+        with self._lock:
+            self._stats['repreparacoes'] += 1
+        if not ociosa:
+            raise erro
+        conn.rollback()
+        self._preparar(cursor, definicao)
+        return cursor.execute(definicao.execute, definicao.valores(params))
+
+    def _definicao(self, query):
+        definicao = self._definicoes.get(query)
+        if definicao is None:
+            definicao = _Definicao(query)
+            with self._lock:
+                definicao = self._definicoes.setdefault(query, definicao)
+            if self.metricas is not None:
+                texto = normalizar_sql(query)
+                self.metricas.apelidar(normalizar_sql(definicao.execute), texto)
+                self.metricas.apelidar(normalizar_sql(definicao.prepare), f"PREPARE {texto}")
+        return definicao
+
+    def _preparar(self, cursor, definicao):
+        conn = cursor.connection
+        with self._lock:
+            preparadas = self._preparadas.setdefault(conn, collections.OrderedDict())
+            if definicao.nome in preparadas:
+                preparadas.move_to_end(definicao.nome)
+                self._stats['acertos'] += 1
+                return
+            # Primeiro as instruções esquecidas com o resultado alterado (o nome pode ser o mesmo desta)
+            excedentes = list(self._desalocar.pop(conn, ()))
+            while len(preparadas) >= self.max_por_conexao:
+                excedentes.append(preparadas.popitem(last=False)[0])
+                self._stats['descartadas'] += 1
+
+        for nome in excedentes:
+            cursor.execute(f"DEALLOCATE {nome}")
+        cursor.execute(definicao.prepare)
+        with self._lock:
+            self._preparadas.setdefault(conn, collections.OrderedDict())[definicao.nome] = definicao
+            self._stats['preparacoes'] += 1
+
+    def _esquecer(self, conn, nome, todas=False, desalocar=False):
+        with self._lock:
+            if todas:
+                # O servidor não tem mais nenhuma instrução desta conexão: nada a desalocar
+                self._desalocar.pop(conn, None)
+            elif desalocar:
+                self._desalocar.setdefault(conn, set()).add(nome)
+            preparadas = self._preparadas.get(conn)
+            if preparadas is None:
+                return
+            if todas:
+                preparadas.clear()
+            else:
+                preparadas.pop(nome, None)
+
+    def estatisticas(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['conexoes'] = len(self._preparadas)
+            stats['instrucoes_preparadas'] = sum(len(preparadas) for preparadas in self._preparadas.values())
+        execucoes = stats['acertos'] + stats['preparacoes']
+        stats['taxa_acertos'] = stats['acertos'] / execucoes if execucoes else 0.0
+        return stats
@@ -0,0 +1,371 @@
+"""
+Grafo da rede de fornecimento de armas: traficantes -> grupos armados -> conflitos.
+
+As arestas vêm das tabelas já carregadas pela análise em memória (AnalyticsCache):
+Fornecimento_Arma_Grupo liga traficantes a grupos (peso: armas fornecidas) e
+Grupo_Armado_Participa_Conflito liga grupos a conflitos. Cada camada vira uma matriz
+de adjacência em CSR (indptr, indices e pesos em arrays NumPy), nos dois sentidos,
+refeita só quando a tabela da camada é invalidada: um aviso de alteração nos
+fornecimentos não reconstrói a camada de participações, e vice-versa. As consultas
+de vários saltos (conflitos abastecidos por um traficante, grupos com fornecedores
+em comum, agrupamentos ligados por fornecedores, rankings de grau, alcance e
+centralidade) percorrem esses arrays com operações vetorizadas, sem SQL.
+"""
+import time
+
+# NumPy só é importado na primeira consulta, como em analytics_cache.py
+np = None
+
+# Tipos de nó: nome -> (tabela em TABELAS_ANALISE, rótulo)
+TIPOS_NO = {
+    'traficante': ('traficante_armas', "Traficante"),
+    'grupo': ('grupo_armado', "Grupo Armado"),
+    'conflito': ('conflito', "Conflito"),
+}
+
+# Camadas do grafo: nome -> (tabela de arestas, (coluna, tipo de nó) de origem e de destino, coluna do peso
+# ou None para contar as linhas). Linhas repetidas do mesmo par viram uma aresta, com os pesos somados
+CAMADAS = {
+    'fornecimento': ('fornecimento_arma_grupo', ('traficante', 'traficante'), ('grupo', 'grupo'), 'quantidade'),
+    'participacao': ('grupo_armado_participa_conflito', ('grupo', 'grupo'), ('conflito', 'conflito'), None),
+}
+
+# Rankings: nome -> rótulo da coluna do valor
+MEDIDAS_RANKING = {
+    'grau': "Grau",
+    'alcance': "Alcance (2 saltos)",
+    'centralidade': "Centralidade (PageRank)",
+}
+
+# Consultas oferecidas pela interface e por python main.py grafo: nome -> descrição
+CONSULTAS = {
+    'conflitos-abastecidos': "conflitos em que lutam os grupos abastecidos pelos traficantes informados",
+    'fornecedores-comuns': "grupos que compartilham traficantes com os grupos informados",
+    'agrupamentos': "conjuntos de grupos ligados entre si por traficantes em comum",
+    'ranking': "traficantes, grupos ou conflitos ordenados por grau, alcance ou centralidade",
+}
+
+# PageRank: fator de amortecimento, tolerância (soma das diferenças) e limite de iterações
+AMORTECIMENTO = 0.85
+TOLERANCIA_PAGERANK = 1e-6
+MAX_ITERACOES_PAGERANK = 100
+# Grupos listados como exemplo em cada agrupamento (os que mais receberam armas)
+EXEMPLOS_POR_AGRUPAMENTO = 3
+
+
+def _numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("O grafo de fornecimento requer o pacote 'numpy' (pip install numpy).") from None
+        np = numpy
+    return np
+
+
+def _inicios_distintos(ordenadas):
+    """Máscara do primeiro elemento de cada valor distinto de um array ordenado."""
+    inicios = np.ones(len(ordenadas), dtype=bool)
+    inicios[1:] = ordenadas[1:] != ordenadas[:-1]
+    return inicios
+
+
+def _maiores(valores, desempate, limite):
+    """Índices em ordem decrescente de 'valores' (e de 'desempate', nos empates), até 'limite'."""
+    ordem = np.lexsort((-desempate, -valores))
+    return ordem if limite is None else ordem[:limite]
+
+
+class _CSR:
+    """
+    Adjacência em CSR (compressed sparse row): os vizinhos do nó i são
+    indices[indptr[i]:indptr[i + 1]], em ordem crescente, com os pesos correspondentes.
+    """
+
+    def __init__(self, indptr, indices, pesos, destinos):
+        self.indptr = indptr
+        self.indices = indices
+        self.pesos = pesos
+        self.destinos = destinos  # Número de nós do lado dos índices
+
+    @classmethod
+    def de_arestas(cls, origens, destinos, pesos, total_origens, total_destinos):
+        """Monta a matriz a partir das arestas (arrays de posições); pares repetidos somam os pesos."""
+        # Ordenação e comparação com o vizinho: mais rápido que np.unique, que usa tabela de hash
+        chaves = origens.astype(np.int64) * max(total_destinos, 1) + destinos
+        ordem = np.argsort(chaves, kind='stable')
+        chaves = chaves[ordem]
+        inicios = _inicios_distintos(chaves)
+        unicas = chaves[inicios]
+        pesos = np.bincount(np.cumsum(inicios) - 1, weights=pesos[ordem], minlength=len(unicas))
+        origens = unicas // max(total_destinos, 1)
+        indptr = np.zeros(total_origens + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origens, minlength=total_origens), out=indptr[1:])
+        return cls(indptr, (unicas % max(total_destinos, 1)).astype(np.int32), pesos, total_destinos)
+
+    def origens(self):
+        """Origem de cada aresta (o inverso de indptr)."""
+        return np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int32), self.graus())
+
+    def transposta(self):
+        return _CSR.de_arestas(self.indices, self.origens(), self.pesos, self.destinos, len(self.indptr) - 1)
+
+    def graus(self):
+        return np.diff(self.indptr)
+
+    def vizinhos(self, nos):
+        """(índice em 'nos' da origem, destino, peso) de cada aresta que sai dos nós informados."""
+        inicios = self.indptr[nos]
+        tamanhos = self.indptr[nos + 1] - inicios
+        # Posição de cada aresta dentro da sua linha, sem laço em Python
+        deslocamentos = np.arange(tamanhos.sum()) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+        arestas = np.repeat(inicios, tamanhos) + deslocamentos
+        return np.repeat(np.arange(len(nos)), tamanhos), self.indices[arestas], self.pesos[arestas]
+
+    def bytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.pesos.nbytes
+
+
+class SupplyGraph:
+    """
+    Consultas sobre a rede traficante -> grupo -> conflito, com as matrizes CSR montadas
+    sobre as tabelas do AnalyticsCache e guardadas como derivados delas: invalidar uma
+    tabela (NOTIFY ou escrita da aplicação, via ReferenceCache) descarta só a camada e
+    os resultados calculados a partir dela.
+    """
+
+    def __init__(self, analise):
+        self.analise = analise
+        self._stats = {'consultas': 0, 'tempo_consultas': 0.0}
+
+    # --- ESTRUTURA ---
+    def _camada(self, nome):
+        """(matriz direta, matriz transposta) da camada, montadas na primeira consulta após a carga."""
+        fato, (coluna_origem, tipo_origem), (coluna_destino, tipo_destino), coluna_peso = CAMADAS[nome]
+        tabela_origem, tabela_destino = TIPOS_NO[tipo_origem][0], TIPOS_NO[tipo_destino][0]
+
+        def calcular(tabela_fato, nos_origem, nos_destino):
+            origens = self.analise.posicoes(fato, coluna_origem, tabela_origem)
+            destinos = self.analise.posicoes(fato, coluna_destino, tabela_destino)
+            validas = (origens >= 0) & (destinos >= 0)
+            pesos = (tabela_fato.colunas[coluna_peso][validas].astype(np.float64) if coluna_peso
+                     else np.ones(int(validas.sum())))
+            direta = _CSR.de_arestas(origens[validas], destinos[validas], pesos, nos_origem.linhas,
+                                     nos_destino.linhas)
+            return direta, direta.transposta()
+        return self.analise.derivado(('grafo', nome), (fato, tabela_origem, tabela_destino), calcular)
+
+    def _tabelas(self):
+        return [CAMADAS[nome][0] for nome in CAMADAS] + [tabela for tabela, _ in TIPOS_NO.values()]
+
+    def _nos(self, tipo, nomes):
+        """Posições dos nós do tipo com algum dos nomes (ValueError se nenhum nome existir)."""
+        tabela = self.analise.tabela(TIPOS_NO[tipo][0])
+        codigos = np.flatnonzero(np.isin(tabela.categorias['nome'], nomes))
+        nos = np.flatnonzero(np.isin(tabela.colunas['nome'], codigos))
+        if not len(nos):
+            raise ValueError(f"{TIPOS_NO[tipo][1]} não encontrado: {', '.join(nomes)}")
+        return nos
+
+    def _nomes(self, tipo, nos):
+        tabela = self.analise.tabela(TIPOS_NO[tipo][0])
+        return tabela.categorias['nome'][tabela.colunas['nome'][nos]]
+
+    # --- CONSULTAS ---
+    def conflitos_abastecidos(self, traficantes, limite=None):
+        """
+        [(conflito, grupos abastecidos, armas fornecidas a esses grupos)] dos conflitos em que
+        lutam grupos que receberam armas dos traficantes (nomes), dos com mais grupos para os
+        com menos. As armas de um grupo contam em cada conflito de que ele participa.
+        """
+        fornece, _ = self._camada('fornecimento')
+        participa, _ = self._camada('participacao')
+        _, grupos, armas = fornece.vizinhos(self._nos('traficante', traficantes))
+        # O mesmo grupo pode ter recebido de mais de um dos traficantes: soma as armas por grupo
+        armas_por_grupo = np.bincount(grupos, weights=armas, minlength=fornece.destinos)
+        grupos = np.unique(grupos)
+        origens, conflitos, _ = participa.vizinhos(grupos)
+        num_grupos = np.bincount(conflitos, minlength=participa.destinos)
+        num_armas = np.bincount(conflitos, weights=armas_por_grupo[grupos][origens], minlength=participa.destinos)
+        presentes = np.flatnonzero(num_grupos)
+        presentes = presentes[_maiores(num_grupos[presentes], num_armas[presentes], limite)]
+        return [(nome, int(num_grupos[i]), int(num_armas[i]))
+                for nome, i in zip(self._nomes('conflito', presentes), presentes)]
+
+    def fornecedores_comuns(self, grupos, limite=None):
+        """[(grupo, traficantes em comum)] dos outros grupos abastecidos pelos fornecedores dos grupos (nomes)."""
+        fornece, fornecido_por = self._camada('fornecimento')
+        nos = self._nos('grupo', grupos)
+        _, traficantes, _ = fornecido_por.vizinhos(nos)
+        _, outros, _ = fornece.vizinhos(np.unique(traficantes))
+        # Cada aresta traficante -> grupo percorrida é um fornecedor em comum (as arestas não se repetem)
+        comuns = np.bincount(outros, minlength=fornece.destinos)
+        comuns[nos] = 0
+        presentes = np.flatnonzero(comuns)
+        presentes = presentes[_maiores(comuns[presentes], -presentes, limite)]
+        return [(nome, int(comuns[i])) for nome, i in zip(self._nomes('grupo', presentes), presentes)]
+
+    def agrupamentos(self, limite=None):
+        """
+        [(grupos, traficantes, principais grupos)] dos componentes conexos da rede traficante-grupo
+        com dois ou mais grupos, dos maiores para os menores: grupos no mesmo agrupamento estão
+        ligados por uma cadeia de fornecedores em comum.
+        """
+        def calcular(*tabelas):
+            fornece, fornecido_por = self._camada('fornecimento')
+            total_grupos = fornece.destinos
+            traficantes = np.flatnonzero(fornece.graus())
+            abastecidos = np.flatnonzero(fornecido_por.graus())
+            # Propagação do menor rótulo: cada grupo começa com a própria posição e recebe o menor
+            # rótulo entre os grupos dos seus fornecedores até nada mudar. O salto rotulos[rotulos]
+            # encurta as cadeias, então bastam poucas iterações mesmo em componentes longos
+            rotulos = np.arange(total_grupos)
+            menor_por_traficante = np.zeros(len(fornece.indptr) - 1, dtype=rotulos.dtype)
+            while len(traficantes):
+                menor_por_traficante[traficantes] = np.minimum.reduceat(rotulos[fornece.indices],
+                                                                        fornece.indptr[traficantes])
+                novos = rotulos.copy()
+                novos[abastecidos] = np.minimum(
+                    rotulos[abastecidos],
+                    np.minimum.reduceat(menor_por_traficante[fornecido_por.indices], fornecido_por.indptr[abastecidos]))
+                novos = novos[novos]
+                if np.array_equal(novos, rotulos):
+                    break
+                rotulos = novos
+            componentes = rotulos[abastecidos]
+            num_grupos = np.bincount(componentes, minlength=total_grupos)
+            num_traficantes = np.bincount(rotulos[fornece.indices[fornece.indptr[traficantes]]],
+                                          minlength=total_grupos)
+            recebidas = np.bincount(fornece.indices, weights=fornece.pesos, minlength=total_grupos)
+            return abastecidos, componentes, num_grupos, num_traficantes, recebidas
+
+        abastecidos, componentes, num_grupos, num_traficantes, recebidas = self.analise.derivado(
+            ('grafo', 'agrupamentos'), self._tabelas(), calcular)
+        escolhidos = np.flatnonzero(num_grupos >= 2)
+        escolhidos = escolhidos[_maiores(num_grupos[escolhidos], num_traficantes[escolhidos], limite)]
+        linhas = []
+        for componente in escolhidos:
+            membros = abastecidos[componentes == componente]
+            membros = membros[np.argsort(-recebidas[membros], kind='stable')[:EXEMPLOS_POR_AGRUPAMENTO]]
+            linhas.append((int(num_grupos[componente]), int(num_traficantes[componente]),
+                           ", ".join(self._nomes('grupo', membros))))
+        return linhas
+
+    def ranking(self, medida, tipo, limite=None):
+        """
+        [(nome, valor)] dos nós do tipo, do maior valor para o menor. grau: vizinhos diretos
+        (traficante: grupos abastecidos; grupo: fornecedores e conflitos; conflito: grupos).
+        alcance: nós a dois saltos (traficante: conflitos; grupo: grupos com fornecedor em
+        comum; conflito: traficantes que abastecem seus grupos). centralidade: PageRank na
+        rede inteira, sem direção e sem pesos, em que 1 é a média. Alcance e centralidade são
+        calculados para todos os nós na primeira consulta e guardados até a próxima recarga.
+        """
+        if medida not in MEDIDAS_RANKING:
+            raise ValueError(f"Medida desconhecida: {medida} (use {', '.join(MEDIDAS_RANKING)})")
+        if tipo not in TIPOS_NO:
+            raise ValueError(f"Tipo de nó desconhecido: {tipo} (use {', '.join(TIPOS_NO)})")
+        if medida == 'grau':
+            valores = self._graus(tipo)
+        elif medida == 'alcance':
+            valores = self.analise.derivado(('grafo', 'alcance', tipo), self._tabelas(),
+                                            lambda *tabelas: self._alcance(tipo))
+        else:
+            valores = self.analise.derivado(('grafo', 'centralidade'), self._tabelas(),
+                                            lambda *tabelas: self._pagerank())[tipo]
+        indices = _maiores(valores, np.zeros(len(valores)), limite)
+        arredondar = (lambda valor: round(float(valor), 4)) if medida == 'centralidade' else int
+        return [(nome, arredondar(valores[i])) for nome, i in zip(self._nomes(tipo, indices), indices)]
+
+    def _graus(self, tipo):
+        fornece, fornecido_por = self._camada('fornecimento')
+        participa, participantes = self._camada('participacao')
+        if tipo == 'traficante':
+            return fornece.graus()
+        if tipo == 'grupo':
+            return fornecido_por.graus() + participa.graus()
+        return participantes.graus()
+
+    def _alcance(self, tipo):
+        """Número de nós distintos a dois saltos de cada nó do tipo."""
+        fornece, fornecido_por = self._camada('fornecimento')
+        participa, participantes = self._camada('participacao')
+        primeiro, segundo = {'traficante': (fornece, participa), 'grupo': (fornecido_por, fornece),
+                             'conflito': (participantes, fornecido_por)}[tipo]
+        origens = primeiro.origens()
+        passos, destinos, _ = segundo.vizinhos(primeiro.indices)
+        pares = np.sort(origens[passos].astype(np.int64) * max(segundo.destinos, 1) + destinos)
+        pares = pares[_inicios_distintos(pares)]
+        origens_pares = pares // max(segundo.destinos, 1)
+        if tipo == 'grupo':
+            # O próprio grupo está a dois saltos de si mesmo (grupo -> fornecedor -> grupo)
+            origens_pares = origens_pares[origens_pares != pares % max(segundo.destinos, 1)]
+        return np.bincount(origens_pares, minlength=len(primeiro.indptr) - 1)
+
+    def _pagerank(self):
+        """PageRank de todos os nós, com traficantes, grupos e conflitos numerados em sequência."""
+        fornece, _ = self._camada('fornecimento')
+        participa, _ = self._camada('participacao')
+        total_traficantes, total_grupos = len(fornece.indptr) - 1, fornece.destinos
+        total = total_traficantes + total_grupos + participa.destinos
+        # Arestas nos dois sentidos: sem direção, o fluxo não se acumula nos conflitos
+        a = np.concatenate([fornece.origens().astype(np.int64), total_traficantes + participa.origens().astype(np.int64)])
+        b = np.concatenate([total_traficantes + fornece.indices.astype(np.int64),
+                            total_traficantes + total_grupos + participa.indices.astype(np.int64)])
+        origens, destinos = np.concatenate([a, b]), np.concatenate([b, a])
+        graus = np.bincount(origens, minlength=total)
+        isolados = graus == 0
+        valores = np.full(total, 1.0 / max(total, 1))
+        for _ in range(MAX_ITERACOES_PAGERANK):
+            novos = AMORTECIMENTO * np.bincount(destinos, weights=(valores / np.maximum(graus, 1))[origens],
+                                                minlength=total)
+            # Teletransporte e a massa dos nós sem arestas, distribuídos igualmente
+            novos += (1.0 - AMORTECIMENTO + AMORTECIMENTO * valores[isolados].sum()) / max(total, 1)
+            convergiu = np.abs(novos - valores).sum() < TOLERANCIA_PAGERANK
+            valores = novos
+            if convergiu:
+                break
+        # Escala em que 1 é a centralidade média de um nó
+        valores *= total
+        return {'traficante': valores[:total_traficantes],
+                'grupo': valores[total_traficantes:total_traficantes + total_grupos],
+                'conflito': valores[total_traficantes + total_grupos:]}
+
+    def consultar(self, consulta, nomes=None, tipo='traficante', medida='grau', limite=None):
+        """
+        (linhas, colunas) da consulta de CONSULTAS. 'nomes' (lista) são os traficantes de
+        conflitos-abastecidos e os grupos de fornecedores-comuns; tipo e medida, os do ranking.
+        """
+        if consulta not in CONSULTAS:
+            raise ValueError(f"Consulta desconhecida: {consulta} (use {', '.join(CONSULTAS)})")
+        if consulta in ('conflitos-abastecidos', 'fornecedores-comuns') and not nomes:
+            raise ValueError(f"Informe os nomes para '{consulta}'.")
+        _numpy()
+        inicio = time.perf_counter()
+        if consulta == 'conflitos-abastecidos':
+            linhas = self.conflitos_abastecidos(nomes, limite)
+            colunas = ["Conflito", "Grupos Abastecidos", "Armas Fornecidas"]
+        elif consulta == 'fornecedores-comuns':
+            linhas = self.fornecedores_comuns(nomes, limite)
+            colunas = ["Grupo Armado", "Fornecedores em Comum"]
+        elif consulta == 'agrupamentos':
+            linhas = self.agrupamentos(limite)
+            colunas = ["Grupos", "Traficantes", "Principais Grupos"]
+        else:
+            linhas = self.ranking(medida, tipo, limite)
+            colunas = [TIPOS_NO[tipo][1], MEDIDAS_RANKING[medida]]
+        self._stats['consultas'] += 1
+        self._stats['tempo_consultas'] += time.perf_counter() - inicio
+        return linhas, colunas
+
+    def estatisticas(self):
+        """Nós e arestas de cada camada e a memória das matrizes (monta as camadas, se preciso)."""
+        _numpy()
+        stats = dict(self._stats)
+        for nome in CAMADAS:
+            direta, transposta = self._camada(nome)
+            stats[f'arestas_{nome}'] = len(direta.indices)
+            stats[f'bytes_{nome}'] = direta.bytes() + transposta.bytes()
+        for tipo, (tabela, _) in TIPOS_NO.items():
+            stats[f'nos_{tipo}'] = self.analise.tabela(tabela).linhas
+        return stats
@@ -0,0 +1,172 @@
+import contextlib
+import os
+import sys
+import types
+
+import psycopg2
+import pytest
+from psycopg2 import extensions
+
+# Os módulos da aplicação ficam na raiz do repositório, fora de qualquer pacote
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CursorFalso:
+    """
+    Cursor do psycopg2 sem servidor. Registra cada instrução em conn.instrucoes, levanta
+    o erro da primeira falha programada em conn.falhas cujo prefixo combine e devolve as
+    linhas de conn.responder(query, params) (None: instrução sem resultado).
+    """
+
+    def __init__(self, conn, name=None):
+        self.connection = conn
+        self.name = name
+        self.itersize = None
+        self.description = None
+        self.rowcount = -1
+        self._linhas = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        conn = self.connection
+        conn.instrucoes.append((query, params))
+        conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+        for i, (prefixo, erro) in enumerate(conn.falhas):
+            if isinstance(query, str) and query.startswith(prefixo):
+                del conn.falhas[i]
+                conn.info.transaction_status = extensions.TRANSACTION_STATUS_INERROR
+                if isinstance(erro, psycopg2.OperationalError):
+                    conn.closed = 1
+                raise erro
+        resultado = conn.responder(query, params) if conn.responder else None
+        if resultado is None:
+            self.description, self._linhas = None, []
+        else:
+            colunas, linhas = resultado
+            self.description = [(coluna, 25) for coluna in colunas]
+            self._linhas = list(linhas)
+        self.rowcount = len(self._linhas)
+
+    def mogrify(self, query, params=None):
+        return self.connection.mogrify(query, params)
+
+    def copy_expert(self, sql, arquivo):
+        self.connection.instrucoes.append((sql, None))
+        for linha in self.connection.copia:
+            arquivo.write(linha)
+        self.rowcount = max(len(self.connection.copia) - 1, 0)
+
+    def fetchone(self):
+        return self._linhas.pop(0) if self._linhas else None
+
+    def fetchmany(self, tamanho=1):
+        lote, self._linhas = self._linhas[:tamanho], self._linhas[tamanho:]
+        return lote
+
+    def fetchall(self):
+        linhas, self._linhas = self._linhas, []
+        return linhas
+
+    def __iter__(self):
+        while self._linhas:
+            yield self._linhas.pop(0)
+
+    def close(self):
+        pass
+
+
+class ConexaoFalsa:
+    """Conexão do psycopg2 sem servidor; os cursores são CursorFalso."""
+
+    def __init__(self, responder=None, falhas=(), erro_commit=None, copia=()):
+        # responder(query, params) -> (colunas, linhas), ou None para instruções sem resultado
+        self.responder = responder
+        # [(prefixo da instrução, erro)]: cada uma é levantada uma vez; OperationalError fecha a conexão
+        self.falhas = list(falhas)
+        self.erro_commit = erro_commit
+        self.copia = list(copia)  # Linhas de texto devolvidas por copy_expert
+        self.instrucoes = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = 0
+        self.info = types.SimpleNamespace(transaction_status=extensions.TRANSACTION_STATUS_IDLE)
+
+    def cursor(self, name=None):
+        return CursorFalso(self, name)
+
+    def mogrify(self, query, params=None):
+        if params:
+            query = query % {chave: repr(valor) for chave, valor in params.items()}
+        return query.encode('utf-8')
+
+    def commit(self):
+        if self.erro_commit is not None:
+            raise self.erro_commit
+        self.commits += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def executadas(self):
+        """Só os textos das instruções, na ordem."""
+        return [query for query, _ in self.instrucoes]
+
+
+class PoolFalso:
+    """
+    ConnectionPool sem servidor: entrega as conexões criadas com nova(), na ordem, e
+    depois conexões novas que respondem com 'responder'.
+    """
+
+    def __init__(self):
+        self.responder = None
+        self.fila = []
+        self.entregues = []
+
+    def nova(self, **opcoes):
+        opcoes.setdefault('responder', self.responder)
+        conn = ConexaoFalsa(**opcoes)
+        self.fila.append(conn)
+        return conn
+
+    @contextlib.contextmanager
+    def conexao(self):
+        conn = self.fila.pop(0) if self.fila else ConexaoFalsa(responder=self.responder)
+        self.entregues.append(conn)
+        yield conn
+
+    def executadas(self):
+        return [query for conn in self.entregues for query in conn.executadas()]
+
+
+@pytest.fixture
+def pool():
+    return PoolFalso()
+
+
+@pytest.fixture
+def analise(pool):
+    """
+    Fábrica de AnalyticsCache cujas cargas leem as linhas informadas (nome da tabela de
+    TABELAS_ANALISE -> tuplas). As tabelas lidas ficam em pool.lidas, na ordem.
+    """
+    from analytics_cache import TABELAS_ANALISE, AnalyticsCache
+
+    tabela_da_consulta = {query: nome for nome, (query, _) in TABELAS_ANALISE.items()}
+    pool.lidas = []
+
+    def carregar(linhas):
+        def responder(query, params):
+            nome = tabela_da_consulta[query]
+            pool.lidas.append(nome)
+            return [coluna for coluna, _ in TABELAS_ANALISE[nome][1]], linhas.get(nome, [])
+        pool.responder = responder
+        return AnalyticsCache(lambda: pool)
+    return carregar
@@ -0,0 +1,98 @@
+import datetime
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from analytics_cache import ler_filtros
+from reports import RELATORIOS
+
+LINHAS = {
+    'pais': [(1, 'Síria'), (2, 'Iraque'), (3, 'Iêmen')],
+    'regiao': [],
+    'conflito': [(100, 'C100', 500, 50, False), (101, 'C101', 300, 10, False), (102, 'C102', 200, 5, False),
+                 (103, 'C103', None, None, True)],
+    'conflito_territorial': [(102,)],
+    'conflito_religioso': [(100,), (101,)],
+    'conflito_economico': [],
+    'conflito_racial': [(103,)],
+    # O conflito 999 não existe: a linha fica fora de qualquer agrupamento
+    'conflito_afeta_pais': [(100, 1), (100, 2), (101, 1), (102, 3), (999, 1)],
+    'conflito_territorial_afeta_regiao': [],
+    'grupo_armado': [(10, 'G10'), (11, 'G11')],
+    'grupo_armado_participa_conflito': [(10, 100, None), (11, 100, None), (11, 101, None)],
+    'organizacao_mediadora': [],
+    'organizacao_intervem_conflito': [],
+    'traficante_armas': [(1, 'T1'), (2, 'T2')],
+    'fornecimento_arma_grupo': [
+        (1, 'AK-47', 10, datetime.date(2024, 1, 5), 5),
+        (1, 'M16', 11, datetime.date(2023, 6, 1), 3),
+        (2, 'AK-47', 11, datetime.date(2024, 3, 1), 4),
+        (2, 'AK-47', 99, datetime.date(2024, 3, 1), 7),  # grupo inexistente
+    ],
+}
+
+
+@pytest.fixture
+def cache(analise):
+    return analise(LINHAS)
+
+
+def test_mortos_por_pais(cache):
+    assert cache.resumir('mortos', 'pais') == [('Síria', 800), ('Iraque', 500), ('Iêmen', 200)]
+
+
+def test_conflitos_por_tipo_omite_tipos_sem_conflitos(cache):
+    assert cache.resumir('conflitos', 'tipo') == [('Religioso', 2), ('Territorial', 1), ('Racial', 1)]
+
+
+def test_filtro_de_outra_dimensao_do_conflito(cache):
+    filtros = ler_filtros("tipo=Religioso")
+    assert cache.resumir('conflitos', 'pais', filtros) == [('Síria', 2), ('Iraque', 1)]
+    assert cache.resumir('mortos', 'grupo', ler_filtros("pais=Iraque")) == [('G10', 500), ('G11', 500)]
+
+
+def test_limite(cache):
+    assert cache.resumir('mortos', 'pais', limite=1) == [('Síria', 800)]
+    assert cache.resumir('mortos', 'pais', limite=10) == cache.resumir('mortos', 'pais')
+
+
+def test_top_conflitos_mortos_poe_os_sem_numero_primeiro_como_o_sql(cache):
+    # ORDER BY num_mortos_atual DESC: no PostgreSQL, os NULLs vêm antes em ordem decrescente
+    linhas, colunas = cache.responder(RELATORIOS['top-conflitos-mortos'], {'limite': '2'})
+    assert linhas == [('C103', None), ('C100', 500)]
+    assert colunas == ["Conflito", "Número de Mortos"]
+
+
+def test_fornecimentos_por_arma_e_por_grupo(cache):
+    assert cache.resumir('armas', 'arma') == [('AK-47', 16), ('M16', 3)]
+    assert cache.resumir('fornecimentos', 'arma') == [('AK-47', 3), ('M16', 1)]
+    # O fornecimento ao grupo inexistente não entra no agrupamento por grupo
+    assert cache.resumir('armas', 'grupo') == [('G11', 7), ('G10', 5)]
+
+
+def test_filtros_de_fornecimento(cache):
+    assert cache.resumir('armas', 'arma', ler_filtros("desde=2024-01-01")) == [('AK-47', 16)]
+    assert cache.resumir('armas', 'arma', ler_filtros("ate=2023-12-31")) == [('M16', 3)]
+    assert cache.resumir('armas', 'grupo', ler_filtros("traficante=T1")) == [('G10', 5), ('G11', 3)]
+
+
+@pytest.mark.parametrize('medida, por, filtros', [
+    ('vitimas', 'pais', None),
+    ('armas', 'pais', None),
+    ('mortos', 'pais', {'arma': ['AK-47']}),
+    ('mortos', 'pais', {'desde': datetime.date(2024, 1, 1)}),
+])
+def test_combinacoes_invalidas(cache, medida, por, filtros):
+    with pytest.raises(ValueError):
+        cache.resumir(medida, por, filtros)
+
+
+def test_tabelas_carregadas_uma_vez_ate_invalidar(cache, pool):
+    cache.resumir('mortos', 'pais')
+    assert sorted(pool.lidas) == ['conflito', 'conflito_afeta_pais', 'pais']
+    cache.resumir('conflitos', 'pais')
+    assert len(pool.lidas) == 3
+    cache.invalidar('Conflito_Afeta_Pais')
+    cache.resumir('mortos', 'pais')
+    assert pool.lidas[3:] == ['conflito_afeta_pais']
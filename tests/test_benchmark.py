@@ -0,0 +1,29 @@
+import pytest
+
+from benchmark import percentil, resumir
+
+
+@pytest.mark.parametrize('p, esperado', [(50, 50), (95, 95), (99, 99), (100, 100), (1, 1), (0.5, 1)])
+def test_percentil_nearest_rank_em_cem_amostras(p, esperado):
+    assert percentil(list(range(1, 101)), p) == esperado
+
+
+@pytest.mark.parametrize('p, esperado', [(10, 10), (20, 20), (21, 30), (50, 50), (51, 60), (70, 70), (99, 100)])
+def test_percentil_arredonda_o_posto_para_cima(p, esperado):
+    amostras = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100]
+    assert percentil(amostras, p) == esperado
+
+
+def test_percentil_de_uma_amostra_e_ela_mesma():
+    for p in (0, 1, 50, 99, 100):
+        assert percentil([7], p) == 7
+
+
+def test_percentil_zero_devolve_o_menor():
+    assert percentil([3, 5, 8], 0) == 3
+
+
+def test_resumir_converte_para_ms():
+    resumo = resumir([0.004, 0.001, 0.002, 0.003])
+    assert resumo['p50_ms'] == pytest.approx(2.0)
+    assert resumo['p99_ms'] == pytest.approx(4.0)
@@ -0,0 +1,123 @@
+import datetime
+import decimal
+import io
+import json
+
+import pytest
+
+import exporter
+from exporter import (ExportacaoCancelada, escrever_parquet, escrever_texto, escrever_xlsx, exportar,
+                      formato_do_arquivo)
+from reports import RELATORIOS
+
+COLUNAS = ["Traficante", "Quantidade"]
+LINHAS = [("Viktor Bout", 3), ("Monzer al-Kassar", None), ('Aspas "e, vírgula"', 7)]
+
+
+def test_formato_do_arquivo():
+    assert formato_do_arquivo("saida.CSV") == 'csv'
+    assert formato_do_arquivo("dados.parquet") == 'parquet'
+    assert formato_do_arquivo("sem_extensao") is None
+
+
+def test_csv_e_tsv_com_cabecalho():
+    saida = io.StringIO()
+    assert escrever_texto(saida, 'csv', COLUNAS, iter(LINHAS)) == 3
+    assert saida.getvalue().splitlines() == [
+        "Traficante,Quantidade", "Viktor Bout,3", "Monzer al-Kassar,", '"Aspas ""e, vírgula""",7']
+    saida = io.StringIO()
+    escrever_texto(saida, 'tsv', COLUNAS, iter(LINHAS[:1]))
+    assert saida.getvalue() == "Traficante\tQuantidade\nViktor Bout\t3\n"
+
+
+def test_json_e_uma_lista_valida_mesmo_vazia():
+    saida = io.StringIO()
+    assert escrever_texto(saida, 'json', ["Data"], iter([(datetime.date(2024, 1, 2),)])) == 1
+    assert json.loads(saida.getvalue()) == [{"Data": "2024-01-02"}]
+    saida = io.StringIO()
+    assert escrever_texto(saida, 'json', COLUNAS, iter([])) == 0
+    assert json.loads(saida.getvalue()) == []
+
+
+# --- COPY ---
+def test_copy_envia_a_consulta_com_os_valores_e_repassa_o_texto(pool):
+    conn = pool.nova(copia=["Traficante\tArma\n", "Viktor Bout\tAK-47\n", "Monzer\tM16\n"])
+    saida = io.StringIO()
+    total = exportar(conn, RELATORIOS['fornecimentos'], saida, 'tsv', {'armas': 'AK-47'})
+    assert total == 2
+    assert saida.getvalue() == "Traficante\tArma\nViktor Bout\tAK-47\nMonzer\tM16\n"
+    copia = conn.executadas()[-1]
+    assert copia.startswith(b"COPY (SELECT ")
+    assert b"['AK-47']" in copia
+    assert copia.endswith(b"\n) TO STDOUT WITH (FORMAT csv, HEADER, DELIMITER E'\\t')")
+
+
+def test_copy_avisa_progresso_e_cancela(pool, monkeypatch, tmp_path):
+    monkeypatch.setattr(exporter, 'INTERVALO_PROGRESSO', 2)
+    conn = pool.nova(copia=["cabecalho\n"] + [f"linha {i}\n" for i in range(5)])
+    avisos = []
+    assert exportar(conn, RELATORIOS['fornecimentos'], io.StringIO(), 'csv', ao_progredir=avisos.append) == 5
+    assert avisos == [1, 3, 5, 5]
+
+    destino = tmp_path / "parcial.csv"
+    conn = pool.nova(copia=["cabecalho\n"] + [f"linha {i}\n" for i in range(5)])
+    with pytest.raises(ExportacaoCancelada):
+        exportar(conn, RELATORIOS['fornecimentos'], str(destino), 'csv', cancelado=lambda: True)
+    assert not destino.exists()
+
+
+def test_sem_copy_le_cursor_nomeado_e_aplica_timeout(pool):
+    conn = pool.nova(responder=lambda query, params: (COLUNAS, LINHAS) if query.startswith("SELECT") else None)
+    saida = io.StringIO()
+    total = exportar(conn, RELATORIOS['fornecimentos'], saida, 'csv', timeout=2.5, usar_copy=False)
+    assert total == 3
+    assert conn.instrucoes[0] == ("SET LOCAL statement_timeout = %s", (2500,))
+    assert saida.getvalue().splitlines()[0] == "Traficante,Quantidade"
+
+
+def test_formato_desconhecido(pool):
+    with pytest.raises(ValueError):
+        exportar(pool.nova(), RELATORIOS['fornecimentos'], io.StringIO(), 'xml')
+
+
+# --- PARQUET ---
+def test_parquet_tipos_pelos_oids_e_row_groups(monkeypatch, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    monkeypatch.setattr(exporter, 'LINHAS_POR_GRUPO', 2)
+    colunas = ["nome", "quantidade", "total", "data", "outro"]
+    tipos = [1043, 23, exporter.OID_NUMERIC, 1082, 600]  # 600: point, gravado como texto
+    linhas = [
+        ("AK-47", 1, decimal.Decimal("2.5"), datetime.date(2024, 1, 1), "(1,2)"),
+        ("M16", 2, decimal.Decimal("10"), datetime.date(2024, 2, 1), "(3,4)"),
+        (None, None, None, None, None),  # Lote só com nulos não muda o tipo
+    ]
+    destino = tmp_path / "saida.parquet"
+    assert escrever_parquet(str(destino), colunas, tipos, iter(linhas)) == 3
+
+    arquivo = pq.ParquetFile(str(destino))
+    assert arquivo.metadata.num_row_groups == 2
+    assert [str(campo.type) for campo in arquivo.schema_arrow] == ['string', 'int32', 'double', 'date32[day]',
+                                                                   'string']
+    tabela = arquivo.read()
+    assert tabela.column("total").to_pylist() == [2.5, 10.0, None]
+    assert tabela.column("data").to_pylist()[0] == datetime.date(2024, 1, 1)
+
+
+# --- XLSX ---
+def test_xlsx_continua_em_nova_planilha_com_cabecalho(monkeypatch, tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    monkeypatch.setattr(exporter, 'LINHAS_POR_PLANILHA', 2)
+    destino = tmp_path / "saida.xlsx"
+    assert escrever_xlsx(str(destino), COLUNAS, iter(LINHAS)) == 3
+
+    livro = openpyxl.load_workbook(str(destino))
+    assert livro.sheetnames == ["Dados", "Dados 2"]
+    assert [tuple(linha) for linha in livro["Dados"].values] == [tuple(COLUNAS)] + LINHAS[:2]
+    assert [tuple(linha) for linha in livro["Dados 2"].values] == [tuple(COLUNAS), LINHAS[2]]
+
+
+def test_xlsx_vazio_tem_so_o_cabecalho(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    destino = tmp_path / "vazio.xlsx"
+    assert escrever_xlsx(str(destino), COLUNAS, iter([])) == 0
+    assert [tuple(linha) for linha in openpyxl.load_workbook(str(destino))["Dados"].values] == [tuple(COLUNAS)]
@@ -0,0 +1,46 @@
+import index_advisor
+from index_advisor import coletar_consultas, consultas_da_busca, consultas_dos_relatorios
+from reports import RELATORIOS
+
+
+def test_fragmentos_de_f_string_nao_sao_coletados(tmp_path):
+    (tmp_path / "modulo.py").write_text(
+        'FILTRO = "c.cod_conflito = %s"\n'
+        'def listar(filtro):\n'
+        '    return f"SELECT nome_conflito FROM Conflito c WHERE {filtro}"\n'
+        'def contar():\n'
+        '    return "SELECT count(*) FROM Conflito"\n', encoding='utf-8')
+    consultas = coletar_consultas(["modulo.py"], str(tmp_path))
+    assert [(consulta.origem, consulta.sql) for consulta in consultas] == [
+        ("modulo.py:contar (linha 5)", "SELECT count(*) FROM Conflito")]
+
+
+def test_reports_nao_e_mais_varrido_como_texto():
+    assert 'reports.py' not in index_advisor.MODULOS_APP
+    assert not any(consulta.origem.startswith('reports.py') for consulta in coletar_consultas())
+
+
+def test_relatorios_compilados_em_todas_as_variantes():
+    origens = {consulta.origem: consulta for consulta in consultas_dos_relatorios()}
+    for nome, relatorio in RELATORIOS.items():
+        assert f"reports.py:{nome} (base)" in origens
+        if relatorio.query_resumo:
+            assert f"reports.py:{nome} (resumos)" in origens
+        if relatorio.chave:
+            seguinte = origens[f"reports.py:{nome} (base, página seguinte)"].sql
+            assert "%(_apos_0)s" in seguinte and "LIMIT %(_tamanho)s" in seguinte
+
+
+def test_series_saem_completas():
+    # As séries montam as condições de data com f-strings: a varredura de literais só via pedaços
+    consulta = next(c for c in consultas_dos_relatorios() if c.origem == "reports.py:entradas-mensais (base)")
+    assert "date_trunc('month', COALESCE(" in consulta.sql
+    assert "%(" not in consulta.numerada() and "$1" in consulta.numerada()
+
+
+def test_buscas_incrementais_de_cada_tabela():
+    consultas = {consulta.origem: consulta.sql for consulta in consultas_da_busca()}
+    assert len(consultas) == 6
+    assert consultas["reference_search.py:conflito (com termo)"] == (
+        "SELECT cod_conflito, nome_conflito FROM Conflito WHERE nome_conflito ILIKE %(padrao)s "
+        "ORDER BY nome_conflito LIMIT %(limite)s")
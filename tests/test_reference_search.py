@@ -0,0 +1,79 @@
+import pytest
+
+from reference_search import ReferenceSearch, _padrao_ilike
+
+PAISES = [(1, "Síria"), (2, "Sérvia"), (3, "Somália"), (4, "Sudão"), (5, "Iêmen"), (6, "Líbia")]
+
+
+def contem(termo):
+    """O que o servidor devolveria, sem o LIMIT: nomes que contêm o termo, em ordem de nome."""
+    return sorted((linha for linha in PAISES if termo in linha[1].lower()), key=lambda linha: linha[1])
+
+
+@pytest.fixture
+def busca(pool):
+    """Fábrica de ReferenceSearch sobre PAISES; o ILIKE do servidor é imitado com 'in' sem caixa."""
+    def responder(query, params):
+        termo = params['padrao'][1:-1].replace('\\', '') if 'padrao' in params else ''
+        return ["cod_pais", "nome_pais"], contem(termo.lower())[:params['limite']]
+    pool.responder = responder
+
+    def criar(limite=10):
+        return ReferenceSearch(lambda: pool, tabelas={'pais': ('Pais', 'cod_pais', 'nome_pais')}, limite=limite)
+    return criar
+
+
+def test_termo_mais_longo_e_filtrado_do_prefixo_completo(busca, pool):
+    referencias = busca()
+    assert referencias.buscar('pais', "s") == contem("s")
+    assert referencias.buscar('pais', "sí") == [(1, "Síria")]
+    assert len(pool.entregues) == 1
+    # "s" não é prefixo de "ria": vai ao servidor
+    assert referencias.buscar('pais', "ria") == [(1, "Síria")]
+    assert len(pool.entregues) == 2
+    assert referencias.estatisticas()['filtradas'] == 1
+
+
+def test_prefixo_incompleto_nao_serve_de_base(busca, pool):
+    referencias = busca(limite=2)
+    assert len(referencias.buscar('pais', "s")) == 2  # Há mais de 2: resultado incompleto
+    assert referencias.buscar('pais', "so") == [(3, "Somália")]
+    assert len(pool.entregues) == 2
+    # O resultado de "so" veio completo: "som" sai dele
+    assert referencias.buscar('pais', "som") == [(3, "Somália")]
+    assert len(pool.entregues) == 2
+
+
+def test_termo_normalizado_e_repetido_vem_do_cache(busca, pool):
+    referencias = busca()
+    referencias.buscar('pais', "Sí")
+    assert referencias.buscar('pais', "  SÍ ") == [(1, "Síria")]
+    assert len(pool.entregues) == 1
+    assert referencias.estatisticas()['acertos'] == 1
+
+
+def test_sem_termo_usa_a_consulta_sem_filtro(busca, pool):
+    referencias = busca(limite=3)
+    assert referencias.buscar('pais', "") == contem("")[:3]
+    (query, params), = pool.entregues[0].instrucoes
+    assert "ILIKE" not in query and params == {'limite': 4}
+
+
+def test_invalidar_descarta_e_nao_guarda_leitura_concorrente(busca, pool):
+    referencias = busca()
+    referencias.buscar('pais', "s")
+    referencias.invalidar('pais')
+    assert referencias.estatisticas()['termos_em_cache'] == 0
+
+    responder = pool.responder
+
+    def escrita_durante_a_leitura(query, params):
+        referencias.invalidar('pais')
+        return responder(query, params)
+    pool.responder = escrita_durante_a_leitura
+    referencias.buscar('pais', "s")
+    assert referencias.estatisticas()['termos_em_cache'] == 0
+
+
+def test_curingas_do_termo_sao_escapados():
+    assert _padrao_ilike("50%_a\\b") == "%50\\%\\_a\\\\b%"
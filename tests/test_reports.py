@@ -0,0 +1,84 @@
+import random
+import re
+import sqlite3
+
+import pytest
+
+from reports import RELATORIOS, Relatorio, _ordenar_por_chave
+
+
+def paginar(relatorio, linhas, tamanho):
+    """
+    Lê a listagem página a página, como a interface, com a consulta de _ordenar_por_chave
+    executada no SQLite sobre 'linhas' (tabela r).
+    """
+    nomes = [coluna for coluna, _ in relatorio.chave]
+    banco = sqlite3.connect(":memory:")
+    colunas = ", ".join(f'"{nome}"' for nome in nomes)
+    banco.execute(f"CREATE TABLE r ({colunas})")
+    banco.executemany(f"INSERT INTO r VALUES ({', '.join('?' * len(nomes))})", linhas)
+    lidas, apos = [], None
+    while True:
+        query, params = _ordenar_por_chave(relatorio, "SELECT * FROM r", {}, apos, tamanho)
+        pagina = banco.execute(re.sub(r"%\((\w+)\)s", r":\1", query), params).fetchall()
+        lidas.extend(pagina[:tamanho])
+        if len(pagina) <= tamanho:
+            return lidas
+        apos = relatorio.chave_da_linha(pagina[tamanho - 1], nomes)
+
+
+def listagem(chave):
+    return Relatorio('teste', "Teste", "", "SELECT * FROM r", [coluna for coluna, _ in chave], chave=chave)
+
+
+def ordenadas(linhas, chave):
+    """Ordem da chave em Python: ordenações estáveis da última coluna para a primeira."""
+    linhas = list(linhas)
+    for i in reversed(range(len(chave))):
+        linhas.sort(key=lambda linha: linha[i], reverse=chave[i][1] == 'DESC')
+    return linhas
+
+
+def test_condicao_com_direcoes_mistas():
+    relatorio = listagem([("Data", 'DESC'), ("id", 'ASC')])
+    query, params = _ordenar_por_chave(relatorio, "SELECT 1", {}, ('2020-01-01', 7), 10)
+    assert ('WHERE r."Data" <= %(_apos_0)s AND ((r."Data" < %(_apos_0)s) '
+            'OR (r."Data" = %(_apos_0)s AND r."id" > %(_apos_1)s))') in query
+    assert query.endswith('ORDER BY r."Data" DESC, r."id" ASC LIMIT %(_tamanho)s')
+    assert params == {'_apos_0': '2020-01-01', '_apos_1': 7, '_tamanho': 11}
+
+
+@pytest.mark.parametrize('direcoes', [('ASC', 'ASC', 'ASC'), ('DESC', 'ASC', 'DESC'), ('ASC', 'DESC', 'ASC')])
+@pytest.mark.parametrize('tamanho', [1, 2, 5])
+def test_paginas_cobrem_a_listagem_na_ordem(direcoes, tamanho):
+    chave = [(nome, direcao) for nome, direcao in zip("abc", direcoes)]
+    gerador = random.Random(tamanho)
+    # Poucos valores distintos por coluna: muitos empates nas primeiras colunas, chave única no conjunto
+    linhas = list({(gerador.randint(0, 3), gerador.randint(0, 2), i) for i in range(40)})
+    assert paginar(listagem(chave), linhas, tamanho) == ordenadas(linhas, chave)
+
+
+def test_participacoes_do_mesmo_grupo_no_mesmo_conflito_nao_se_perdem():
+    # O mesmo grupo entra duas vezes no mesmo conflito: só a incorporação desempata
+    relatorio = RELATORIOS['participacoes']
+    linhas = [("Guerra A", 1, "Grupo X", 10, f"2020-0{mes}-01") for mes in range(1, 6)]
+    linhas.append(("Guerra B", 2, "Grupo Y", 11, "2019-01-01"))
+    for tamanho in (1, 2, 3):
+        assert paginar(relatorio, linhas, tamanho) == ordenadas(linhas, relatorio.chave)
+
+
+def test_series_separam_conflitos_de_mesmo_nome():
+    relatorio = RELATORIOS['entradas-mensais']
+    colunas = ["mes", "nome_conflito", "entradas", "acumulado", "cod_conflito_fk"]
+    linhas = [("2024-01-01", "Guerra Civil", 2, 2, 7), ("2024-01-01", "Guerra Civil", 1, 1, 9),
+              ("2024-02-01", "Guerra Civil", 3, 5, 7)]
+    assert relatorio.series(linhas, colunas) == [("Guerra Civil", ["2024-01-01", "2024-02-01"], [2, 3]),
+                                                 ("Guerra Civil", ["2024-01-01"], [1])]
+
+
+def test_serie_sem_grupo_tem_uma_linha_por_medida():
+    relatorio = RELATORIOS['participacoes-ativas']
+    linhas = [("2024-01-01", 4, 4.0), ("2024-02-01", 6, 5.0)]
+    assert relatorio.series(linhas, ["mes", "ativas", "media_movel"]) == [
+        ("Participações Ativas", ["2024-01-01", "2024-02-01"], [4, 6]),
+        ("Média Móvel", ["2024-01-01", "2024-02-01"], [4.0, 5.0])]
@@ -0,0 +1,109 @@
+import pytest
+
+import result_cache
+from result_cache import ResultCache, tabelas_da_consulta
+
+QUERY = "SELECT nome_grupo FROM Grupo_Armado g JOIN Divisao d ON d.cod_grupo_fk = g.cod_grupo"
+OUTRA = "SELECT nome_pais FROM Pais"
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio controlado pelo teste no lugar de time.monotonic."""
+    agora = [1000.0]
+    monkeypatch.setattr(result_cache.time, 'monotonic', lambda: agora[0])
+    return agora
+
+
+def guardar(cache, query, params=None, linhas=((1,),)):
+    cache.guardar(query, params, list(linhas), ["c"], cache.versoes(query))
+
+
+def test_tabelas_da_consulta_inclui_as_bases_dos_resumos():
+    assert tabelas_da_consulta(QUERY) == {'grupo_armado', 'divisao'}
+    resumo = "SELECT tipo FROM Resumo_Conflitos_Tipo ORDER BY ordem"
+    assert tabelas_da_consulta(resumo) == {'resumo_conflitos_tipo', 'conflito_territorial', 'conflito_religioso',
+                                           'conflito_economico', 'conflito_racial'}
+
+
+def test_chave_inclui_os_parametros():
+    cache = ResultCache()
+    guardar(cache, QUERY, {'armas': ['AK-47'], 'limite': 5}, linhas=[(1,)])
+    assert cache.obter(QUERY, {'limite': 5, 'armas': ['AK-47']}) == ([(1,)], ["c"])
+    assert cache.obter(QUERY, {'limite': 5, 'armas': ['M16']}) is None
+
+
+def test_invalidar_descarta_so_quem_le_a_tabela():
+    cache = ResultCache()
+    guardar(cache, QUERY)
+    guardar(cache, OUTRA)
+    cache.invalidar('Divisao')
+    assert cache.obter(QUERY) is None
+    assert cache.obter(OUTRA) is not None
+    assert cache.estatisticas()['invalidados'] == 1
+
+
+def test_resultado_lido_antes_de_uma_escrita_nao_e_guardado():
+    cache = ResultCache()
+    versoes = cache.versoes(QUERY)
+    cache.invalidar('grupo_armado')  # A escrita chegou enquanto a consulta rodava
+    cache.guardar(QUERY, None, [(1,)], ["c"], versoes)
+    assert cache.obter(QUERY) is None
+    # Uma tabela que a consulta não lê não impede
+    versoes = cache.versoes(QUERY)
+    cache.invalidar('pais')
+    cache.guardar(QUERY, None, [(1,)], ["c"], versoes)
+    assert cache.obter(QUERY) is not None
+
+
+def test_invalidar_tudo_muda_a_epoca():
+    cache = ResultCache()
+    guardar(cache, OUTRA)
+    versoes = cache.versoes(QUERY)
+    cache.invalidar()
+    assert cache.obter(OUTRA) is None
+    cache.guardar(QUERY, None, [(1,)], ["c"], versoes)
+    assert cache.obter(QUERY) is None
+
+
+def test_ttl(relogio):
+    cache = ResultCache(ttl=300)
+    guardar(cache, QUERY)
+    relogio[0] += 300
+    assert cache.obter(QUERY) is not None
+    relogio[0] += 1
+    assert cache.obter(QUERY) is None
+    assert cache.estatisticas()['expirados'] == 1
+
+
+def test_lru_por_quantidade():
+    cache = ResultCache(max_resultados=2)
+    for query in ("SELECT 1 FROM a", "SELECT 2 FROM b"):
+        guardar(cache, query)
+    cache.obter("SELECT 1 FROM a")  # Passa a ser o mais recente
+    guardar(cache, "SELECT 3 FROM c")
+    assert cache.obter("SELECT 2 FROM b") is None
+    assert cache.obter("SELECT 1 FROM a") is not None
+    assert cache.estatisticas()['descartados'] == 1
+
+
+def test_limite_de_memoria():
+    linhas = [(i, f"nome {i}") for i in range(100)]
+    tamanho = result_cache._tamanho(list(linhas))
+    cache = ResultCache(max_bytes=2 * tamanho + tamanho // 2)
+    for query in ("SELECT 1 FROM a", "SELECT 2 FROM b", "SELECT 3 FROM c"):
+        guardar(cache, query, linhas=linhas)
+    stats = cache.estatisticas()
+    assert stats['resultados'] == 2 and stats['bytes'] == 2 * tamanho
+    assert cache.obter("SELECT 1 FROM a") is None
+    # Maior que o limite inteiro: nem entra (e não expulsa ninguém)
+    guardar(cache, "SELECT 4 FROM d", linhas=linhas * 3)
+    assert cache.estatisticas()['resultados'] == 2
+
+
+def test_guardar_de_novo_nao_conta_bytes_em_dobro():
+    cache = ResultCache()
+    guardar(cache, QUERY)
+    bytes_antes = cache.estatisticas()['bytes']
+    guardar(cache, QUERY)
+    assert cache.estatisticas()['bytes'] == bytes_antes
@@ -0,0 +1,165 @@
+import psycopg2
+import pytest
+from psycopg2 import errorcodes
+
+from report_executor import CONCLUIDO, ERRO, ReportExecutor
+from statement_cache import StatementCache, _Definicao
+
+
+class ResultadoAlterado(psycopg2.Error):
+    """Erro com SQLSTATE, como os que o servidor devolve (o psycopg2 não deixa atribuir pgcode)."""
+    pgcode = errorcodes.FEATURE_NOT_SUPPORTED
+
+
+class InstrucaoDesconhecida(psycopg2.Error):
+    pgcode = errorcodes.INVALID_SQL_STATEMENT_NAME
+
+
+@pytest.fixture
+def cursor(pool):
+    return pool.nova().cursor()
+
+
+def test_posicionais_viram_parametros_numerados():
+    definicao = _Definicao("SELECT * FROM Pais WHERE cod_pais = %s AND nome_pais = %s")
+    assert definicao.prepare.endswith("AS SELECT * FROM Pais WHERE cod_pais = $1 AND nome_pais = $2")
+    assert definicao.execute == f"EXECUTE {definicao.nome} (%s, %s)"
+    assert definicao.valores((7, 'Síria')) == [7, 'Síria']
+
+
+def test_nome_repetido_usa_o_mesmo_numero():
+    definicao = _Definicao("SELECT %(inicio)s, %(fim)s WHERE x >= %(inicio)s")
+    assert definicao.prepare.endswith("AS SELECT $1, $2 WHERE x >= $1")
+    assert definicao.valores({'fim': 2, 'inicio': 1}) == [1, 2]
+
+
+def test_percentual_literal_nao_e_parametro():
+    definicao = _Definicao("SELECT nome FROM Pais WHERE nome LIKE 'S%%' AND cod = %s;")
+    assert definicao.prepare.endswith("AS SELECT nome FROM Pais WHERE nome LIKE 'S%' AND cod = $1")
+    assert definicao.ordem == [0]
+
+
+def test_instrucao_sem_parametros():
+    definicao = _Definicao("SELECT 1")
+    assert definicao.execute == f"EXECUTE {definicao.nome}"
+    assert definicao.valores(None) is None
+
+
+def test_nome_depende_apenas_do_texto():
+    assert _Definicao("SELECT %s").nome == _Definicao("SELECT %s").nome
+    assert _Definicao("SELECT %s").nome != _Definicao("SELECT  %s").nome
+    assert _Definicao("SELECT %s").nome.startswith('ps_')
+
+
+def test_prepara_uma_vez_por_conexao(cursor):
+    cache = StatementCache()
+    cache.executar(cursor, "SELECT %s", (1,))
+    cache.executar(cursor, "SELECT %s", (2,))
+    nome = _Definicao("SELECT %s").nome
+    assert cursor.connection.instrucoes == [(f"PREPARE {nome} AS SELECT $1", None),
+                               (f"EXECUTE {nome} (%s)", [1]),
+                               (f"EXECUTE {nome} (%s)", [2])]
+    stats = cache.estatisticas()
+    assert (stats['preparacoes'], stats['acertos']) == (1, 1)
+
+
+def test_excedente_recebe_deallocate(cursor):
+    cache = StatementCache(max_por_conexao=2)
+    for query in ("SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3"):
+        cache.executar(cursor, query)
+    # SELECT 2 é a menos usada recentemente quando SELECT 3 chega
+    assert (f"DEALLOCATE {_Definicao('SELECT 2').nome}", None) in cursor.connection.instrucoes
+    assert cache.estatisticas()['descartadas'] == 1
+
+
+def test_composable_e_executado_diretamente(cursor):
+    cache = StatementCache()
+    composta = object()
+    cache.executar(cursor, composta, (1,))
+    assert cursor.connection.instrucoes == [(composta, (1,))]
+    assert cache.estatisticas()['diretas'] == 1
+
+
+def resultado_alterado_na_transacao(cache, cursor, query):
+    """Prepara a instrução e a faz falhar com 0A000 no meio de uma transação: fica um DEALLOCATE pendente."""
+    conn = cursor.connection
+    cache.executar(cursor, query)
+    conn.falhas.append(("EXECUTE", ResultadoAlterado("cached plan must not change result type")))
+    cursor.execute("SET LOCAL statement_timeout = 1000")
+    with pytest.raises(ResultadoAlterado):
+        cache.executar(cursor, query)
+    conn.rollback()
+    conn.instrucoes.clear()
+
+
+def test_discard_all_descarta_os_deallocate_pendentes(cursor):
+    cache = StatementCache()
+    um, dois = _Definicao("SELECT 1").nome, _Definicao("SELECT 2").nome
+    cache.executar(cursor, "SELECT 2")
+    cursor.connection.rollback()
+    resultado_alterado_na_transacao(cache, cursor, "SELECT 1")
+    # DISCARD ALL no servidor: o EXECUTE de outra instrução já preparada não a encontra mais
+    cursor.connection.falhas.append(("EXECUTE", InstrucaoDesconhecida("prepared statement does not exist")))
+    cache.executar(cursor, "SELECT 2")
+    cache.executar(cursor, "SELECT 1")
+    # Nenhum DEALLOCATE de um nome que o servidor já não tem
+    assert cursor.connection.executadas() == [f"EXECUTE {dois}", f"PREPARE {dois} AS SELECT 2", f"EXECUTE {dois}",
+                                              f"PREPARE {um} AS SELECT 1", f"EXECUTE {um}"]
+
+
+def test_deallocate_de_nome_desconhecido_prepara_de_novo(cursor):
+    cache = StatementCache()
+    nome = _Definicao("SELECT 1").nome
+    resultado_alterado_na_transacao(cache, cursor, "SELECT 1")
+    cursor.connection.falhas.append(("DEALLOCATE", InstrucaoDesconhecida("prepared statement does not exist")))
+    cache.executar(cursor, "SELECT 1")
+    assert cursor.connection.executadas() == [f"DEALLOCATE {nome}",
+                                              f"PREPARE {nome} AS SELECT 1", f"EXECUTE {nome}"]
+    assert cursor.connection.rollbacks == 2
+
+
+def test_deallocate_de_nome_desconhecido_na_transacao_repassa_o_erro(cursor):
+    cache = StatementCache()
+    resultado_alterado_na_transacao(cache, cursor, "SELECT 1")
+    cursor.connection.falhas.append(("DEALLOCATE", InstrucaoDesconhecida("prepared statement does not exist")))
+    cursor.execute("SET LOCAL statement_timeout = 1000")
+    with pytest.raises(InstrucaoDesconhecida):
+        cache.executar(cursor, "SELECT 1")
+    # Quem chamou desfaz a transação e repete: não sobra DEALLOCATE nem instrução esquecida
+    cursor.connection.rollback()
+    cursor.connection.instrucoes.clear()
+    cache.executar(cursor, "SELECT 1")
+    assert [query.split()[0] for query in cursor.connection.executadas()] == ["PREPARE", "EXECUTE"]
+
+
+@pytest.fixture
+def executar_relatorio(pool):
+    """Roda um job do ReportExecutor com timeout (SET LOCAL antes da consulta) e espera o fim."""
+    pool.responder = lambda query, params: (["valor"], [(1,)]) if query.startswith("EXECUTE") else None
+
+    def executar(query, params):
+        executor = ReportExecutor(lambda: pool, max_workers=1, cache_instrucoes=StatementCache())
+        job = executor.submit('teste', query, params, timeout=5)
+        job._terminou.wait(5)
+        executor.shutdown()
+        return job
+    return executar
+
+
+def test_relatorio_repete_quando_o_resultado_muda_de_tipo_na_transacao(pool, executar_relatorio):
+    nome = _Definicao("SELECT %s").nome
+    conn = pool.nova(falhas=[("EXECUTE", ResultadoAlterado("cached plan must not change result type"))])
+    job = executar_relatorio("SELECT %s", (1,))
+    assert (job.estado, job.resultado) == (CONCLUIDO, ([(1,)], ["valor"]))
+    assert conn.executadas() == ["SET LOCAL statement_timeout = %s", f"PREPARE {nome} AS SELECT $1",
+                                 f"EXECUTE {nome} (%s)",
+                                 "SET LOCAL statement_timeout = %s", f"DEALLOCATE {nome}",
+                                 f"PREPARE {nome} AS SELECT $1", f"EXECUTE {nome} (%s)"]
+    assert conn.rollbacks == 2
+
+
+def test_relatorio_repete_uma_vez_so(pool, executar_relatorio):
+    erros = [("EXECUTE", InstrucaoDesconhecida("prepared statement does not exist")) for _ in range(2)]
+    pool.nova(falhas=erros)
+    job = executar_relatorio("SELECT %s", (1,))
+    assert job.estado == ERRO and isinstance(job.erro, InstrucaoDesconhecida)
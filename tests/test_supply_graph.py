@@ -0,0 +1,179 @@
+import datetime
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import supply_graph
+from supply_graph import SupplyGraph, _CSR
+
+supply_graph._numpy()
+
+
+def rede_aleatoria(semente, traficantes=25, grupos=50, conflitos=12, fornecimentos=70, participacoes=60):
+    """Linhas das tabelas do grafo, com alguns códigos que não existem (devem ser ignorados)."""
+    aleatorio = random.Random(semente)
+    hoje = datetime.date(2024, 1, 1)
+    return {
+        'traficante_armas': [(100 + i, f"T{i}") for i in range(traficantes)],
+        'grupo_armado': [(200 + i, f"G{i}") for i in range(grupos)],
+        'conflito': [(300 + i, f"C{i}", 0, 0, False) for i in range(conflitos)],
+        'fornecimento_arma_grupo': [
+            (100 + aleatorio.randrange(traficantes + 2), 'AK-47', 200 + aleatorio.randrange(grupos + 2), hoje,
+             aleatorio.randint(1, 9))
+            for _ in range(fornecimentos)],
+        'grupo_armado_participa_conflito': [
+            (200 + aleatorio.randrange(grupos), 300 + aleatorio.randrange(conflitos + 1), hoje)
+            for _ in range(participacoes)],
+    }
+
+
+@pytest.fixture
+def grafo_de(analise):
+    """Fábrica de SupplyGraph sobre as linhas informadas."""
+    return lambda linhas: SupplyGraph(analise(linhas))
+
+
+def arestas_validas(linhas):
+    """Pares (traficante, grupo) e (grupo, conflito) por nome, só entre nós existentes."""
+    nomes = {codigo: nome for tabela in ('traficante_armas', 'grupo_armado', 'conflito')
+             for codigo, nome, *_ in linhas[tabela]}
+    fornece = {(nomes[t], nomes[g]) for t, _, g, _, _ in linhas['fornecimento_arma_grupo']
+               if t in nomes and g in nomes}
+    participa = {(nomes[g], nomes[c]) for g, c, _ in linhas['grupo_armado_participa_conflito']
+                 if g in nomes and c in nomes}
+    return fornece, participa
+
+
+# --- _CSR ---
+def test_de_arestas_soma_pares_repetidos_e_ordena_vizinhos():
+    origens = np.array([2, 0, 2, 0, 2], dtype=np.int32)
+    destinos = np.array([1, 3, 0, 3, 1], dtype=np.int32)
+    pesos = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    csr = _CSR.de_arestas(origens, destinos, pesos, total_origens=4, total_destinos=5)
+    assert csr.indptr.tolist() == [0, 1, 1, 3, 3]
+    assert csr.indices.tolist() == [3, 0, 1]
+    assert csr.pesos.tolist() == [6.0, 3.0, 6.0]
+    assert csr.graus().tolist() == [1, 0, 2, 0]
+    assert csr.origens().tolist() == [0, 2, 2]
+    assert csr.destinos == 5
+
+
+def test_de_arestas_sem_arestas():
+    vazio = np.array([], dtype=np.int32)
+    csr = _CSR.de_arestas(vazio, vazio, np.array([]), total_origens=3, total_destinos=0)
+    assert csr.indptr.tolist() == [0, 0, 0, 0]
+    assert len(csr.indices) == 0 and len(csr.pesos) == 0
+
+
+@pytest.mark.parametrize('semente', range(5))
+def test_de_arestas_e_transposta_contra_dicionario(semente):
+    aleatorio = np.random.default_rng(semente)
+    origens = aleatorio.integers(0, 20, 200).astype(np.int32)
+    destinos = aleatorio.integers(0, 30, 200).astype(np.int32)
+    pesos = aleatorio.integers(1, 10, 200).astype(np.float64)
+    esperado = {}
+    for o, d, p in zip(origens.tolist(), destinos.tolist(), pesos.tolist()):
+        esperado[o, d] = esperado.get((o, d), 0) + p
+
+    csr = _CSR.de_arestas(origens, destinos, pesos, 20, 30)
+    obtido = {(o, d): p for o, d, p in zip(csr.origens().tolist(), csr.indices.tolist(), csr.pesos.tolist())}
+    assert obtido == esperado
+    for no in range(20):
+        vizinhos = csr.indices[csr.indptr[no]:csr.indptr[no + 1]]
+        assert (np.diff(vizinhos) > 0).all()
+
+    transposta = csr.transposta()
+    assert len(transposta.indptr) == 31 and transposta.destinos == 20
+    obtido = {(o, d): p for d, o, p in zip(transposta.origens().tolist(), transposta.indices.tolist(),
+                                           transposta.pesos.tolist())}
+    assert obtido == esperado
+
+
+def test_vizinhos_de_varios_nos():
+    csr = _CSR.de_arestas(np.array([0, 0, 2], dtype=np.int32), np.array([1, 2, 0], dtype=np.int32),
+                          np.array([1.0, 2.0, 3.0]), 3, 3)
+    origens, destinos, pesos = csr.vizinhos(np.array([2, 1, 0]))
+    assert origens.tolist() == [0, 2, 2]
+    assert destinos.tolist() == [0, 1, 2]
+    assert pesos.tolist() == [3.0, 1.0, 2.0]
+
+
+# --- AGRUPAMENTOS ---
+def agrupamentos_forca_bruta(linhas):
+    """(grupos, traficantes) de cada componente com dois ou mais grupos, por união de conjuntos."""
+    fornece, _ = arestas_validas(linhas)
+    pai = {}
+
+    def raiz(no):
+        while pai.setdefault(no, no) != no:
+            no = pai[no]
+        return no
+
+    for traficante, grupo in fornece:
+        pai[raiz(('t', traficante))] = raiz(('g', grupo))
+    componentes = {}
+    for tipo, nome in pai:
+        componentes.setdefault(raiz((tipo, nome)), []).append(tipo)
+    return sorted(((tipos.count('g'), tipos.count('t')) for tipos in componentes.values()
+                   if tipos.count('g') >= 2), reverse=True)
+
+
+@pytest.mark.parametrize('semente', range(8))
+def test_agrupamentos_contra_forca_bruta(semente, grafo_de):
+    linhas = rede_aleatoria(semente)
+    obtido = grafo_de(linhas).agrupamentos()
+    assert [(g, t) for g, t, _ in obtido] == agrupamentos_forca_bruta(linhas)
+
+
+def test_agrupamentos_cadeia_longa(grafo_de):
+    # T0-G0-T1-G1-...: um único componente, que a propagação precisa atravessar inteiro
+    linhas = rede_aleatoria(0, fornecimentos=0)
+    cadeia = [(100 + i, 'AK-47', 200 + i, None, 1) for i in range(25)]
+    cadeia += [(100 + i + 1, 'AK-47', 200 + i, None, 1) for i in range(24)]
+    linhas['fornecimento_arma_grupo'] = cadeia
+    assert [(g, t) for g, t, _ in grafo_de(linhas).agrupamentos()] == [(25, 25)]
+
+
+def test_agrupamentos_limite_e_exemplos(grafo_de):
+    linhas = rede_aleatoria(0, fornecimentos=0)
+    linhas['fornecimento_arma_grupo'] = [
+        (100, 'AK-47', 200, None, 1), (100, 'AK-47', 201, None, 9), (100, 'AK-47', 202, None, 5),
+        (101, 'AK-47', 210, None, 1), (101, 'AK-47', 211, None, 1),
+        (102, 'AK-47', 220, None, 1),
+    ]
+    grafo = grafo_de(linhas)
+    assert grafo.agrupamentos() == [(3, 1, "G1, G2, G0"), (2, 1, "G10, G11")]
+    assert grafo.agrupamentos(limite=1) == [(3, 1, "G1, G2, G0")]
+
+
+# --- ALCANCE ---
+def alcance_forca_bruta(linhas, tipo):
+    """Nós distintos a dois saltos, pelos caminhos que a docstring de ranking descreve."""
+    fornece, participa = arestas_validas(linhas)
+    fornecido_por = {(b, a) for a, b in fornece}
+    participantes = {(b, a) for a, b in participa}
+    primeiro, segundo = {'traficante': (fornece, participa), 'grupo': (fornecido_por, fornece),
+                         'conflito': (participantes, fornecido_por)}[tipo]
+    resultado = {}
+    for _, nome, *_ in linhas[supply_graph.TIPOS_NO[tipo][0]]:
+        vizinhos = {b for a, b in primeiro if a == nome}
+        dois_saltos = {b for a, b in segundo if a in vizinhos} - {nome}
+        resultado[nome] = len(dois_saltos)
+    return resultado
+
+
+@pytest.mark.parametrize('tipo', ['traficante', 'grupo', 'conflito'])
+@pytest.mark.parametrize('semente', range(5))
+def test_alcance_contra_forca_bruta(semente, tipo, grafo_de):
+    linhas = rede_aleatoria(semente)
+    obtido = dict(grafo_de(linhas).ranking('alcance', tipo))
+    assert obtido == alcance_forca_bruta(linhas, tipo)
+
+
+def test_ranking_ordena_e_limita(grafo_de):
+    linhas = rede_aleatoria(3)
+    ranking = grafo_de(linhas).ranking('alcance', 'grupo', limite=5)
+    valores = [valor for _, valor in ranking]
+    assert len(ranking) == 5 and valores == sorted(valores, reverse=True)
@@ -0,0 +1,113 @@
+import psycopg2
+import pytest
+from psycopg2 import errorcodes
+
+from write_queue import Escrita, GravacaoIncerta, WriteQueue
+
+
+class ErroServidor(psycopg2.Error):
+    """Erro com SQLSTATE, como os que o servidor devolve (o psycopg2 não deixa atribuir pgcode)."""
+    pgcode = errorcodes.SERIALIZATION_FAILURE
+
+
+class ResultadoAlterado(psycopg2.Error):
+    pgcode = errorcodes.FEATURE_NOT_SUPPORTED
+
+
+def escrita(nome, erro=None):
+    def gravar(cursor):
+        cursor.execute(f"INSERT {nome}")
+        if erro is not None:
+            raise erro
+        return f"{nome} gravado"
+    return Escrita(nome, gravar)
+
+
+def gravar_lote(pool, lote):
+    fila = WriteQueue(lambda: pool)
+    fila._gravar_lote(lote)
+    return fila.estatisticas()
+
+
+def test_lote_inteiro_em_uma_transacao(pool):
+    lote = [escrita('a'), escrita('b')]
+    stats = gravar_lote(pool, lote)
+    assert len(pool.entregues) == 1 and pool.entregues[0].commits == 1
+    assert [e.mensagem for e in lote] == ['a gravado', 'b gravado']
+    assert stats['regravados'] == 0
+
+
+def test_registro_com_erro_e_desfeito_sozinho(pool):
+    lote = [escrita('a'), escrita('b', erro=ValueError("inválido")), escrita('c')]
+    gravar_lote(pool, lote)
+    conn, = pool.entregues
+    assert conn.commits == 1
+    assert conn.executadas().count("ROLLBACK TO SAVEPOINT escrita") == 1
+    assert [e.sucesso() for e in lote] == [True, False, True]
+
+
+def test_falha_antes_do_commit_regrava_um_por_transacao(pool):
+    # A conexão cai no primeiro SAVEPOINT: nada foi efetivado
+    pool.nova(falhas=[("SAVEPOINT", psycopg2.OperationalError("server closed the connection"))])
+    lote = [escrita('a'), escrita('b')]
+    stats = gravar_lote(pool, lote)
+    assert len(pool.entregues) == 3
+    assert [c.commits for c in pool.entregues[1:]] == [1, 1]
+    assert all(e.sucesso() for e in lote)
+    assert stats['regravados'] == 2
+
+
+def test_registro_com_erro_proprio_nao_e_regravado(pool):
+    pool.nova(erro_commit=ErroServidor("could not serialize access"))
+    lote = [escrita('a'), escrita('b', erro=ValueError("inválido"))]
+    stats = gravar_lote(pool, lote)
+    assert len(pool.entregues) == 2
+    assert lote[0].sucesso() and not lote[1].sucesso()
+    assert stats['regravados'] == 1
+
+
+def test_commit_recusado_pelo_servidor_regrava(pool):
+    conn = pool.nova(erro_commit=ErroServidor("could not serialize access"))
+    lote = [escrita('a'), escrita('b')]
+    stats = gravar_lote(pool, lote)
+    assert conn.rollbacks == 1
+    assert [c.commits for c in pool.entregues[1:]] == [1, 1]
+    assert all(e.sucesso() for e in lote)
+    assert stats['regravados'] == 2 and stats['incertos'] == 0
+
+
+def test_conexao_perdida_no_commit_nao_regrava(pool):
+    conn = pool.nova(erro_commit=psycopg2.OperationalError("server closed the connection"))
+    lote = [escrita('a'), escrita('b', erro=ValueError("inválido"))]
+    stats = gravar_lote(pool, lote)
+    assert pool.entregues == [conn]
+    assert isinstance(lote[0].erro, GravacaoIncerta) and lote[0].mensagem is None
+    assert isinstance(lote[1].erro, ValueError)
+    assert stats['incertos'] == 1 and stats['regravados'] == 0
+
+
+def test_resultado_alterado_repete_no_mesmo_savepoint(pool):
+    tentativas = []
+
+    def gravar(cursor):
+        tentativas.append(1)
+        if len(tentativas) == 1:
+            raise ResultadoAlterado("cached plan must not change result type")
+        return "gravado"
+
+    lote = [Escrita('a', gravar)]
+    gravar_lote(pool, lote)
+    conn, = pool.entregues
+    assert lote[0].mensagem == "gravado" and lote[0].sucesso()
+    assert conn.executadas().count("SAVEPOINT escrita") == 2
+
+
+def test_sem_pool():
+    lote = [escrita('a')]
+    gravar_lote(None, lote)
+    assert isinstance(lote[0].erro, psycopg2.InterfaceError)
+
+
+@pytest.fixture(autouse=True)
+def sem_log_de_erros(caplog):
+    caplog.set_level('CRITICAL', logger='conflitos.gravacao')
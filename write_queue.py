@@ -0,0 +1,228 @@
+import contextlib
+import logging
+import queue
+import threading
+
+import psycopg2
+
+from statement_cache import ERROS_REPREPARAR
+
+# Registros gravados por transação, no máximo
+TAMANHO_LOTE = 50
+# Espera (s) por mais registros depois do primeiro, para juntar uma rajada de cadastros no mesmo lote
+ESPERA_LOTE = 0.05
+
+logger = logging.getLogger('conflitos.gravacao')
+
+
+class GravacaoIncerta(Exception):
+    """A conexão caiu durante o COMMIT do lote: não se sabe se o registro foi gravado."""
+
+
+class Escrita:
+    """
+    Um registro (um cadastro completo) enviado à WriteQueue.
+
+    gravar(cursor) executa todas as instruções do registro e retorna a mensagem de
+    sucesso; roda na thread da fila, então só usa valores já lidos dos widgets.
+    'tabelas' são as tabelas de referência a invalidar e 'formularios' os
+    formulários a atualizar quando o registro for gravado. Depois da gravação,
+    'mensagem' ou 'erro' (o registro foi inteiramente desfeito) fica preenchido.
+    """
+
+    def __init__(self, descricao, gravar, tabelas=(), formularios=()):
+        self.descricao = descricao
+        self.gravar = gravar
+        self.tabelas = tuple(tabelas)
+        self.formularios = tuple(formularios)
+        self.mensagem = None
+        self.erro = None
+
+    def sucesso(self):
+        return self.erro is None
+
+
+class WriteQueue:
+    """
+    Fila de gravação (write-behind) dos cadastros.
+
+    enviar() só enfileira o registro; uma thread grava os registros em lotes, cada
+    lote em uma transação e cada registro em um SAVEPOINT próprio: um registro com
+    erro é desfeito sozinho, sem afetar os outros do lote, e a garantia de "tudo ou
+    nada" por registro continua a mesma da gravação direta. Se o lote falhar antes do
+    COMMIT (ou o servidor recusar o COMMIT com um erro, o que desfaz a transação), os
+    registros que tinham dado certo são gravados de novo, um por transação. Se a
+    conexão cair durante o COMMIT, o servidor pode já ter efetivado o lote: os
+    registros ficam com erro GravacaoIncerta e não são repetidos, para não duplicá-los.
+
+    A thread do Tk busca os lotes gravados com lotes_concluidos() (via root.after)
+    e atualiza os caches e as listas uma vez por lote.
+    """
+
+    def __init__(self, obter_pool, tamanho_lote=TAMANHO_LOTE, espera=ESPERA_LOTE,
+                 metricas=None):
+        # obter_pool é uma função porque o pool é recriado a cada "Testar Conexão"
+        self.obter_pool = obter_pool
+        self.tamanho_lote = tamanho_lote
+        self.espera = espera
+        # QueryMetrics opcional: cada lote conta como uma ação, com seus round trips
+        self.metricas = metricas
+        self._entrada = queue.Queue()
+        self._concluidos = queue.Queue()
+        self._lock = threading.Lock()
+        self._pendentes = 0
+        self._thread = None
+        self._stats = {'registros': 0, 'erros': 0, 'lotes': 0, 'regravados': 0, 'incertos': 0}
+
+    def enviar(self, escrita):
+        """Enfileira o registro e retorna imediatamente."""
+        with self._lock:
+            self._pendentes += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executar, name="fila-gravacao", daemon=True)
+                self._thread.start()
+        self._entrada.put(escrita)
+        return escrita
+
+    def pendentes(self):
+        """Registros enviados cujo lote ainda não foi gravado."""
+        with self._lock:
+            return self._pendentes
+
+    def lotes_concluidos(self):
+        """Lotes (listas de Escrita) gravados desde a última chamada."""
+        lotes = []
+        while True:
+            try:
+                lotes.append(self._concluidos.get_nowait())
+            except queue.Empty:
+                return lotes
+
+    def _executar(self):
+        while True:
+            primeira = self._entrada.get()
+            if primeira is None:
+                return
+            lote = [primeira]
+            fim = False
+            # Junta o que chegar logo em seguida (ou já estiver na fila) no mesmo lote
+            while len(lote) < self.tamanho_lote:
+                try:
+                    escrita = self._entrada.get(timeout=self.espera)
+                except queue.Empty:
+                    break
+                if escrita is None:
+                    fim = True
+                    break
+                lote.append(escrita)
+
+            acao = self.metricas.acao('fila_gravacao') if self.metricas else contextlib.nullcontext()
+            with acao:
+                self._gravar_lote(lote)
+            with self._lock:
+                self._pendentes -= len(lote)
+                self._stats['lotes'] += 1
+                self._stats['registros'] += len(lote)
+                self._stats['erros'] += sum(not escrita.sucesso() for escrita in lote)
+            self._concluidos.put(lote)
+            if fim:
+                return
+
+    def _gravar_lote(self, lote):
+        pool = self.obter_pool()
+        if pool is None:
+            for escrita in lote:
+                escrita.erro = psycopg2.InterfaceError("Sem conexão com o banco.")
+            return
+
+        no_commit = False
+        try:
+            with pool.conexao() as conn:
+                try:
+                    with conn.cursor() as cursor:
+                        for escrita in lote:
+                            self._gravar_no_savepoint(cursor, escrita)
+                    no_commit = True
+                    conn.commit()
+                    return
+                except Exception:
+                    if not conn.closed:
+                        conn.rollback()
+                    raise
+        except Exception as e:
+            # Erro do servidor (com SQLSTATE) em resposta ao COMMIT: a transação foi desfeita.
+            # Sem resposta (conexão perdida), o lote pode ter sido efetivado
+            if no_commit and getattr(e, 'pgcode', None) is None:
+                logger.error("Conexão perdida no COMMIT de um lote de %d registros; resultado desconhecido",
+                             len(lote), exc_info=True)
+                incertos = [escrita for escrita in lote if escrita.erro is None]
+                for escrita in incertos:
+                    escrita.mensagem = None
+                    escrita.erro = GravacaoIncerta(
+                        "A conexão caiu ao confirmar a gravação; verifique se o registro foi gravado antes de "
+                        "enviá-lo de novo.")
+                with self._lock:
+                    self._stats['incertos'] += len(incertos)
+                return
+            logger.warning("Lote de %d registros não foi efetivado; gravando um por transação",
+                           len(lote), exc_info=True)
+
+        # Os registros que não falharam por conta própria (gravados ou ainda não tentados)
+        # são gravados um por transação
+        restantes = [escrita for escrita in lote if escrita.erro is None]
+        with self._lock:
+            self._stats['regravados'] += len(restantes)
+        for escrita in restantes:
+            self._gravar_sozinha(pool, escrita)
+
+    def _gravar_no_savepoint(self, cursor, escrita):
+        for tentativa in range(2):
+            cursor.execute("SAVEPOINT escrita")
+            try:
+                escrita.mensagem = escrita.gravar(cursor)
+            except psycopg2.Error as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT escrita")
+                # Instrução preparada que o servidor descartou ou cujo resultado mudou: o cache já a
+                # esqueceu (e a desaloca antes de prepará-la de novo), basta repetir
+                if e.pgcode in ERROS_REPREPARAR and tentativa == 0:
+                    continue
+                escrita.erro = e
+                return
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT escrita")
+                escrita.erro = e
+                return
+            cursor.execute("RELEASE SAVEPOINT escrita")
+            return
+
+    def _gravar_sozinha(self, pool, escrita):
+        escrita.mensagem = None
+        try:
+            with pool.conexao() as conn:
+                try:
+                    with conn.cursor() as cursor:
+                        escrita.mensagem = escrita.gravar(cursor)
+                    conn.commit()
+                    escrita.erro = None
+                except Exception:
+                    if not conn.closed:
+                        conn.rollback()
+                    raise
+        except Exception as e:
+            escrita.mensagem = None
+            escrita.erro = e
+
+    def estatisticas(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pendentes'] = self._pendentes
+        return stats
+
+    def shutdown(self, timeout=None):
+        """Grava o que ainda estiver na fila e encerra a thread (espera até 'timeout' segundos)."""
+        with self._lock:
+            thread = self._thread
+        if thread is None:
+            return
+        self._entrada.put(None)
+        thread.join(timeout)